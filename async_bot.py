@@ -0,0 +1,377 @@
+# ============================================
+# 🚀 ASTERDEX PERP FARM BOT - ASYNC MAIN
+# asyncio version của bot.py: 1 connection pool mỗi exchange,
+# market data của tất cả symbols được poll song song
+# ============================================
+
+import os
+import sys
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import asyncio
+import traceback
+from datetime import datetime
+
+from config import Config
+from utils.logger import logger
+from bot import AsterDEXBot
+from trading.async_asterdex_client import AsyncAsterDEXClient
+from trading.async_binance_client import AsyncBinanceClient
+from trading.async_bridge import AsyncClientBridge
+
+
+class AsyncAsterDEXBot(AsterDEXBot):
+    """
+    Async trading bot - cùng logic với AsterDEXBot.
+
+    Mỗi loop:
+    1. Lấy AccountSnapshot (balance + positions) của mỗi exchange, rồi prefetch
+       klines/orderbook cho tất cả symbols song song trên event loop
+       (giới hạn bởi ASYNC_SYMBOL_CONCURRENCY)
+    2. Phần CPU (features, ML, entry pipeline) và quyết định trade chạy
+       trong worker thread bằng AsterDEXBot._process_symbol, đọc data đã
+       prefetch qua AsyncClientBridge
+    """
+
+    def _init_clients(self):
+        """Async clients cần event loop đang chạy -> tạo trong _run()"""
+        self.async_clients = {}
+
+        if 'asterdex' in Config.EXCHANGES:
+            self.exchange_symbols['asterdex'] = Config.SYMBOLS
+        if 'binance' in Config.EXCHANGES:
+            self.exchange_symbols['binance'] = Config.BINANCE_SYMBOLS
+
+    async def _create_clients(self):
+        """Tạo async clients + sync bridges trên event loop hiện tại"""
+        loop = asyncio.get_running_loop()
+
+        if 'asterdex' in self.exchange_symbols:
+            self.async_clients['asterdex'] = AsyncAsterDEXClient()
+            logger.info(f"✅ AsterDEX (async) initialized with {len(Config.SYMBOLS)} symbols")
+
+        if 'binance' in self.exchange_symbols:
+            self.async_clients['binance'] = AsyncBinanceClient()
+            logger.info(f"✅ Binance (async) initialized with {len(Config.BINANCE_SYMBOLS)} symbols")
+
+        self.clients = {
+            name: AsyncClientBridge(client, loop)
+            for name, client in self.async_clients.items()
+        }
+        self.client = list(self.clients.values())[0] if self.clients else None
+
+    def start(self):
+        """Bắt đầu bot (blocking)"""
+        asyncio.run(self._run())
+
+    async def _refresh_snapshots_async(self):
+        """
+        Lấy AccountSnapshot của tất cả exchanges song song
+
+        Returns:
+            float: Tổng balance
+        """
+        names = list(self.async_clients.keys())
+
+        # Exchange có user-data stream live -> không cần REST
+        snapshots = [self._live_snapshot(n) for n in names]
+        polled = [n for n, s in zip(names, snapshots) if s is None]
+        fetched = dict(zip(polled, await asyncio.gather(
+            *(self.async_clients[n].get_account_snapshot() for n in polled)
+        )))
+        snapshots = [s if s is not None else fetched[n] for n, s in zip(names, snapshots)]
+
+        total_balance = 0
+        for name, snapshot in zip(names, snapshots):
+            self.snapshots[name] = snapshot
+
+            if snapshot is not None:
+                balance = snapshot.balance
+            else:
+                logger.warning(f"⚠️ [{name.upper()}] Account snapshot unavailable, using per-symbol positions")
+                balance = await self.async_clients[name].get_account_balance()
+
+            total_balance += balance
+            logger.info(f"💰 [{name.upper()}] Balance: ${balance:.2f}")
+
+        return total_balance
+
+    async def _get_active_symbols_async(self, fresh=False):
+        """
+        Symbols đang có position trên tất cả exchanges
+
+        Args:
+            fresh: True -> get_all_positions (1 request / exchange) thay vì snapshot đầu loop
+        """
+        active = []
+        for exchange_name, client in self.async_clients.items():
+            symbols = self.exchange_symbols[exchange_name]
+            live = self._live_snapshot(exchange_name)
+            if live is not None:
+                positions = live.positions
+            elif fresh:
+                positions = await client.get_all_positions()
+            else:
+                snapshot = self.snapshots.get(exchange_name)
+                positions = snapshot.positions if snapshot is not None else None
+
+            if positions is None:
+                results = await asyncio.gather(*(client.get_position(s) for s in symbols))
+                positions = {s: p for s, p in zip(symbols, results) if p is not None}
+
+            active.extend(s for s in symbols if s in positions)
+
+        return active
+
+    async def _get_position_async(self, exchange_name, symbol):
+        """Position từ user-data stream / snapshot đầu loop (fallback: get_position)"""
+        snapshot = self._live_snapshot(exchange_name) or self.snapshots.get(exchange_name)
+        if snapshot is not None:
+            return snapshot.get_position(symbol)
+        return await self.async_clients[exchange_name].get_position(symbol)
+
+    async def _prepare_signals_async(self, semaphore, exchange_name, symbols):
+        """
+        Prefetch data của tất cả symbols, rồi batch inference cho symbols chưa có position
+
+        Returns:
+            Symbols đã prefetch (release sau khi xử lý)
+        """
+        bridge = self.clients[exchange_name]
+
+        async def prefetch(symbol):
+            async with semaphore:
+                try:
+                    position = await self._get_position_async(exchange_name, symbol)
+                    await bridge.prefetch(symbol, self._kline_requests(), position=position)
+                    return symbol, position
+                except Exception as e:
+                    logger.debug(f"[{exchange_name.upper()}] Prefetch failed for {symbol}: {e}")
+                    return None
+
+        results = [r for r in await asyncio.gather(*(prefetch(s) for s in symbols)) if r is not None]
+        entry = [symbol for symbol, position in results if position is None]
+
+        if entry:
+            try:
+                prepared = await asyncio.to_thread(self.signal_generator.prepare_batch, bridge, entry)
+                logger.info(f"🧮 [{exchange_name.upper()}] Batch inference: {prepared}/{len(entry)} entry candidates")
+            except Exception as e:
+                logger.warning(f"⚠️ [{exchange_name.upper()}] Batch inference failed, falling back per symbol: {e}")
+
+        return {symbol for symbol, _ in results}
+
+    async def _process_symbol_async(self, semaphore, exchange_name, symbol, current_balance, leverage,
+                                    prefetched=False):
+        """
+        Prefetch data trên event loop, rồi xử lý symbol trong worker thread
+
+        Args:
+            prefetched: Data đã được _prepare_signals_async prefetch
+        """
+        bridge = self.clients[exchange_name]
+
+        async with semaphore:
+            try:
+                if not prefetched:
+                    position = await self._get_position_async(exchange_name, symbol)
+                    await bridge.prefetch(symbol, self._kline_requests(), position=position)
+                await asyncio.to_thread(
+                    self._process_symbol, exchange_name, bridge, symbol, current_balance, leverage
+                )
+            except Exception as e:
+                logger.error(f"❌ [{exchange_name.upper()}] Error processing {symbol}: {e}")
+            finally:
+                bridge.release(symbol)
+
+    async def _process_all_symbols(self, current_balance, symbols=None):
+        """
+        Xử lý symbols của tất cả exchanges song song
+
+        Args:
+            symbols: {exchange_name: [symbols]} (None = tất cả symbols)
+        """
+        semaphore = asyncio.Semaphore(Config.ASYNC_SYMBOL_CONCURRENCY)
+        tasks = []
+        selected = symbols
+
+        for exchange_name in self.clients:
+            if selected is not None and not selected.get(exchange_name):
+                continue
+            leverage = Config.BINANCE_LEVERAGE if exchange_name == 'binance' else Config.LEVERAGE
+            symbols = self._order_symbols(
+                selected[exchange_name] if selected is not None else self.exchange_symbols[exchange_name]
+            )
+            logger.info(f"🔄 Processing {exchange_name.upper()} ({len(symbols)} symbols, async)")
+
+            prefetched = set()
+            if Config.USE_BATCH_INFERENCE:
+                prefetched = await self._prepare_signals_async(semaphore, exchange_name, symbols)
+
+            for symbol in symbols:
+                tasks.append(self._process_symbol_async(
+                    semaphore, exchange_name, symbol, current_balance, leverage,
+                    prefetched=symbol in prefetched
+                ))
+
+        await asyncio.gather(*tasks)
+
+    async def _run_scheduled_async(self):
+        """Main loop theo EventScheduler (xem AsterDEXBot._run_scheduled)"""
+        scheduler = self._build_scheduler()
+
+        while self.running:
+            await asyncio.sleep(min(scheduler.seconds_until_next(), 1.0))
+            due = scheduler.pop_due()
+            if not due:
+                continue
+
+            try:
+                # _daily_reset dùng sync bridge -> chạy trong thread
+                if 'daily_reset' in due:
+                    try:
+                        await asyncio.to_thread(self._daily_reset)
+                    except Exception as e:
+                        logger.error(f"⚠️ Error during daily reset: {e}")
+
+                if any(key not in ('daily_reset', 'cleanup') for key in due):
+                    total_balance = await self._refresh_snapshots_async()
+
+                    can_trade, reason = self.risk_manager.should_trade(total_balance)
+                    if not can_trade:
+                        logger.warning(f"⚠️ Cannot trade: {reason}", send_tg=True)
+                        if self._should_flatten(total_balance):
+                            await asyncio.to_thread(self._flatten_positions, reason)
+                        break
+
+                    symbols = self._due_symbols(due)
+                    if symbols:
+                        self.loop_count += 1
+                        logger.info(f"\n{'='*60}")
+                        logger.info(f"⏰ RUN #{self.loop_count} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - "
+                                    f"{sum(len(s) for s in symbols.values())} symbols")
+                        logger.info(f"{'='*60}")
+                        await self._process_all_symbols(total_balance, symbols)
+
+                if 'cleanup' in due:
+                    try:
+                        self.position_tracker.cleanup_stale_positions(await self._get_active_symbols_async(fresh=True))
+                    except Exception as e:
+                        logger.error(f"⚠️ Error during cleanup: {e}")
+
+            except Exception as e:
+                logger.error(f"❌ CRITICAL: Scheduled run error: {e}")
+                logger.error(f"   Traceback: {traceback.format_exc()}")
+
+    async def _run(self):
+        """Main async loop"""
+        await self._create_clients()
+
+        if Config.USE_KLINE_STREAM:
+            self._start_kline_streams()
+
+        if Config.USE_USER_STREAM:
+            self._start_user_streams()
+
+        if Config.USE_EXIT_ENGINE:
+            self._start_exit_engines()
+
+        try:
+            logger.info("🏁 ASYNC BOT STARTED!", send_tg=True)
+
+            try:
+                total_balance = await self._refresh_snapshots_async()
+                self.risk_manager.set_daily_start(total_balance)
+                logger.info(f"💰 Total starting balance: ${total_balance:.2f}", send_tg=True)
+            except Exception as e:
+                logger.error(f"❌ Failed to get initial balance: {e}", send_tg=True)
+                logger.error("   Check API credentials and network connection")
+                return
+
+            if Config.USE_EVENT_SCHEDULER:
+                await self._run_scheduled_async()
+                return
+
+            while self.running:
+                try:
+                    self.loop_count += 1
+                    logger.info(f"\n{'='*60}")
+                    logger.info(f"🔄 LOOP #{self.loop_count} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+                    logger.info(f"{'='*60}")
+
+                    total_balance = await self._refresh_snapshots_async()
+                    logger.info(f"💰 Total balance: ${total_balance:.2f}")
+
+                    # Heartbeat logging every 5 loops
+                    if self.loop_count % 5 == 0:
+                        active = await self._get_active_symbols_async()
+                        logger.info(f"💓 Bot alive - Loop #{self.loop_count} - Active positions: {len(active)}")
+
+                    # Check if can trade
+                    can_trade, reason = self.risk_manager.should_trade(total_balance)
+                    if not can_trade:
+                        logger.warning(f"⚠️ Cannot trade: {reason}", send_tg=True)
+                        if self._should_flatten(total_balance):
+                            await asyncio.to_thread(self._flatten_positions, reason)
+                        break
+
+                    await self._process_all_symbols(total_balance)
+
+                    # Cleanup stale position tracking (every 10 loops)
+                    if self.loop_count % 10 == 0:
+                        try:
+                            self.position_tracker.cleanup_stale_positions(await self._get_active_symbols_async(fresh=True))
+                        except Exception as e:
+                            logger.error(f"⚠️ Error during cleanup: {e}")
+
+                    # Daily reset check (00:00) - _daily_reset dùng sync bridge -> chạy trong thread
+                    if datetime.now().hour == 0 and datetime.now().minute < 1:
+                        try:
+                            await asyncio.to_thread(self._daily_reset)
+                        except Exception as e:
+                            logger.error(f"⚠️ Error during daily reset: {e}")
+
+                    logger.info(f"\n💤 Sleeping {Config.LOOP_SLEEP}s...")
+                    await asyncio.sleep(Config.LOOP_SLEEP)
+
+                except Exception as e:
+                    logger.error(f"❌ CRITICAL: Main loop error: {e}")
+                    logger.error(f"   Traceback: {traceback.format_exc()}")
+                    logger.error("   Waiting 60s before retry...")
+                    await asyncio.sleep(60)
+
+        except Exception as e:
+            logger.error(f"❌ FATAL: Bot crashed: {e}", send_tg=True)
+            logger.error(f"   Traceback: {traceback.format_exc()}")
+        finally:
+            # Exit engine close qua bridge -> stop trong thread để loop này vẫn chạy
+            for engine in self.exit_engines.values():
+                await asyncio.to_thread(engine.stop)
+            # Flatten qua bridges trước khi đóng sessions (_shutdown sẽ bỏ qua)
+            if Config.FLATTEN_ON_SHUTDOWN and self.clients:
+                await asyncio.to_thread(self._flatten_positions, "shutdown")
+            # Streams backfill qua bridge (chờ loop này) -> dừng trước khi đóng sessions,
+            # stop trong thread để backfill đang chạy hoàn tất thay vì join timeout
+            for stream in self.kline_streams.values():
+                await asyncio.to_thread(stream.stop)
+            # User stream đóng listen key qua bridge -> stop trong thread để loop này vẫn chạy
+            for stream in self.user_streams.values():
+                await asyncio.to_thread(stream.stop)
+            for client in self.async_clients.values():
+                await client.close()
+            self._shutdown()
+
+
+def main():
+    """Main entry point"""
+    os.makedirs('logs', exist_ok=True)
+    os.makedirs('models', exist_ok=True)
+    os.makedirs('data', exist_ok=True)
+
+    bot = AsyncAsterDEXBot()
+    bot.start()
+
+
+if __name__ == '__main__':
+    main()
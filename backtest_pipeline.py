@@ -86,7 +86,8 @@ class PipelineBacktester:
         trailing_distance_pct: float = 2.2,
         use_breakeven: bool = True,
         breakeven_activation_pct: float = 2.5,
-        breakeven_offset_pct: float = 0.4
+        breakeven_offset_pct: float = 0.4,
+        client: AsterDEXClient = None
     ):
         self.symbol = symbol
         self.timeframe = timeframe
@@ -106,7 +107,7 @@ class PipelineBacktester:
         self.breakeven_offset_pct = breakeven_offset_pct / 100
 
         # Initialize components
-        self.client = AsterDEXClient()
+        self.client = client or AsterDEXClient()  # Dùng lại client khi backtest nhiều symbols
         self.feature_engine = FeatureEngine()
 
         # Build pipeline config from Config class or custom
@@ -566,6 +567,9 @@ def run_all_symbols(days: int, balance: float = 1000, leverage: int = 10):
     breakeven_activation = getattr(Config, 'BREAKEVEN_ACTIVATION_PCT', 2.5)
     breakeven_offset = getattr(Config, 'BREAKEVEN_OFFSET_PCT', 0.4)
 
+    # 1 client (1 connection pool) cho tất cả symbols
+    client = AsterDEXClient()
+
     for i, symbol in enumerate(Config.SYMBOLS):
         print(f"\n[{i+1}/{len(Config.SYMBOLS)}] 📊 Backtesting {symbol}...")
 
@@ -583,7 +587,8 @@ def run_all_symbols(days: int, balance: float = 1000, leverage: int = 10):
                 trailing_distance_pct=trailing_distance,
                 use_breakeven=use_breakeven,
                 breakeven_activation_pct=breakeven_activation,
-                breakeven_offset_pct=breakeven_offset
+                breakeven_offset_pct=breakeven_offset,
+                client=client
             )
 
             # Inject ML models
@@ -762,6 +767,7 @@ def optimize_thresholds(symbol: str, days: int):
     ]
 
     results = []
+    client = AsterDEXClient()
 
     for config in configs:
         name = config.pop('name')
@@ -770,7 +776,8 @@ def optimize_thresholds(symbol: str, days: int):
         backtester = PipelineBacktester(
             symbol=symbol,
             days=days,
-            custom_config=config
+            custom_config=config,
+            client=client
         )
 
         result = backtester.run_backtest()
@@ -8,9 +8,11 @@ import sys
 # Add project root to path
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
+import threading
 import time
 from datetime import datetime
 import signal
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from config import Config
 from utils.logger import logger
@@ -19,7 +21,14 @@ from trading.binance_client import BinanceClient
 from trading.signal_generator import SignalGenerator
 from trading.risk_manager import RiskManager
 from trading.position_tracker import PositionTracker
-from trading.trailing_stop import TrailingStopManager
+from trading.trailing_stop import TrailingStopManager, BreakevenStop
+from trading.candle_store import CandleStore
+from trading.kline_stream import KlineStreamManager
+from trading.user_stream import UserDataStream
+from trading.exit_engine import ExitEngine
+from trading.scheduler import EventScheduler
+from trading.execution import OrderExecutor
+from trading.flatten import flatten_all, format_report
 from ml.lstm_model import LSTMTrainer
 from ml.ensemble import EnsemblePredictor
 from ml.features import FeatureEngine
@@ -39,16 +48,7 @@ class AsterDEXBot:
         # Initialize exchange clients
         self.clients = {}
         self.exchange_symbols = {}
-
-        if 'asterdex' in Config.EXCHANGES:
-            self.clients['asterdex'] = AsterDEXClient()
-            self.exchange_symbols['asterdex'] = Config.SYMBOLS
-            logger.info(f"✅ AsterDEX initialized with {len(Config.SYMBOLS)} symbols")
-
-        if 'binance' in Config.EXCHANGES:
-            self.clients['binance'] = BinanceClient()
-            self.exchange_symbols['binance'] = Config.BINANCE_SYMBOLS
-            logger.info(f"✅ Binance initialized with {len(Config.BINANCE_SYMBOLS)} symbols")
+        self._init_clients()
 
         # Backward compatibility: giữ self.client cho code cũ (mặc định = exchange đầu tiên)
         self.client = list(self.clients.values())[0] if self.clients else None
@@ -71,6 +71,15 @@ class AsterDEXBot:
             self.trailing_stop_mgr = None
             logger.info("📈 Trailing Stop disabled")
 
+        # Breakeven stop chỉ đánh giá mỗi tick trong exit engine
+        if Config.USE_EXIT_ENGINE and Config.USE_BREAKEVEN_STOP:
+            self.breakeven_stop = BreakevenStop(
+                activation_pct=Config.BREAKEVEN_ACTIVATION_PCT,
+                breakeven_offset_pct=Config.BREAKEVEN_OFFSET_PCT
+            )
+        else:
+            self.breakeven_stop = None
+
         # Load ML models
         if Config.USE_ENSEMBLE:
             logger.info("🎭 Loading Ensemble models...")
@@ -100,10 +109,36 @@ class AsterDEXBot:
         else:
             self.ai_tracker = None
 
+        # Worker pool per exchange (xử lý symbols song song)
+        self.symbol_executors = self._create_symbol_executors()
+
         # State
         self.running = True
         self.loop_count = 0
 
+        # AccountSnapshot mỗi exchange (balance + positions), refresh đầu mỗi loop
+        self.snapshots = {}
+
+        # Kline websocket streams mỗi exchange (start trong start())
+        self.kline_streams = {}
+
+        # User-data streams mỗi exchange: positions / balance realtime (start trong start())
+        self.user_streams = {}
+
+        # Exit engines mỗi exchange: exit checks theo mark price tick (start trong start())
+        self.exit_engines = {}
+
+        # OrderExecutor mỗi exchange (tạo khi cần, async bot tạo clients trong _run)
+        self.executors = {}
+        self._executors_lock = threading.Lock()
+
+        # flatten_all chỉ chạy 1 lần (loss limit rồi shutdown)
+        self._flattened = False
+
+        # (exchange, symbol) đang được close (main loop / exit engine)
+        self._closing = set()
+        self._closing_lock = threading.Lock()
+
         # Setup signal handlers
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
@@ -115,6 +150,8 @@ class AsterDEXBot:
             leverage = Config.BINANCE_LEVERAGE if exchange_name == 'binance' else Config.LEVERAGE
             logger.info(f"   [{exchange_name.upper()}] Symbols: {symbols}")
             logger.info(f"   [{exchange_name.upper()}] Leverage: {leverage}x")
+            if exchange_name in self.symbol_executors:
+                logger.info(f"   [{exchange_name.upper()}] Parallel workers: {self._get_symbol_workers(exchange_name)}")
 
         logger.info(f"   Position Size: {Config.SIZE_PCT*100}%")
 
@@ -128,6 +165,18 @@ class AsterDEXBot:
         logger.info(f"   🔄 Loop Sleep: {Config.LOOP_SLEEP}s")
         logger.info("=" * 60)
     
+    def _init_clients(self):
+        """Khởi tạo exchange clients theo Config.EXCHANGES"""
+        if 'asterdex' in Config.EXCHANGES:
+            self.clients['asterdex'] = AsterDEXClient()
+            self.exchange_symbols['asterdex'] = Config.SYMBOLS
+            logger.info(f"✅ AsterDEX initialized with {len(Config.SYMBOLS)} symbols")
+
+        if 'binance' in Config.EXCHANGES:
+            self.clients['binance'] = BinanceClient()
+            self.exchange_symbols['binance'] = Config.BINANCE_SYMBOLS
+            logger.info(f"✅ Binance initialized with {len(Config.BINANCE_SYMBOLS)} symbols")
+
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals"""
         logger.info("\n🛑 Shutdown signal received...")
@@ -138,14 +187,18 @@ class AsterDEXBot:
         try:
             logger.info("🏁 BOT STARTED!", send_tg=True)
 
+            if Config.USE_KLINE_STREAM:
+                self._start_kline_streams()
+
+            if Config.USE_USER_STREAM:
+                self._start_user_streams()
+
+            if Config.USE_EXIT_ENGINE:
+                self._start_exit_engines()
+
             # Get initial balance from all exchanges
             try:
-                total_balance = 0
-                for exchange_name, client in self.clients.items():
-                    balance = client.get_account_balance()
-                    total_balance += balance
-                    logger.info(f"💰 [{exchange_name.upper()}] Balance: ${balance:.2f}")
-
+                total_balance = self._refresh_snapshots()
                 self.risk_manager.set_daily_start(total_balance)
                 logger.info(f"💰 Total starting balance: ${total_balance:.2f}", send_tg=True)
             except Exception as e:
@@ -153,6 +206,10 @@ class AsterDEXBot:
                 logger.error("   Check API credentials and network connection")
                 return
 
+            if Config.USE_EVENT_SCHEDULER:
+                self._run_scheduled()
+                return
+
             # Main loop with comprehensive error handling
             while self.running:
                 try:
@@ -161,22 +218,9 @@ class AsterDEXBot:
                     logger.info(f"🔄 LOOP #{self.loop_count} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
                     logger.info(f"{'='*60}")
 
-                    # Heartbeat logging every 5 loops
-                    if self.loop_count % 5 == 0:
-                        total_positions = 0
-                        for exchange_name, client in self.clients.items():
-                            symbols = self.exchange_symbols[exchange_name]
-                            positions_count = sum(1 for s in symbols if client.get_position(s) is not None)
-                            total_positions += positions_count
-                        logger.info(f"💓 Bot alive - Loop #{self.loop_count} - Active positions: {total_positions}")
-
-                    # Get current balance from all exchanges
+                    # Get current balance + positions from all exchanges
                     try:
-                        total_balance = 0
-                        for exchange_name, client in self.clients.items():
-                            balance = client.get_account_balance()
-                            total_balance += balance
-                            logger.info(f"💰 [{exchange_name.upper()}] Balance: ${balance:.2f}")
+                        total_balance = self._refresh_snapshots()
                         logger.info(f"💰 Total balance: ${total_balance:.2f}")
                     except Exception as e:
                         logger.error(f"⚠️ Failed to get balance: {e}")
@@ -184,47 +228,29 @@ class AsterDEXBot:
                         time.sleep(60)
                         continue
 
+                    # Heartbeat logging every 5 loops
+                    if self.loop_count % 5 == 0:
+                        total_positions = sum(
+                            len(self._get_active_symbols(exchange_name, client))
+                            for exchange_name, client in self.clients.items()
+                        )
+                        logger.info(f"💓 Bot alive - Loop #{self.loop_count} - Active positions: {total_positions}")
+
                     # Check if can trade
                     can_trade, reason = self.risk_manager.should_trade(total_balance)
 
                     if not can_trade:
                         logger.warning(f"⚠️ Cannot trade: {reason}", send_tg=True)
+                        if self._should_flatten(total_balance):
+                            self._flatten_positions(reason)
                         break
 
                     # Process each exchange and their symbols
-                    for exchange_name, client in self.clients.items():
-                        logger.info(f"\n{'='*50}")
-                        logger.info(f"🔄 Processing {exchange_name.upper()}")
-                        logger.info(f"{'='*50}")
-
-                        symbols = self.exchange_symbols[exchange_name]
-                        leverage = Config.BINANCE_LEVERAGE if exchange_name == 'binance' else Config.LEVERAGE
-
-                        # Process each symbol on this exchange
-                        for i, symbol in enumerate(symbols):
-                            try:
-                                self._process_symbol(exchange_name, client, symbol, total_balance, leverage)
-                            except Exception as e:
-                                logger.error(f"❌ [{exchange_name.upper()}] Error processing {symbol}: {e}")
-                                logger.error(f"   Continuing with next symbol...")
-                                continue
-
-                            # Small delay between symbols (except last one)
-                            if i < len(symbols) - 1:
-                                time.sleep(0.5)  # 500ms delay
+                    self._process_symbols(total_balance)
 
                     # Cleanup stale position tracking (every 10 loops)
                     if self.loop_count % 10 == 0:
-                        try:
-                            # Collect all active symbols from all exchanges
-                            active_symbols = []
-                            for exchange_name, client in self.clients.items():
-                                symbols = self.exchange_symbols[exchange_name]
-                                active = [s for s in symbols if client.get_position(s) is not None]
-                                active_symbols.extend(active)
-                            self.position_tracker.cleanup_stale_positions(active_symbols)
-                        except Exception as e:
-                            logger.error(f"⚠️ Error during cleanup: {e}")
+                        self._cleanup_stale_positions()
 
                     # Daily reset check (00:00)
                     if datetime.now().hour == 0 and datetime.now().minute < 1:
@@ -256,13 +282,571 @@ class AsterDEXBot:
             # Shutdown
             self._shutdown()
     
+    def _process_symbols(self, current_balance, symbols=None):
+        """
+        Xử lý symbols của mỗi exchange (worker pool nếu có, không thì tuần tự)
+
+        Args:
+            symbols: {exchange_name: [symbols]} (None = tất cả symbols)
+        """
+        if self.symbol_executors:
+            self._process_symbols_parallel(current_balance, symbols)
+
+        for exchange_name, client in self.clients.items():
+            if exchange_name in self.symbol_executors:
+                continue
+            if symbols is not None and not symbols.get(exchange_name):
+                continue
+
+            logger.info(f"\n{'='*50}")
+            logger.info(f"🔄 Processing {exchange_name.upper()}")
+            logger.info(f"{'='*50}")
+
+            exchange_symbols = symbols[exchange_name] if symbols is not None else self.exchange_symbols[exchange_name]
+            leverage = Config.BINANCE_LEVERAGE if exchange_name == 'binance' else Config.LEVERAGE
+
+            ordered = self._order_symbols(exchange_symbols)
+            self._prepare_signals(exchange_name, client, ordered)
+
+            # Process each symbol on this exchange
+            # (pacing do rate limiter của client, không sleep cố định)
+            for symbol in ordered:
+                try:
+                    self._process_symbol(exchange_name, client, symbol, current_balance, leverage)
+                except Exception as e:
+                    logger.error(f"❌ [{exchange_name.upper()}] Error processing {symbol}: {e}")
+                    logger.error(f"   Continuing with next symbol...")
+                    continue
+
+    def _cleanup_stale_positions(self):
+        """Xoá tracking của positions không còn trên exchange"""
+        try:
+            # Collect all active symbols from all exchanges
+            # (fresh, vì snapshot đầu loop chưa có positions vừa mở trong loop này)
+            active_symbols = []
+            for exchange_name, client in self.clients.items():
+                active = self._get_active_symbols(exchange_name, client, fresh=True)
+                active_symbols.extend(active)
+            self.position_tracker.cleanup_stale_positions(active_symbols)
+        except Exception as e:
+            logger.error(f"⚠️ Error during cleanup: {e}")
+
+    # ============================================
+    # EVENT SCHEDULER
+    # ============================================
+
+    def _build_scheduler(self):
+        """
+        Jobs của bot:
+        - ('entry', exchange, symbol): khi candle entry timeframe đóng (+ jitter)
+        - 'positions': quản lý positions mỗi POSITION_CHECK_INTERVAL giây
+        - 'cleanup': dọn position tracking (10 x POSITION_CHECK_INTERVAL)
+        - 'daily_reset': đúng 00:00 giờ local
+        """
+        scheduler = EventScheduler()
+        timeframe = self._entry_timeframe()
+
+        for exchange_name, symbols in self.exchange_symbols.items():
+            for symbol in symbols:
+                scheduler.add_candle_close(
+                    ('entry', exchange_name, symbol), timeframe, jitter=Config.SCHEDULER_JITTER
+                )
+
+        scheduler.add_interval('positions', Config.POSITION_CHECK_INTERVAL)
+        scheduler.add_interval('cleanup', Config.POSITION_CHECK_INTERVAL * 10, immediate=False)
+        scheduler.add_daily('daily_reset', 0, 0)
+
+        logger.info(f"⏰ Event scheduler: entries on {timeframe} close (jitter {Config.SCHEDULER_JITTER}s), "
+                    f"positions every {Config.POSITION_CHECK_INTERVAL}s")
+        return scheduler
+
+    def _position_symbols(self, exchange_name):
+        """Symbols đang có position theo snapshot mới nhất (fallback: PositionTracker)"""
+        symbols = self.exchange_symbols[exchange_name]
+        snapshot = self.snapshots.get(exchange_name)
+        if snapshot is not None:
+            return snapshot.active_symbols(symbols)
+        tracked = self.position_tracker.get_all_tracked_positions()
+        return [s for s in symbols if s in tracked]
+
+    def _due_symbols(self, due):
+        """
+        Symbols cần xử lý cho các jobs tới hạn
+
+        Returns:
+            dict: {exchange_name: [symbols]} (chỉ exchanges có symbols)
+        """
+        symbols = {exchange_name: [] for exchange_name in self.clients}
+
+        for key in due:
+            if isinstance(key, tuple) and key[0] == 'entry' and key[1] in symbols:
+                symbols[key[1]].append(key[2])
+
+        if 'positions' in due:
+            for exchange_name in self.clients:
+                if exchange_name in self.exit_engines:
+                    continue  # Exit engine đã theo dõi mỗi tick
+                for symbol in self._position_symbols(exchange_name):
+                    if symbol not in symbols[exchange_name]:
+                        symbols[exchange_name].append(symbol)
+
+        return {exchange_name: s for exchange_name, s in symbols.items() if s}
+
+    def _run_scheduled(self):
+        """Main loop theo EventScheduler thay vì LOOP_SLEEP"""
+        scheduler = self._build_scheduler()
+
+        while self.running:
+            due = scheduler.wait(lambda: not self.running)
+            if not due:
+                continue
+
+            try:
+                if 'daily_reset' in due:
+                    try:
+                        self._daily_reset()
+                    except Exception as e:
+                        logger.error(f"⚠️ Error during daily reset: {e}")
+
+                if any(key not in ('daily_reset', 'cleanup') for key in due):
+                    total_balance = self._refresh_snapshots()
+
+                    can_trade, reason = self.risk_manager.should_trade(total_balance)
+                    if not can_trade:
+                        logger.warning(f"⚠️ Cannot trade: {reason}", send_tg=True)
+                        if self._should_flatten(total_balance):
+                            self._flatten_positions(reason)
+                        break
+
+                    symbols = self._due_symbols(due)
+                    if symbols:
+                        self.loop_count += 1
+                        logger.info(f"\n{'='*60}")
+                        logger.info(f"⏰ RUN #{self.loop_count} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - "
+                                    f"{sum(len(s) for s in symbols.values())} symbols")
+                        logger.info(f"{'='*60}")
+                        self._process_symbols(total_balance, symbols)
+
+                if 'cleanup' in due:
+                    self._cleanup_stale_positions()
+
+            except KeyboardInterrupt:
+                logger.info("\n⌨️ Keyboard interrupt...")
+                break
+            except Exception as e:
+                logger.error(f"❌ CRITICAL: Scheduled run error: {e}")
+                import traceback
+                logger.error(f"   Traceback: {traceback.format_exc()}")
+
+    @staticmethod
+    def _entry_timeframe():
+        """Timeframe mà entry signal dựa vào (candle đóng -> đánh giá entry)"""
+        return Config.PRIMARY_TIMEFRAME if Config.USE_ADVANCED_ENTRY else '15m'
+
+    @staticmethod
+    def _kline_requests():
+        """
+        Các (interval, limit) mà SignalGenerator.generate_signal sẽ đọc
+
+        Returns:
+            dict: {interval: limit}
+        """
+        if Config.USE_ADVANCED_ENTRY:
+            requests = {Config.PRIMARY_TIMEFRAME: 200}
+        else:
+            requests = {'15m': 100}
+
+        if Config.USE_MULTI_TIMEFRAME:
+            for interval in ('1h', '4h', Config.HIGHER_TIMEFRAME):
+                requests[interval] = max(requests.get(interval, 0), 100)
+
+        return requests
+
+    @staticmethod
+    def _get_stream_url(exchange_name, testnet):
+        """Websocket base URL cho kline streams"""
+        if exchange_name == 'binance':
+            return Config.BINANCE_TESTNET_WS_URL if testnet else Config.BINANCE_WS_URL
+        return Config.WS_URL
+
+    def _start_kline_streams(self):
+        """
+        Start kline websocket streams cho mỗi exchange.
+        client.get_klines đọc từ CandleStore, REST chỉ dùng để backfill.
+        """
+        intervals = list(self._kline_requests().keys())
+
+        for exchange_name, client in self.clients.items():
+            store = CandleStore(Config.KLINE_STREAM_BUFFER)
+            client.candle_store = store
+
+            stream = KlineStreamManager(
+                self._get_stream_url(exchange_name, client.testnet),
+                client,
+                self.exchange_symbols[exchange_name],
+                intervals,
+                store=store,
+                exchange_name=exchange_name.upper()
+            )
+            stream.start()
+            self.kline_streams[exchange_name] = stream
+
+        logger.info(f"📡 Kline streams started: intervals={intervals}")
+
+    def _start_user_streams(self):
+        """
+        Start user-data stream cho mỗi exchange. Snapshot / positions đọc từ
+        AccountState realtime, REST chỉ khi stream không live.
+        """
+        for exchange_name, client in self.clients.items():
+            stream = UserDataStream(
+                self._get_stream_url(exchange_name, client.testnet),
+                client,
+                exchange_name=exchange_name.upper()
+            )
+            stream.state.add_position_closed_listener(
+                lambda symbol, record, name=exchange_name: self._on_position_closed(name, symbol, record)
+            )
+            stream.start()
+            self.user_streams[exchange_name] = stream
+
+        logger.info(f"👤 User data streams started: {list(self.user_streams.keys())}")
+
+    def _on_position_closed(self, exchange_name, symbol, record):
+        """
+        Position về 0 trên exchange (TP/SL, liquidation, close thủ công, hoặc
+        lệnh close của bot): dọn tracking ngay thay vì chờ loop sau
+        """
+        logger.info(f"👤 [{exchange_name.upper()}] Position closed on exchange: {symbol}")
+        self.position_tracker.clear_position(symbol)
+        if self.trailing_stop_mgr is not None:
+            self.trailing_stop_mgr.remove_trailing_stop(symbol)
+        if self.breakeven_stop is not None:
+            self.breakeven_stop.remove_breakeven_stop(symbol)
+
+    def _start_exit_engines(self):
+        """
+        Start exit engine cho mỗi exchange: trailing / breakeven / TP / SL /
+        timeout đánh giá mỗi mark price tick, close ngay không chờ LOOP_SLEEP
+        """
+        for exchange_name, client in self.clients.items():
+            leverage = Config.BINANCE_LEVERAGE if exchange_name == 'binance' else Config.LEVERAGE
+            engine = ExitEngine(
+                self._get_stream_url(exchange_name, client.testnet),
+                lambda name=exchange_name, client=client: self._get_open_positions(name, client),
+                lambda symbol, position, leverage=leverage: self._evaluate_exit(symbol, position, leverage),
+                lambda symbol, position, reason, name=exchange_name, client=client:
+                    self._close_and_record(name, client, symbol, position, reason),
+                leverage=leverage,
+                exchange_name=exchange_name.upper()
+            )
+            engine.start()
+            self.exit_engines[exchange_name] = engine
+
+        logger.info(f"⚡ Exit engines started: {list(self.exit_engines.keys())}")
+
+    def _get_open_positions(self, exchange_name, client):
+        """Positions đang mở: user-data stream nếu live, không thì REST"""
+        live = self._live_snapshot(exchange_name)
+        if live is not None:
+            return live.positions
+        return client.get_all_positions()
+
+    def _get_executor(self, exchange_name, client):
+        """
+        OrderExecutor của exchange. Giá sizing: mark price (user-data stream)
+        -> candle entry timeframe (stream / prefetch) -> ticker REST
+        """
+        with self._executors_lock:
+            executor = self.executors.get(exchange_name)
+            if executor is None or executor.client is not client:
+                timeframe = self._entry_timeframe()
+                executor = OrderExecutor(
+                    client,
+                    self.risk_manager,
+                    price_sources=[
+                        ('mark', lambda symbol: self._cached_mark_price(exchange_name, symbol)),
+                        ('candle', lambda symbol: client.get_cached_price(symbol, timeframe)),
+                    ],
+                    exchange_name=exchange_name.upper()
+                )
+                self.executors[exchange_name] = executor
+            return executor
+
+    def _cached_mark_price(self, exchange_name, symbol):
+        """Mark price realtime từ user-data stream (None nếu không live)"""
+        stream = self.user_streams.get(exchange_name)
+        if stream is None or not stream.is_live():
+            return None
+        return stream.state.get_mark_price(symbol)
+
+    def _live_snapshot(self, exchange_name):
+        """AccountSnapshot realtime từ user-data stream (None nếu không live)"""
+        stream = self.user_streams.get(exchange_name)
+        if stream is None:
+            return None
+        return stream.get_snapshot()
+
+    def _refresh_snapshots(self):
+        """
+        Lấy AccountSnapshot (balance + tất cả positions) của từng exchange.
+        2 requests mỗi exchange thay vì 1 get_position mỗi symbol.
+
+        Returns:
+            float: Tổng balance của tất cả exchanges
+        """
+        total_balance = 0
+        for exchange_name, client in self.clients.items():
+            snapshot = self._live_snapshot(exchange_name) or client.get_account_snapshot()
+            self.snapshots[exchange_name] = snapshot
+
+            if snapshot is not None:
+                balance = snapshot.balance
+            else:
+                # Không lấy được positions -> _get_position fallback per-symbol
+                logger.warning(f"⚠️ [{exchange_name.upper()}] Account snapshot unavailable, using per-symbol positions")
+                balance = client.get_account_balance()
+
+            total_balance += balance
+            logger.info(f"💰 [{exchange_name.upper()}] Balance: ${balance:.2f}")
+
+        return total_balance
+
+    def _get_position(self, exchange_name, client, symbol):
+        """Position của symbol từ user-data stream / snapshot đầu loop (fallback: get_position)"""
+        snapshot = self._live_snapshot(exchange_name) or self.snapshots.get(exchange_name)
+        if snapshot is not None:
+            return snapshot.get_position(symbol)
+        return client.get_position(symbol)
+
+    def _get_active_symbols(self, exchange_name, client, fresh=False):
+        """
+        Symbols đang có position trên 1 exchange
+
+        Args:
+            fresh: True -> 1 request get_all_positions thay vì dùng snapshot đầu loop
+        """
+        symbols = self.exchange_symbols[exchange_name]
+
+        live = self._live_snapshot(exchange_name)
+        if live is not None:
+            return live.active_symbols(symbols)
+
+        if fresh:
+            positions = client.get_all_positions()
+            if positions is not None:
+                return [s for s in symbols if s in positions]
+        else:
+            snapshot = self.snapshots.get(exchange_name)
+            if snapshot is not None:
+                return snapshot.active_symbols(symbols)
+
+        return [s for s in symbols if client.get_position(s) is not None]
+
+    def _create_symbol_executors(self):
+        """Worker pool mỗi exchange khi USE_PARALLEL_SYMBOLS ({} = xử lý tuần tự)"""
+        if not Config.USE_PARALLEL_SYMBOLS:
+            return {}
+        return {
+            exchange_name: ThreadPoolExecutor(
+                max_workers=self._get_symbol_workers(exchange_name),
+                thread_name_prefix=f"{exchange_name}-symbol"
+            )
+            for exchange_name in self.clients
+        }
+
+    def _get_symbol_workers(self, exchange_name):
+        """Số worker xử lý symbols song song cho exchange"""
+        return Config.BINANCE_SYMBOL_WORKERS if exchange_name == 'binance' else Config.SYMBOL_WORKERS
+
+    def _order_symbols(self, symbols):
+        """
+        Sắp xếp symbols: symbols đang có position được xử lý trước entry scans
+
+        Dùng PositionTracker (local) nên không tốn thêm API call
+        """
+        tracked = self.position_tracker.get_all_tracked_positions()
+        return sorted(symbols, key=lambda s: s not in tracked)
+
+    def _prepare_signals(self, exchange_name, client, symbols, executor=None):
+        """
+        Batch inference cho symbols chưa có position (trước khi xử lý từng symbol)
+
+        generate_signal() của các symbols này dùng lại predictions đã tính,
+        lỗi ở đây chỉ làm mỗi symbol tự predict như cũ.
+        """
+        if not Config.USE_BATCH_INFERENCE:
+            return
+        try:
+            entry = [s for s in symbols if not self._get_position(exchange_name, client, s)]
+            if entry:
+                prepared = self.signal_generator.prepare_batch(client, entry, executor=executor)
+                logger.info(f"🧮 [{exchange_name.upper()}] Batch inference: {prepared}/{len(entry)} entry candidates")
+        except Exception as e:
+            logger.warning(f"⚠️ [{exchange_name.upper()}] Batch inference failed, falling back per symbol: {e}")
+
+    def _process_symbols_parallel(self, current_balance, symbols=None):
+        """
+        Xử lý symbols song song qua worker pool của từng exchange.
+        Thời gian 1 loop ~ symbol chậm nhất thay vì tổng tất cả symbols.
+
+        Args:
+            symbols: {exchange_name: [symbols]} (None = tất cả symbols)
+        """
+        futures = {}
+        selected = symbols
+
+        for exchange_name, client in self.clients.items():
+            executor = self.symbol_executors.get(exchange_name)
+            if executor is None:
+                continue
+            if selected is not None and not selected.get(exchange_name):
+                continue
+
+            symbols = self._order_symbols(
+                selected[exchange_name] if selected is not None else self.exchange_symbols[exchange_name]
+            )
+            leverage = Config.BINANCE_LEVERAGE if exchange_name == 'binance' else Config.LEVERAGE
+
+            logger.info(f"\n{'='*50}")
+            logger.info(f"🔄 Processing {exchange_name.upper()} ({len(symbols)} symbols, {self._get_symbol_workers(exchange_name)} workers)")
+            logger.info(f"{'='*50}")
+
+            self._prepare_signals(exchange_name, client, symbols, executor=executor)
+
+            # Executor chạy theo thứ tự submit (FIFO) -> open positions trước
+            for symbol in symbols:
+                future = executor.submit(
+                    self._process_symbol, exchange_name, client, symbol, current_balance, leverage
+                )
+                futures[future] = (exchange_name, symbol)
+
+        for future in as_completed(futures):
+            exchange_name, symbol = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"❌ [{exchange_name.upper()}] Error processing {symbol}: {e}")
+
+    def _evaluate_exit(self, symbol, position, leverage, position_age_hours=None, verbose=False):
+        """
+        Trailing stop -> breakeven -> TP/SL/timeout cho 1 position
+
+        Args:
+            position: Position dict (get_position format)
+            leverage: Leverage để tính PnL%
+            position_age_hours: Tuổi position (None: đọc từ PositionTracker)
+            verbose: Log trạng thái trailing (main loop), tắt khi gọi mỗi tick
+
+        Returns:
+            tuple: (should_close, reason)
+        """
+        if position_age_hours is None:
+            position_age_hours = self.position_tracker.get_position_age_hours(symbol)
+
+        # Check trailing stop first (highest priority for profit protection)
+        if self.trailing_stop_mgr is not None:
+            ts_result = self.trailing_stop_mgr.update_trailing_stop(
+                symbol=symbol,
+                side=position['side'],
+                entry_price=position['entry_price'],
+                current_price=position['mark_price'],
+                leverage=leverage  # Pass leverage for PnL-based calculation
+            )
+
+            if ts_result['should_close']:
+                logger.info(f"   📈 {ts_result['reason']}")
+                return True, ts_result['reason']
+            elif verbose and ts_result.get('activated'):
+                # Log trailing stop status when active
+                logger.info(f"   📈 Trailing active: PnL={ts_result.get('current_pnl', 0):.2f}%, Peak={ts_result.get('highest_pnl', 0):.2f}%")
+
+        if self.breakeven_stop is not None:
+            be_result = self.breakeven_stop.update_breakeven_stop(
+                symbol=symbol,
+                side=position['side'],
+                entry_price=position['entry_price'],
+                current_price=position['mark_price'],
+                leverage=leverage
+            )
+            if be_result['should_close']:
+                return True, be_result['reason']
+
+        # If not closed by trailing stop, check TP/SL/Timeout
+        return self.signal_generator.should_close_position(
+            position,
+            position_age_hours=position_age_hours
+        )
+
+    def _close_and_record(self, exchange_name, client, symbol, position, reason):
+        """
+        Đóng position và cập nhật tracking / cooldowns / stats.
+        Main loop và ExitEngine có thể gọi cùng lúc -> chỉ 1 close mỗi symbol.
+
+        Returns:
+            bool: True nếu đã đóng
+        """
+        key = (exchange_name, symbol)
+        with self._closing_lock:
+            if key in self._closing:
+                return False
+            self._closing.add(key)
+
+        try:
+            logger.info(f"   🔴 Closing position: {reason}")
+
+            if not client.close_position(symbol, position=position):
+                return False
+
+            logger.trade(f"[{exchange_name.upper()}] CLOSE {position['side']} {symbol} | {reason} | PnL: {position['pnl_pct']*100:.2f}%")
+
+            # Clear position tracking
+            self.position_tracker.clear_position(symbol)
+
+            # Clear trailing / breakeven stop
+            if self.trailing_stop_mgr is not None:
+                self.trailing_stop_mgr.remove_trailing_stop(symbol)
+            if self.breakeven_stop is not None:
+                self.breakeven_stop.remove_breakeven_stop(symbol)
+
+            # Record POST-TRADE COOLDOWN (NEW!)
+            if self.signal_generator.cooldown_tracker is not None and Config.USE_POST_TRADE_COOLDOWN:
+                self.signal_generator.cooldown_tracker.record_trade_close(
+                    symbol=symbol,
+                    close_price=position['mark_price'],
+                    close_reason=reason
+                )
+                logger.info(f"   ⏳ Post-trade cooldown: {Config.POST_TRADE_COOLDOWN_MINUTES}m")
+
+            # Record for Entry Quality Checker (NEW!)
+            if hasattr(self.signal_generator, 'entry_quality_checker'):
+                self.signal_generator.entry_quality_checker.record_close(
+                    symbol=symbol,
+                    close_price=position['mark_price'],
+                    close_reason=reason,
+                    side=position['side']
+                )
+
+            # Record trade
+            self.risk_manager.record_trade(
+                symbol=symbol,
+                side=f"CLOSE_{position['side']}",
+                quantity=position['amount'],
+                price=position['mark_price'],
+                pnl_pct=position['pnl_pct']
+            )
+            return True
+        finally:
+            with self._closing_lock:
+                self._closing.discard(key)
+
     def _process_symbol(self, exchange_name, client, symbol, current_balance, leverage):
         """Xử lý 1 symbol với detailed logging"""
         logger.info(f"\n📊 [{exchange_name.upper()}] Processing {symbol}...")
 
         try:
             # Check current position
-            position = client.get_position(symbol)
+            position = self._get_position(exchange_name, client, symbol)
 
             if position:
                 # Get position age
@@ -275,73 +859,17 @@ class AsterDEXBot:
                 if position_age_hours is not None:
                     logger.info(f"   Age: {position_age_hours:.1f}h / {Config.POSITION_TIMEOUT_HOURS}h")
 
-                # Check trailing stop first (highest priority for profit protection)
-                should_close = False
-                reason = ""
-
-                if self.trailing_stop_mgr is not None:
-                    ts_result = self.trailing_stop_mgr.update_trailing_stop(
-                        symbol=symbol,
-                        side=position['side'],
-                        entry_price=position['entry_price'],
-                        current_price=position['mark_price'],
-                        leverage=leverage  # Pass leverage for PnL-based calculation
-                    )
-
-                    if ts_result['should_close']:
-                        should_close = True
-                        reason = ts_result['reason']
-                        logger.info(f"   📈 {reason}")
-                    elif ts_result.get('activated'):
-                        # Log trailing stop status when active
-                        logger.info(f"   📈 Trailing active: PnL={ts_result.get('current_pnl', 0):.2f}%, Peak={ts_result.get('highest_pnl', 0):.2f}%")
-
-                # If not closed by trailing stop, check TP/SL/Timeout
-                if not should_close:
-                    should_close, reason = self.signal_generator.should_close_position(
-                        position,
-                        position_age_hours=position_age_hours
-                    )
+                if exchange_name in self.exit_engines:
+                    # Exit checks chạy theo mark price tick trong ExitEngine
+                    logger.info(f"   ⚡ Exits monitored by exit engine")
+                    return
+
+                should_close, reason = self._evaluate_exit(
+                    symbol, position, leverage, position_age_hours=position_age_hours, verbose=True
+                )
 
                 if should_close:
-                    logger.info(f"   🔴 Closing position: {reason}")
-
-                    if client.close_position(symbol):
-                        logger.trade(f"[{exchange_name.upper()}] CLOSE {position['side']} {symbol} | {reason} | PnL: {position['pnl_pct']*100:.2f}%")
-
-                        # Clear position tracking
-                        self.position_tracker.clear_position(symbol)
-
-                        # Clear trailing stop
-                        if self.trailing_stop_mgr is not None:
-                            self.trailing_stop_mgr.remove_trailing_stop(symbol)
-
-                        # Record POST-TRADE COOLDOWN (NEW!)
-                        if self.signal_generator.cooldown_tracker is not None and Config.USE_POST_TRADE_COOLDOWN:
-                            self.signal_generator.cooldown_tracker.record_trade_close(
-                                symbol=symbol,
-                                close_price=position['mark_price'],
-                                close_reason=reason
-                            )
-                            logger.info(f"   ⏳ Post-trade cooldown: {Config.POST_TRADE_COOLDOWN_MINUTES}m")
-
-                        # Record for Entry Quality Checker (NEW!)
-                        if hasattr(self.signal_generator, 'entry_quality_checker'):
-                            self.signal_generator.entry_quality_checker.record_close(
-                                symbol=symbol,
-                                close_price=position['mark_price'],
-                                close_reason=reason,
-                                side=position['side']
-                            )
-
-                        # Record trade
-                        self.risk_manager.record_trade(
-                            symbol=symbol,
-                            side=f"CLOSE_{position['side']}",
-                            quantity=position['amount'],
-                            price=position['mark_price'],
-                            pnl_pct=position['pnl_pct']
-                        )
+                    self._close_and_record(exchange_name, client, symbol, position, reason)
 
             else:
                 # No position - check for entry signal with detailed logging
@@ -384,6 +912,7 @@ class AsterDEXBot:
                     # Extract signal direction for use in order placement
                     signal_direction = signal[0] if isinstance(signal, tuple) else signal
 
+                    signal_time = time.monotonic()
                     logger.info(f"   🟢 Entry signal detected: {signal_direction}")
                     if Config.USE_ADVANCED_ENTRY or Config.USE_SMART_ENTRY_V2:
                         logger.info(f"   📊 Confluence score: {confluence_score}/{Config.MIN_CONFLUENCE_SCORE}")
@@ -396,22 +925,16 @@ class AsterDEXBot:
                         logger.info(f"   🚫 Cooldown recorded for {symbol} ({Config.SIGNAL_COOLDOWN_MINUTES}m)")
 
                     try:
-                        # Setup leverage and margin
-                        logger.info(f"   ⚙️ Setting up leverage {leverage}x and ISOLATED margin...")
-                        client.set_leverage(symbol, leverage)
-                        client.set_margin_type(symbol, 'ISOLATED')
-
-                        # Get price
-                        price = client.get_ticker_price(symbol)
-                        logger.info(f"   💵 Current price: ${price:.2f}")
-
-                        # Calculate position size
-                        raw_quantity = self.risk_manager.calculate_position_size(
-                            current_balance, price, leverage
-                        )
+                        # Setup leverage and margin (chỉ gửi request nếu account config khác)
+                        client.ensure_symbol_config(symbol, leverage, 'ISOLATED')
 
-                        # Format quantity according to exchange rules
-                        quantity = client.format_quantity(symbol, raw_quantity)
+                        # Price (cache trước, ticker REST nếu không có) + size + format 1 lần
+                        executor = self._get_executor(exchange_name, client)
+                        plan = executor.plan_entry(
+                            symbol, signal_direction, current_balance, leverage, signal_time=signal_time
+                        )
+                        price, raw_quantity, quantity = plan.price, plan.raw_quantity, plan.quantity
+                        logger.info(f"   💵 Current price: ${price:.2f} ({plan.price_source})")
 
                         # Log calculation details
                         logger.info(f"   💰 Position calculation:")
@@ -429,16 +952,14 @@ class AsterDEXBot:
 
                         # Check minimum quantity
                         if quantity > 0:
-                            # Determine side (use signal_direction, not signal)
-                            side = 'BUY' if signal_direction == 'LONG' else 'SELL'
-                            logger.info(f"   📤 Placing {side} order for {quantity} {symbol}...")
+                            # Side theo signal_direction (plan.side), không phải signal
+                            logger.info(f"   📤 Placing {plan.side} order for {quantity} {symbol}...")
 
-                            # Create order
-                            order = client.create_market_order(
-                                symbol=symbol,
-                                side=side,
-                                quantity=quantity
-                            )
+                            # Create order (client order id, retry idempotent)
+                            result = executor.submit(plan)
+                            order = result.order
+                            logger.info(f"   ⏱️ Signal -> ack: {result.signal_to_ack_ms:.0f}ms "
+                                        f"(submit {result.submit_to_ack_ms:.0f}ms, attempts {result.attempts})")
 
                             if order:
                                 # Log trade with confluence info if available
@@ -481,6 +1002,47 @@ class AsterDEXBot:
             import traceback
             logger.error(f"   Traceback: {traceback.format_exc()}")
     
+    def _should_flatten(self, total_balance):
+        """Đóng tất cả positions khi chạm daily loss limit (FLATTEN_ON_LOSS_LIMIT)"""
+        if not Config.FLATTEN_ON_LOSS_LIMIT:
+            return False
+        exceeded, _ = self.risk_manager.check_daily_loss_limit(total_balance)
+        return exceeded
+
+    def _flatten_positions(self, reason):
+        """
+        Đóng tất cả positions trên mọi exchange song song (batch orders),
+        dọn tracking và gửi report từng position
+
+        Returns:
+            list: CloseResult (rỗng nếu đã flatten trước đó)
+        """
+        if self._flattened:
+            return []
+        self._flattened = True
+
+        logger.warning(f"🔴 Flattening all positions: {reason}", send_tg=True)
+        results = flatten_all(self.clients)
+
+        for r in results:
+            if not r.ok:
+                continue
+            self.position_tracker.clear_position(r.symbol)
+            if self.trailing_stop_mgr is not None:
+                self.trailing_stop_mgr.remove_trailing_stop(r.symbol)
+            if self.breakeven_stop is not None:
+                self.breakeven_stop.remove_breakeven_stop(r.symbol)
+            self.risk_manager.record_trade(
+                symbol=r.symbol,
+                side=f"CLOSE_{r.side}",
+                quantity=r.amount,
+                price=r.mark_price,
+                pnl_pct=r.pnl_pct
+            )
+
+        logger.info(format_report(results), send_tg=True)
+        return results
+
     def _daily_reset(self):
         """Reset daily stats"""
         logger.info("\n🌅 DAILY RESET")
@@ -499,10 +1061,29 @@ class AsterDEXBot:
         logger.info("🛑 SHUTTING DOWN BOT")
         logger.info("=" * 60)
         
+        # Stop exit engines + kline + user-data streams
+        for engine in self.exit_engines.values():
+            engine.stop()
+
         # Close all positions (optional)
-        # for symbol in Config.SYMBOLS:
-        #     self.client.close_position(symbol)
-        
+        if Config.FLATTEN_ON_SHUTDOWN:
+            self._flatten_positions("shutdown")
+
+        for stream in self.kline_streams.values():
+            stream.stop()
+        for stream in self.user_streams.values():
+            stream.stop()
+
+        # Stop worker pools
+        for executor in self.symbol_executors.values():
+            executor.shutdown(wait=True)
+
+        # Order latency
+        for exchange_name, executor in self.executors.items():
+            for stage, stats in executor.latency.summary().items():
+                logger.info(f"⏱️ [{exchange_name.upper()}] {stage}: p50={stats['p50']:.0f}ms "
+                            f"p95={stats['p95']:.0f}ms max={stats['max']:.0f}ms (n={stats['count']})")
+
         # Final stats
         stats_msg = self.risk_manager.get_stats_message()
         logger.info(stats_msg, send_tg=True)
@@ -24,12 +24,22 @@ class Config:
     # AsterDEX URLs
     FUTURES_BASE_URL = 'https://fapi.asterdex.com/fapi'
     TESTNET_URL = 'https://testnet.asterdex.com/fapi'
+    WS_URL = os.getenv('ASTERDEX_WS_URL', 'wss://fstream.asterdex.com')
     TESTNET_MODE = os.getenv('TESTNET_MODE', 'True').lower() == 'true'
 
     # Binance API Credentials
     BINANCE_API_KEY = os.getenv('BINANCE_API_KEY', '')
     BINANCE_API_SECRET = os.getenv('BINANCE_API_SECRET', '')
     BINANCE_TESTNET_MODE = os.getenv('BINANCE_TESTNET_MODE', 'False').lower() == 'true'
+    BINANCE_WS_URL = 'wss://fstream.binance.com'
+    BINANCE_TESTNET_WS_URL = 'wss://stream.binancefuture.com'
+
+    # Local exchange simulator (scripts/run_simulator.py), vd. http://127.0.0.1:8765
+    # Set -> tất cả REST / websocket URLs (AsterDEX + Binance) trỏ tới simulator
+    SIMULATOR_URL = os.getenv('SIMULATOR_URL', '').rstrip('/')
+    if SIMULATOR_URL:
+        FUTURES_BASE_URL = TESTNET_URL = f"{SIMULATOR_URL}/fapi"
+        WS_URL = BINANCE_WS_URL = BINANCE_TESTNET_WS_URL = 'ws' + SIMULATOR_URL[len('http'):]
 
     # ============================================
     # 📱 TELEGRAM NOTIFICATION
@@ -67,6 +77,64 @@ class Config:
     LOOP_SLEEP = int(os.getenv('LOOP_SLEEP', '30'))  # 30 giây
     DAILY_LOSS_LIMIT = float(os.getenv('DAILY_LOSS_LIMIT', '0.2'))  # 20%
     POSITION_TIMEOUT_HOURS = float(os.getenv('POSITION_TIMEOUT_HOURS', '24'))  # Auto-close after 24 hours
+
+    # Concurrent symbol processing (worker pool mỗi exchange)
+    USE_PARALLEL_SYMBOLS = os.getenv('USE_PARALLEL_SYMBOLS', 'False').lower() == 'true'
+    SYMBOL_WORKERS = int(os.getenv('SYMBOL_WORKERS', '4'))  # Max symbols xử lý song song trên AsterDEX
+    BINANCE_SYMBOL_WORKERS = int(os.getenv('BINANCE_SYMBOL_WORKERS', '4'))  # Max symbols song song trên Binance
+
+    # Async bot (async_bot.py) - 1 aiohttp connection pool mỗi exchange
+    ASYNC_SYMBOL_CONCURRENCY = int(os.getenv('ASYNC_SYMBOL_CONCURRENCY', '50'))  # Max symbols đang xử lý cùng lúc
+    ASYNC_MAX_CONNECTIONS = int(os.getenv('ASYNC_MAX_CONNECTIONS', '20'))  # Max TCP connections mỗi exchange
+
+    # Kline websocket streams -> in-memory candle store (get_klines không cần REST)
+    USE_KLINE_STREAM = os.getenv('USE_KLINE_STREAM', 'False').lower() == 'true'
+    KLINE_STREAM_BUFFER = int(os.getenv('KLINE_STREAM_BUFFER', '500'))  # Candles giữ mỗi (symbol, interval)
+
+    # User-data stream (listen key): positions / balance / fills realtime, REST chỉ khi stream mất kết nối
+    USE_USER_STREAM = os.getenv('USE_USER_STREAM', 'False').lower() == 'true'
+
+    # Exit engine: trailing / breakeven / TP / SL / timeout mỗi mark price tick
+    # (<symbol>@markPrice@1s) cho positions đang mở, không chờ LOOP_SLEEP
+    USE_EXIT_ENGINE = os.getenv('USE_EXIT_ENGINE', 'False').lower() == 'true'
+    EXIT_POLL_INTERVAL = float(os.getenv('EXIT_POLL_INTERVAL', '2'))  # Giây refresh positions / REST fallback
+
+    # Event scheduler: entry khi candle entry timeframe đóng, quản lý positions theo
+    # POSITION_CHECK_INTERVAL, daily reset đúng 00:00 (thay vì chạy tất cả mỗi LOOP_SLEEP)
+    USE_EVENT_SCHEDULER = os.getenv('USE_EVENT_SCHEDULER', 'False').lower() == 'true'
+    SCHEDULER_JITTER = float(os.getenv('SCHEDULER_JITTER', '10'))  # Giây jitter tối đa sau candle close
+    POSITION_CHECK_INTERVAL = float(os.getenv('POSITION_CHECK_INTERVAL', '15'))  # Giây
+
+    # REST kline cache: chỉ fetch candles mới hơn cache (startTime) thay vì cả window
+    USE_KLINE_CACHE = os.getenv('USE_KLINE_CACHE', 'True').lower() == 'true'
+    KLINE_CACHE_SIZE = int(os.getenv('KLINE_CACHE_SIZE', '1000'))  # Candles giữ mỗi (exchange, symbol, interval)
+
+    # Indicator cache: indicators / EMAs / rolling means mỗi (symbol, interval, candle) chỉ tính 1 lần
+    USE_INDICATOR_CACHE = os.getenv('USE_INDICATOR_CACHE', 'True').lower() == 'true'
+
+    # Batch inference: mỗi loop, models predict 1 lần cho mọi symbols chưa có position
+    USE_BATCH_INFERENCE = os.getenv('USE_BATCH_INFERENCE', 'True').lower() == 'true'
+
+    # Exchange info index (LOT_SIZE/PRICE_FILTER/MIN_NOTIONAL) cache trong data/
+    EXCHANGE_INFO_TTL = int(os.getenv('EXCHANGE_INFO_TTL', '21600'))  # 6 giờ
+
+    # REST rate limiter (token bucket theo request weight, mỗi exchange 1 bucket)
+    RATE_LIMIT_WEIGHT = int(os.getenv('RATE_LIMIT_WEIGHT', '2400'))  # AsterDEX weight / phút
+    BINANCE_RATE_LIMIT_WEIGHT = int(os.getenv('BINANCE_RATE_LIMIT_WEIGHT', '2400'))  # Binance weight / phút
+    RATE_LIMIT_UTILIZATION = float(os.getenv('RATE_LIMIT_UTILIZATION', '0.8'))  # Chỉ dùng 80% limit
+
+    # HTTP connection pool (keep-alive) dùng chung cho mọi REST client
+    HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '10'))  # Số hosts giữ pool
+    HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '10'))  # Max connections mỗi host
+    HTTP_KEEPALIVE_TIMEOUT = float(os.getenv('HTTP_KEEPALIVE_TIMEOUT', '60'))  # Giây giữ connection rảnh (async)
+    HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '3'))  # Retry lỗi mạng / 5xx
+    HTTP_BACKOFF_FACTOR = float(os.getenv('HTTP_BACKOFF_FACTOR', '0.5'))  # Backoff 0.5s, 1s, 2s... + jitter
+    ORDER_MAX_RETRIES = int(os.getenv('ORDER_MAX_RETRIES', '2'))  # Gửi lại order (cùng client order id) khi lỗi mạng
+    BULK_ORDER_WORKERS = int(os.getenv('BULK_ORDER_WORKERS', '4'))  # batchOrders requests song song mỗi exchange
+
+    # Đóng tất cả positions (song song, mọi exchange) khi chạm daily loss limit / khi tắt bot
+    FLATTEN_ON_LOSS_LIMIT = os.getenv('FLATTEN_ON_LOSS_LIMIT', 'False').lower() == 'true'
+    FLATTEN_ON_SHUTDOWN = os.getenv('FLATTEN_ON_SHUTDOWN', 'False').lower() == 'true'
     
     # ML Parameters
     LSTM_HIDDEN_SIZE = int(os.getenv('LSTM_HIDDEN_SIZE', '128'))
@@ -77,6 +145,12 @@ class Config:
     SEQUENCE_LENGTH = int(os.getenv('SEQUENCE_LENGTH', '60'))
     LSTM_THRESHOLD = float(os.getenv('LSTM_THRESHOLD', '0.55'))
 
+    # ============================================
+    # 🏭 TRAINING FEATURE PIPELINE
+    # ============================================
+    # Processes tính indicators từng symbol khi train (0 = số CPU, 1 = tuần tự)
+    FEATURE_WORKERS = int(os.getenv('FEATURE_WORKERS', '0'))
+
     # ============================================
     # 🎭 ENSEMBLE MODEL SETTINGS
     # ============================================
@@ -176,6 +250,11 @@ class Config:
     MODEL_PATH = 'models/lstm_model.pt'
     SCALER_PATH = 'models/scaler.pkl'
 
+    # ONNX Runtime: scalers + models của ensemble export thành 1 graph (ml/onnx_export.py),
+    # inference bằng onnxruntime CPU; thiếu onnxruntime / file cũ hơn models -> dùng models gốc
+    USE_ONNX_RUNTIME = os.getenv('USE_ONNX_RUNTIME', 'True').lower() == 'true'
+    ONNX_MODEL_PATH = 'models/ensemble.onnx'
+
     # Backtest
     BACKTEST_DAYS = int(os.getenv('BACKTEST_DAYS', '90'))
     BACKTEST_INITIAL_CAPITAL = int(os.getenv('BACKTEST_INITIAL_CAPITAL', '1000'))
@@ -314,6 +393,14 @@ class Config:
             if cls.BINANCE_LEVERAGE < 1 or cls.BINANCE_LEVERAGE > 125:
                 raise ValueError("❌ BINANCE_LEVERAGE phải trong khoảng [1, 125]")
 
+        # Validate worker pool size
+        if cls.SYMBOL_WORKERS < 1 or cls.BINANCE_SYMBOL_WORKERS < 1:
+            raise ValueError("❌ SYMBOL_WORKERS và BINANCE_SYMBOL_WORKERS phải >= 1")
+
+        # Candle store phải chứa đủ 200 candles (limit lớn nhất của SignalGenerator)
+        if cls.USE_KLINE_STREAM and cls.KLINE_STREAM_BUFFER < 200:
+            raise ValueError("❌ KLINE_STREAM_BUFFER phải >= 200")
+
         print("✅ Config validation passed!")
         return True
 
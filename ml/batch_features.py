@@ -0,0 +1,143 @@
+# ============================================
+# 📦 BATCH FEATURE PIPELINE
+# Indicators tính riêng từng symbol (song song qua process pool khi universe lớn),
+# sequences không bao giờ nối qua 2 symbols
+# ============================================
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from ml.feature_store import write_features
+from ml.features import FeatureEngine
+from ml.sequence_dataset import SequenceDataset
+from utils.logger import logger
+
+
+# Dưới ngưỡng này chi phí spawn process lớn hơn thời gian tính indicators
+PARALLEL_MIN_ROWS = 50_000
+
+
+@dataclass
+class FeatureMatrix:
+    """
+    Features của nhiều symbols trong 1 matrix float32 liên tục
+
+    Rows của symbol i nằm trong features[offsets[i]:offsets[i + 1]]
+    """
+    features: np.ndarray   # (n_rows, n_features) float32, C-contiguous
+    symbols: List[str]
+    offsets: np.ndarray    # (n_symbols + 1,) int64
+
+    @property
+    def symbol_codes(self) -> np.ndarray:
+        """Index symbol (trong self.symbols) của từng row"""
+        return np.repeat(np.arange(len(self.symbols)), np.diff(self.offsets))
+
+    def rows(self, symbol: str) -> np.ndarray:
+        """View (không copy) các rows của 1 symbol"""
+        i = self.symbols.index(symbol)
+        return self.features[self.offsets[i]:self.offsets[i + 1]]
+
+    def sequences(self, seq_length: int, data: Optional[np.ndarray] = None
+                  ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Sequences + labels theo từng symbol (xem build_sequences)
+
+        Args:
+            seq_length: Độ dài sequence
+            data: Matrix thay thế cùng layout (vd. features đã normalize)
+        """
+        return build_sequences(self.features if data is None else data, self.offsets, seq_length)
+
+    def dataset(self, seq_length: int, data: Optional[np.ndarray] = None) -> SequenceDataset:
+        """
+        Sequences lazily (strided views, không copy seq_length lần)
+
+        Args:
+            seq_length: Độ dài sequence
+            data: Matrix thay thế cùng layout (vd. features đã normalize)
+        """
+        return SequenceDataset(self.features if data is None else data, seq_length, self.offsets)
+
+
+def _symbol_features(df: pd.DataFrame) -> np.ndarray:
+    """Indicators + feature columns của 1 symbol (chạy trong worker process)"""
+    out = np.empty((len(df), len(FeatureEngine.FEATURE_COLUMNS)), dtype=np.float32)
+    return write_features(df, out)
+
+
+def compute_grouped_features(df: pd.DataFrame, symbol_col: str = 'symbol',
+                             workers: Optional[int] = None) -> FeatureMatrix:
+    """
+    Tính indicators riêng cho từng symbol trong multi-symbol frame
+
+    Rolling windows / EMA không bị "rò" từ cuối symbol này sang đầu symbol kế tiếp.
+    Thứ tự symbols = thứ tự xuất hiện đầu tiên; thứ tự rows trong symbol giữ nguyên.
+
+    Args:
+        df: DataFrame OHLCV có column symbol_col (vd. DataFetcher.combine_dataframes)
+        symbol_col: Tên column symbol
+        workers: Số processes (None = Config.FEATURE_WORKERS, 0 = os.cpu_count(), 1 = tuần tự)
+
+    Returns:
+        FeatureMatrix
+    """
+    if symbol_col not in df.columns:
+        raise ValueError(f"DataFrame không có column '{symbol_col}'")
+
+    # Row positions mỗi symbol; frame từng symbol chỉ tạo khi tính (không giữ cả universe 2 lần)
+    positions = df.groupby(symbol_col, sort=False).indices
+    keys = list(pd.unique(df[symbol_col]))
+    symbols = [str(key) for key in keys]
+    ohlcv = [i for i, column in enumerate(df.columns) if column != symbol_col]
+
+    def group(i: int) -> pd.DataFrame:
+        return df.iloc[positions[keys[i]], ohlcv]
+
+    if workers is None:
+        workers = Config.FEATURE_WORKERS
+    workers = min(workers or os.cpu_count() or 1, len(keys))
+
+    offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(positions[key]) for key in keys])
+
+    # Preallocate 1 lần, indicators ghi thẳng vào rows của từng symbol
+    n_features = len(FeatureEngine.FEATURE_COLUMNS)
+    features = np.empty((offsets[-1], n_features), dtype=np.float32)
+
+    if workers > 1 and len(df) >= PARALLEL_MIN_ROWS:
+        logger.info(f"🔧 Calculating indicators for {len(keys)} symbols ({workers} processes)...")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            arrays = pool.map(_symbol_features, (group(i) for i in range(len(keys))))
+            for i, array in enumerate(arrays):
+                features[offsets[i]:offsets[i + 1]] = array
+    else:
+        for i in range(len(keys)):
+            write_features(group(i), features[offsets[i]:offsets[i + 1]])
+
+    return FeatureMatrix(features=features, symbols=symbols, offsets=offsets)
+
+
+def build_sequences(data: np.ndarray, offsets: np.ndarray, seq_length: int
+                    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Giống FeatureEngine.create_sequences nhưng windows nằm trọn trong 1 symbol
+
+    Args:
+        data: (n_rows, n_features), rows nhóm theo symbol
+        offsets: Ranh giới symbols (FeatureMatrix.offsets)
+        seq_length: Độ dài sequence
+
+    Returns:
+        X: (n_sequences, seq_length, n_features) float32 C-contiguous
+        y: (n_sequences,) - 1 nếu close kế tiếp tăng, 0 nếu giảm
+        seq_symbols: (n_sequences,) index symbol của từng sequence
+    """
+    dataset = SequenceDataset(data, seq_length, offsets)
+    return dataset.batch(slice(None)), dataset.labels, dataset.symbol_codes
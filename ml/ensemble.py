@@ -3,7 +3,12 @@
 # Combines multiple models for better predictions
 # ============================================
 
+import os
+from collections import Counter
+from typing import Dict, List, Optional
+
 import numpy as np
+from ml.ensemble_result import EnsembleResult
 from ml.lstm_model import LSTMTrainer
 from ml.xgboost_model import XGBoostTrainer
 from ml.lightgbm_model import LightGBMTrainer
@@ -11,6 +16,106 @@ from ml.catboost_model import CatBoostTrainer
 from utils.logger import logger
 from config import Config
 
+# ONNX Runtime (optional): InferenceBackend cho models đã export (ml/onnx_export.py)
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+
+# File model của từng model trong thư mục Config.MODEL_PATH
+MODEL_FILES = {
+    'lstm': 'lstm_model.pt',
+    'xgboost': 'xgboost_model.json',
+    'lightgbm': 'lightgbm_model.txt',
+    'catboost': 'catboost_model.cbm',
+}
+
+
+def model_paths(model_name: str):
+    """(model_path, scaler_path) của 1 model trong models/"""
+    if model_name == 'lstm':
+        return Config.MODEL_PATH, Config.SCALER_PATH
+    return (Config.MODEL_PATH.replace('lstm_model.pt', MODEL_FILES[model_name]),
+            Config.SCALER_PATH.replace('scaler.pkl', f'{model_name}_scaler.pkl'))
+
+
+class InferenceBackend:
+    """
+    onnxruntime session cho ensemble.onnx: scalers + tất cả models trong 1 graph,
+    1 lần run cho cả batch thay vì 1 forward pass / model
+
+    Input X (n, seq_len, n_features) float32, output probability UP (n, n_models).
+    """
+
+    def __init__(self, path: str):
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.model_names: List[str] = metadata['models'].split(',')
+        self.n_features = int(metadata['n_features'])
+        self.path = path
+
+    @classmethod
+    def load(cls, path: str = None, model_names: List[str] = ()) -> Optional['InferenceBackend']:
+        """
+        Load backend nếu dùng được, None -> EnsemblePredictor dùng models gốc
+
+        None khi: thiếu onnxruntime, chưa export, file cũ hơn models (retrain chưa export lại),
+        thiếu model trong graph.
+        """
+        path = path or Config.ONNX_MODEL_PATH
+
+        if not ONNXRUNTIME_AVAILABLE:
+            logger.info("ℹ️ onnxruntime not installed, using native models")
+            return None
+        if not os.path.exists(path):
+            logger.info(f"ℹ️ {path} not found, using native models")
+            return None
+
+        exported_at = os.path.getmtime(path)
+        for model_name in model_names:
+            if model_name not in MODEL_FILES:
+                continue
+            model_path = model_paths(model_name)[0]
+            if os.path.exists(model_path) and os.path.getmtime(model_path) > exported_at:
+                logger.warning(f"⚠️ {path} is older than {model_path}, using native models")
+                return None
+
+        try:
+            backend = cls(path)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load {path}: {e}")
+            return None
+
+        missing = [name for name in model_names if name not in backend.model_names]
+        if missing:
+            logger.warning(f"⚠️ {path} has no {missing}, using native models")
+            return None
+
+        logger.info(f"⚡ ONNX Runtime backend loaded: {backend.model_names}")
+        return backend
+
+    def run(self, X) -> Dict[str, np.ndarray]:
+        """
+        Args:
+            X: (n, seq_len, n_features) hoặc (seq_len, n_features)
+
+        Returns:
+            {model_name: (n,) probabilities}
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 2:
+            X = X[None]
+
+        probabilities = self.session.run(None, {self.input_name: X})[0]
+        return {name: probabilities[:, i].astype(float) for i, name in enumerate(self.model_names)}
+
+
 class EnsemblePredictor:
     """
     Ensemble multiple ML models with weighted averaging
@@ -49,6 +154,12 @@ class EnsemblePredictor:
         # Initialize models
         self.models = {}
 
+        # Số inputs (symbol, candle) mỗi model đã predict: {model_name: count}
+        self.model_runs = Counter()
+
+        # InferenceBackend (ONNX Runtime), set bởi load_models() khi USE_ONNX_RUNTIME
+        self.backend = None
+
         for model_name in models:
             if model_name == 'lstm':
                 self.models['lstm'] = LSTMTrainer(input_size=input_size)
@@ -117,6 +228,12 @@ class EnsemblePredictor:
             self._adjust_weights()
 
         logger.info(f"✅ Ensemble loaded: {success_count}/{len(self.models)} models")
+
+        if Config.USE_ONNX_RUNTIME:
+            self.backend = InferenceBackend.load(
+                Config.ONNX_MODEL_PATH, [name for name in self.model_names if name in self.models]
+            )
+
         return True
 
     def _adjust_weights(self):
@@ -140,9 +257,46 @@ class EnsemblePredictor:
             self.model_names = available_models
             logger.info(f"   Adjusted weights: {dict(zip(self.model_names, self.weights))}")
 
-    def predict(self, X):
+    def _run_model(self, model_name, X):
+        """Probability của 1 model cho 1 input (đếm vào model_runs)"""
+        pred = self.models[model_name].predict(X)
+        self.model_runs[model_name] += 1
+
+        # Handle different return types
+        if isinstance(pred, np.ndarray):
+            pred = pred[0] if len(pred) > 0 else 0.5
+
+        return float(pred)
+
+    def _run_backend(self, X):
         """
-        Ensemble prediction with weighted averaging
+        Probabilities của tất cả models qua InferenceBackend (đếm vào model_runs)
+
+        Returns:
+            {model_name: (n,)} hoặc None (không có backend / lỗi -> tắt backend, dùng models gốc)
+        """
+        if self.backend is None:
+            return None
+
+        try:
+            columns = self.backend.run(X)
+        except Exception as e:
+            logger.warning(f"ONNX Runtime inference failed, using native models: {e}")
+            self.backend = None
+            return None
+
+        n = 1 if np.ndim(X) == 2 else len(X)
+        columns = {name: columns[name] for name in self.model_names if name in self.models and name in columns}
+        for model_name in columns:
+            self.model_runs[model_name] += n
+        return columns
+
+    def _backend_weights(self, columns):
+        return {name: self.weights[i] for i, name in enumerate(self.model_names) if name in columns}
+
+    def predict_result(self, X):
+        """
+        Chạy mỗi model đúng 1 lần cho input
 
         Args:
             X: Input features (compatible with all models)
@@ -150,43 +304,43 @@ class EnsemblePredictor:
                 - For XGBoost: (seq_len, n_features) or (n_features,)
 
         Returns:
-            float: Ensemble prediction (0-1)
+            EnsembleResult: probabilities từng model, weighted mean, agreement
         """
-        predictions = []
-        valid_weights = []
+        columns = self._run_backend(X) if np.ndim(X) == 2 else None
+        if columns:
+            return EnsembleResult.from_predictions(
+                {name: float(preds[0]) for name, preds in columns.items()}, self._backend_weights(columns)
+            )
+
+        predictions = {}
+        valid_weights = {}
 
         for i, model_name in enumerate(self.model_names):
+            if model_name not in self.models:
+                continue
             try:
-                if model_name not in self.models:
-                    continue
-
-                model = self.models[model_name]
-
-                # Get prediction
-                pred = model.predict(X)
-
-                # Handle different return types
-                if isinstance(pred, np.ndarray):
-                    pred = pred[0] if len(pred) > 0 else 0.5
-
-                predictions.append(pred)
-                valid_weights.append(self.weights[i])
-
+                predictions[model_name] = self._run_model(model_name, X)
+                valid_weights[model_name] = self.weights[i]
             except Exception as e:
                 logger.warning(f"Prediction failed for {model_name}: {e}")
                 continue
 
         if not predictions:
             logger.error("All model predictions failed!")
-            return 0.5
 
-        # Weighted average
-        valid_weights = np.array(valid_weights)
-        valid_weights = valid_weights / valid_weights.sum()  # Normalize
+        return EnsembleResult.from_predictions(predictions, valid_weights)
+
+    def predict(self, X):
+        """
+        Ensemble prediction with weighted averaging
 
-        ensemble_pred = np.average(predictions, weights=valid_weights)
+        Args:
+            X: Input features (xem predict_result)
 
-        return ensemble_pred
+        Returns:
+            float: Ensemble prediction (0-1)
+        """
+        return self.predict_result(X).probability
 
     def predict_with_details(self, X):
         """
@@ -198,7 +352,29 @@ class EnsemblePredictor:
         Returns:
             tuple: (ensemble_pred, individual_preds_dict)
         """
-        predictions = {}
+        result = self.predict_result(X)
+        return result.probability, result.details()
+
+    def predict_results(self, X):
+        """
+        EnsembleResult cho nhiều samples (vd. 1 window mỗi symbol):
+        mỗi model chạy 1 lần trên cả batch
+
+        Args:
+            X: (n, seq_len, n_features)
+
+        Returns:
+            list: EnsembleResult cho từng sample, cùng thứ tự với X
+        """
+        columns = self._run_backend(X)
+        if columns:
+            return [
+                EnsembleResult.from_predictions({name: preds[i] for name, preds in columns.items()},
+                                                self._backend_weights(columns))
+                for i in range(len(X))
+            ]
+
+        columns = {}
         valid_weights = {}
 
         for i, model_name in enumerate(self.model_names):
@@ -206,67 +382,64 @@ class EnsemblePredictor:
                 if model_name not in self.models:
                     continue
 
-                model = self.models[model_name]
-                pred = model.predict(X)
-
-                if isinstance(pred, np.ndarray):
-                    pred = pred[0] if len(pred) > 0 else 0.5
-
-                predictions[model_name] = pred
+                columns[model_name] = np.asarray(self.models[model_name].predict_batch(X), dtype=float)
+                self.model_runs[model_name] += len(X)
                 valid_weights[model_name] = self.weights[i]
 
             except Exception as e:
-                logger.warning(f"Prediction failed for {model_name}: {e}")
+                logger.warning(f"Batch prediction failed for {model_name}: {e}")
                 continue
 
-        if not predictions:
-            return 0.5, {}
+        return [
+            EnsembleResult.from_predictions({name: preds[i] for name, preds in columns.items()}, valid_weights)
+            for i in range(len(X))
+        ]
 
-        # Weighted average
-        weights_array = np.array(list(valid_weights.values()))
-        weights_array = weights_array / weights_array.sum()
+    def predict_batch(self, X):
+        """
+        Ensemble prediction cho nhiều samples (xem predict_results)
+
+        Args:
+            X: (n, seq_len, n_features)
 
-        ensemble_pred = np.average(list(predictions.values()), weights=weights_array)
+        Returns:
+            tuple: (ensemble_preds (n,), individual_preds_dict)
+                individual_preds_dict[model_name] = (n,) array,
+                + 'ensemble' và 'weights' như predict_with_details
+        """
+        results = self.predict_results(X)
+        if not results or not results[0].predictions:
+            return np.full(len(X), 0.5), {}
 
-        # Add ensemble to predictions
-        predictions['ensemble'] = ensemble_pred
-        predictions['weights'] = valid_weights
+        ensemble_preds = np.array([result.probability for result in results])
+        predictions = {
+            name: np.array([result.predictions[name] for result in results])
+            for name in results[0].predictions
+        }
+        predictions['ensemble'] = ensemble_preds
+        predictions['weights'] = dict(results[0].weights)
 
-        return ensemble_pred, predictions
+        return ensemble_preds, predictions
 
-    def get_model_agreement(self, X):
+    def get_model_agreement(self, X=None, result=None):
         """
         Check how much models agree on prediction
 
+        Args:
+            X: Input features (chỉ dùng khi không có result)
+            result: EnsembleResult đã tính (không chạy lại models)
+
         Returns:
             float: Agreement score (0-1, higher = more agreement)
         """
-        predictions = []
-
-        for model_name in self.model_names:
-            if model_name not in self.models:
-                continue
+        if result is None:
+            result = self.predict_result(X)
 
-            try:
-                pred = self.models[model_name].predict(X)
-                if isinstance(pred, np.ndarray):
-                    pred = pred[0]
-                predictions.append(pred)
-            except:
-                continue
-
-        if len(predictions) < 2:
+        if len(result.predictions) < 2:
             return 1.0  # Perfect agreement if only 1 model
 
-        # Calculate standard deviation (lower = more agreement)
-        std = np.std(predictions)
-
-        # Convert to agreement score (0-1)
-        # std of 0.0 = perfect agreement (1.0)
-        # std of 0.5 = maximum disagreement (0.0)
-        agreement = 1.0 - min(std * 2, 1.0)
-
-        return agreement
+        # std of 0.0 = perfect agreement (1.0), std of 0.5 = maximum disagreement (0.0)
+        return result.agreement
 
     @property
     def scaler(self):
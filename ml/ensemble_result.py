@@ -0,0 +1,61 @@
+# ============================================
+# 🎯 ENSEMBLE RESULT
+# Kết quả predict 1 lần của tất cả models cho 1 input (symbol, candle):
+# SignalGenerator -> EntryPipeline -> AIEntryAnalyzer dùng lại, không chạy lại models
+# ============================================
+
+from dataclasses import dataclass, field
+from typing import Dict
+
+import numpy as np
+
+
+@dataclass
+class EnsembleResult:
+    """
+    Probabilities từng model + weighted mean + agreement
+
+    Stages dùng weights khác (vd. MLEnsembleSignal) gọi reweighted(),
+    chỉ tính lại mean / agreement từ probabilities đã có.
+    """
+    predictions: Dict[str, float] = field(default_factory=dict)  # {model_name: probability UP}
+    weights: Dict[str, float] = field(default_factory=dict)      # Weights đã dùng (normalized)
+    probability: float = 0.5                                     # Weighted mean
+    agreement: float = 0.0                                       # 1 - min(std * 2, 1)
+
+    @classmethod
+    def from_predictions(cls, predictions: Dict[str, float], weights: Dict[str, float]) -> 'EnsembleResult':
+        """
+        Args:
+            predictions: {model_name: probability}
+            weights: {model_name: weight} (chưa cần normalize, chỉ dùng models có trong predictions)
+        """
+        if not predictions:
+            return cls()
+
+        names = list(predictions)
+        weights_array = np.array([weights[name] for name in names], dtype=float)
+        weights_array = weights_array / weights_array.sum()
+        preds_array = np.array([predictions[name] for name in names], dtype=float)
+
+        return cls(
+            predictions={name: float(p) for name, p in zip(names, preds_array)},
+            weights=dict(zip(names, weights_array.tolist())),
+            probability=float(np.average(preds_array, weights=weights_array)),
+            agreement=1.0 - min(float(np.std(preds_array)) * 2, 1.0),
+        )
+
+    def reweighted(self, weights: Dict[str, float]) -> 'EnsembleResult':
+        """Cùng probabilities, chỉ models có trong `weights` (không chạy lại models)"""
+        return EnsembleResult.from_predictions(
+            {name: p for name, p in self.predictions.items() if name in weights}, weights
+        )
+
+    def details(self) -> Dict:
+        """Dict kiểu predict_with_details: {model: prob, 'ensemble': mean, 'weights': {...}}"""
+        if not self.predictions:
+            return {}
+        details = dict(self.predictions)
+        details['ensemble'] = self.probability
+        details['weights'] = dict(self.weights)
+        return details
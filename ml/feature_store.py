@@ -0,0 +1,219 @@
+# ============================================
+# 🗄️ FEATURE STORE
+# Buffer float32 theo columns, preallocate mỗi (symbol, interval):
+# indicator kernels (INDICATOR_REGISTRY) ghi thẳng vào buffer,
+# models / scalers đọc rows mà không qua DataFrame trung gian
+# ============================================
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ml.features import BASE_COLUMNS, INDICATOR_REGISTRY, FeatureEngine
+
+
+# Columns mà indicator khác đọc lại (vd. atr -> atr_pct): giữ bản float64 trong lúc tính
+_INTERMEDIATE_COLUMNS = {column for spec in INDICATOR_REGISTRY for column in spec.inputs} - set(BASE_COLUMNS)
+
+
+class _BufferFrame:
+    """
+    Thay DataFrame cho các spec functions (df['x'] đọc / ghi)
+
+    Input OHLCV đọc từ frame gốc; output ghi (cast float32) thẳng vào column
+    tương ứng của `out`. Chỉ columns trong _INTERMEDIATE_COLUMNS được giữ lại
+    dạng float64 để indicator sau đọc (kết quả giống hệt calculate_indicators).
+    """
+
+    def __init__(self, df: pd.DataFrame, out: np.ndarray, columns: List[str]):
+        self._df = df
+        self._out = out
+        self._positions = {column: i for i, column in enumerate(columns)}
+        self._series: Dict[str, pd.Series] = {}
+
+    @property
+    def index(self) -> pd.Index:
+        return self._df.index
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._df.columns) + list(self._series)
+
+    def __len__(self) -> int:
+        return len(self._df)
+
+    def __getitem__(self, column: str) -> pd.Series:
+        series = self._series.get(column)
+        return self._df[column] if series is None else series
+
+    def __setitem__(self, column: str, value):
+        if column in _INTERMEDIATE_COLUMNS:
+            self._series[column] = value if isinstance(value, pd.Series) else pd.Series(value, index=self.index)
+        position = self._positions.get(column)
+        if position is not None:
+            target = self._out[:, position]
+            target[:] = value.to_numpy(dtype=np.float64) if isinstance(value, pd.Series) else value
+
+
+def _backfill(values: np.ndarray):
+    """bfill rồi fillna(0) từng column, in-place"""
+    n = len(values)
+    positions = np.arange(n)
+    for j in range(values.shape[1]):
+        column = values[:, j]
+        missing = np.isnan(column)
+        if not missing.any():
+            continue
+        # Row valid kế tiếp (n nếu không có)
+        following = np.minimum.accumulate(np.where(missing, n, positions)[::-1])[::-1]
+        filled = following < n
+        column[missing & filled] = column[following[missing & filled]]
+        column[missing & ~filled] = 0
+
+
+def write_features(df: pd.DataFrame, out: np.ndarray, columns: Optional[List[str]] = None) -> np.ndarray:
+    """
+    Tính indicators của df, ghi `columns` vào `out` (in-place)
+
+    Giá trị = prepare_features(calculate_indicators(df))[columns] cast float32.
+
+    Args:
+        df: DataFrame OHLCV
+        out: (len(df), len(columns)) float32, có thể là view (vd. rows 1 symbol trong matrix lớn)
+        columns: Feature columns (None = FEATURE_COLUMNS)
+
+    Returns:
+        out
+    """
+    columns = columns or FeatureEngine.FEATURE_COLUMNS
+    if out.shape != (len(df), len(columns)):
+        raise ValueError(f"Buffer shape {out.shape} != {(len(df), len(columns))}")
+
+    frame = _BufferFrame(df, out, columns)
+    # Columns không spec nào tạo ra (giống prepare_features) = 0
+    for position, column in enumerate(columns):
+        out[:, position] = df[column].to_numpy(dtype=np.float64) if column in df.columns else 0
+
+    for spec in FeatureEngine.resolve([c for c in columns if c not in df.columns]):
+        spec.fn(frame)
+
+    _backfill(out)
+    return out
+
+
+class FeatureBuffer:
+    """
+    Features 1 (symbol, interval): (capacity, n_features) float32 column-major
+
+    Mỗi column liên tục trong memory; buffer chỉ cấp phát lại khi frame dài hơn capacity.
+    Rows trả về là views: hợp lệ tới lần ghi tiếp theo. Nhiều threads dùng chung buffer
+    -> giữ `lock` từ lúc ghi tới khi đọc xong rows (vd. scaler.transform).
+    """
+
+    def __init__(self, capacity: int, columns: Optional[List[str]] = None):
+        self.columns = list(columns or FeatureEngine.FEATURE_COLUMNS)
+        self.values = np.zeros((capacity, len(self.columns)), dtype=np.float32, order='F')
+        self.length = 0
+        self.lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return len(self.values)
+
+    def _reserve(self, n: int):
+        if n > self.capacity:
+            self.values = np.zeros((n, len(self.columns)), dtype=np.float32, order='F')
+
+    def fill(self, df: pd.DataFrame) -> np.ndarray:
+        """Tính indicators từ OHLCV thẳng vào buffer, trả về rows"""
+        self._reserve(len(df))
+        self.length = len(df)
+        write_features(df, self.values[:self.length], self.columns)
+        return self.rows()
+
+    def load(self, df: pd.DataFrame, n: Optional[int] = None) -> np.ndarray:
+        """
+        Copy feature columns của frame đã có indicators (vd. IndicatorCache) vào buffer
+
+        Args:
+            df: DataFrame có indicators
+            n: Chỉ lấy n rows cuối (None = tất cả)
+        """
+        count = len(df) if n is None else min(n, len(df))
+        self._reserve(count)
+        self.length = count
+        for position, column in enumerate(self.columns):
+            target = self.values[:count, position]
+            if column in df.columns:
+                target[:] = df[column].to_numpy(dtype=np.float64)[len(df) - count:]
+                target[np.isnan(target)] = 0  # Như prepare_features (fillna(0))
+            else:
+                target[:] = 0
+        return self.rows()
+
+    def rows(self, n: Optional[int] = None) -> np.ndarray:
+        """(n, n_features) view các rows cuối"""
+        start = 0 if n is None else max(self.length - n, 0)
+        return self.values[start:self.length]
+
+    def column(self, name: str) -> np.ndarray:
+        """View 1 column"""
+        return self.values[:self.length, self.columns.index(name)]
+
+
+class FeatureStore:
+    """
+    FeatureBuffer cho mỗi (exchange, symbol, interval), dùng lại giữa các loops
+
+    Cùng symbol trên 2 exchanges (vd. BTCUSDT trên AsterDEX và Binance) có buffer riêng.
+
+    Usage:
+        store = FeatureStore()
+        buffer = store.buffer('BTCUSDT', '15m', exchange='Binance')
+        with buffer.lock:
+            rows = buffer.load(df, n=60)                # df đã có indicators
+            X = scaler.transform(rows)                  # (60, n_features) float32
+    """
+
+    def __init__(self, capacity: int = 1000):
+        """
+        Args:
+            capacity: Số rows preallocate mỗi buffer (tự tăng khi cần)
+        """
+        self.capacity = capacity
+        self._buffers: Dict[Tuple[str, str, str], FeatureBuffer] = {}
+        self._lock = threading.Lock()
+
+    def buffer(self, symbol: str, interval: str, exchange: str = '') -> FeatureBuffer:
+        key = (exchange, symbol, interval)
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                buffer = self._buffers[key] = FeatureBuffer(self.capacity)
+            return buffer
+
+    def fill(self, symbol: str, interval: str, df: pd.DataFrame, exchange: str = '') -> np.ndarray:
+        """OHLCV -> indicators ghi thẳng vào buffer (xem FeatureBuffer.fill)"""
+        return self.buffer(symbol, interval, exchange).fill(df)
+
+    def load(self, symbol: str, interval: str, df: pd.DataFrame, n: Optional[int] = None,
+             exchange: str = '') -> np.ndarray:
+        """Frame đã có indicators -> buffer (xem FeatureBuffer.load)"""
+        return self.buffer(symbol, interval, exchange).load(df, n)
+
+    def get_rows(self, symbol: str, interval: str, n: Optional[int] = None,
+                 exchange: str = '') -> Optional[np.ndarray]:
+        """`n` rows cuối, None nếu chưa có hoặc chưa đủ"""
+        buffer = self._buffers.get((exchange, symbol, interval))
+        if buffer is None or (n is not None and buffer.length < n):
+            return None
+        return buffer.rows(n)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(buffer.values.nbytes for buffer in self._buffers.values())
+
+    def __contains__(self, key: Tuple[str, str, str]) -> bool:
+        return key in self._buffers
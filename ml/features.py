@@ -5,6 +5,8 @@
 
 import pandas as pd
 import numpy as np
+from dataclasses import dataclass
+from typing import Callable, Tuple
 from utils.logger import logger
 import warnings
 
@@ -80,107 +82,25 @@ class FeatureEngine:
         Returns:
             DataFrame với indicators
         """
+        return FeatureEngine.compute(df)
+
+    @staticmethod
+    def compute(df, columns=None):
+        """
+        Chỉ tính các indicator columns được yêu cầu (+ dependencies)
+
+        Args:
+            df: DataFrame với OHLCV
+            columns: List columns cần (vd. ['rsi', 'atr']), None = tất cả.
+                OHLCV columns được bỏ qua.
+
+        Returns:
+            DataFrame với OHLCV + indicators đã tính (giá trị giống calculate_indicators)
+        """
         df = df.copy()
 
-        if USE_PANDAS_TA:
-            # Use pandas-ta
-            # RSI (14)
-            df['rsi'] = ta.rsi(df['close'], length=14)
-
-            # MACD (12, 26, 9)
-            macd = ta.macd(df['close'], fast=12, slow=26, signal=9)
-            if macd is not None:
-                df['macd'] = macd['MACD_12_26_9']
-                df['macd_signal'] = macd['MACDs_12_26_9']
-                df['macd_hist'] = macd['MACDh_12_26_9']
-            else:
-                df['macd'] = 0
-                df['macd_signal'] = 0
-                df['macd_hist'] = 0
-
-            # Bollinger Bands (20, 2)
-            bbands = ta.bbands(df['close'], length=20, std=2)
-            if bbands is not None and len(bbands.columns) >= 3:
-                # pandas-ta may use different column names, find them dynamically
-                bb_cols = bbands.columns.tolist()
-                # Upper, Middle, Lower are usually in order
-                df['bb_upper'] = bbands[bb_cols[0]]  # BBL (Lower)
-                df['bb_middle'] = bbands[bb_cols[1]]  # BBM (Middle)
-                df['bb_lower'] = bbands[bb_cols[2]]  # BBU (Upper)
-                # Swap if needed (check which is actually upper/lower)
-                if df['bb_upper'].iloc[-1] < df['bb_lower'].iloc[-1]:
-                    df['bb_upper'], df['bb_lower'] = df['bb_lower'].copy(), df['bb_upper'].copy()
-                df['bb_width'] = (df['bb_upper'] - df['bb_lower']) / df['bb_middle']
-            else:
-                df['bb_upper'] = df['close']
-                df['bb_middle'] = df['close']
-                df['bb_lower'] = df['close']
-                df['bb_width'] = 0
-        else:
-            # Use manual calculation
-            # RSI (14)
-            df['rsi'] = FeatureEngine._calculate_rsi_manual(df['close'], period=14)
-
-            # MACD (12, 26, 9)
-            macd, macd_signal, macd_hist = FeatureEngine._calculate_macd_manual(
-                df['close'], fast=12, slow=26, signal=9
-            )
-            df['macd'] = macd
-            df['macd_signal'] = macd_signal
-            df['macd_hist'] = macd_hist
-
-            # Bollinger Bands (20, 2)
-            bb_upper, bb_middle, bb_lower = FeatureEngine._calculate_bbands_manual(
-                df['close'], length=20, std=2
-            )
-            df['bb_upper'] = bb_upper
-            df['bb_middle'] = bb_middle
-            df['bb_lower'] = bb_lower
-            df['bb_width'] = (df['bb_upper'] - df['bb_lower']) / df['bb_middle']
-        
-        # OB Imbalance (placeholder - sẽ update realtime)
-        df['ob_imbalance'] = 1.0
-
-        # ============================================
-        # NEW FEATURES FOR BETTER ACCURACY
-        # ============================================
-
-        # 1. ATR (Average True Range) - Volatility indicator
-        high_low = df['high'] - df['low']
-        high_close = abs(df['high'] - df['close'].shift(1))
-        low_close = abs(df['low'] - df['close'].shift(1))
-        true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-        df['atr'] = true_range.rolling(14).mean()
-        df['atr_pct'] = (df['atr'] / df['close']) * 100  # ATR as % of price
-
-        # 2. Volume MA Ratio - Volume strength
-        volume_ma_20 = df['volume'].rolling(20).mean()
-        df['volume_ma_ratio'] = df['volume'] / volume_ma_20.replace(0, 1)
-
-        # 3. Price Distance from EMAs
-        ema_20 = df['close'].ewm(span=20, adjust=False).mean()
-        ema_50 = df['close'].ewm(span=50, adjust=False).mean()
-        df['price_distance_ema20'] = ((df['close'] - ema_20) / ema_20) * 100
-        df['price_distance_ema50'] = ((df['close'] - ema_50) / ema_50) * 100
-
-        # 4. RSI Divergence Score
-        df['rsi_divergence_score'] = FeatureEngine._calculate_rsi_divergence_score(df)
-
-        # 5. Higher Timeframe Trend (placeholder - will be updated with actual HTF data)
-        # 1 = uptrend, 0 = ranging, -1 = downtrend
-        df['higher_tf_trend'] = 0
-
-        # 6. Momentum Score
-        # Combine ROC and price momentum
-        roc_10 = ((df['close'] - df['close'].shift(10)) / df['close'].shift(10)) * 100
-        roc_20 = ((df['close'] - df['close'].shift(20)) / df['close'].shift(20)) * 100
-        df['momentum_score'] = (roc_10 + roc_20) / 2
-
-        # 7. Volatility Ratio
-        # Compare current volatility to average
-        current_volatility = df['high'].rolling(10).std()
-        avg_volatility = df['high'].rolling(50).std()
-        df['volatility_ratio'] = current_volatility / avg_volatility.replace(0, 1)
+        for spec in FeatureEngine.resolve(columns):
+            spec.fn(df)
 
         # Fill NaN - use infer_objects() to avoid downcasting warning
         # First backward fill, then fill remaining with 0
@@ -190,6 +110,36 @@ class FeatureEngine:
         df = df.infer_objects(copy=False)
 
         return df
+
+    @staticmethod
+    def resolve(columns=None):
+        """
+        Indicators cần tính cho columns (gồm dependencies), theo thứ tự registry
+
+        Raises:
+            KeyError: Column không có trong INDICATOR_REGISTRY
+        """
+        if columns is None:
+            return list(INDICATOR_REGISTRY)
+
+        needed = set()
+
+        def visit(column):
+            if column in BASE_COLUMNS:
+                return
+            spec = INDICATOR_OUTPUTS.get(column)
+            if spec is None:
+                raise KeyError(f"Unknown indicator column '{column}'")
+            if spec.name not in needed:
+                needed.add(spec.name)
+                for dependency in spec.inputs:
+                    visit(dependency)
+
+        for column in columns:
+            visit(column)
+
+        # Registry sắp xếp sẵn theo dependencies
+        return [spec for spec in INDICATOR_REGISTRY if spec.name in needed]
     
     @staticmethod
     def prepare_features(df, feature_cols=None):
@@ -228,23 +178,72 @@ class FeatureEngine:
             X: (n_sequences, seq_length, n_features)
             y: (n_sequences,) - 1 nếu giá tăng, 0 nếu giảm
         """
-        X, y = [], []
-        
-        for i in range(len(data) - seq_length):
-            X.append(data[i:i+seq_length])
-            
-            # Label: 1 nếu close tăng, 0 nếu giảm
-            # Close ở index 3 (open, high, low, close, ...)
-            future_close = data[i + seq_length, 3]
-            current_close = data[i + seq_length - 1, 3]
-            y.append(1 if future_close > current_close else 0)
-        
-        return np.array(X), np.array(y)
+        data = np.asarray(data)
+        count = max(len(data) - seq_length, 0)
+        if not count:
+            return np.empty((0, seq_length, data.shape[1]), dtype=data.dtype), np.empty(0, dtype=int)
+
+        # 1 copy duy nhất từ strided views (dataset lớn: dùng SequenceDataset, không copy)
+        windows = np.lib.stride_tricks.sliding_window_view(data, seq_length, axis=0)[:count]
+        X = np.ascontiguousarray(windows.transpose(0, 2, 1))
+
+        # Label: 1 nếu close tăng, 0 nếu giảm
+        # Close ở index 3 (open, high, low, close, ...)
+        close = data[:, 3]
+        y = (close[seq_length:] > close[seq_length - 1:-1]).astype(int)
+
+        return X, y
     
     @staticmethod
     def _calculate_rsi_divergence_score(df, lookback=14):
         """
-        Calculate RSI divergence score
+        Calculate RSI divergence score (vectorized)
+
+        Mỗi row i so sánh window [i-lookback, i) với window trước đó
+        [i-2*lookback, i-lookback) bằng rolling min / max trên sliding windows
+        (NaN bị bỏ qua, window toàn NaN -> không có divergence). Kết quả giống
+        hệt _calculate_rsi_divergence_score_loop.
+
+        Returns:
+            Series: Divergence score (-1 to 1)
+                -1 = bearish divergence
+                0 = no divergence
+                1 = bullish divergence
+        """
+        n = len(df)
+        if 'rsi' not in df.columns or n < lookback * 2:
+            return pd.Series(0, index=df.index)
+
+        scores = np.zeros(n, dtype=np.int64)
+        close = df['close'].to_numpy(dtype=float)
+        rsi = df['rsi'].to_numpy(dtype=float)
+
+        def window_min_max(values):
+            # Window k = values[k:k+lookback]; không lấy row cuối (window kết thúc trước row i)
+            windows = np.lib.stride_tricks.sliding_window_view(values[:-1], lookback)
+            # fmin / fmax bỏ qua NaN, chỉ NaN khi cả window là NaN
+            return np.fmin.reduce(windows, axis=1), np.fmax.reduce(windows, axis=1)
+
+        price_min, price_max = window_min_max(close)
+        rsi_min, rsi_max = window_min_max(rsi)
+
+        # Row i (>= 2*lookback): window hiện tại bắt đầu ở i-lookback, window trước ở i-2*lookback
+        curr, prev = slice(lookback, n - lookback), slice(0, n - 2 * lookback)
+
+        # NaN so sánh luôn False -> window toàn NaN không bao giờ là divergence
+        bullish = (price_min[curr] < price_min[prev]) & (rsi_min[curr] > rsi_min[prev])
+        bearish = (price_max[curr] > price_max[prev]) & (rsi_max[curr] < rsi_max[prev])
+
+        scores[lookback * 2:] = np.where(bullish, 1, np.where(bearish, -1, 0))
+        return pd.Series(scores, index=df.index)
+
+    @staticmethod
+    def _calculate_rsi_divergence_score_loop(df, lookback=14):
+        """
+        Calculate RSI divergence score (bản loop từng row, chậm)
+
+        Reference implementation cho tests / scripts/benchmark_features.py,
+        dùng _calculate_rsi_divergence_score.
 
         Returns:
             Series: Divergence score (-1 to 1)
@@ -331,3 +330,157 @@ class FeatureEngine:
             logger.error(f"OB imbalance calculation error: {e}")
             return 1.0
 
+
+# ============================================
+# 📋 INDICATOR REGISTRY
+# name -> inputs -> function (ghi output columns vào df)
+# Thứ tự = thứ tự columns của calculate_indicators (dependencies đứng trước)
+# ============================================
+
+BASE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+@dataclass(frozen=True)
+class IndicatorSpec:
+    """1 indicator: columns nó tạo ra, columns nó cần, function tính"""
+    name: str
+    outputs: Tuple[str, ...]
+    inputs: Tuple[str, ...]
+    fn: Callable[[pd.DataFrame], None]
+
+
+def _rsi(df):
+    # RSI (14)
+    if USE_PANDAS_TA:
+        df['rsi'] = ta.rsi(df['close'], length=14)
+    else:
+        df['rsi'] = FeatureEngine._calculate_rsi_manual(df['close'], period=14)
+
+
+def _macd(df):
+    # MACD (12, 26, 9)
+    if USE_PANDAS_TA:
+        macd = ta.macd(df['close'], fast=12, slow=26, signal=9)
+        if macd is not None:
+            df['macd'] = macd['MACD_12_26_9']
+            df['macd_signal'] = macd['MACDs_12_26_9']
+            df['macd_hist'] = macd['MACDh_12_26_9']
+        else:
+            df['macd'] = 0
+            df['macd_signal'] = 0
+            df['macd_hist'] = 0
+    else:
+        macd, macd_signal, macd_hist = FeatureEngine._calculate_macd_manual(
+            df['close'], fast=12, slow=26, signal=9
+        )
+        df['macd'] = macd
+        df['macd_signal'] = macd_signal
+        df['macd_hist'] = macd_hist
+
+
+def _bbands(df):
+    # Bollinger Bands (20, 2)
+    if USE_PANDAS_TA:
+        bbands = ta.bbands(df['close'], length=20, std=2)
+        if bbands is not None and len(bbands.columns) >= 3:
+            # pandas-ta may use different column names, find them dynamically
+            bb_cols = bbands.columns.tolist()
+            # Upper, Middle, Lower are usually in order
+            df['bb_upper'] = bbands[bb_cols[0]]  # BBL (Lower)
+            df['bb_middle'] = bbands[bb_cols[1]]  # BBM (Middle)
+            df['bb_lower'] = bbands[bb_cols[2]]  # BBU (Upper)
+            # Swap if needed (check which is actually upper/lower)
+            if df['bb_upper'].iloc[-1] < df['bb_lower'].iloc[-1]:
+                df['bb_upper'], df['bb_lower'] = df['bb_lower'].copy(), df['bb_upper'].copy()
+        else:
+            df['bb_upper'] = df['close']
+            df['bb_middle'] = df['close']
+            df['bb_lower'] = df['close']
+    else:
+        bb_upper, bb_middle, bb_lower = FeatureEngine._calculate_bbands_manual(
+            df['close'], length=20, std=2
+        )
+        df['bb_upper'] = bb_upper
+        df['bb_middle'] = bb_middle
+        df['bb_lower'] = bb_lower
+
+
+def _bb_width(df):
+    df['bb_width'] = (df['bb_upper'] - df['bb_lower']) / df['bb_middle']
+
+
+def _ob_imbalance(df):
+    # OB Imbalance (placeholder - sẽ update realtime)
+    df['ob_imbalance'] = 1.0
+
+
+def _atr(df):
+    # ATR (Average True Range) - Volatility indicator
+    high_low = df['high'] - df['low']
+    high_close = abs(df['high'] - df['close'].shift(1))
+    low_close = abs(df['low'] - df['close'].shift(1))
+    true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+    df['atr'] = true_range.rolling(14).mean()
+
+
+def _atr_pct(df):
+    df['atr_pct'] = (df['atr'] / df['close']) * 100  # ATR as % of price
+
+
+def _volume_ma_ratio(df):
+    # Volume MA Ratio - Volume strength
+    volume_ma_20 = df['volume'].rolling(20).mean()
+    df['volume_ma_ratio'] = df['volume'] / volume_ma_20.replace(0, 1)
+
+
+def _price_distance_ema(span):
+    # Price Distance from EMA
+    def fn(df):
+        ema = df['close'].ewm(span=span, adjust=False).mean()
+        df[f'price_distance_ema{span}'] = ((df['close'] - ema) / ema) * 100
+    return fn
+
+
+def _rsi_divergence_score(df):
+    df['rsi_divergence_score'] = FeatureEngine._calculate_rsi_divergence_score(df)
+
+
+def _higher_tf_trend(df):
+    # Higher Timeframe Trend (placeholder - will be updated with actual HTF data)
+    # 1 = uptrend, 0 = ranging, -1 = downtrend
+    df['higher_tf_trend'] = 0
+
+
+def _momentum_score(df):
+    # Combine ROC and price momentum
+    roc_10 = ((df['close'] - df['close'].shift(10)) / df['close'].shift(10)) * 100
+    roc_20 = ((df['close'] - df['close'].shift(20)) / df['close'].shift(20)) * 100
+    df['momentum_score'] = (roc_10 + roc_20) / 2
+
+
+def _volatility_ratio(df):
+    # Compare current volatility to average
+    current_volatility = df['high'].rolling(10).std()
+    avg_volatility = df['high'].rolling(50).std()
+    df['volatility_ratio'] = current_volatility / avg_volatility.replace(0, 1)
+
+
+INDICATOR_REGISTRY = [
+    IndicatorSpec('rsi', ('rsi',), ('close',), _rsi),
+    IndicatorSpec('macd', ('macd', 'macd_signal', 'macd_hist'), ('close',), _macd),
+    IndicatorSpec('bbands', ('bb_upper', 'bb_middle', 'bb_lower'), ('close',), _bbands),
+    IndicatorSpec('bb_width', ('bb_width',), ('bb_upper', 'bb_middle', 'bb_lower'), _bb_width),
+    IndicatorSpec('ob_imbalance', ('ob_imbalance',), (), _ob_imbalance),
+    IndicatorSpec('atr', ('atr',), ('high', 'low', 'close'), _atr),
+    IndicatorSpec('atr_pct', ('atr_pct',), ('atr', 'close'), _atr_pct),
+    IndicatorSpec('volume_ma_ratio', ('volume_ma_ratio',), ('volume',), _volume_ma_ratio),
+    IndicatorSpec('price_distance_ema20', ('price_distance_ema20',), ('close',), _price_distance_ema(20)),
+    IndicatorSpec('price_distance_ema50', ('price_distance_ema50',), ('close',), _price_distance_ema(50)),
+    IndicatorSpec('rsi_divergence_score', ('rsi_divergence_score',), ('close', 'rsi'), _rsi_divergence_score),
+    IndicatorSpec('higher_tf_trend', ('higher_tf_trend',), (), _higher_tf_trend),
+    IndicatorSpec('momentum_score', ('momentum_score',), ('close',), _momentum_score),
+    IndicatorSpec('volatility_ratio', ('volatility_ratio',), ('high',), _volatility_ratio),
+]
+
+# Output column -> IndicatorSpec
+INDICATOR_OUTPUTS = {column: spec for spec in INDICATOR_REGISTRY for column in spec.outputs}
@@ -168,6 +168,29 @@ class LightGBMTrainer:
             logger.error(f"LightGBM prediction error: {e}")
             return 0.5
 
+    def predict_batch(self, X):
+        """
+        Predict nhiều samples (vd. 1 window mỗi symbol) trong 1 lần gọi model
+
+        Args:
+            X: (n, seq_len, features) - dùng timestep cuối, hoặc (n, features)
+
+        Returns:
+            np.ndarray: (n,) probability of price going UP
+        """
+        if self.model is None:
+            logger.warning("Model not loaded!")
+            return np.full(len(X), 0.5)
+
+        try:
+            if len(X.shape) == 3:
+                X = X[:, -1, :]
+            return np.asarray(self.model.predict(self.scaler.transform(X)))
+
+        except Exception as e:
+            logger.error(f"LightGBM prediction error: {e}")
+            return np.full(len(X), 0.5)
+
     def save(self, model_path, scaler_path):
         """Save model and scaler"""
         if self.model is None:
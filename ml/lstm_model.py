@@ -10,6 +10,10 @@ import pickle
 import os
 from utils.logger import logger
 from config import Config
+from ml.sequence_dataset import SequenceDataset
+
+# Batch size khi predict trên SequenceDataset (materialize từng phần)
+PREDICT_BATCH_SIZE = 4096
 
 class LSTMPredictor(nn.Module):
     """
@@ -94,7 +98,8 @@ class LSTMTrainer:
         Train model
         
         Args:
-            X_train: (n_samples, seq_len, features)
+            X_train: (n_samples, seq_len, features) hoặc SequenceDataset
+                (mỗi batch materialize riêng)
             y_train: (n_samples,)
             epochs: Số epochs
             batch_size: Batch size
@@ -104,7 +109,9 @@ class LSTMTrainer:
         lr = lr or Config.LSTM_LEARNING_RATE
 
         # Convert to tensors
-        X_tensor = torch.FloatTensor(X_train).to(self.device)
+        lazy = isinstance(X_train, SequenceDataset)
+        if not lazy:
+            X_tensor = torch.FloatTensor(X_train).to(self.device)
         y_tensor = torch.FloatTensor(y_train).view(-1, 1).to(self.device)
 
         # Loss and optimizer
@@ -127,7 +134,10 @@ class LSTMTrainer:
             
             for i in range(0, len(X_train), batch_size):
                 batch_indices = indices[i:i+batch_size]
-                X_batch = X_tensor[batch_indices]
+                if lazy:
+                    X_batch = torch.from_numpy(X_train.batch(batch_indices.numpy())).to(self.device)
+                else:
+                    X_batch = X_tensor[batch_indices]
                 y_batch = y_tensor[batch_indices]
                 
                 # Forward
@@ -159,11 +169,17 @@ class LSTMTrainer:
         Predict probability
         
         Args:
-            X: (seq_len, features) hoặc (batch, seq_len, features)
+            X: (seq_len, features), (batch, seq_len, features) hoặc SequenceDataset
             
         Returns:
             float hoặc array: Probability of UP
         """
+        if isinstance(X, SequenceDataset):
+            if not len(X):
+                return np.empty(0, dtype=np.float32)
+            return np.concatenate([self.predict(X.batch(slice(i, i + PREDICT_BATCH_SIZE)))
+                                   for i in range(0, len(X), PREDICT_BATCH_SIZE)])
+
         self.model.eval()
         
         with torch.no_grad():
@@ -176,6 +192,18 @@ class LSTMTrainer:
             
             return output.cpu().numpy().flatten()
     
+    def predict_batch(self, X):
+        """
+        Predict nhiều sequences (vd. 1 window mỗi symbol) trong 1 forward pass
+
+        Args:
+            X: (n, seq_len, features) hoặc SequenceDataset
+
+        Returns:
+            np.ndarray: (n,) probability of UP
+        """
+        return self.predict(X)
+
     def save(self, model_path=None, scaler_path=None):
         """Lưu model và scaler"""
         model_path = model_path or Config.MODEL_PATH
@@ -0,0 +1,236 @@
+# ============================================
+# 📦 ONNX EXPORT
+# Scalers + tất cả models của ensemble -> 1 graph ONNX (models/ensemble.onnx)
+# Inference bằng onnxruntime CPU (ml.ensemble.InferenceBackend)
+#
+# Optional dependencies: onnx, onnxmltools (XGBoost / LightGBM), torch (LSTM)
+# ============================================
+
+import io
+import os
+import tempfile
+import warnings
+from typing import Dict, List, Tuple
+
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
+from config import Config
+from utils.logger import logger
+
+try:
+    import onnx
+    from onnx import TensorProto, helper, numpy_helper
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+# onnxmltools hỗ trợ tối đa opset 15 cho tree converters
+ONNX_OPSET = 15
+ML_OPSET = 2
+
+INPUT_NAME = 'X'                    # (batch, seq_len, n_features) float32
+OUTPUT_NAME = 'probabilities'       # (batch, n_models) - probability UP, cột theo metadata 'models'
+
+
+def _const(name: str, value) -> 'onnx.TensorProto':
+    return numpy_helper.from_array(np.asarray(value), name=name)
+
+
+def _scaler_nodes(prefix: str, scaler, input_name: str) -> Tuple[List, List, str]:
+    """
+    Scaler -> nodes, tính giống hệt sklearn transform trên float32:
+    mỗi bước tính float64 rồi làm tròn về float32 (như numpy in-place)
+
+    Returns:
+        (nodes, initializers, output_name)
+    """
+    if not hasattr(scaler, 'n_features_in_'):
+        raise ValueError(f"{prefix} scaler is not fitted")
+
+    if isinstance(scaler, StandardScaler):
+        steps = []
+        if scaler.with_mean:
+            steps.append(('Sub', scaler.mean_))
+        if scaler.with_std:
+            steps.append(('Div', scaler.scale_))
+    elif isinstance(scaler, MinMaxScaler):
+        if scaler.clip:
+            raise ValueError(f"{prefix} MinMaxScaler(clip=True) is not supported")
+        steps = [('Mul', scaler.scale_), ('Add', scaler.min_)]
+    else:
+        raise ValueError(f"{prefix} unsupported scaler {type(scaler).__name__}")
+
+    nodes, initializers = [], []
+    current = input_name
+    for i, (op, values) in enumerate(steps):
+        name = f'{prefix}/scale_{i}'
+        initializers.append(_const(f'{name}/value', np.asarray(values, dtype=np.float64)))
+        nodes.extend([
+            helper.make_node('Cast', [current], [f'{name}/f64'], to=TensorProto.DOUBLE),
+            helper.make_node(op, [f'{name}/f64', f'{name}/value'], [f'{name}/out64']),
+            helper.make_node('Cast', [f'{name}/out64'], [f'{name}/out'], to=TensorProto.FLOAT),
+        ])
+        current = f'{name}/out'
+    return nodes, initializers, current
+
+
+def _tree_model_proto(model_name: str, trainer, n_features: int) -> 'onnx.ModelProto':
+    """Model gốc của trainer -> ONNX (TreeEnsembleClassifier)"""
+    if model_name == 'catboost':
+        # CatBoost tự export ONNX
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'catboost.onnx')
+            trainer.model.save_model(path, format='onnx')
+            return onnx.load(path)
+
+    from onnxmltools import convert_lightgbm, convert_xgboost
+    from onnxmltools.convert.common.data_types import FloatTensorType
+
+    initial_types = [('input', FloatTensorType([None, n_features]))]
+    if model_name == 'xgboost':
+        return convert_xgboost(trainer.model, initial_types=initial_types, target_opset=ONNX_OPSET)
+    if model_name == 'lightgbm':
+        return convert_lightgbm(trainer.model, initial_types=initial_types, target_opset=ONNX_OPSET, zipmap=False)
+    raise ValueError(f"Unsupported model: {model_name}")
+
+
+def _tree_nodes(model_name: str, trainer, input_name: str) -> Tuple[List, List, str]:
+    """last timestep -> scaler -> tree ensemble -> (batch, 1) probability UP"""
+    n_features = trainer.scaler.n_features_in_
+    nodes, initializers, scaled = _scaler_nodes(model_name, trainer.scaler, input_name)
+
+    # Converters thêm label / ZipMap / Identity: chỉ giữ TreeEnsembleClassifier
+    trees = [node for node in _tree_model_proto(model_name, trainer, n_features).graph.node
+             if node.op_type == 'TreeEnsembleClassifier']
+    if len(trees) != 1:
+        raise ValueError(f"{model_name}: expected 1 TreeEnsembleClassifier, got {len(trees)}")
+
+    tree = onnx.NodeProto()
+    tree.CopyFrom(trees[0])
+    tree.name = f'{model_name}/trees'
+    del tree.input[:], tree.output[:]
+    tree.input.append(scaled)
+    tree.output.extend([f'{model_name}/label', f'{model_name}/proba'])
+
+    output = f'{model_name}/prob'
+    initializers.append(_const(f'{model_name}/up_index', np.array([1], dtype=np.int64)))
+    nodes.extend([
+        tree,
+        helper.make_node('Gather', [f'{model_name}/proba', f'{model_name}/up_index'], [output], axis=1),
+    ])
+    return nodes, initializers, output
+
+
+def _lstm_nodes(trainer, seq_length: int) -> Tuple[List, List, str]:
+    """torch LSTMPredictor -> nodes (input X, output (batch, 1))"""
+    import torch
+
+    model = trainer.model.to('cpu').eval()
+    buffer = io.BytesIO()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        torch.onnx.export(
+            model, torch.zeros(1, seq_length, trainer.input_size), buffer,
+            input_names=['input'], output_names=['prob'],
+            dynamic_axes={'input': {0: 'batch', 1: 'seq'}, 'prob': {0: 'batch'}},
+            opset_version=ONNX_OPSET, dynamo=False,
+        )
+    model.to(trainer.device)
+
+    proto = onnx.compose.add_prefix(onnx.load_from_string(buffer.getvalue()), 'lstm/')
+    nodes = [helper.make_node('Identity', [INPUT_NAME], ['lstm/input'])] + list(proto.graph.node)
+    return nodes, list(proto.graph.initializer), 'lstm/prob'
+
+
+def build_ensemble_graph(models: Dict, seq_length: int = None) -> 'onnx.ModelProto':
+    """
+    1 graph cho cả ensemble
+
+    Input X (batch, seq_len, n_features) float32 (đã normalize như input của EnsemblePredictor).
+    Tree models lấy timestep cuối rồi qua scaler riêng (như predict_batch), LSTM nhận X.
+
+    Args:
+        models: {model_name: trainer đã train / load}
+        seq_length: Độ dài sequence khi trace LSTM (None = Config.SEQUENCE_LENGTH)
+
+    Returns:
+        onnx.ModelProto, output 'probabilities' (batch, n_models)
+    """
+    seq_length = seq_length or Config.SEQUENCE_LENGTH
+    nodes, initializers, outputs, names = [], [], [], []
+    n_features = None
+
+    for model_name, trainer in models.items():
+        if trainer is None or trainer.model is None:
+            continue
+
+        if model_name == 'lstm':
+            model_nodes, model_initializers, output = _lstm_nodes(trainer, seq_length)
+            model_features = trainer.input_size
+        else:
+            if not any('last_timestep' in node.output for node in nodes):
+                # Tree models dùng chung X[:, -1, :]
+                initializers.append(_const('last_index', np.array(-1, dtype=np.int64)))
+                nodes.append(helper.make_node('Gather', [INPUT_NAME, 'last_index'], ['last_timestep'], axis=1))
+            model_nodes, model_initializers, output = _tree_nodes(model_name, trainer, 'last_timestep')
+            model_features = trainer.scaler.n_features_in_
+
+        if n_features is not None and model_features != n_features:
+            raise ValueError(f"{model_name}: {model_features} features != {n_features}")
+        n_features = model_features
+
+        nodes.extend(model_nodes)
+        initializers.extend(model_initializers)
+        outputs.append(output)
+        names.append(model_name)
+
+    if not names:
+        raise ValueError("No trained models to export")
+
+    nodes.append(helper.make_node('Concat', outputs, [OUTPUT_NAME], axis=1))
+
+    graph = helper.make_graph(
+        nodes, 'ensemble',
+        inputs=[helper.make_tensor_value_info(INPUT_NAME, TensorProto.FLOAT, ['batch', 'seq', n_features])],
+        outputs=[helper.make_tensor_value_info(OUTPUT_NAME, TensorProto.FLOAT, ['batch', len(names)])],
+        initializer=initializers,
+    )
+    opset_imports = [helper.make_opsetid('', ONNX_OPSET), helper.make_opsetid('ai.onnx.ml', ML_OPSET)]
+    # IR version thấp nhất cho opsets: onnxruntime cũ hơn package onnx vẫn load được
+    proto = helper.make_model(graph, producer_name='farmaster', opset_imports=opset_imports,
+                              ir_version=helper.find_min_ir_version_for(opset_imports))
+    helper.set_model_props(proto, {'models': ','.join(names), 'n_features': str(n_features)})
+    onnx.checker.check_model(proto)
+    return proto
+
+
+def export_ensemble(models: Dict, path: str = None, seq_length: int = None) -> bool:
+    """
+    Export ensemble -> file ONNX (chạy sau khi train / save models)
+
+    Args:
+        models: {model_name: trainer}
+        path: File output (None = Config.ONNX_MODEL_PATH)
+        seq_length: Xem build_ensemble_graph
+
+    Returns:
+        True nếu export thành công (False khi thiếu onnx / converter lỗi, models gốc vẫn dùng được)
+    """
+    path = path or Config.ONNX_MODEL_PATH
+
+    if not ONNX_AVAILABLE:
+        logger.info("ℹ️ onnx not installed, skipping ONNX export (pip install onnx onnxmltools onnxruntime)")
+        return False
+
+    try:
+        proto = build_ensemble_graph(models, seq_length)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        onnx.save(proto, path)
+    except Exception as e:
+        logger.warning(f"⚠️ ONNX export failed, native models will be used: {e}")
+        return False
+
+    models_exported = [p.value for p in proto.metadata_props if p.key == 'models'][0]
+    logger.info(f"📦 ONNX ensemble exported to {path} ({models_exported}, {os.path.getsize(path) / 1024:.0f} KB)")
+    return True
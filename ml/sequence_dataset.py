@@ -0,0 +1,162 @@
+# ============================================
+# 🪟 SEQUENCE DATASET
+# Sequences (n, seq_length, n_features) dạng strided views trên feature matrix:
+# không copy seq_length lần, batch chỉ materialize khi trainer cần
+# ============================================
+
+import math
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+
+class SequenceDataset:
+    """
+    Sequences + labels lazily trên 1 feature matrix (rows nhóm theo symbol)
+
+    Window i = data[starts[i]:starts[i] + seq_length], không nối qua 2 symbols.
+    Label = 1 nếu close của candle kế tiếp > close candle cuối window
+    (giống FeatureEngine.create_sequences).
+
+    Interface như array (n, seq_length, n_features):
+    - `len(ds)`, `ds.shape`, `ds[i]` (view 1 window)
+    - `ds[idx]` / `ds.batch(idx)`: materialize batch float32
+    - `ds[:, -1, :]` / `ds.last_timestep()`: chỉ gather rows cuối (tree models),
+      không build sequences
+    """
+
+    ndim = 3
+
+    def __init__(self, data: np.ndarray, seq_length: int, offsets: Optional[np.ndarray] = None,
+                 starts: Optional[np.ndarray] = None):
+        """
+        Args:
+            data: (n_rows, n_features), close ở column 3
+            seq_length: Độ dài sequence
+            offsets: Ranh giới symbols (FeatureMatrix.offsets), None = 1 symbol
+            starts: Row bắt đầu của từng window (None = tất cả windows có label)
+        """
+        self.data = data
+        self.seq_length = seq_length
+        self.offsets = np.array([0, len(data)], dtype=np.int64) if offsets is None else np.asarray(offsets)
+
+        if starts is None:
+            ranges = [np.arange(start, end - seq_length, dtype=np.int64)
+                      for start, end in zip(self.offsets[:-1], self.offsets[1:]) if end - start > seq_length]
+            starts = np.concatenate(ranges) if ranges else np.empty(0, dtype=np.int64)
+        self.starts = starts
+
+        # (n_rows - seq_length + 1, seq_length, n_features) view, không copy
+        if len(data) >= seq_length:
+            self._windows = np.lib.stride_tricks.sliding_window_view(data, seq_length, axis=0).transpose(0, 2, 1)
+        else:
+            self._windows = np.empty((0, seq_length, data.shape[1]), dtype=data.dtype)
+
+    # ============================================
+    # ARRAY INTERFACE
+    # ============================================
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return len(self.starts), self.seq_length, self.data.shape[1]
+
+    @property
+    def dtype(self):
+        return np.dtype(np.float32)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes nếu materialize toàn bộ (float32)"""
+        return int(np.prod(self.shape)) * 4
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            index, rest = key[0], key[1:]
+            if rest and isinstance(rest[0], (int, np.integer)):
+                # [idx, t, ...]: gather rows của timestep t, không build sequences
+                step = int(rest[0]) % self.seq_length
+                return self.data[self.starts[index] + step][(slice(None),) + rest[1:]]
+            return self[index][(slice(None),) + rest]
+
+        if isinstance(key, (int, np.integer)):
+            return self._windows[self.starts[key]]
+        return self.batch(key)
+
+    def __array__(self, dtype=None, copy=None):
+        X = self.batch(slice(None))
+        return X if dtype is None else X.astype(dtype, copy=False)
+
+    # ============================================
+    # MATERIALIZE
+    # ============================================
+
+    def batch(self, index) -> np.ndarray:
+        """Materialize windows `index` (slice / int array) -> (k, seq_length, n_features) float32"""
+        return np.ascontiguousarray(self._windows[self.starts[index]], dtype=np.float32)
+
+    def batches(self, batch_size: int, shuffle: bool = False,
+                seed: Optional[int] = None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """(X_batch, y_batch) lần lượt, mỗi batch materialize riêng"""
+        order = np.random.default_rng(seed).permutation(len(self)) if shuffle else np.arange(len(self))
+        labels = self.labels
+        for i in range(0, len(order), batch_size):
+            index = order[i:i + batch_size]
+            yield self.batch(index), labels[index]
+
+    def last_timestep(self) -> np.ndarray:
+        """(n, n_features) rows cuối mỗi window (input của tree models)"""
+        return self[:, -1, :]
+
+    @property
+    def labels(self) -> np.ndarray:
+        """(n,) int64 - 1 nếu close kế tiếp tăng, 0 nếu giảm (vectorized)"""
+        close = self.data[:, 3]
+        last = self.starts + self.seq_length - 1
+        return (close[last + 1] > close[last]).astype(np.int64)
+
+    @property
+    def symbol_codes(self) -> np.ndarray:
+        """(n,) index symbol của từng window"""
+        return np.searchsorted(self.offsets, self.starts, side='right') - 1
+
+    def rows(self) -> np.ndarray:
+        """
+        Rows nằm trong ít nhất 1 window (không lặp lại)
+
+        Fit scaler trên rows() cho cùng min/max với X.reshape(-1, n_features)
+        nhưng không copy seq_length lần.
+        """
+        covered = np.zeros(len(self.data) + 1, dtype=np.int64)
+        np.add.at(covered, self.starts, 1)
+        np.add.at(covered, self.starts + self.seq_length, -1)
+        return self.data[np.cumsum(covered[:-1]) > 0]
+
+    # ============================================
+    # DERIVED DATASETS (dùng chung data)
+    # ============================================
+
+    def subset(self, index) -> 'SequenceDataset':
+        """Dataset chỉ gồm windows `index` (không copy data)"""
+        return SequenceDataset(self.data, self.seq_length, self.offsets, starts=self.starts[index])
+
+    def with_data(self, data: np.ndarray) -> 'SequenceDataset':
+        """Cùng windows trên matrix khác cùng layout (vd. features đã normalize)"""
+        return SequenceDataset(data, self.seq_length, self.offsets, starts=self.starts)
+
+    def split(self, test_size: float = 0.2, shuffle: bool = False,
+              random_state: Optional[int] = None) -> Tuple['SequenceDataset', 'SequenceDataset']:
+        """
+        Train/test split (cùng indices như sklearn train_test_split)
+
+        Returns:
+            (train, test) datasets dùng chung data
+        """
+        n = len(self)
+        n_test = math.ceil(test_size * n)
+        if shuffle:
+            order = np.random.RandomState(random_state).permutation(n)
+            return self.subset(order[n_test:]), self.subset(order[:n_test])
+        return self.subset(slice(0, n - n_test)), self.subset(slice(n - n_test, n))
@@ -0,0 +1,367 @@
+# ============================================
+# 🌊 STREAMING FEATURE ENGINE
+# Cập nhật FEATURE_COLUMNS mỗi candle mới trong O(1)
+# (running state thay vì tính lại cả DataFrame)
+# ============================================
+
+import math
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ml.features import FeatureEngine
+
+
+NAN = float('nan')
+
+
+class _RollingWindow:
+    """
+    Rolling mean / std (ddof=1) trên `window` giá trị gần nhất bằng running
+    sum + sum of squares. Giá trị được trừ `shift` (giá trị đầu tiên) để giữ
+    precision với giá lớn; sums được tính lại định kỳ để không bị drift.
+    """
+
+    RESYNC = 1000  # Tính lại sums sau mỗi RESYNC lần push (amortized O(1))
+
+    __slots__ = ('window', 'values', 'shift', 'sum', 'sumsq', '_pushes')
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.shift = None
+        self.sum = 0.0
+        self.sumsq = 0.0
+        self._pushes = 0
+
+    def push(self, x: float):
+        if self.shift is None:
+            self.shift = x
+        if len(self.values) == self.window:
+            old = self.values[0] - self.shift
+            self.sum -= old
+            self.sumsq -= old * old
+
+        self.values.append(x)
+        d = x - self.shift
+        self.sum += d
+        self.sumsq += d * d
+
+        self._pushes += 1
+        if self._pushes % self.RESYNC == 0:
+            self.sum = sum(v - self.shift for v in self.values)
+            self.sumsq = sum((v - self.shift) ** 2 for v in self.values)
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.window
+
+    def mean(self) -> float:
+        """Mean (NaN khi chưa đủ window, giống pandas rolling)"""
+        if not self.full:
+            return NAN
+        return self.sum / self.window + self.shift
+
+    def std(self) -> float:
+        if not self.full:
+            return NAN
+        n = self.window
+        var = (self.sumsq - self.sum * self.sum / n) / (n - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+    def copy(self) -> '_RollingWindow':
+        other = _RollingWindow.__new__(_RollingWindow)
+        other.window = self.window
+        other.values = self.values.copy()
+        other.shift = self.shift
+        other.sum = self.sum
+        other.sumsq = self.sumsq
+        other._pushes = self._pushes
+        return other
+
+
+def _ema_step(prev: Optional[float], x: float, span: int) -> float:
+    """EMA adjust=False (giống pandas ewm(span, adjust=False)): seed bằng giá trị đầu"""
+    if prev is None:
+        return x
+    alpha = 2 / (span + 1)
+    return alpha * x + (1 - alpha) * prev
+
+
+def _nan_min(values) -> float:
+    valid = [v for v in values if v == v]
+    return min(valid) if valid else NAN
+
+
+def _nan_max(values) -> float:
+    valid = [v for v in values if v == v]
+    return max(valid) if valid else NAN
+
+
+class IncrementalFeatures:
+    """
+    Running state của FeatureEngine cho 1 (symbol, interval).
+
+    update(candle) trả về row FEATURE_COLUMNS của candle đó, bằng với
+    FeatureEngine.calculate_indicators(df).iloc[-1] khi df kết thúc ở candle
+    này (công thức manual, tức khi không dùng pandas-ta):
+
+    - EMA 12/26/9 (MACD), EMA 20/50: 1 phép tính mỗi candle
+    - RSI (SMA 14), Bollinger (20, 2), ATR 14, volume MA 20, volatility
+      10/50: running sums trên ring buffers
+    - Momentum, RSI divergence: ring buffers độ dài cố định
+
+    Candle có cùng open time với candle trước (candle đang hình thành được
+    cập nhật) thay thế candle đó: state được tính lại từ state trước nó.
+    """
+
+    RSI_PERIOD = 14
+    DIVERGENCE_LOOKBACK = 14
+    COLUMNS = FeatureEngine.FEATURE_COLUMNS
+
+    def __init__(self):
+        # State trước candle cuối cùng (để thay thế candle đang hình thành)
+        self._base: Optional[dict] = None
+        self._state = self._new_state()
+        self.open_time = None
+        self.row: Optional[np.ndarray] = None
+
+    @classmethod
+    def _new_state(cls) -> dict:
+        lookback = cls.DIVERGENCE_LOOKBACK
+        return {
+            'count': 0,
+            'prev_close': None,
+            'ema12': None, 'ema26': None, 'macd_signal': None,
+            'ema20': None, 'ema50': None,
+            'gain': _RollingWindow(cls.RSI_PERIOD),
+            'loss': _RollingWindow(cls.RSI_PERIOD),
+            'bb': _RollingWindow(20),
+            'tr': _RollingWindow(14),
+            'volume': _RollingWindow(20),
+            'high10': _RollingWindow(10),
+            'high50': _RollingWindow(50),
+            'closes': deque(maxlen=21),               # Momentum (ROC 10 / 20)
+            'div_close': deque(maxlen=lookback * 2),  # Close + RSI của các candles trước
+            'div_rsi': deque(maxlen=lookback * 2),
+        }
+
+    @staticmethod
+    def _copy_state(state: dict) -> dict:
+        copied = {}
+        for key, value in state.items():
+            copied[key] = value.copy() if isinstance(value, (_RollingWindow, deque)) else value
+        return copied
+
+    # ============================================
+    # UPDATE
+    # ============================================
+
+    def update(self, open_time, open_: float, high: float, low: float, close: float,
+               volume: float) -> np.ndarray:
+        """
+        Apply 1 candle
+
+        Args:
+            open_time: Open time của candle (cùng open time = cập nhật candle cuối)
+
+        Returns:
+            np.ndarray: Row theo FEATURE_COLUMNS
+        """
+        if open_time is not None and open_time == self.open_time and self._base is not None:
+            state = self._copy_state(self._base)
+        else:
+            self._base = self._state
+            state = self._copy_state(self._state)
+
+        self.row = self._apply(state, float(open_), float(high), float(low), float(close), float(volume))
+        self._state = state
+        self.open_time = open_time
+        return self.row
+
+    def update_kline(self, kline: list) -> np.ndarray:
+        """Apply 1 kline format futures_klines ([open_time, o, h, l, c, v, ...])"""
+        return self.update(kline[0], kline[1], kline[2], kline[3], kline[4], kline[5])
+
+    def _apply(self, s: dict, o: float, h: float, l: float, c: float, v: float) -> np.ndarray:
+        i = s['count']
+        prev_close = s['prev_close']
+
+        # RSI (SMA 14 của gain / loss, diff đầu tiên = 0 như pandas .where)
+        delta = c - prev_close if prev_close is not None else 0.0
+        s['gain'].push(delta if delta > 0 else 0.0)
+        s['loss'].push(-delta if delta < 0 else 0.0)
+        rsi = self._rsi(s['gain'].mean(), s['loss'].mean())
+
+        # MACD (12, 26, 9)
+        s['ema12'] = _ema_step(s['ema12'], c, 12)
+        s['ema26'] = _ema_step(s['ema26'], c, 26)
+        macd = s['ema12'] - s['ema26']
+        s['macd_signal'] = _ema_step(s['macd_signal'], macd, 9)
+        macd_signal = s['macd_signal']
+
+        # Bollinger (20, 2)
+        s['bb'].push(c)
+        bb_middle = s['bb'].mean()
+        bb_std = s['bb'].std()
+        bb_upper = bb_middle + 2 * bb_std
+        bb_lower = bb_middle - 2 * bb_std
+        bb_width = (bb_upper - bb_lower) / bb_middle if bb_middle else NAN
+
+        # ATR 14 (true range candle đầu = high - low)
+        if prev_close is None:
+            true_range = h - l
+        else:
+            true_range = max(h - l, abs(h - prev_close), abs(l - prev_close))
+        s['tr'].push(true_range)
+        atr = s['tr'].mean()
+        atr_pct = atr / c * 100 if c else NAN
+
+        # Volume MA ratio
+        s['volume'].push(v)
+        volume_ma = s['volume'].mean()
+        volume_ma_ratio = v / (volume_ma if volume_ma != 0 else 1)
+
+        # EMA distances
+        s['ema20'] = _ema_step(s['ema20'], c, 20)
+        s['ema50'] = _ema_step(s['ema50'], c, 50)
+        distance_ema20 = (c - s['ema20']) / s['ema20'] * 100
+        distance_ema50 = (c - s['ema50']) / s['ema50'] * 100
+
+        # RSI divergence (windows các candles trước, không gồm candle hiện tại)
+        divergence = self._divergence(i, s['div_close'], s['div_rsi'])
+        s['div_close'].append(c)
+        s['div_rsi'].append(rsi)
+
+        # Momentum (ROC 10 + ROC 20) / 2
+        closes = s['closes']
+        closes.append(c)
+        if len(closes) == closes.maxlen:
+            roc_10 = (c - closes[-11]) / closes[-11] * 100
+            roc_20 = (c - closes[0]) / closes[0] * 100
+            momentum = (roc_10 + roc_20) / 2
+        else:
+            momentum = NAN
+
+        # Volatility ratio
+        s['high10'].push(h)
+        s['high50'].push(h)
+        avg_volatility = s['high50'].std()
+        volatility_ratio = s['high10'].std() / (avg_volatility if avg_volatility != 0 else 1)
+
+        s['count'] = i + 1
+        s['prev_close'] = c
+
+        row = np.array([
+            o, h, l, c, v,
+            rsi, macd, macd_signal, macd - macd_signal,
+            bb_upper, bb_middle, bb_lower, bb_width,
+            1.0,  # ob_imbalance: placeholder, caller cập nhật realtime
+            atr, atr_pct,
+            volume_ma_ratio,
+            distance_ema20,
+            distance_ema50,
+            divergence,
+            0.0,  # higher_tf_trend: placeholder
+            momentum,
+            volatility_ratio
+        ], dtype=np.float64)
+
+        # Giống calculate_indicators: NaN (chưa đủ data) -> 0 ở row cuối
+        row[np.isnan(row)] = 0.0
+        return row
+
+    @staticmethod
+    def _rsi(gain: float, loss: float) -> float:
+        if gain != gain or loss != loss:
+            return NAN
+        if loss == 0:
+            return NAN if gain == 0 else 100.0
+        return 100 - 100 / (1 + gain / loss)
+
+    @classmethod
+    def _divergence(cls, i: int, closes: deque, rsis: deque) -> float:
+        """Cùng logic FeatureEngine._calculate_rsi_divergence_score cho index i"""
+        lookback = cls.DIVERGENCE_LOOKBACK
+        if i < lookback * 2:
+            return 0.0
+
+        prev_close, curr_close = list(closes)[:lookback], list(closes)[lookback:]
+        prev_rsi, curr_rsi = list(rsis)[:lookback], list(rsis)[lookback:]
+
+        curr_rsi_min = _nan_min(curr_rsi)
+        if curr_rsi_min != curr_rsi_min:
+            return 0.0  # Window RSI toàn NaN
+
+        if min(curr_close) < min(prev_close) and curr_rsi_min > _nan_min(prev_rsi):
+            return 1.0
+        if max(curr_close) > max(prev_close) and _nan_max(curr_rsi) < _nan_max(prev_rsi):
+            return -1.0
+        return 0.0
+
+
+class StreamingFeatureEngine:
+    """
+    IncrementalFeatures cho mỗi (symbol, interval) + ring buffer các rows
+    gần nhất (input sequence cho model).
+
+    Usage:
+        engine = StreamingFeatureEngine(history=200)
+        engine.seed('BTCUSDT', '1h', klines)           # REST klines lúc khởi động
+        row = engine.update('BTCUSDT', '1h', kline)     # Mỗi kline từ stream
+        X = engine.get_rows('BTCUSDT', '1h', 60)        # (60, len(FEATURE_COLUMNS))
+    """
+
+    def __init__(self, history: int = 200):
+        """
+        Args:
+            history: Số rows gần nhất giữ lại mỗi (symbol, interval)
+        """
+        self.history = history
+        self._features: Dict[Tuple[str, str], IncrementalFeatures] = {}
+        self._rows: Dict[Tuple[str, str], deque] = {}
+
+    def update(self, symbol: str, interval: str, kline: list) -> np.ndarray:
+        """Apply 1 kline (format futures_klines), trả về row FEATURE_COLUMNS"""
+        key = (symbol, interval)
+        features = self._features.get(key)
+        if features is None:
+            features = self._features[key] = IncrementalFeatures()
+            self._rows[key] = deque(maxlen=self.history)
+
+        rows = self._rows[key]
+        replace = features.open_time is not None and kline[0] == features.open_time
+        row = features.update_kline(kline)
+        if replace and rows:
+            rows[-1] = row
+        else:
+            rows.append(row)
+        return row
+
+    def seed(self, symbol: str, interval: str, klines: Iterable[list]) -> Optional[np.ndarray]:
+        """Reset state rồi nạp klines lịch sử, trả về row cuối"""
+        self.reset(symbol, interval)
+        row = None
+        for kline in klines:
+            row = self.update(symbol, interval, kline)
+        return row
+
+    def reset(self, symbol: str, interval: str):
+        self._features.pop((symbol, interval), None)
+        self._rows.pop((symbol, interval), None)
+
+    def get_row(self, symbol: str, interval: str) -> Optional[np.ndarray]:
+        features = self._features.get((symbol, interval))
+        return features.row if features is not None else None
+
+    def get_rows(self, symbol: str, interval: str, n: Optional[int] = None) -> Optional[np.ndarray]:
+        """`n` rows gần nhất (n, len(FEATURE_COLUMNS)), None nếu chưa đủ"""
+        rows = self._rows.get((symbol, interval))
+        if not rows or (n is not None and len(rows) < n):
+            return None
+        selected: List[np.ndarray] = list(rows)[-n:] if n else list(rows)
+        return np.vstack(selected)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._features
@@ -10,9 +10,9 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
 from utils.data_fetcher import DataFetcher
 from ml.features import FeatureEngine
+from ml.batch_features import compute_grouped_features
 from ml.lstm_model import LSTMTrainer
 from config import Config
 from utils.logger import logger
@@ -40,50 +40,37 @@ def train_model(symbols=None, days=365, test_size=0.2):
         logger.error("❌ Không lấy được data!")
         return None
     
-    # 2. Combine và calculate features
+    # 2. Combine và calculate features (riêng từng symbol)
     logger.info("🔬 Calculating features...")
     combined_df = DataFetcher.combine_dataframes(data_dict)
+    matrix = compute_grouped_features(combined_df)
+    logger.info(f"✅ Total data points: {len(matrix.features)}")
     
-    # Calculate indicators cho từng symbol
-    processed_dfs = []
-    for symbol in symbols:
-        if symbol in data_dict:
-            df = data_dict[symbol].copy()
-            df = FeatureEngine.calculate_indicators(df)
-            processed_dfs.append(df)
-    
-    # Combine lại
-    all_data = pd.concat(processed_dfs, ignore_index=True)
-    logger.info(f"✅ Total data points: {len(all_data)}")
-    
-    # 3. Prepare features
-    feature_df = FeatureEngine.prepare_features(all_data)
-    
-    # 4. Normalize
+    # 3. Normalize
     trainer = LSTMTrainer(input_size=len(FeatureEngine.FEATURE_COLUMNS))
-    normalized_data = trainer.scaler.fit_transform(feature_df.values)
+    normalized_data = trainer.scaler.fit_transform(matrix.features)
     
-    # 5. Create sequences
+    # 4. Sequences (lazy views, không nối qua 2 symbols)
     logger.info(f"🔄 Creating sequences (length={Config.SEQUENCE_LENGTH})...")
-    X, y = FeatureEngine.create_sequences(normalized_data, seq_length=Config.SEQUENCE_LENGTH)
+    X = matrix.dataset(Config.SEQUENCE_LENGTH, data=normalized_data)
+    y = X.labels
     
     logger.info(f"   X shape: {X.shape}")
     logger.info(f"   y shape: {y.shape}")
     logger.info(f"   UP samples: {y.sum()} ({y.sum()/len(y)*100:.1f}%)")
     logger.info(f"   DOWN samples: {len(y)-y.sum()} ({(len(y)-y.sum())/len(y)*100:.1f}%)")
     
-    # 6. Split train/test
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=test_size, shuffle=True, random_state=42
-    )
+    # 5. Split train/test
+    X_train, X_test = X.split(test_size=test_size, shuffle=True, random_state=42)
+    y_train, y_test = X_train.labels, X_test.labels
     
     logger.info(f"📚 Train set: {len(X_train)} samples")
     logger.info(f"📝 Test set: {len(X_test)} samples")
     
-    # 7. Train
+    # 6. Train
     trainer.train(X_train, y_train, epochs=Config.LSTM_EPOCHS)
     
-    # 8. Evaluate
+    # 7. Evaluate
     logger.info("\n📊 EVALUATING MODEL...")
     y_pred_proba = trainer.predict(X_test)
     y_pred = (y_pred_proba > 0.5).astype(int)
@@ -106,7 +93,7 @@ def train_model(symbols=None, days=365, test_size=0.2):
     logger.info(f"   F1 Score: {f1*100:.2f}%")
     logger.info(f"   TP: {tp}, TN: {tn}, FP: {fp}, FN: {fn}")
     
-    # 9. Save model
+    # 8. Save model
     trainer.save()
     
     logger.info("=" * 60)
@@ -10,12 +10,14 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import numpy as np
-from sklearn.model_selection import train_test_split
 
+from ml.lstm_model import LSTMTrainer
 from ml.xgboost_model import XGBoostTrainer
 from ml.lightgbm_model import LightGBMTrainer
 from ml.catboost_model import CatBoostTrainer
 from ml.features import FeatureEngine
+from ml.batch_features import compute_grouped_features
+from ml.onnx_export import export_ensemble
 from utils.data_fetcher import DataFetcher
 from config import Config
 from utils.logger import logger
@@ -54,37 +56,30 @@ def train_ensemble_models(symbols=None, days=360):
     df_combined = DataFetcher.combine_dataframes(data_dict)
     logger.info(f"\n📊 Combined dataset: {len(df_combined)} candles")
 
-    # 2. Calculate indicators
+    # 2. Calculate indicators (riêng từng symbol)
     logger.info("\n🔧 Calculating indicators...")
-    feature_engine = FeatureEngine()
-    df_combined = feature_engine.calculate_indicators(df_combined)
+    matrix = compute_grouped_features(df_combined)
 
-    # 3. Prepare features
-    logger.info("\n🎯 Preparing features...")
-    feature_df = feature_engine.prepare_features(df_combined)
-
-    # 4. Create sequences for LSTM
+    # 3. Sequences for LSTM (lazy views, không nối qua 2 symbols)
     logger.info(f"\n📦 Creating sequences (length={Config.SEQUENCE_LENGTH})...")
-    X, y = feature_engine.create_sequences(
-        data=feature_df.values,
-        seq_length=Config.SEQUENCE_LENGTH
-    )
+    X = matrix.dataset(Config.SEQUENCE_LENGTH)
+    y = X.labels
 
-    logger.info(f"   Sequences: {X.shape}")
+    logger.info(f"   Sequences: {X.shape} (materialized: {X.nbytes / 1e9:.2f} GB, not allocated)")
     logger.info(f"   Labels: {y.shape}")
     logger.info(f"   Label distribution: UP={np.sum(y)}, DOWN={len(y)-np.sum(y)}")
 
-    # 5. Train/Val split
-    X_train, X_val, y_train, y_val = train_test_split(
-        X, y, test_size=0.2, random_state=42, shuffle=False
-    )
+    # 4. Train/Val split
+    X_train, X_val = X.split(test_size=0.2)
+    y_train, y_val = X_train.labels, X_val.labels
 
     logger.info(f"\n✂️ Data split:")
     logger.info(f"   Train: {X_train.shape[0]} samples")
     logger.info(f"   Val: {X_val.shape[0]} samples")
 
-    # 6. Train models
+    # 5. Train models
     results = {}
+    trainers = {}  # Models đã train -> ONNX export
 
     for model_name in Config.ENSEMBLE_MODELS:
         logger.info(f"\n{'='*60}")
@@ -100,10 +95,9 @@ def train_ensemble_models(symbols=None, days=360):
                     num_layers=Config.LSTM_NUM_LAYERS
                 )
 
-                # Fit scaler on training data (flatten for scaler)
-                # Reshape from (samples, seq_len, features) to (samples*seq_len, features)
-                X_train_flat = X_train.reshape(-1, X_train.shape[2])
-                lstm_trainer.scaler.fit(X_train_flat)
+                # Fit scaler on training data
+                # Rows của các windows (cùng min/max như flatten (samples*seq_len, features))
+                lstm_trainer.scaler.fit(X_train.rows())
                 logger.info(f"   ✅ Scaler fitted on training data")
 
                 lstm_trainer.train(
@@ -114,7 +108,7 @@ def train_ensemble_models(symbols=None, days=360):
                 )
 
                 # Evaluate on validation set
-                y_val_pred = lstm_trainer.predict(X_val)
+                y_val_pred = lstm_trainer.predict_batch(X_val)
                 y_val_pred_binary = (y_val_pred > 0.5).astype(int)
                 val_acc = (y_val_pred_binary == y_val).sum() / len(y_val)
 
@@ -122,6 +116,7 @@ def train_ensemble_models(symbols=None, days=360):
                 lstm_trainer.save(Config.MODEL_PATH, Config.SCALER_PATH)
 
                 results['lstm'] = {'val_acc': val_acc}
+                trainers['lstm'] = lstm_trainer
 
                 logger.info(f"✅ LSTM training complete!")
                 logger.info(f"   Val Acc: {val_acc:.4f}")
@@ -141,6 +136,7 @@ def train_ensemble_models(symbols=None, days=360):
                 xgb_scaler_path = Config.SCALER_PATH.replace('scaler.pkl', 'xgboost_scaler.pkl')
                 xgb_trainer.save(xgb_model_path, xgb_scaler_path)
                 results['xgboost'] = history
+                trainers['xgboost'] = xgb_trainer
 
                 logger.info(f"✅ XGBoost training complete!")
                 logger.info(f"   Val AUC: {history.get('val_auc', 0):.4f}")
@@ -166,10 +162,11 @@ def train_ensemble_models(symbols=None, days=360):
                 lgb_trainer.save(lgb_model_path, lgb_scaler_path)
 
                 # Calculate validation accuracy
-                y_val_pred = lgb_trainer.predict(X_val)
+                y_val_pred = lgb_trainer.predict_batch(X_val)
                 y_val_pred_binary = (y_val_pred > 0.5).astype(int)
                 val_acc = (y_val_pred_binary == y_val).sum() / len(y_val)
                 results['lightgbm'] = {'val_acc': val_acc}
+                trainers['lightgbm'] = lgb_trainer
 
                 logger.info(f"✅ LightGBM training complete!")
                 logger.info(f"   Val Acc: {val_acc:.4f}")
@@ -189,10 +186,11 @@ def train_ensemble_models(symbols=None, days=360):
                 cb_trainer.save(cb_model_path, cb_scaler_path)
 
                 # Calculate validation accuracy
-                y_val_pred = cb_trainer.predict(X_val)
+                y_val_pred = cb_trainer.predict_batch(X_val)
                 y_val_pred_binary = (y_val_pred > 0.5).astype(int)
                 val_acc = (y_val_pred_binary == y_val).sum() / len(y_val)
                 results['catboost'] = {'val_acc': val_acc}
+                trainers['catboost'] = cb_trainer
 
                 logger.info(f"✅ CatBoost training complete!")
                 logger.info(f"   Val Acc: {val_acc:.4f}")
@@ -203,6 +201,10 @@ def train_ensemble_models(symbols=None, days=360):
             traceback.print_exc()
             continue
 
+    # 6. Export ONNX (scalers + models -> 1 graph cho InferenceBackend)
+    if trainers:
+        export_ensemble(trainers, Config.ONNX_MODEL_PATH)
+
     # 7. Summary
     logger.info(f"\n{'='*60}")
     logger.info("📊 TRAINING SUMMARY")
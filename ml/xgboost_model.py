@@ -171,6 +171,25 @@ class XGBoostTrainer:
 
         return prob
 
+    def predict_batch(self, X):
+        """
+        Predict nhiều samples (vd. 1 window mỗi symbol) trong 1 lần gọi model
+
+        Args:
+            X: (n, seq_len, n_features) - dùng timestep cuối, hoặc (n, n_features)
+
+        Returns:
+            np.ndarray: (n,) probability of price going up
+        """
+        if self.model is None:
+            logger.error("Model not trained or loaded!")
+            return np.full(len(X), 0.5)
+
+        if len(X.shape) == 3:
+            X = X[:, -1, :]
+
+        return self.model.predict_proba(self.scaler.transform(X))[:, 1]
+
     def save(self, model_path='models/xgboost_model.json', scaler_path='models/xgboost_scaler.pkl'):
         """Save model and scaler"""
         if self.model is None:
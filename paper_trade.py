@@ -68,8 +68,9 @@ class PaperTrader:
             if df_1h.empty:
                 return None, None
 
-            # Calculate indicators
-            df_1h = self.feature_engine.calculate_indicators(df_1h)
+            # Calculate indicators (chỉ columns các pipeline stages đọc)
+            columns, _ = self.pipeline.required_columns()
+            df_1h = self.feature_engine.compute(df_1h, columns)
 
             # Create 4H data (use same data for simplicity)
             df_4h = df_1h.copy()
@@ -12,17 +12,18 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from sklearn.model_selection import train_test_split
 
 from config import Config
 from utils.logger import logger
 from trading.asterdex_client import AsterDEXClient
 from ml.features import FeatureEngine
+from ml.sequence_dataset import SequenceDataset
 from ml.lstm_model import LSTMTrainer
 from ml.xgboost_model import XGBoostTrainer
 from ml.lightgbm_model import LightGBMTrainer
 from ml.catboost_model import CatBoostTrainer
 from ml.ensemble import EnsemblePredictor
+from ml.onnx_export import export_ensemble
 
 
 class AutoRetrainer:
@@ -177,12 +178,11 @@ class AutoRetrainer:
         Prepare training data from all symbols
 
         Returns:
-            X, y arrays for training
+            X (SequenceDataset, windows không nối qua 2 symbols), y labels
         """
         logger.info("🔧 Preparing training data...")
 
-        all_sequences = []
-        all_labels = []
+        all_features = []
 
         for symbol in Config.SYMBOLS:
             logger.info(f"\n📊 Processing {symbol}...")
@@ -200,24 +200,18 @@ class AutoRetrainer:
             # Prepare features
             feature_df = self.feature_engine.prepare_features(df)
 
-            # Create sequences
-            X_symbol, y_symbol = self.feature_engine.create_sequences(
-                feature_df.values,
-                seq_length=Config.SEQUENCE_LENGTH
-            )
-
-            logger.info(f"   Created {len(X_symbol)} sequences")
+            logger.info(f"   Created {max(len(feature_df) - Config.SEQUENCE_LENGTH, 0)} sequences")
 
-            all_sequences.append(X_symbol)
-            all_labels.append(y_symbol)
+            all_features.append(feature_df.to_numpy(dtype=np.float32))
 
-        if not all_sequences:
+        if not all_features:
             logger.error("❌ No training data collected!")
             return None, None
 
-        # Combine all data
-        X = np.vstack(all_sequences)
-        y = np.concatenate(all_labels)
+        # Combine all data: 1 feature matrix, sequences là views
+        offsets = np.concatenate([[0], np.cumsum([len(features) for features in all_features])])
+        X = SequenceDataset(np.concatenate(all_features), Config.SEQUENCE_LENGTH, offsets)
+        y = X.labels
 
         logger.info(f"\n✅ Total training data:")
         logger.info(f"   Sequences: {len(X)}")
@@ -251,13 +245,9 @@ class AutoRetrainer:
 
         logger.info("📊 Fitting scaler on training data...")
 
-        # Reshape X_train từ (n_samples, seq_len, features) thành (n_samples * seq_len, features)
-        n_samples, seq_len, n_features = X_train.shape
-        X_train_2d = X_train.reshape(-1, n_features)
-
-        # Fit scaler
+        # Rows của các training windows (cùng min/max như reshape (n_samples * seq_len, features))
         scaler = MinMaxScaler()
-        scaler.fit(X_train_2d)
+        scaler.fit(X_train.rows())
 
         # Save scaler
         scaler_path = Config.SCALER_PATH
@@ -268,13 +258,10 @@ class AutoRetrainer:
         logger.info(f"✅ Scaler fitted and saved to {scaler_path}")
         logger.info(f"   n_features: {scaler.n_features_in_}")
 
-        # Normalize training data
-        X_train_normalized = scaler.transform(X_train_2d).reshape(n_samples, seq_len, n_features)
-
-        # Normalize validation data
-        n_val_samples = X_val.shape[0]
-        X_val_2d = X_val.reshape(-1, n_features)
-        X_val_normalized = scaler.transform(X_val_2d).reshape(n_val_samples, seq_len, n_features)
+        # Normalize feature matrix 1 lần (train + val dùng chung rows)
+        normalized_data = scaler.transform(X_train.data).astype(np.float32)
+        X_train_normalized = X_train.with_data(normalized_data)
+        X_val_normalized = X_val.with_data(normalized_data)
 
         logger.info(f"✅ Data normalized: train={X_train_normalized.shape}, val={X_val_normalized.shape}\n")
 
@@ -364,11 +351,8 @@ class AutoRetrainer:
 
             # 2. Split data
             logger.info("\n📊 Splitting data...")
-            X_train, X_val, y_train, y_val = train_test_split(
-                X, y,
-                test_size=0.2,
-                shuffle=False  # Time series - no shuffle!
-            )
+            X_train, X_val = X.split(test_size=0.2)  # Time series - no shuffle!
+            y_train, y_val = X_train.labels, X_val.labels
 
             logger.info(f"   Train: {len(X_train)} samples")
             logger.info(f"   Val: {len(X_val)} samples")
@@ -380,7 +364,10 @@ class AutoRetrainer:
                 logger.error("❌ No models trained")
                 return False
 
-            # 4. Test ensemble
+            # 4. Export ONNX (load_models() dùng InferenceBackend nếu export thành công)
+            export_ensemble(models, Config.ONNX_MODEL_PATH)
+
+            # 5. Test ensemble
             logger.info("\n" + "=" * 60)
             logger.info("🎭 Testing Ensemble...")
             logger.info("=" * 60)
@@ -405,7 +392,7 @@ class AutoRetrainer:
                 test_accuracy = correct / min(100, total)
                 logger.info(f"\n✅ Ensemble test accuracy: {test_accuracy:.2%}")
 
-            # 5. Summary
+            # 6. Summary
             logger.info("\n" + "=" * 60)
             logger.info("✅ RETRAINING COMPLETED SUCCESSFULLY!")
             logger.info("=" * 60)
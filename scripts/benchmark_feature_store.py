@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# ============================================
+# ⏱️ BENCHMARK FEATURE STORE
+# Peak RSS / allocations khi tính features cho cả universe:
+# DataFrame pipeline cũ (calculate_indicators + prepare_features mỗi symbol)
+# vs float32 buffer preallocate (compute_grouped_features + write_features)
+# ============================================
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import hashlib
+import json
+import resource
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from ml.batch_features import compute_grouped_features
+from ml.features import FeatureEngine
+
+
+MODES = ('dataframe', 'store')
+
+
+def make_universe(symbols: int, candles: int, seed: int = 42) -> pd.DataFrame:
+    """Multi-symbol OHLCV random walk (như DataFetcher.combine_dataframes)"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(symbols):
+        close = (100 + i) * np.exp(np.cumsum(rng.normal(0, 0.004, candles)))
+        open_ = np.concatenate([[close[0]], close[:-1]])
+        frames.append(pd.DataFrame({
+            'open': open_,
+            'high': np.maximum(open_, close) * (1 + rng.uniform(0, 0.003, candles)),
+            'low': np.minimum(open_, close) * (1 - rng.uniform(0, 0.003, candles)),
+            'close': close,
+            'volume': rng.uniform(10, 500, candles),
+            'symbol': f'SIM{i}USDT',
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def dataframe_features(df: pd.DataFrame) -> np.ndarray:
+    """Pipeline cũ: DataFrame indicators mỗi symbol, rồi ghép matrix"""
+    arrays = []
+    for _, group in df.groupby('symbol', sort=False):
+        frame = FeatureEngine.calculate_indicators(group.drop(columns=['symbol']).reset_index(drop=True))
+        arrays.append(FeatureEngine.prepare_features(frame).to_numpy(dtype=np.float32))
+    return np.concatenate(arrays)
+
+
+def store_features(df: pd.DataFrame) -> np.ndarray:
+    return compute_grouped_features(df, workers=1).features
+
+
+def current_rss_mb() -> float:
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run_mode(mode: str, symbols: int, candles: int) -> dict:
+    """Chạy 1 mode trong process hiện tại (process riêng -> peak RSS không lẫn)"""
+    df = make_universe(symbols, candles)
+    rss_before = current_rss_mb()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    features = dataframe_features(df) if mode == 'dataframe' else store_features(df)
+    seconds = time.perf_counter() - start
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'mode': mode,
+        'seconds': seconds,
+        'rss_before_mb': rss_before,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,  # Linux: KB
+        'traced_peak_mb': traced_peak / 1024 ** 2,
+        'result_mb': features.nbytes / 1024 ** 2,
+        'checksum': hashlib.sha1(np.ascontiguousarray(features).tobytes()).hexdigest(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark feature store memory')
+    parser.add_argument('--symbols', type=int, default=100, help='Symbols in the universe')
+    parser.add_argument('--candles', type=int, default=5000, help='Candles per symbol')
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)  # Child process
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.symbols, args.candles)))
+        return
+
+    results = {}
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--mode', mode,
+             '--symbols', str(args.symbols), '--candles', str(args.candles)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    print("=" * 60)
+    print(f"⏱️  FEATURE STORE ({args.symbols} symbols × {args.candles:,} candles)")
+    print("=" * 60)
+    print(f"   {'':12}{'time':>9}{'peak RSS':>12}{'Δ RSS':>10}{'allocated':>12}{'result':>9}")
+    for mode, r in results.items():
+        print(f"   {mode:12}{r['seconds']:8.2f}s{r['peak_rss_mb']:10.0f}MB"
+              f"{r['peak_rss_mb'] - r['rss_before_mb']:8.0f}MB{r['traced_peak_mb']:10.0f}MB{r['result_mb']:7.0f}MB")
+
+    identical = results['dataframe']['checksum'] == results['store']['checksum']
+    print(f"\n   Identical:  {'✅' if identical else '❌'}")
+    print("=" * 60)
+
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
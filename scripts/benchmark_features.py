@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# ============================================
+# ⏱️ BENCHMARK FEATURES
+# So sánh tốc độ RSI divergence scorer (vectorized vs loop)
+# và calculate_indicators trên frame lớn
+# ============================================
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from ml.features import FeatureEngine
+
+
+def make_frame(rows: int, seed: int = 42) -> pd.DataFrame:
+    """OHLCV random walk (1h candles)"""
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.004, rows)))
+    open_ = np.concatenate([[30000.0], close[:-1]])
+    df = pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) * (1 + rng.uniform(0, 0.003, rows)),
+        'low': np.minimum(open_, close) * (1 - rng.uniform(0, 0.003, rows)),
+        'close': close,
+        'volume': rng.uniform(10, 500, rows),
+    })
+    df['rsi'] = FeatureEngine._calculate_rsi_manual(df['close'], period=14)
+    return df
+
+
+def timed(fn, *args, repeat: int = 1):
+    """(best seconds, result)"""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark RSI divergence scorer')
+    parser.add_argument('--rows', type=int, default=100_000, help='Rows in the benchmark frame')
+    parser.add_argument('--loop-rows', type=int, default=None,
+                        help='Rows for the slow loop version (default: --rows; smaller = extrapolated)')
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    loop_rows = min(args.loop_rows or args.rows, args.rows)
+
+    print("=" * 60)
+    print(f"⏱️  RSI DIVERGENCE SCORER ({args.rows:,} rows)")
+    print("=" * 60)
+
+    vec_time, vec_scores = timed(FeatureEngine._calculate_rsi_divergence_score, df, repeat=5)
+    loop_time, loop_scores = timed(FeatureEngine._calculate_rsi_divergence_score_loop, df.iloc[:loop_rows])
+
+    identical = np.array_equal(vec_scores.to_numpy()[:loop_rows], loop_scores.to_numpy())
+    loop_estimate = loop_time * args.rows / loop_rows
+
+    print(f"   Loop:       {loop_time:8.3f}s ({loop_rows:,} rows)"
+          + (f" -> ~{loop_estimate:.1f}s for {args.rows:,}" if loop_rows < args.rows else ""))
+    print(f"   Vectorized: {vec_time:8.3f}s")
+    print(f"   Speedup:    {loop_estimate / vec_time:8.0f}x")
+    print(f"   Identical:  {'✅' if identical else '❌'} "
+          f"({int((vec_scores != 0).sum()):,} divergences)")
+
+    ind_time, _ = timed(FeatureEngine.calculate_indicators, df.drop(columns=['rsi']))
+    print(f"\n   calculate_indicators ({args.rows:,} rows): {ind_time:.3f}s")
+    print("=" * 60)
+
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
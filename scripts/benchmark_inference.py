@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# ============================================
+# ⏱️ BENCHMARK INFERENCE
+# Latency của EnsemblePredictor: models gốc (torch / xgboost / lightgbm / catboost)
+# vs ONNX Runtime (ensemble.onnx, 1 graph), per-symbol và batch mỗi loop
+# ============================================
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from ml.catboost_model import CatBoostTrainer
+from ml.ensemble import EnsemblePredictor, InferenceBackend
+from ml.features import FeatureEngine
+from ml.lightgbm_model import LightGBMTrainer
+from ml.lstm_model import LSTMTrainer
+from ml.onnx_export import export_ensemble
+from ml.xgboost_model import XGBoostTrainer
+
+
+TRAINERS = {
+    'lstm': LSTMTrainer,
+    'xgboost': XGBoostTrainer,
+    'lightgbm': LightGBMTrainer,
+    'catboost': CatBoostTrainer,
+}
+
+
+def make_windows(n: int, seq_len: int, n_features: int, seed: int = 0):
+    """Windows random (đã normalize) + labels theo 2 features của candle cuối"""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, seq_len, n_features)).astype(np.float32)
+    y = (X[:, -1, 0] + X[:, -1, 3] > 0).astype(np.int64)
+    return X, y
+
+
+def train_models(names, X, y, workdir: str) -> dict:
+    """Train nhỏ trên data synthetic (catboost_info/ ghi vào workdir)"""
+    split = int(len(X) * 0.8)
+    n_features = X.shape[2]
+    models = {}
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        for name in names:
+            trainer = TRAINERS[name](input_size=n_features)
+            if name == 'lstm':
+                trainer.train(X[:split], y[:split], epochs=1, batch_size=64)
+            else:
+                trainer.train(X[:split], y[:split], X[split:], y[split:])
+                trainer.scaler.fit(X.reshape(-1, n_features))
+            models[name] = trainer
+    finally:
+        os.chdir(cwd)
+    return models
+
+
+def timed(fn, repeat: int) -> np.ndarray:
+    """Latency mỗi lần gọi (ms)"""
+    fn()  # Warm-up
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return np.array(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark native vs ONNX Runtime ensemble inference')
+    parser.add_argument('--symbols', type=int, default=100, help='Windows per batch (1 per symbol)')
+    parser.add_argument('--seq-len', type=int, default=60, help='Sequence length')
+    parser.add_argument('--repeat', type=int, default=50, help='Timed runs per case')
+    parser.add_argument('--models', default='lstm,xgboost,lightgbm,catboost', help='Ensemble models')
+    args = parser.parse_args()
+
+    names = args.models.split(',')
+    n_features = len(FeatureEngine.FEATURE_COLUMNS)
+    X_train, y_train = make_windows(2000, args.seq_len, n_features)
+    X, _ = make_windows(args.symbols, args.seq_len, n_features, seed=1)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        models = train_models(names, X_train, y_train, workdir)
+        path = os.path.join(workdir, 'ensemble.onnx')
+        if not export_ensemble(models, path, seq_length=args.seq_len):
+            print("❌ ONNX export failed (pip install onnx onnxmltools onnxruntime)")
+            sys.exit(1)
+
+        ensemble = EnsemblePredictor(models=names, weights=[1 / len(names)] * len(names), input_size=n_features)
+        ensemble.models = models
+        backend = InferenceBackend(path)
+
+        results = {}
+        for mode, mode_backend in (('native', None), ('onnx', backend)):
+            ensemble.backend = mode_backend
+            results[mode] = {
+                'single': timed(lambda: ensemble.predict_result(X[0]), args.repeat),
+                'batch': timed(lambda: ensemble.predict_results(X), args.repeat),
+                'probs': np.array([r.probability for r in ensemble.predict_results(X)]),
+            }
+
+    max_diff = float(np.abs(results['native']['probs'] - results['onnx']['probs']).max())
+
+    print("=" * 60)
+    print(f"⏱️  ENSEMBLE INFERENCE ({','.join(names)}, seq_len={args.seq_len})")
+    print("=" * 60)
+    print(f"   {'':24}{'native p50':>12}{'p99':>9}{'onnx p50':>11}{'p99':>9}{'speedup':>9}")
+    for case, label in (('single', '1 symbol'), ('batch', f'batch {args.symbols} symbols')):
+        native, onnx_ = results['native'][case], results['onnx'][case]
+        print(f"   {label:24}{np.median(native):10.2f}ms{np.percentile(native, 99):7.2f}ms"
+              f"{np.median(onnx_):9.2f}ms{np.percentile(onnx_, 99):7.2f}ms"
+              f"{np.median(native) / np.median(onnx_):8.1f}x")
+
+    print(f"\n   Max |Δ prob|: {max_diff:.2e} {'✅' if max_diff < 1e-4 else '❌'}")
+    print("=" * 60)
+
+    if max_diff >= 1e-4:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
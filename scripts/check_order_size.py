@@ -21,7 +21,7 @@ def main():
     risk_manager = RiskManager()
     
     # Get balance
-    balance = client.get_balance()
+    balance = client.get_account_balance()
     
     if balance is None:
         print("\n❌ Failed to get balance!")
@@ -42,7 +42,7 @@ def main():
         print(f"   Buying power: ${balance * Config.SIZE_PCT * Config.LEVERAGE:.2f}")
     
     # Check each symbol
-    symbols = Config.SYMBOLS.split(',')
+    symbols = Config.SYMBOLS
     
     print(f"\n📋 Checking {len(symbols)} symbols:")
     print("=" * 70)
@@ -68,28 +68,10 @@ def main():
             # Format quantity
             formatted_quantity = client.format_quantity(symbol, raw_quantity)
             
-            # Get symbol info for minimum notional
-            symbol_info = client._get_symbol_info(symbol)
-            
-            min_notional = 0
-            min_qty = 0
-            
-            if symbol_info:
-                # Get MIN_NOTIONAL filter
-                min_notional_filter = next(
-                    (f for f in symbol_info['filters'] if f['filterType'] == 'MIN_NOTIONAL'),
-                    None
-                )
-                if min_notional_filter:
-                    min_notional = float(min_notional_filter.get('notional', 0))
-                
-                # Get LOT_SIZE filter
-                lot_size_filter = next(
-                    (f for f in symbol_info['filters'] if f['filterType'] == 'LOT_SIZE'),
-                    None
-                )
-                if lot_size_filter:
-                    min_qty = float(lot_size_filter.get('minQty', 0))
+            # Get trading rules (MIN_NOTIONAL, LOT_SIZE) from exchange info index
+            filters = client.exchange_info.get(symbol)
+            min_notional = filters.min_notional if filters else 0
+            min_qty = filters.min_qty if filters else 0
             
             # Calculate notional value
             notional_value = formatted_quantity * price
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 # ============================================
 # 🔴 CLOSE ALL POSITIONS
-# Emergency close tất cả positions
+# Emergency close tất cả positions (mọi exchange, song song)
 # ============================================
 
 import sys
@@ -10,45 +10,41 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import Config
 from trading.asterdex_client import AsterDEXClient
+from trading.binance_client import BinanceClient
+from trading.flatten import flatten_all, format_report
 from utils.logger import logger
 
 def main():
     """Close all positions"""
     Config.validate()
-    
-    client = AsterDEXClient()
-    
+
+    clients = {}
+    if 'asterdex' in Config.EXCHANGES:
+        clients['asterdex'] = AsterDEXClient()
+    if 'binance' in Config.EXCHANGES:
+        clients['binance'] = BinanceClient()
+
     logger.info("=" * 60)
-    logger.info("🔴 CLOSING ALL POSITIONS")
+    logger.info(f"🔴 CLOSING ALL POSITIONS ({', '.join(clients)})")
     logger.info("=" * 60)
-    
-    # Confirm
-    response = input("\n⚠️  Are you sure? (yes/no): ")
-    
-    if response.lower() != 'yes':
-        logger.info("❌ Cancelled")
-        return
-    
-    # Close all
-    closed_count = 0
-    
-    for symbol in Config.SYMBOLS:
-        pos = client.get_position(symbol)
-        
-        if pos:
-            logger.info(f"\n📊 Closing {symbol}...")
-            logger.info(f"   {pos['side']} {pos['amount']} @ ${pos['mark_price']:.2f}")
-            logger.info(f"   PnL: {pos['pnl_pct']*100:.2f}%")
-            
-            if client.close_position(symbol):
-                logger.info(f"   ✅ Closed!")
-                closed_count += 1
-            else:
-                logger.error(f"   ❌ Failed to close!")
-    
-    logger.info(f"\n✅ Closed {closed_count} positions")
+
+    # Confirm (--yes: bỏ qua, vd. chạy từ cron / alert)
+    if '--yes' not in sys.argv:
+        response = input("\n⚠️  Are you sure? (yes/no): ")
+
+        if response.lower() != 'yes':
+            logger.info("❌ Cancelled")
+            return
+
+    # Close all: 1 request positions + batch orders mỗi exchange, các exchanges song song
+    results = flatten_all(clients)
+
+    logger.info(format_report(results))
     logger.info("=" * 60)
 
+    # Exit code != 0 nếu còn position chưa đóng được
+    if any(not r.ok for r in results):
+        sys.exit(1)
+
 if __name__ == '__main__':
     main()
-
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# ============================================
+# 🧪 RUN EXCHANGE SIMULATOR
+# Local Binance-compatible futures API để load test bot (không cần network)
+# ============================================
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+
+from trading.simulator import ExchangeSimulator, load_price_path
+from utils.logger import logger
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Local Binance-compatible exchange simulator')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Bind host')
+    parser.add_argument('--port', type=int, default=8765, help='Bind port')
+    parser.add_argument('--symbols', type=int, default=100, help='Number of synthetic symbols (SIM0USDT, SIM1USDT, ...)')
+    parser.add_argument('--symbol-list', type=str, default='', help='Comma-separated symbols (overrides --symbols)')
+    parser.add_argument('--replay', action='append', default=[],
+                        help='SYMBOL=path.csv|path.json: replay recorded prices for a symbol (repeatable)')
+    parser.add_argument('--volatility', type=float, default=0.001, help='Random walk volatility per minute')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Fixed latency added to each REST request')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Random extra latency (0..jitter) per request')
+    parser.add_argument('--weight-limit', type=int, default=2400, help='Request weight per minute (0 = unlimited)')
+    parser.add_argument('--tick', type=float, default=1.0, help='Seconds between price ticks')
+    parser.add_argument('--balance', type=float, default=10000.0, help='Initial USDT balance')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed')
+    return parser.parse_args()
+
+
+async def run(args):
+    if args.symbol_list:
+        symbols = [s.strip().upper() for s in args.symbol_list.split(',') if s.strip()]
+    else:
+        symbols = [f'SIM{i}USDT' for i in range(args.symbols)]
+
+    paths = {}
+    for item in args.replay:
+        symbol, _, path = item.partition('=')
+        paths[symbol.upper()] = load_price_path(path)
+        if symbol.upper() not in symbols:
+            symbols.append(symbol.upper())
+
+    sim = ExchangeSimulator(
+        symbols, paths=paths, volatility=args.volatility,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        weight_limit=args.weight_limit or None, tick_interval=args.tick,
+        balance=args.balance, seed=args.seed
+    )
+    url = await sim.start(args.host, args.port)
+
+    logger.info("=" * 60)
+    logger.info("Point the bot at the simulator:")
+    logger.info(f"   SIMULATOR_URL={url}")
+    logger.info(f"   SYMBOLS={','.join(symbols)}")
+    logger.info(f"   Stats: {url}/sim/stats")
+    logger.info("=" * 60)
+
+    try:
+        while True:
+            await asyncio.sleep(60)
+            stats = sim.stats()
+            logger.info(
+                f"🧪 {stats['total_requests']} requests | {stats['rejected']} rate limited | "
+                f"{stats['orders']} orders | {stats['open_positions']} positions | "
+                f"{stats['websockets']} websockets | balance ${stats['balance']:.2f}"
+            )
+    finally:
+        await sim.stop()
+
+
+def main():
+    try:
+        asyncio.run(run(parse_args()))
+    except KeyboardInterrupt:
+        logger.info("🛑 Simulator stopped")
+
+
+if __name__ == '__main__':
+    main()
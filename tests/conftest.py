@@ -0,0 +1,72 @@
+# ============================================
+# 🧪 SHARED TEST HELPERS
+# Klines / windows synthetic và models train nhỏ dùng chung giữa các test files
+# ============================================
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+
+from ml.catboost_model import CatBoostTrainer
+from ml.ensemble import EnsemblePredictor
+from ml.features import FeatureEngine
+from ml.lightgbm_model import LightGBMTrainer
+from ml.lstm_model import LSTMTrainer
+from ml.xgboost_model import XGBoostTrainer
+
+N_FEATURES = len(FeatureEngine.FEATURE_COLUMNS)
+
+
+def make_klines(n=200, start_price=30000.0, seed=7, interval_ms=900000):
+    """Klines random walk dạng REST (12 columns như Binance / AsterDEX)"""
+    rng = np.random.default_rng(seed)
+    closes = start_price * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    opens = np.concatenate([[start_price], closes[:-1]])
+    highs = np.maximum(opens, closes) * (1 + rng.uniform(0, 0.003, n))
+    lows = np.minimum(opens, closes) * (1 - rng.uniform(0, 0.003, n))
+    volumes = rng.uniform(10, 500, n)
+    return [[i * interval_ms, str(o), str(h), str(l), str(c), str(v), i * interval_ms + interval_ms - 1,
+             '0', 0, '0', '0', '0']
+            for i, (o, h, l, c, v) in enumerate(zip(opens, highs, lows, closes, volumes))]
+
+
+def make_windows(n=40, seq_len=20, seed=0):
+    """Windows (n, seq_len, n_features) float32 + labels theo 2 features của candle cuối"""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, seq_len, N_FEATURES)).astype(np.float32)
+    y = (X[:, -1, 0] + X[:, -1, 3] > 0).astype(np.int64)
+    return X, y
+
+
+def make_ensemble(models):
+    """EnsemblePredictor equal weights dùng các trainers đã train"""
+    ensemble = EnsemblePredictor(models=list(models), weights=[1 / len(models)] * len(models),
+                                 input_size=N_FEATURES)
+    ensemble.models = dict(models)
+    return ensemble
+
+
+@pytest.fixture(scope='session')
+def trained(tmp_path_factory):
+    """4 models train nhỏ trên make_windows (seq_len 20), 1 lần cho cả test session"""
+    X, y = make_windows(n=200)
+    models = {}
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('models'))  # catboost_info/ của CatBoost ghi vào tmp
+    try:
+        for name, trainer_cls in (('xgboost', XGBoostTrainer), ('lightgbm', LightGBMTrainer),
+                                  ('catboost', CatBoostTrainer)):
+            trainer = trainer_cls(input_size=N_FEATURES)
+            trainer.train(X[:160], y[:160], X[160:], y[160:])
+            trainer.scaler.fit(X.reshape(-1, N_FEATURES))
+            models[name] = trainer
+    finally:
+        os.chdir(cwd)
+
+    lstm = LSTMTrainer(input_size=N_FEATURES)
+    lstm.train(X[:160], y[:160], epochs=1, batch_size=64)
+    models['lstm'] = lstm
+    return models
@@ -0,0 +1,44 @@
+# ============================================
+# 🧪 TESTS FOR ACCOUNT CONFIG CACHE
+# ============================================
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trading.account_config import AccountConfigCache, parse_margin_type
+
+
+class TestAccountConfigCache:
+
+    def test_parse_margin_type(self):
+        assert parse_margin_type('isolated') == 'ISOLATED'
+        assert parse_margin_type('cross') == 'CROSSED'
+        assert parse_margin_type('CROSSED') == 'CROSSED'
+        assert parse_margin_type(None) is None
+
+    def test_load_positions(self):
+        cache = AccountConfigCache()
+        loaded = cache.load_positions([
+            {'symbol': 'BTCUSDT', 'leverage': '20', 'marginType': 'isolated'},
+            {'symbol': 'ETHUSDT', 'leverage': '5', 'marginType': 'cross'},
+            {'symbol': 'XRPUSDT'},  # Thiếu leverage -> bỏ qua
+        ])
+
+        assert loaded == 2
+        assert not cache.needs_leverage('BTCUSDT', 20)
+        assert not cache.needs_margin_type('BTCUSDT', 'ISOLATED')
+        assert cache.needs_margin_type('ETHUSDT', 'ISOLATED')
+        assert cache.needs_leverage('XRPUSDT', 10)
+
+    def test_set_and_invalidate(self):
+        cache = AccountConfigCache()
+        cache.set_leverage('BTCUSDT', 10)
+        cache.set_margin_type('BTCUSDT', 'ISOLATED')
+
+        assert cache.get('BTCUSDT').leverage == 10
+        assert not cache.needs_margin_type('BTCUSDT', 'ISOLATED')
+
+        cache.invalidate('BTCUSDT')
+        assert cache.needs_leverage('BTCUSDT', 10)
+        assert len(cache) == 0
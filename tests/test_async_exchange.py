@@ -0,0 +1,377 @@
+# ============================================
+# 🧪 TESTS FOR ASYNC EXCHANGE CLIENTS
+# Chạy với local aiohttp server (không cần network)
+# ============================================
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+import pytest
+from urllib.parse import unquote
+from aiohttp import web
+
+from config import Config
+from trading.async_asterdex_client import AsyncAsterDEXClient
+from trading.async_bridge import AsyncClientBridge
+from trading.flatten import flatten_all
+from trading.rate_limiter import get_rate_limiter
+
+
+# ============================================
+# FAKE FUTURES API
+# ============================================
+
+class FakeFuturesAPI:
+    """Local Binance-compatible endpoints với request counter"""
+
+    def __init__(self, position_amt='0', symbols=('BTCUSDT', 'ETHUSDT'), open_count=1, batch_orders=True,
+                 batch_timeout=False):
+        self.position_amt = position_amt
+        self.symbols = symbols
+        self.open_count = open_count
+        self.batch_orders = batch_orders
+        self.batch_timeout = batch_timeout  # Nhận orders nhưng trả lỗi (execution status unknown)
+        self.calls = {}
+        self.orders = {}  # clientOrderId -> order
+
+    def _count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    async def klines(self, request):
+        self._count('klines')
+        limit = int(request.query['limit'])
+        return web.json_response([
+            [i * 60000, '100', '101', '99', '100.5', '10', i * 60000 + 59999, '0', 1, '0', '0', '0']
+            for i in range(limit)
+        ], headers={'X-MBX-USED-WEIGHT-1M': str(self.calls['klines'] * 2)})
+
+    async def depth(self, request):
+        self._count('depth')
+        return web.json_response({'bids': [['100', '2']] * 20, 'asks': [['101', '1']] * 20})
+
+    async def position_risk(self, request):
+        self._count('positionRisk')
+        # Không truyền symbol -> trả về tất cả symbols (open_count symbols đầu có position)
+        if 'symbol' in request.query:
+            entries = [(request.query['symbol'], self.position_amt)]
+        else:
+            entries = [(s, self.position_amt if i < self.open_count else '0') for i, s in enumerate(self.symbols)]
+        return web.json_response([{
+            'symbol': symbol,
+            'positionAmt': amt,
+            'entryPrice': '100',
+            'markPrice': '110',
+            'unRealizedProfit': '5',
+            'leverage': '10',
+            'marginType': 'isolated'
+        } for symbol, amt in entries])
+
+    async def leverage(self, request):
+        self._count('leverage')
+        return web.json_response({'leverage': 20})
+
+    async def margin_type(self, request):
+        self._count('marginType')
+        return web.json_response({'code': 200, 'msg': 'success'})
+
+    async def balance(self, request):
+        self._count('balance')
+        return web.json_response([{'asset': 'USDT', 'balance': '1000'}])
+
+    async def create_order(self, request):
+        self._count('order')
+        params = {**request.query, **(await request.post())}
+        order = {
+            'orderId': len(self.orders) + 1, 'symbol': params['symbol'], 'side': params['side'],
+            'origQty': params['quantity'], 'clientOrderId': params.get('newClientOrderId', 'auto'),
+            'status': 'NEW'
+        }
+        self.orders[order['clientOrderId']] = order
+        return web.json_response(order)
+
+    async def create_batch_orders(self, request):
+        self._count('batchOrders')
+        if not self.batch_orders:
+            return web.json_response({'code': -1000, 'msg': 'Batch orders unsupported'}, status=400)
+
+        # batchOrders = JSON đã url-encode 1 lần (python-binance), rồi encode tiếp trong query/body
+        params = {**request.query, **(await request.post())}
+        batch = json.loads(unquote(params['batchOrders']))
+        response = []
+        for params in batch:
+            if params['symbol'] == 'BADUSDT':
+                response.append({'code': -1121, 'msg': 'Invalid symbol.'})
+                continue
+            order = {
+                'orderId': len(self.orders) + 1, 'symbol': params['symbol'], 'side': params['side'],
+                'origQty': params['quantity'], 'reduceOnly': params.get('reduceOnly') == 'true',
+                'clientOrderId': params.get('newClientOrderId', 'auto'), 'status': 'NEW'
+            }
+            self.orders[order['clientOrderId']] = order
+            response.append(order)
+        if self.batch_timeout:
+            return web.json_response({'code': -1007, 'msg': 'Timeout waiting for response from backend server.'},
+                                     status=503)
+        return web.json_response(response)
+
+    async def get_order(self, request):
+        self._count('getOrder')
+        order = self.orders.get(request.query.get('origClientOrderId'))
+        if order is None:
+            return web.json_response({'code': -2013, 'msg': 'Order does not exist.'}, status=400)
+        return web.json_response(order)
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get('/fapi/v1/klines', self.klines)
+        app.router.add_get('/fapi/v1/depth', self.depth)
+        app.router.add_get('/fapi/v2/positionRisk', self.position_risk)
+        app.router.add_get('/fapi/v2/balance', self.balance)
+        app.router.add_post('/fapi/v1/leverage', self.leverage)
+        app.router.add_post('/fapi/v1/marginType', self.margin_type)
+        app.router.add_post('/fapi/v1/order', self.create_order)
+        app.router.add_get('/fapi/v1/order', self.get_order)
+        app.router.add_post('/fapi/v1/batchOrders', self.create_batch_orders)
+        return app
+
+
+async def _with_client(api, fn):
+    """Start fake server, tạo AsyncAsterDEXClient trỏ tới nó, chạy fn(client)"""
+    runner = web.AppRunner(api.app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    original_url = Config.FUTURES_BASE_URL
+    Config.FUTURES_BASE_URL = f'http://127.0.0.1:{port}/fapi'
+    try:
+        async with AsyncAsterDEXClient('key', 'secret', testnet=False) as client:
+            return await fn(client)
+    finally:
+        Config.FUTURES_BASE_URL = original_url
+        await runner.cleanup()
+
+
+# ============================================
+# TESTS
+# ============================================
+
+class TestAsyncAsterDEXClient:
+
+    def test_concurrent_klines(self):
+        api = FakeFuturesAPI()
+
+        async def run(client):
+            symbols = [f'SYM{i}USDT' for i in range(50)]
+            return await asyncio.gather(*(client.get_klines(s, '1h', 100) for s in symbols))
+
+        results = asyncio.run(_with_client(api, run))
+
+        assert len(results) == 50
+        assert all(len(k) == 100 for k in results)
+        assert api.calls['klines'] == 50
+
+    def test_requests_go_through_rate_limiter(self):
+        api = FakeFuturesAPI()
+        limiter = get_rate_limiter('asterdex_mainnet')
+        weight_before = limiter.total_weight
+
+        async def run(client):
+            await asyncio.gather(*(client.get_klines(f'SYM{i}USDT', '1h', 100) for i in range(10)))
+
+        asyncio.run(_with_client(api, run))
+
+        assert limiter.total_weight - weight_before == 10 * 2  # klines limit 100 = weight 2
+        assert limiter.used_weight > 0  # Đọc từ X-MBX-USED-WEIGHT-1M
+
+    def test_symbol_config_loaded_from_positions(self):
+        api = FakeFuturesAPI()
+
+        async def run(client):
+            await client.get_account_snapshot()
+            # Leverage 10x ISOLATED đã đúng -> không request nào
+            assert await client.ensure_symbol_config('ETHUSDT', 10, 'ISOLATED')
+            assert api.calls.get('leverage', 0) == 0
+            assert api.calls.get('marginType', 0) == 0
+
+            # Đổi leverage 1 lần, lần sau dùng cache
+            assert await client.ensure_symbol_config('ETHUSDT', 20, 'ISOLATED')
+            assert await client.ensure_symbol_config('ETHUSDT', 20, 'ISOLATED')
+            assert api.calls['leverage'] == 1
+
+            # Symbol chưa biết config -> set cả 2
+            assert await client.ensure_symbol_config('NEWUSDT', 10, 'ISOLATED')
+            assert api.calls['leverage'] == 2
+            assert api.calls['marginType'] == 1
+
+        asyncio.run(_with_client(api, run))
+
+    def test_get_position_parses_long(self):
+        api = FakeFuturesAPI(position_amt='0.5')
+
+        async def run(client):
+            return await client.get_position('BTCUSDT')
+
+        position = asyncio.run(_with_client(api, run))
+
+        assert position['side'] == 'LONG'
+        assert position['amount'] == 0.5
+        assert position['pnl_pct'] == pytest.approx(0.1 * Config.LEVERAGE)
+
+    def test_get_position_flat_returns_none(self):
+        api = FakeFuturesAPI(position_amt='0')
+
+        async def run(client):
+            return await client.get_position('BTCUSDT')
+
+        assert asyncio.run(_with_client(api, run)) is None
+
+    def test_account_snapshot_single_position_request(self):
+        api = FakeFuturesAPI(position_amt='-2')
+
+        async def run(client):
+            return await client.get_account_snapshot()
+
+        snapshot = asyncio.run(_with_client(api, run))
+
+        assert snapshot.balance == 1000.0
+        assert snapshot.active_symbols(['BTCUSDT', 'ETHUSDT', 'SOLUSDT']) == ['BTCUSDT']
+        assert snapshot.get_position('BTCUSDT')['side'] == 'SHORT'
+        assert snapshot.get_position('ETHUSDT') is None
+        assert api.calls == {'positionRisk': 1, 'balance': 1}
+
+
+    def test_client_order_id_round_trip(self):
+        api = FakeFuturesAPI()
+
+        async def run(client):
+            order = await client.create_market_order('BTCUSDT', 'BUY', 0.01, client_order_id='fm-abc')
+            found = await client.get_order('BTCUSDT', 'fm-abc')
+            missing = await client.get_order('BTCUSDT', 'fm-unknown')
+            return order, found, missing
+
+        order, found, missing = asyncio.run(_with_client(api, run))
+
+        assert order['clientOrderId'] == 'fm-abc'
+        assert found['orderId'] == order['orderId']
+        assert missing is None
+
+
+    def test_batch_orders_chunked_in_order(self):
+        api = FakeFuturesAPI()
+        orders = [{'symbol': f'SYM{i}USDT', 'side': 'SELL', 'quantity': 1.0, 'reduce_only': True} for i in range(7)]
+        orders[3]['symbol'] = 'BADUSDT'
+
+        results = asyncio.run(_with_client(api, lambda client: client.create_market_orders(orders)))
+
+        assert api.calls['batchOrders'] == 2  # 5 + 2
+        assert [r['symbol'] if r else None for r in results] == [
+            'SYM0USDT', 'SYM1USDT', 'SYM2USDT', None, 'SYM4USDT', 'SYM5USDT', 'SYM6USDT'
+        ]
+        assert all(r['reduceOnly'] for r in results if r)
+
+    def test_batch_rejected_falls_back_to_single_orders(self):
+        api = FakeFuturesAPI(batch_orders=False)
+        orders = [{'symbol': s, 'side': 'BUY', 'quantity': 1.0} for s in ('BTCUSDT', 'ETHUSDT')]
+
+        results = asyncio.run(_with_client(api, lambda client: client.create_market_orders(orders)))
+
+        assert [r['symbol'] for r in results] == ['BTCUSDT', 'ETHUSDT']
+        assert api.calls['order'] == 2
+        assert api.calls['getOrder'] == 2  # Tra client order id trước khi gửi lại
+
+    def test_batch_failed_after_accept_not_resubmitted(self):
+        api = FakeFuturesAPI(batch_timeout=True)
+        orders = [{'symbol': s, 'side': 'BUY', 'quantity': 1.0} for s in ('BTCUSDT', 'ETHUSDT')]
+
+        results = asyncio.run(_with_client(api, lambda client: client.create_market_orders(orders)))
+
+        assert [r['symbol'] for r in results] == ['BTCUSDT', 'ETHUSDT']
+        assert [r['clientOrderId'] for r in results] == list(api.orders)  # Id gửi trong batch
+        assert 'order' not in api.calls
+        assert api.calls['getOrder'] == 2
+        assert all('client_order_id' not in o for o in orders)  # Orders của caller không bị sửa
+
+
+class TestFlatten:
+
+    def test_flatten_all_closes_every_position(self):
+        api = FakeFuturesAPI(position_amt='-0.5', symbols=('BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'XRPUSDT'), open_count=3)
+
+        async def run(client):
+            bridge = AsyncClientBridge(client, asyncio.get_running_loop())
+            return await asyncio.to_thread(flatten_all, {'asterdex': bridge})
+
+        results = asyncio.run(_with_client(api, run))
+
+        assert sorted(r.symbol for r in results) == ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
+        assert all(r.ok and r.side == 'SHORT' and r.amount == 0.5 for r in results)
+        assert all(o['side'] == 'BUY' and o['reduceOnly'] for o in api.orders.values())
+        assert api.calls == {'positionRisk': 1, 'batchOrders': 1}
+
+
+class TestAsyncClientBridge:
+
+    def test_prefetched_data_served_without_requests(self):
+        api = FakeFuturesAPI(position_amt='0')
+
+        async def run(client):
+            bridge = AsyncClientBridge(client, asyncio.get_running_loop())
+            await bridge.prefetch('BTCUSDT', {'1h': 200, '4h': 100})
+            calls_after_prefetch = dict(api.calls)
+
+            def blocking():
+                return (
+                    len(bridge.get_klines('BTCUSDT', '1h', 150)),
+                    len(bridge.get_klines('BTCUSDT', '4h', 100)),
+                    len(bridge.get_orderbook('BTCUSDT', 10)['bids']),
+                )
+
+            result = await asyncio.to_thread(blocking)
+            return result, calls_after_prefetch, dict(api.calls)
+
+        result, before, after = asyncio.run(_with_client(api, run))
+
+        assert result == (150, 100, 10)
+        assert before == after  # Không có request nào thêm
+        assert 'positionRisk' not in after  # Position đến từ snapshot, không fetch per-symbol
+
+    def test_cached_price_from_prefetched_klines(self):
+        api = FakeFuturesAPI(position_amt='0')
+
+        async def run(client):
+            bridge = AsyncClientBridge(client, asyncio.get_running_loop())
+            await bridge.prefetch('BTCUSDT', {'1h': 50})
+            return bridge.get_cached_price('BTCUSDT', '1h'), bridge.get_cached_price('BTCUSDT', '4h')
+
+        assert asyncio.run(_with_client(api, run)) == (100.5, None)
+        assert 'ticker' not in api.calls
+
+    def test_prefetch_skips_market_data_with_position(self):
+        api = FakeFuturesAPI(position_amt='0.5')
+
+        async def run(client):
+            bridge = AsyncClientBridge(client, asyncio.get_running_loop())
+            snapshot = await client.get_account_snapshot()
+            await bridge.prefetch('BTCUSDT', {'1h': 200}, position=snapshot.get_position('BTCUSDT'))
+
+        asyncio.run(_with_client(api, run))
+
+        assert 'klines' not in api.calls
+        assert 'depth' not in api.calls
+
+    def test_cache_miss_forwards_to_event_loop(self):
+        api = FakeFuturesAPI(position_amt='0')
+
+        async def run(client):
+            bridge = AsyncClientBridge(client, asyncio.get_running_loop())
+            await bridge.prefetch('BTCUSDT', {'1h': 50})
+            klines = await asyncio.to_thread(bridge.get_klines, 'BTCUSDT', '1h', 120)
+            return len(klines)
+
+        assert asyncio.run(_with_client(api, run)) == 120
+        assert api.calls['klines'] == 2
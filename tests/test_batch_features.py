@@ -0,0 +1,98 @@
+# ============================================
+# 🧪 TESTS FOR BATCH FEATURE PIPELINE
+# Indicators theo từng symbol, sequences không nối qua symbols
+# ============================================
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ml.batch_features
+from ml.batch_features import build_sequences, compute_grouped_features
+from ml.features import FeatureEngine
+
+
+def make_ohlcv(n, start_price, seed):
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    open_ = np.concatenate([[start_price], close[:-1]])
+    return pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) * (1 + rng.uniform(0, 0.003, n)),
+        'low': np.minimum(open_, close) * (1 - rng.uniform(0, 0.003, n)),
+        'close': close,
+        'volume': rng.uniform(10, 500, n),
+    })
+
+
+def make_universe():
+    """3 symbols, giá rất khác nhau (ranh giới symbol dễ thấy nếu bị nối)"""
+    data = {'BTCUSDT': make_ohlcv(150, 30000, 1), 'ETHUSDT': make_ohlcv(90, 2000, 2), 'DOGEUSDT': make_ohlcv(40, 0.1, 3)}
+    frames = [df.assign(symbol=symbol) for symbol, df in data.items()]
+    return data, pd.concat(frames, ignore_index=True)
+
+
+def expected_features(df):
+    return FeatureEngine.prepare_features(FeatureEngine.calculate_indicators(df.copy())).to_numpy(dtype=np.float32)
+
+
+class TestGroupedFeatures:
+
+    def test_matches_per_symbol_indicators(self):
+        data, combined = make_universe()
+        matrix = compute_grouped_features(combined, workers=1)
+
+        assert matrix.symbols == list(data)
+        assert matrix.features.dtype == np.float32 and matrix.features.flags['C_CONTIGUOUS']
+        assert list(matrix.offsets) == [0, 150, 240, 280]
+        for symbol, df in data.items():
+            np.testing.assert_array_equal(matrix.rows(symbol), expected_features(df))
+        assert list(np.bincount(matrix.symbol_codes)) == [150, 90, 40]
+
+    def test_process_pool_same_result(self, monkeypatch):
+        _, combined = make_universe()
+        monkeypatch.setattr(ml.batch_features, 'PARALLEL_MIN_ROWS', 0)
+
+        serial = compute_grouped_features(combined, workers=1)
+        parallel = compute_grouped_features(combined, workers=2)
+
+        np.testing.assert_array_equal(serial.features, parallel.features)
+        assert serial.symbols == parallel.symbols
+
+    def test_missing_symbol_column(self):
+        with pytest.raises(ValueError):
+            compute_grouped_features(make_ohlcv(50, 100, 0))
+
+
+class TestSequences:
+
+    def test_sequences_never_straddle_symbols(self):
+        data, combined = make_universe()
+        matrix = compute_grouped_features(combined, workers=1)
+
+        X, y, seq_symbols = matrix.sequences(seq_length=60)
+
+        # DOGEUSDT (40 rows) quá ngắn cho sequence 60
+        assert X.shape == (90 + 30, 60, len(FeatureEngine.FEATURE_COLUMNS))
+        assert X.dtype == np.float32 and X.flags['C_CONTIGUOUS']
+        assert list(np.bincount(seq_symbols, minlength=3)) == [90, 30, 0]
+
+        pos = 0
+        for i, symbol in enumerate(matrix.symbols):
+            X_ref, y_ref = FeatureEngine.create_sequences(matrix.rows(symbol), seq_length=60)
+            count = len(X_ref)
+            if count:
+                np.testing.assert_array_equal(X[pos:pos + count], X_ref)
+                np.testing.assert_array_equal(y[pos:pos + count], y_ref)
+            pos += count
+
+    def test_custom_data_same_layout(self):
+        data = np.arange(40, dtype=np.float64).reshape(10, 4)
+        X, y, seq_symbols = build_sequences(data, np.array([0, 6, 10]), seq_length=3)
+
+        np.testing.assert_array_equal(X[:, 0, 0], [0, 4, 8, 24])  # Không có window bắt đầu ở row 3..5
+        assert list(y) == [1, 1, 1, 1] and list(seq_symbols) == [0, 0, 0, 1]
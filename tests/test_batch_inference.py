@@ -0,0 +1,121 @@
+# ============================================
+# 🧪 TESTS FOR BATCH INFERENCE
+# predict_batch (1 lần / model cho mọi symbols) phải giống predict từng symbol
+# ============================================
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+
+from config import Config
+from conftest import N_FEATURES, make_ensemble, make_klines, make_windows
+from ml.xgboost_model import XGBoostTrainer
+from trading.entry_pipeline.ml_ensemble import MLEnsembleSignal
+from trading.signal_generator import SignalGenerator
+
+
+class TestModelPredictBatch:
+
+    @pytest.mark.parametrize('name', ['xgboost', 'lightgbm', 'catboost', 'lstm'])
+    def test_matches_single_predict(self, trained, name):
+        X, _ = make_windows(seed=1)
+        model = trained[name]
+
+        batch = model.predict_batch(X)
+        single = np.array([np.asarray(model.predict(x)).flatten()[0] for x in X])
+
+        assert batch.shape == (len(X),)
+        np.testing.assert_allclose(batch, single, rtol=1e-5, atol=1e-6)
+
+    def test_untrained_model_is_neutral(self):
+        X, _ = make_windows(n=3)
+        np.testing.assert_array_equal(XGBoostTrainer(input_size=N_FEATURES).predict_batch(X), [0.5] * 3)
+
+
+class TestEnsemblePredictBatch:
+
+    def test_matches_predict_with_details(self, trained):
+        ensemble = make_ensemble(trained)
+        X, _ = make_windows(n=8, seed=2)
+
+        preds, details = ensemble.predict_batch(X)
+
+        assert preds.shape == (8,)
+        for i, x in enumerate(X):
+            pred, single = ensemble.predict_with_details(x)
+            assert preds[i] == pytest.approx(pred, rel=1e-5)
+            for name in trained:
+                assert details[name][i] == pytest.approx(single[name], rel=1e-5, abs=1e-6)
+        assert details['weights'] == single['weights']
+
+    def test_ml_stage_batch_matches_predict(self, trained):
+        stage = MLEnsembleSignal(config={}, models=dict(trained))
+        X, _ = make_windows(n=6, seed=3)
+
+        batch = stage.predict_batch(X)
+
+        assert len(batch) == 6
+        for prediction, x in zip(batch, X):
+            single = stage.predict(x)
+            assert prediction.direction == single.direction
+            assert prediction.confidence == pytest.approx(single.confidence, rel=1e-5)
+            assert prediction.model_agreement == pytest.approx(single.model_agreement, rel=1e-5, abs=1e-6)
+
+
+class FakeClient:
+    """Klines / order book cố định theo symbol, đếm số lần fetch"""
+
+    def __init__(self):
+        self.kline_calls = []
+
+    def get_klines(self, symbol, interval='15m', limit=100):
+        self.kline_calls.append((symbol, interval))
+        return make_klines(seed=sum(map(ord, symbol)))[-limit:]
+
+    def get_orderbook(self, symbol, limit=10):
+        return {'bids': [[100.0, 3.0]], 'asks': [[100.1, 2.0]]}
+
+
+class TestSignalGeneratorPrepareBatch:
+
+    def test_prepared_predictions_match_per_symbol(self, trained):
+        tree_models = {name: trained[name] for name in ('xgboost', 'lightgbm')}
+        generator = SignalGenerator(make_ensemble(tree_models))
+        client = FakeClient()
+        symbols = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
+
+        assert generator.prepare_batch(client, symbols) == 3
+
+        for symbol in symbols:
+            prepared = generator._prepared[(client, symbol)]
+            single = generator._prepare_ml_input(client, symbol)
+            generator._predict_prepared([single])
+
+            np.testing.assert_array_equal(prepared.ml_input, single.ml_input)
+            assert prepared.ml_prob == pytest.approx(single.ml_prob, rel=1e-6)
+            assert prepared.ensemble_result.predictions == pytest.approx(single.ensemble_result.predictions, rel=1e-6)
+
+    def test_generate_signal_consumes_prepared(self, trained, monkeypatch):
+        monkeypatch.setattr(Config, 'USE_MULTI_TIMEFRAME', False)
+        generator = SignalGenerator(make_ensemble({'xgboost': trained['xgboost']}))
+        client = FakeClient()
+        generator.prepare_batch(client, ['BTCUSDT'])
+
+        client.kline_calls.clear()
+        generator.generate_signal(client, 'BTCUSDT')
+        assert client.kline_calls == []  # Dùng kết quả đã prepare
+        assert (client, 'BTCUSDT') not in generator._prepared
+
+        generator.generate_signal(client, 'BTCUSDT')
+        assert len(client.kline_calls) == 1  # Không còn -> tự fetch + predict
+
+    def test_stale_prepared_is_ignored(self, trained, monkeypatch):
+        generator = SignalGenerator(make_ensemble({'xgboost': trained['xgboost']}))
+        client = FakeClient()
+        generator.prepare_batch(client, ['BTCUSDT'])
+
+        monkeypatch.setattr(SignalGenerator, 'PREPARED_MAX_AGE', -1)
+        assert generator._take_prepared(client, 'BTCUSDT') is None
@@ -0,0 +1,157 @@
+# ============================================
+# 🧪 TESTS FOR ENSEMBLE RESULT
+# Mỗi model chạy đúng 1 lần cho mỗi (symbol, candle):
+# SignalGenerator -> EntryPipeline -> AIEntryAnalyzer dùng lại cùng kết quả
+# ============================================
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import Config
+from conftest import make_klines
+from ml.ensemble import EnsemblePredictor
+from ml.ensemble_result import EnsembleResult
+from trading.entry_pipeline import EntryPipeline
+from trading.entry_pipeline.ai_analyzer import AIEntryAnalyzer
+from trading.entry_pipeline.ml_ensemble import MLEnsembleSignal
+from trading.signal_generator import SignalGenerator
+
+
+class IdentityScaler:
+    def transform(self, X):
+        return np.asarray(X, dtype=float)
+
+
+class FixedModel:
+    """Probability = sigmoid(bias + mean row cuối), đếm số lần được gọi"""
+
+    def __init__(self, bias):
+        self.bias = bias
+        self.model = object()  # "Đã load"
+        self.scaler = IdentityScaler()
+        self.calls = 0
+
+    def _prob(self, X):
+        return 1 / (1 + np.exp(-(self.bias + np.tanh(np.asarray(X)[..., -1, :].mean(axis=-1)))))
+
+    def predict(self, X):
+        self.calls += 1
+        return np.array([self._prob(X)])
+
+    def predict_batch(self, X):
+        self.calls += 1
+        return self._prob(X)
+
+
+def make_ensemble(biases=(('xgboost', 0.8), ('lightgbm', 0.2))):
+    names = [name for name, _ in biases]
+    ensemble = EnsemblePredictor(models=names, weights=[0.6, 0.4][:len(names)], input_size=4)
+    ensemble.models = {name: FixedModel(bias) for name, bias in biases}
+    return ensemble
+
+
+class FakeClient:
+    def get_klines(self, symbol, interval='15m', limit=100):
+        return make_klines()[-limit:]
+
+    def get_orderbook(self, symbol, limit=10):
+        return {'bids': [[100.0, 3.0]], 'asks': [[100.1, 2.0]]}
+
+
+class TestEnsembleResult:
+
+    def test_from_predictions(self):
+        result = EnsembleResult.from_predictions({'a': 0.8, 'b': 0.4}, {'a': 3, 'b': 1})
+
+        assert result.probability == pytest.approx(0.7)
+        assert result.weights == pytest.approx({'a': 0.75, 'b': 0.25})
+        assert result.agreement == pytest.approx(1 - 0.2 * 2)
+        assert result.details()['ensemble'] == result.probability
+
+    def test_reweighted_keeps_probabilities(self):
+        result = EnsembleResult.from_predictions({'a': 0.8, 'b': 0.4, 'c': 0.6}, {'a': 1, 'b': 1, 'c': 1})
+
+        subset = result.reweighted({'a': 0.5, 'c': 0.5})
+        assert subset.predictions == {'a': 0.8, 'c': 0.6}
+        assert subset.probability == pytest.approx(0.7)
+
+    def test_empty_is_neutral(self):
+        result = EnsembleResult.from_predictions({}, {})
+        assert result.probability == 0.5 and result.details() == {}
+
+
+class TestSinglePass:
+
+    def test_predictor_runs_each_model_once(self):
+        ensemble = make_ensemble()
+        X = np.random.default_rng(0).normal(size=(20, 4))
+
+        result = ensemble.predict_result(X)
+        assert dict(ensemble.model_runs) == {'xgboost': 1, 'lightgbm': 1}
+
+        assert ensemble.get_model_agreement(result=result) == result.agreement
+        assert dict(ensemble.model_runs) == {'xgboost': 1, 'lightgbm': 1}
+
+        prob, details = ensemble.predict_with_details(X)
+        assert prob == pytest.approx(result.probability)
+        assert details['xgboost'] == pytest.approx(result.predictions['xgboost'])
+
+    def test_ml_stage_reuses_result(self):
+        ensemble = make_ensemble()
+        stage = MLEnsembleSignal({}, models=dict(ensemble.models))
+        X = np.random.default_rng(1).normal(size=(20, 4))
+
+        reused = stage.predict(X, result=ensemble.predict_result(X))
+        assert sum(stage.model_runs.values()) == 0
+
+        fresh = stage.predict(X)
+        assert dict(stage.model_runs) == {'xgboost': 1, 'lightgbm': 1}
+        assert reused == fresh
+
+        details = stage.get_prediction_details(X, prediction=reused)
+        assert details['ensemble_prob'] == round(fresh.ensemble_prob, 4)
+        assert dict(stage.model_runs) == {'xgboost': 1, 'lightgbm': 1}
+
+    def test_pipeline_passes_result_to_ai_prompt(self):
+        ensemble = make_ensemble()
+        pipeline = EntryPipeline({'USE_SMART_ENTRY': False, 'USE_PRICE_ACTION': False,
+                                  'USE_HTF_ALIGNMENT': False}, models=dict(ensemble.models))
+        X = np.full((20, 4), 0.5)
+        df = pd.DataFrame({'open': np.linspace(100, 110, 30), 'high': np.linspace(101, 111, 30),
+                           'low': np.linspace(99, 109, 30), 'close': np.linspace(100.5, 110.5, 30),
+                           'volume': np.full(30, 10.0)})
+
+        result = ensemble.predict_result(X)
+        decision = pipeline.evaluate('BTCUSDT', df, X_features=X, ensemble_result=result)
+
+        assert sum(pipeline.ml_stage.model_runs.values()) == 0
+        ml_details = decision.stage_results[0].details
+        assert ml_details['individual_predictions'] == pytest.approx(result.predictions)
+
+        prediction = pipeline.ml_stage.from_result(result)
+        prompt = AIEntryAnalyzer({'USE_AI_CHECK': False})._build_prompt('BTCUSDT', prediction, 8, 6, df)
+        assert f"xgboost {result.predictions['xgboost']:.2f}" in prompt
+
+    def test_signal_generator_runs_each_model_once(self, monkeypatch):
+        monkeypatch.setattr(Config, 'USE_MULTI_TIMEFRAME', False)
+        monkeypatch.setattr(Config, 'USE_ENTRY_PIPELINE', True)
+        ensemble = make_ensemble()
+        generator = SignalGenerator(ensemble)
+        client = FakeClient()
+
+        generator.generate_signal(client, 'BTCUSDT')
+        assert dict(ensemble.model_runs) == {'xgboost': 1, 'lightgbm': 1}
+        assert all(model.calls == 1 for model in ensemble.models.values())
+        assert generator.entry_pipeline.total_evaluations == 1
+        assert sum(generator.entry_pipeline.ml_stage.model_runs.values()) == 0
+
+        generator.prepare_batch(client, ['BTCUSDT', 'ETHUSDT'])
+        generator.generate_signal(client, 'BTCUSDT')
+        generator.generate_signal(client, 'ETHUSDT')
+        assert dict(ensemble.model_runs) == {'xgboost': 3, 'lightgbm': 3}
+        assert sum(generator.entry_pipeline.ml_stage.model_runs.values()) == 0
@@ -321,6 +321,19 @@ class TestEntryPipeline:
         assert isinstance(decision.should_enter, bool)
         assert isinstance(decision.direction, SignalDirection)
 
+    def test_required_columns(self, sample_config):
+        """Test indicator columns follow enabled stages"""
+        pipeline = EntryPipeline(sample_config)
+        primary, htf = pipeline.required_columns()
+
+        assert 'rsi' in primary and 'atr' in primary
+        assert htf == []  # HTF trend chỉ dùng EMAs (IndicatorCache)
+
+        sample_config['USE_PRICE_ACTION'] = False
+        sample_config['USE_SMART_ENTRY'] = False
+        primary, _ = EntryPipeline(sample_config).required_columns()
+        assert 'macd' not in primary
+
     def test_get_metrics(self, sample_config):
         """Test metrics tracking"""
         pipeline = EntryPipeline(sample_config)
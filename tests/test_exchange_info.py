@@ -0,0 +1,104 @@
+# ============================================
+# 🧪 TESTS FOR EXCHANGE INFO INDEX
+# ============================================
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import time
+
+from trading.exchange_info import ExchangeInfoIndex, SymbolFilters, parse_exchange_info
+
+
+def make_exchange_info(symbols=('BTCUSDT', 'ETHUSDT')):
+    return {'symbols': [{
+        'symbol': symbol,
+        'quantityPrecision': 3,
+        'pricePrecision': 1,
+        'filters': [
+            {'filterType': 'PRICE_FILTER', 'tickSize': '0.10'},
+            {'filterType': 'LOT_SIZE', 'stepSize': '0.001', 'minQty': '0.001', 'maxQty': '1000'},
+            {'filterType': 'MIN_NOTIONAL', 'notional': '5'},
+        ]
+    } for symbol in symbols]}
+
+
+class FakeFetch:
+    def __init__(self, symbols=('BTCUSDT', 'ETHUSDT')):
+        self.symbols = symbols
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return make_exchange_info(self.symbols)
+
+
+class TestParseExchangeInfo:
+
+    def test_parses_filters(self):
+        index = parse_exchange_info(make_exchange_info())
+
+        btc = index['BTCUSDT']
+        assert btc.step_size == 0.001
+        assert btc.min_qty == 0.001
+        assert btc.tick_size == 0.1
+        assert btc.min_notional == 5.0
+        assert set(index) == {'BTCUSDT', 'ETHUSDT'}
+
+    def test_format_quantity(self):
+        assert SymbolFilters('BTCUSDT', step_size=0.001).format_quantity(0.12345) == 0.123
+        assert SymbolFilters('XRPUSDT', step_size=1.0).format_quantity(12.7) == 13.0
+        assert SymbolFilters('XUSDT', quantity_precision=2).format_quantity(1.2345) == 1.23
+
+
+class TestExchangeInfoIndex:
+
+    def test_single_fetch_for_all_symbols(self, tmp_path):
+        fetch = FakeFetch()
+        index = ExchangeInfoIndex('test', fetch, ttl=60, data_dir=str(tmp_path))
+
+        assert index.get('BTCUSDT').step_size == 0.001
+        assert index.get('ETHUSDT').min_notional == 5.0
+        assert fetch.calls == 1
+
+    def test_loaded_from_disk_within_ttl(self, tmp_path):
+        ExchangeInfoIndex('test', FakeFetch(), ttl=60, data_dir=str(tmp_path)).get('BTCUSDT')
+
+        fetch = FakeFetch()
+        index = ExchangeInfoIndex('test', fetch, ttl=60, data_dir=str(tmp_path))
+
+        assert index.get('BTCUSDT') is not None
+        assert fetch.calls == 0
+
+    def test_expired_cache_served_and_refreshed_in_background(self, tmp_path):
+        path = tmp_path / 'exchange_info_test.json'
+        ExchangeInfoIndex('test', FakeFetch(), ttl=60, data_dir=str(tmp_path)).get('BTCUSDT')
+        data = json.loads(path.read_text())
+        data['updated_at'] = time.time() - 120
+        path.write_text(json.dumps(data))
+
+        fetch = FakeFetch()
+        index = ExchangeInfoIndex('test', fetch, ttl=60, data_dir=str(tmp_path))
+
+        assert index.get('BTCUSDT') is not None  # Data cũ vẫn dùng được ngay
+        deadline = time.time() + 5
+        while index.is_expired() and time.time() < deadline:
+            time.sleep(0.01)
+        assert fetch.calls == 1
+        assert not index.is_expired()
+
+    def test_unknown_symbol_triggers_refresh(self, tmp_path):
+        fetch = FakeFetch()
+        index = ExchangeInfoIndex('test', fetch, ttl=60, data_dir=str(tmp_path))
+        index.get('BTCUSDT')
+
+        fetch.symbols = ('BTCUSDT', 'ETHUSDT', 'NEWUSDT')
+        index._last_refresh_attempt = 0
+        assert index.get('NEWUSDT') is not None
+        assert fetch.calls == 2
+
+        # Symbol lạ ngay sau refresh -> không fetch lại (MIN_REFRESH_INTERVAL)
+        assert index.get('MISSINGUSDT') is None
+        assert fetch.calls == 2
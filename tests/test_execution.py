@@ -0,0 +1,169 @@
+# ============================================
+# 🧪 TESTS FOR ORDER EXECUTION FAST PATH
+# Fake client (không cần network)
+# ============================================
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+from config import Config
+from trading.execution import LatencyTracker, OrderExecutor, new_client_order_id
+
+
+class FakeRiskManager:
+    def calculate_position_size(self, balance, price, leverage):
+        return balance * 0.1 * leverage / price
+
+
+class FakeOrderClient:
+    """
+    create_market_order có thể lỗi network (`failures` lần đầu) sau khi
+    order đã / chưa tới exchange (`lands_on_failure`)
+    """
+
+    def __init__(self, failures=0, lands_on_failure=False, reject=False):
+        self.failures = failures
+        self.lands_on_failure = lands_on_failure
+        self.reject = reject
+        self.orders = {}
+        self.submits = []
+        self.calls = {'ticker': 0, 'get_order': 0}
+
+    def get_ticker_price(self, symbol):
+        self.calls['ticker'] += 1
+        return 200.0
+
+    def format_quantity(self, symbol, quantity):
+        return round(quantity, 3)
+
+    def create_market_order(self, symbol, side, quantity, reduce_only=False, client_order_id=None):
+        self.submits.append(client_order_id)
+        if self.reject:
+            return None
+        if self.failures > 0:
+            self.failures -= 1
+            if self.lands_on_failure:
+                self.orders[client_order_id] = {'clientOrderId': client_order_id, 'status': 'FILLED'}
+            raise ConnectionError('read timed out')
+        if client_order_id in self.orders:
+            return None  # Duplicate client order id
+        self.orders[client_order_id] = {'clientOrderId': client_order_id, 'status': 'NEW'}
+        return self.orders[client_order_id]
+
+    def get_order(self, symbol, client_order_id):
+        self.calls['get_order'] += 1
+        return self.orders.get(client_order_id)
+
+
+def make_executor(client, price_sources=None, max_retries=2):
+    return OrderExecutor(client, FakeRiskManager(), price_sources=price_sources,
+                         max_retries=max_retries, exchange_name='TEST')
+
+
+class TestPlan:
+
+    def test_cached_price_skips_ticker(self):
+        client = FakeOrderClient()
+        executor = make_executor(client, price_sources=[
+            ('mark', lambda symbol: None),
+            ('candle', lambda symbol: 100.0),
+        ])
+
+        plan = executor.plan_entry('BTCUSDT', 'SHORT', balance=1000, leverage=10)
+
+        assert (plan.price, plan.price_source) == (100.0, 'candle')
+        assert plan.side == 'SELL'
+        assert plan.quantity == 10.0
+        assert client.calls['ticker'] == 0
+
+    def test_falls_back_to_ticker(self):
+        client = FakeOrderClient()
+        executor = make_executor(client, price_sources=[('mark', lambda symbol: 1 / 0)])
+
+        plan = executor.plan_entry('BTCUSDT', 'LONG', balance=1000, leverage=10)
+
+        assert (plan.price, plan.price_source) == (200.0, 'ticker')
+        assert plan.quantity == 5.0
+
+
+class TestSubmit:
+
+    def setup_method(self):
+        self._factor = Config.HTTP_BACKOFF_FACTOR
+        Config.HTTP_BACKOFF_FACTOR = 0.001
+
+    def teardown_method(self):
+        Config.HTTP_BACKOFF_FACTOR = self._factor
+
+    def _plan(self, executor):
+        return executor.plan_entry('BTCUSDT', 'LONG', 1000, 10, signal_time=time.monotonic() - 0.05)
+
+    def test_ack_records_latency(self):
+        client = FakeOrderClient()
+        executor = make_executor(client)
+
+        result = executor.submit(self._plan(executor))
+
+        assert result.ok and result.attempts == 1
+        assert result.order['clientOrderId'] == result.client_order_id
+        assert result.signal_to_ack_ms >= 50
+        assert executor.latency.summary()['signal_to_ack']['count'] == 1
+
+    def test_timeout_after_order_landed_does_not_resubmit(self):
+        client = FakeOrderClient(failures=1, lands_on_failure=True)
+        executor = make_executor(client)
+
+        result = executor.submit(self._plan(executor))
+
+        assert result.ok
+        assert result.order['status'] == 'FILLED'
+        assert len(client.submits) == 1
+        assert len(client.orders) == 1
+
+    def test_retries_with_same_client_order_id(self):
+        client = FakeOrderClient(failures=2)
+        executor = make_executor(client)
+
+        result = executor.submit(self._plan(executor))
+
+        assert result.ok and result.attempts == 3
+        assert set(client.submits) == {result.client_order_id}
+        assert client.calls['get_order'] == 2
+
+    def test_gives_up_after_max_retries(self):
+        client = FakeOrderClient(failures=5)
+        executor = make_executor(client, max_retries=1)
+
+        result = executor.submit(self._plan(executor))
+
+        assert not result.ok and result.attempts == 2
+        assert 'signal_to_ack' not in executor.latency.summary()
+
+    def test_exchange_rejection_not_retried(self):
+        client = FakeOrderClient(reject=True)
+        executor = make_executor(client)
+
+        result = executor.submit(self._plan(executor))
+
+        assert not result.ok and result.attempts == 1
+        assert client.calls['get_order'] == 0
+
+
+class TestHelpers:
+
+    def test_client_order_id_format(self):
+        ids = {new_client_order_id() for _ in range(100)}
+        assert len(ids) == 100
+        assert all(len(i) <= 36 and i.startswith('fm-') for i in ids)
+
+    def test_latency_percentiles(self):
+        tracker = LatencyTracker(maxlen=100)
+        for ms in range(1, 201):
+            tracker.record('submit_to_ack', float(ms))
+
+        stats = tracker.summary()['submit_to_ack']
+        assert stats['count'] == 100  # Chỉ giữ 100 samples gần nhất
+        assert stats['p50'] == 151 and stats['p95'] == 196 and stats['max'] == 200
@@ -0,0 +1,180 @@
+# ============================================
+# 🧪 TESTS FOR EXIT ENGINE
+# Chạy với local aiohttp websocket server (không cần network)
+# ============================================
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import threading
+import time
+from aiohttp import web
+
+from trading.exit_engine import ExitEngine, reprice_position
+
+
+def make_position(side='LONG', amount=1.0, entry_price=100.0, mark_price=100.0):
+    return {
+        'side': side, 'amount': amount, 'entry_price': entry_price,
+        'mark_price': mark_price, 'pnl_pct': 0.0, 'pnl_usdt': 0.0
+    }
+
+
+# ============================================
+# FAKES
+# ============================================
+
+class FakeMarkPriceServer:
+    """Endpoint /ws: ghi lại SUBSCRIBE / UNSUBSCRIBE, gửi markPriceUpdate"""
+
+    def __init__(self):
+        self.subscribed = set()
+        self.requests = []
+        self.ws = None
+
+    async def handler(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.ws = ws
+        async for msg in ws:
+            data = msg.json()
+            self.requests.append(data['method'])
+            if data['method'] == 'SUBSCRIBE':
+                self.subscribed.update(data['params'])
+            elif data['method'] == 'UNSUBSCRIBE':
+                self.subscribed.difference_update(data['params'])
+            await ws.send_json({'result': None, 'id': data['id']})
+        return ws
+
+    async def send_mark_price(self, symbol, price):
+        await self.ws.send_json({'e': 'markPriceUpdate', 'E': 1, 's': symbol, 'p': str(price)})
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get('/ws', self.handler)
+        return app
+
+
+class FakeExchange:
+    """Positions + close (thread-safe), rule đóng đơn giản: pnl_pct <= -stop"""
+
+    def __init__(self, positions, stop=0.05):
+        self.positions = dict(positions)
+        self.stop = stop
+        self.closed = []
+        self.lock = threading.Lock()
+
+    def get_all_positions(self):
+        with self.lock:
+            return dict(self.positions)
+
+    def evaluate(self, symbol, position):
+        if position['pnl_pct'] <= -self.stop:
+            return True, f"Stop loss {position['pnl_pct']*100:.1f}%"
+        return False, ''
+
+    def close(self, symbol, position, reason):
+        with self.lock:
+            self.positions.pop(symbol, None)
+            self.closed.append((symbol, position['mark_price'], reason))
+        return True
+
+
+async def _wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        await asyncio.sleep(0.02)
+    return False
+
+
+async def _with_engine(server, exchange, fn, ws_url=None, poll_interval=0.05):
+    """Start fake server + ExitEngine (thread riêng), chạy fn(engine)"""
+    runner = web.AppRunner(server.app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    engine = ExitEngine(
+        ws_url or f'ws://127.0.0.1:{port}',
+        exchange.get_all_positions, exchange.evaluate, exchange.close,
+        leverage=10, poll_interval=poll_interval, exchange_name='TEST'
+    )
+    engine.RECONNECT_DELAY = 0.05
+    engine.start()
+    try:
+        return await fn(engine)
+    finally:
+        await asyncio.to_thread(engine.stop)
+        await runner.cleanup()
+
+
+# ============================================
+# TESTS
+# ============================================
+
+class TestReprice:
+
+    def test_long_and_short_pnl(self):
+        long = reprice_position(make_position('LONG', amount=2, entry_price=100), 101, leverage=10)
+        assert long['mark_price'] == 101
+        assert abs(long['pnl_pct'] - 0.10) < 1e-9
+        assert long['pnl_usdt'] == 2
+
+        short = reprice_position(make_position('SHORT', amount=2, entry_price=100), 101, leverage=10)
+        assert abs(short['pnl_pct'] + 0.10) < 1e-9
+        assert short['pnl_usdt'] == -2
+
+
+class TestExitEngine:
+
+    def test_subscribes_only_open_positions(self):
+        server = FakeMarkPriceServer()
+        exchange = FakeExchange({'BTCUSDT': make_position(), 'ETHUSDT': make_position()})
+
+        async def run(engine):
+            assert await _wait_for(lambda: server.subscribed == {'btcusdt@markPrice@1s', 'ethusdt@markPrice@1s'})
+
+            with exchange.lock:
+                del exchange.positions['ETHUSDT']
+            assert await _wait_for(lambda: server.subscribed == {'btcusdt@markPrice@1s'})
+
+        asyncio.run(_with_engine(server, exchange, run))
+
+        assert 'UNSUBSCRIBE' in server.requests
+
+    def test_closes_on_tick_crossing_stop(self):
+        server = FakeMarkPriceServer()
+        exchange = FakeExchange({'BTCUSDT': make_position(entry_price=100)})
+
+        async def run(engine):
+            assert await _wait_for(lambda: 'btcusdt@markPrice@1s' in server.subscribed)
+
+            await server.send_mark_price('BTCUSDT', 99.8)  # -2% PnL: giữ
+            assert await _wait_for(lambda: engine.ticks == 1)
+            assert exchange.closed == []
+
+            await server.send_mark_price('BTCUSDT', 99.4)  # -6% PnL: đóng
+            assert await _wait_for(lambda: engine.closes == 1)
+            assert await _wait_for(lambda: server.subscribed == set())
+
+        asyncio.run(_with_engine(server, exchange, run, poll_interval=30))
+
+        assert exchange.closed == [('BTCUSDT', 99.4, 'Stop loss -6.0%')]
+
+    def test_rest_fallback_without_stream(self):
+        server = FakeMarkPriceServer()
+        position = reprice_position(make_position(entry_price=100), 99, leverage=10)
+        exchange = FakeExchange({'BTCUSDT': position})
+
+        async def run(engine):
+            # Không có websocket -> mỗi lần poll đánh giá theo mark price REST
+            assert await _wait_for(lambda: engine.closes == 1)
+
+        asyncio.run(_with_engine(server, exchange, run, ws_url='ws://127.0.0.1:1'))
+
+        assert exchange.closed[0][0] == 'BTCUSDT'
@@ -0,0 +1,124 @@
+# ============================================
+# 🧪 TESTS FOR FEATURE STORE
+# Buffer float32 phải giống hệt prepare_features(calculate_indicators(df))
+# ============================================
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml.feature_store import FeatureStore, write_features
+from ml.features import FeatureEngine
+
+
+def make_ohlcv(n=300, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    open_ = np.concatenate([[30000.0], close[:-1]])
+    return pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) * (1 + rng.uniform(0, 0.003, n)),
+        'low': np.minimum(open_, close) * (1 - rng.uniform(0, 0.003, n)),
+        'close': close,
+        'volume': rng.uniform(10, 500, n),
+    })
+
+
+def expected(df):
+    return FeatureEngine.prepare_features(FeatureEngine.calculate_indicators(df)).to_numpy(dtype=np.float32)
+
+
+class TestWriteFeatures:
+
+    @pytest.mark.parametrize('rows', [10, 40, 300])
+    def test_matches_dataframe_pipeline(self, rows):
+        df = make_ohlcv(rows)
+        out = np.empty((rows, len(FeatureEngine.FEATURE_COLUMNS)), dtype=np.float32)
+
+        assert write_features(df, out) is out
+        np.testing.assert_array_equal(out, expected(df))
+
+    def test_writes_into_view(self):
+        df = make_ohlcv(100)
+        matrix = np.full((250, len(FeatureEngine.FEATURE_COLUMNS)), -1, dtype=np.float32)
+
+        write_features(df, matrix[50:150])
+        np.testing.assert_array_equal(matrix[50:150], expected(df))
+        assert (matrix[:50] == -1).all() and (matrix[150:] == -1).all()
+
+    def test_shape_mismatch(self):
+        with pytest.raises(ValueError):
+            write_features(make_ohlcv(50), np.empty((49, len(FeatureEngine.FEATURE_COLUMNS)), dtype=np.float32))
+
+
+class TestFeatureStore:
+
+    def test_buffer_reused_between_loops(self):
+        store = FeatureStore(capacity=400)
+        df = make_ohlcv()
+
+        rows = store.fill('BTCUSDT', '1h', df)
+        buffer = store.buffer('BTCUSDT', '1h').values
+        np.testing.assert_array_equal(rows, expected(df))
+        assert buffer.dtype == np.float32 and buffer.flags['F_CONTIGUOUS']
+
+        newer = make_ohlcv(seed=4)
+        store.fill('BTCUSDT', '1h', newer)
+        assert store.buffer('BTCUSDT', '1h').values is buffer  # Không cấp phát lại
+        np.testing.assert_array_equal(store.get_rows('BTCUSDT', '1h', 60), expected(newer)[-60:])
+
+        store.fill('BTCUSDT', '1h', make_ohlcv(n=500))  # Dài hơn capacity -> buffer lớn hơn
+        assert store.buffer('BTCUSDT', '1h').capacity == 500
+
+    def test_load_indicator_frame(self):
+        store = FeatureStore(capacity=60)
+        df = FeatureEngine.calculate_indicators(make_ohlcv())
+        df['ob_imbalance'] = 1.7
+        df.loc[df.index[-1], 'rsi'] = np.nan
+
+        rows = store.load('BTCUSDT', '15m', df.drop(columns=['higher_tf_trend']), n=60)
+
+        reference = FeatureEngine.prepare_features(df.copy()).to_numpy(dtype=np.float32)[-60:]
+        reference[:, FeatureEngine.FEATURE_COLUMNS.index('higher_tf_trend')] = 0
+        np.testing.assert_array_equal(rows, reference)
+        assert store.get_rows('BTCUSDT', '15m', 61) is None
+        assert store.get_rows('ETHUSDT', '15m') is None
+        assert store.nbytes == 60 * len(FeatureEngine.FEATURE_COLUMNS) * 4
+
+    def test_exchanges_have_separate_buffers(self):
+        store = FeatureStore(capacity=60)
+        aster, binance = make_ohlcv(seed=5), make_ohlcv(seed=6)
+
+        store.fill('BTCUSDT', '15m', aster, exchange='AsterDEX')
+        store.fill('BTCUSDT', '15m', binance, exchange='Binance')
+
+        np.testing.assert_array_equal(store.get_rows('BTCUSDT', '15m', exchange='AsterDEX'), expected(aster))
+        np.testing.assert_array_equal(store.get_rows('BTCUSDT', '15m', exchange='Binance'), expected(binance))
+        assert ('AsterDEX', 'BTCUSDT', '15m') in store and ('', 'BTCUSDT', '15m') not in store
+
+    def test_lock_serializes_load_and_read(self):
+        store = FeatureStore(capacity=60)
+        frames = [FeatureEngine.calculate_indicators(make_ohlcv(seed=seed)) for seed in (7, 8)]
+        references = [FeatureEngine.prepare_features(df.copy()).to_numpy(dtype=np.float32)[-60:] for df in frames]
+        mismatches = []
+
+        def worker(i):
+            for _ in range(100):
+                buffer = store.buffer('BTCUSDT', '15m')
+                with buffer.lock:
+                    rows = buffer.load(frames[i], n=60).copy()  # Như scaler.transform (array mới)
+                if not np.array_equal(rows, references[i]):
+                    mismatches.append(i)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in (0, 1)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert mismatches == []
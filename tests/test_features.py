@@ -0,0 +1,90 @@
+# ============================================
+# 🧪 TESTS FOR FEATURE ENGINE
+# RSI divergence vectorized phải giống hệt bản loop,
+# compute(df, columns) chỉ tính columns cần + dependencies
+# ============================================
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml.features import FeatureEngine
+
+
+class TestRsiDivergenceScore:
+
+    @pytest.mark.parametrize('seed', [0, 1, 2])
+    def test_vectorized_matches_loop(self, seed):
+        rng = np.random.default_rng(seed)
+        df = pd.DataFrame({'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 1500)))})
+        df['rsi'] = FeatureEngine._calculate_rsi_manual(df['close'])
+        if seed == 1:
+            df.loc[100:140, 'rsi'] = np.nan    # Window RSI toàn NaN
+            df.loc[500:505, 'close'] = np.nan
+
+        vectorized = FeatureEngine._calculate_rsi_divergence_score(df)
+        loop = FeatureEngine._calculate_rsi_divergence_score_loop(df)
+
+        assert (vectorized != 0).sum() > 0
+        pd.testing.assert_series_equal(vectorized, loop)
+
+    @pytest.mark.parametrize('rows', [0, 27, 28, 29])
+    def test_short_frames(self, rows):
+        df = pd.DataFrame({'close': np.arange(rows, dtype=float) + 1})
+        df['rsi'] = FeatureEngine._calculate_rsi_manual(df['close'])
+
+        pd.testing.assert_series_equal(FeatureEngine._calculate_rsi_divergence_score(df),
+                                       FeatureEngine._calculate_rsi_divergence_score_loop(df))
+
+    def test_keeps_index(self):
+        df = pd.DataFrame({'close': np.linspace(100, 50, 60)}, index=pd.RangeIndex(1000, 1060))
+        df['rsi'] = FeatureEngine._calculate_rsi_manual(df['close'])
+
+        assert FeatureEngine._calculate_rsi_divergence_score(df).index.equals(df.index)
+
+
+def make_ohlcv(n=300, seed=4):
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    open_ = np.concatenate([[30000.0], close[:-1]])
+    return pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) * (1 + rng.uniform(0, 0.003, n)),
+        'low': np.minimum(open_, close) * (1 - rng.uniform(0, 0.003, n)),
+        'close': close,
+        'volume': rng.uniform(10, 500, n),
+    })
+
+
+class TestComputeColumns:
+
+    def test_full_compute_matches_calculate_indicators(self):
+        df = make_ohlcv()
+        full = FeatureEngine.compute(df)
+
+        pd.testing.assert_frame_equal(full, FeatureEngine.calculate_indicators(df))
+        assert list(full.columns) == list(df.columns) + [c for c in FeatureEngine.FEATURE_COLUMNS if c not in df.columns]
+
+    def test_subset_pulls_dependencies_only(self):
+        df = make_ohlcv()
+        full = FeatureEngine.compute(df)
+        subset = FeatureEngine.compute(df, ['atr_pct', 'rsi_divergence_score'])
+
+        # atr_pct cần atr, rsi_divergence_score cần rsi
+        assert {'atr', 'atr_pct', 'rsi', 'rsi_divergence_score'} <= set(subset.columns)
+        assert 'macd' not in subset.columns and 'bb_upper' not in subset.columns
+        for column in ('atr', 'atr_pct', 'rsi', 'rsi_divergence_score'):
+            pd.testing.assert_series_equal(subset[column], full[column])
+
+    def test_ohlcv_only(self):
+        df = make_ohlcv(n=50)
+        assert list(FeatureEngine.compute(df, []).columns) == list(df.columns)
+        assert FeatureEngine.resolve(['close']) == []
+
+    def test_unknown_column(self):
+        with pytest.raises(KeyError):
+            FeatureEngine.compute(make_ohlcv(n=50), ['vwap'])
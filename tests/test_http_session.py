@@ -0,0 +1,145 @@
+# ============================================
+# 🧪 TESTS FOR SHARED HTTP SESSION
+# Local HTTP servers (không cần network)
+# ============================================
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from aiohttp import web
+
+from config import Config
+from trading.http_session import backoff_delay, create_connector, create_session, get_http_adapter
+from trading.rate_limiter import AsyncRateLimitedClient, RateLimiter
+
+
+class FlakyServer:
+    """HTTP/1.1 server: `failures` responses 503 đầu tiên, sau đó 200; đếm connections"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.requests = 0
+        self.connections = set()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _respond(self):
+                server.requests += 1
+                server.connections.add(self.client_address)
+                length = int(self.headers.get('Content-Length') or 0)
+                self.rfile.read(length)
+
+                status = 503 if server.failures > 0 else 200
+                server.failures -= 1
+                body = b'{"ok": true}'
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = _respond
+            do_POST = _respond
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class TestSyncSession:
+
+    def test_sessions_share_one_pool(self):
+        a = create_session({'X-MBX-APIKEY': 'a'})
+        b = create_session({'X-MBX-APIKEY': 'b'})
+
+        assert a.get_adapter('https://fapi.asterdex.com') is get_http_adapter()
+        assert b.get_adapter('https://fapi.binance.com') is get_http_adapter()
+        assert a.headers['X-MBX-APIKEY'] == 'a'
+
+    def test_keep_alive_reuses_connection(self):
+        with FlakyServer() as server:
+            session = create_session()
+            for _ in range(5):
+                assert session.get(server.url + '/fapi/v1/time').status_code == 200
+
+            # Session.close() (Client.close_connection) không đóng pool chung
+            session.close()
+            create_session().get(server.url + '/fapi/v1/time')
+
+        assert server.requests == 6
+        assert len(server.connections) == 1
+
+    def test_retries_server_errors_for_get_only(self):
+        with FlakyServer(failures=2) as server:
+            response = create_session().get(server.url + '/fapi/v1/klines')
+            assert response.status_code == 200
+            assert server.requests == 3
+
+            server.failures = 1
+            response = create_session().post(server.url + '/fapi/v1/order')
+            assert response.status_code == 503  # Không retry POST order
+            assert server.requests == 4
+
+
+class TestBackoff:
+
+    def test_jittered_and_bounded(self):
+        delays = [backoff_delay(3, factor=0.5) for _ in range(200)]
+
+        assert all(0 <= d <= 4.0 for d in delays)
+        assert len(set(delays)) > 100
+        assert backoff_delay(20, factor=0.5) <= 10.0
+
+
+class TestAsyncRetry:
+
+    def test_async_client_retries_503(self, monkeypatch):
+        monkeypatch.setattr(Config, 'HTTP_BACKOFF_FACTOR', 0.01)
+        calls = {'n': 0}
+
+        async def klines(request):
+            calls['n'] += 1
+            if calls['n'] <= 2:
+                return web.Response(status=503, text='unavailable')
+            return web.json_response([])
+
+        async def run():
+            app = web.Application()
+            app.router.add_get('/fapi/v1/klines', klines)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+
+            client = AsyncRateLimitedClient(
+                'key', 'secret', RateLimiter('test'),
+                loop=asyncio.get_running_loop(),
+                session_params={'connector': create_connector()}
+            )
+            client.FUTURES_URL = f'http://127.0.0.1:{port}/fapi'
+            try:
+                return await client.futures_klines(symbol='BTCUSDT', interval='1h', limit=10)
+            finally:
+                await client.close_connection()
+                await runner.cleanup()
+
+        assert asyncio.run(run()) == []
+        assert calls['n'] == 3
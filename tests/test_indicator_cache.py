@@ -0,0 +1,151 @@
+# ============================================
+# 🧪 TESTS FOR INDICATOR CACHE
+# Mỗi indicator tính 1 lần / frame, dùng chung cho các consumers
+# ============================================
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml.features import FeatureEngine
+from trading.advanced_entry import SmartEntrySystemV2
+from trading.entry_pipeline.htf_alignment import HTFTrendAligner
+from trading.entry_pipeline.price_action import PriceActionValidator
+from trading.entry_pipeline.smart_entry import SmartEntryScoring
+from trading.entry_pipeline.models import SignalDirection
+from trading.indicator_cache import IndicatorCache, IndicatorFrame, compute_indicator, indicator
+from trading.market_regime import MarketRegimeDetector
+
+
+def make_raw(n=200, seed=5, freq='15min'):
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0.0005, 0.004, n)))
+    open_ = np.concatenate([[30000.0], close[:-1]])
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq=freq),
+        'open': open_,
+        'high': np.maximum(open_, close) * (1 + rng.uniform(0, 0.003, n)),
+        'low': np.minimum(open_, close) * (1 - rng.uniform(0, 0.003, n)),
+        'close': close,
+        'volume': rng.uniform(10, 500, n),
+    })
+
+
+def run_consumers(df, df_htf):
+    """Các consumers của 1 generate_signal (SmartEntryV2 + EntryPipeline stages)"""
+    config = {'VOLUME_CONFIRMATION_RATIO': 1.5}
+    return (
+        SmartEntrySystemV2(min_score=0).evaluate_entry('BTCUSDT', df, df_htf, df_htf)[:2],
+        HTFTrendAligner(config).get_trend(df_htf),
+        SmartEntryScoring(config)._score_market_structure(df, SignalDirection.LONG, df_htf),
+        PriceActionValidator(config)._get_volume_ratio(df),
+    )
+
+
+class TestIndicatorFrame:
+
+    def test_named_indicators_match_direct_computation(self):
+        raw = make_raw()
+        frame = IndicatorFrame(raw)
+
+        pd.testing.assert_frame_equal(frame.df, FeatureEngine.calculate_indicators(raw))
+        expected = FeatureEngine.calculate_indicators(raw)['close'].ewm(span=21, adjust=False).mean()
+        pd.testing.assert_series_equal(indicator(frame.df, 'ema_21'), expected)
+        assert indicator(frame.df, 'ema_21') is frame.get('ema_21')
+
+    def test_frame_extended_with_requested_columns(self):
+        raw = make_raw()
+        frame = IndicatorFrame(raw)
+
+        df = frame.indicators([])  # HTF frame: chỉ OHLCV
+        assert 'rsi' not in df.columns
+        df = frame.indicators(['rsi'])
+        assert 'rsi' in df.columns and 'macd' not in df.columns
+        pd.testing.assert_series_equal(df['rsi'], FeatureEngine.calculate_indicators(raw)['rsi'])
+        assert frame.get('ema_21') is indicator(df, 'ema_21')  # Copy vẫn dùng memo
+
+    def test_consumer_writes_do_not_touch_cache(self):
+        frame = IndicatorFrame(make_raw())
+
+        df = frame.indicators(['rsi'])
+        df['ob_imbalance'] = 1.7
+        df['rsi'] = 0.0
+
+        cached = frame.indicators(['rsi'])
+        assert 'ob_imbalance' not in cached.columns
+        assert (cached['rsi'] != 0).any()
+
+    def test_uncached_frame_computed_directly(self):
+        raw = make_raw()
+        pd.testing.assert_series_equal(indicator(raw, 'volume_sma_20'), raw['volume'].rolling(20).mean())
+        # Copy không mang theo frame
+        assert indicator(IndicatorFrame(raw).df.copy(), 'ema_8') is not None
+        with pytest.raises(KeyError):
+            compute_indicator(raw, 'vwap_20')
+
+
+class TestIndicatorCache:
+
+    def test_same_candle_reuses_frame(self):
+        cache = IndicatorCache()
+        raw = make_raw()
+
+        frame = cache.get_frame('BTCUSDT', '15m', raw)
+        assert cache.get_frame('BTCUSDT', '15m', raw.copy()) is frame
+        assert cache.get_frame('BTCUSDT', '1h', raw) is not frame
+        assert cache.get_frame('BTCUSDT', '15m', raw, exchange='Binance') is not frame
+        assert cache.get_frame('BTCUSDT', '15m', raw.iloc[-100:]) is not frame  # Limit khác
+
+        # Candle cuối đang hình thành thay đổi -> frame mới
+        forming = raw.copy()
+        forming.loc[forming.index[-1], 'close'] *= 1.001
+        assert cache.get_frame('BTCUSDT', '15m', forming) is not frame
+
+        stats = cache.stats()
+        assert (stats['frame_hits'], stats['frame_misses']) == (1, 5)
+
+    def test_lru_eviction(self):
+        cache = IndicatorCache(max_frames=2)
+        raw = make_raw(n=60)
+        first = cache.get_frame('A', '15m', raw)
+        cache.get_frame('B', '15m', raw)
+        cache.get_frame('C', '15m', raw)
+
+        assert cache.stats()['frames'] == 2
+        assert cache.get_frame('A', '15m', raw) is not first
+
+    def test_consumers_share_indicators(self):
+        cache = IndicatorCache()
+        raw, raw_htf = make_raw(), make_raw(n=100, seed=9, freq='4h')
+
+        df = cache.get_frame('BTCUSDT', '15m', raw).df
+        df_htf = cache.get_frame('BTCUSDT', '4h', raw_htf).df
+        cached = run_consumers(df, df_htf)
+
+        # Kết quả giống hệt khi không có cache
+        uncached = run_consumers(FeatureEngine.calculate_indicators(raw), FeatureEngine.calculate_indicators(raw_htf))
+        assert cached == uncached
+
+        stats = cache.stats()
+        # Mỗi indicator tính tối đa 1 lần mỗi frame (2 frames: 15m + 4h)
+        assert max(stats['computed'].values()) == 2
+        assert stats['computed']['indicators'] == stats['computed']['ema_21'] == 2
+        assert stats['hits'] > 0  # HTF aligner, scoring, price action dùng lại
+
+        # Loop tiếp theo cùng candle: không tính lại gì
+        misses = stats['misses']
+        run_consumers(cache.get_frame('BTCUSDT', '15m', raw).df, cache.get_frame('BTCUSDT', '4h', raw_htf).df)
+        assert cache.stats()['misses'] == misses
+
+    def test_regime_ma_alignment_uses_lookback_window(self):
+        # Seed 20: EMA cả frame (adjust=False) và EMA trên lookback window (adjust=True) ngược dấu
+        df = IndicatorCache().get_frame('BTCUSDT', '15m', make_raw(seed=20)).df
+        window = df['close'].iloc[-50:]
+        expected = np.sign(window.ewm(span=20).mean().iloc[-1] - window.ewm(span=50).mean().iloc[-1])
+
+        assert expected != np.sign(indicator(df, 'ema_20').iloc[-1] - indicator(df, 'ema_50').iloc[-1])
+        assert MarketRegimeDetector().detect_regime(df, lookback=50)['metrics']['ma_alignment'] == expected
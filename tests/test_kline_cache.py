@@ -0,0 +1,110 @@
+# ============================================
+# 🧪 TESTS FOR KLINE CACHE (REST delta fetching)
+# ============================================
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+from trading.kline_cache import KlineCache
+
+
+MINUTE = 60_000
+
+
+class FakeKlineSource:
+    """REST klines 1m tới candle đang hình thành, ghi lại mọi request"""
+
+    def __init__(self):
+        self.requests = []
+        self.closes = {}  # open_time -> close override
+        self.extra = 0    # Số candles mới sau candle hiện tại
+
+    def _last_open(self):
+        return (int(time.time() * 1000) // MINUTE + self.extra) * MINUTE
+
+    def _kline(self, open_time):
+        close = self.closes.get(open_time, open_time / MINUTE)
+        return [open_time, '1', '2', '0.5', str(close), '10', open_time + MINUTE - 1, '5', 3, '1', '2', '0']
+
+    def fetch(self, limit, start_time=None):
+        self.requests.append((limit, start_time))
+        last_open = self._last_open()
+        first = start_time if start_time is not None else last_open - (limit - 1) * MINUTE
+        opens = range(first, last_open + MINUTE, MINUTE)
+        return [self._kline(t) for t in opens][:limit]
+
+
+class TestKlineCache:
+
+    def test_first_call_fetches_full_window(self):
+        cache = KlineCache(max_candles=500)
+        source = FakeKlineSource()
+
+        klines = cache.get_klines('AsterDEX', 'BTCUSDT', '1m', 200, source.fetch)
+
+        assert len(klines) == 200
+        assert source.requests == [(200, None)]
+        assert klines[-1][4] == float(source._kline(klines[-1][0])[4])
+
+    def test_second_call_fetches_only_delta(self):
+        cache = KlineCache(max_candles=500)
+        source = FakeKlineSource()
+
+        first = cache.get_klines('AsterDEX', 'BTCUSDT', '1m', 200, source.fetch)
+        second = cache.get_klines('AsterDEX', 'BTCUSDT', '1m', 200, source.fetch)
+
+        limit, start_time = source.requests[-1]
+        assert start_time == first[-1][0]
+        assert limit < 100
+        assert second == first
+        assert cache.get_stats()['delta_fetches'] == 1
+
+    def test_forming_candle_replaced_and_new_candles_appended(self):
+        cache = KlineCache(max_candles=500)
+        source = FakeKlineSource()
+
+        first = cache.get_klines('AsterDEX', 'BTCUSDT', '1m', 100, source.fetch)
+        forming_open = first[-1][0]
+        source.closes[forming_open] = 12345
+        source.extra = 2
+
+        klines = cache.get_klines('AsterDEX', 'BTCUSDT', '1m', 100, source.fetch)
+
+        open_times = [k[0] for k in klines]
+        assert open_times == list(range(forming_open - 97 * MINUTE, forming_open + 3 * MINUTE, MINUTE))
+        assert klines[-3][4] == 12345.0
+
+    def test_larger_limit_refetches_full_window(self):
+        cache = KlineCache(max_candles=500)
+        source = FakeKlineSource()
+
+        cache.get_klines('AsterDEX', 'BTCUSDT', '1m', 100, source.fetch)
+        klines = cache.get_klines('AsterDEX', 'BTCUSDT', '1m', 200, source.fetch)
+
+        assert len(klines) == 200
+        assert source.requests[-1] == (200, None)
+
+    def test_keys_are_separate(self):
+        cache = KlineCache(max_candles=500)
+        source = FakeKlineSource()
+
+        cache.get_klines('AsterDEX', 'BTCUSDT', '1m', 50, source.fetch)
+        cache.get_klines('Binance', 'BTCUSDT', '1m', 50, source.fetch)
+        cache.get_klines('AsterDEX', 'ETHUSDT', '1m', 50, source.fetch)
+
+        assert [start for _, start in source.requests] == [None, None, None]
+        assert cache.get_stats()['keys'] == 3
+
+    def test_bounded_by_max_candles(self):
+        cache = KlineCache(max_candles=50)
+        source = FakeKlineSource()
+
+        cache.get_klines('AsterDEX', 'BTCUSDT', '1m', 50, source.fetch)
+        source.extra = 5
+        klines = cache.get_klines('AsterDEX', 'BTCUSDT', '1m', 50, source.fetch)
+
+        assert len(klines) == 50
+        assert len(cache._data[('AsterDEX', 'BTCUSDT', '1m')]) == 50
@@ -0,0 +1,206 @@
+# ============================================
+# 🧪 TESTS FOR KLINE STREAM + CANDLE STORE
+# Chạy với local aiohttp websocket server (không cần network)
+# ============================================
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import time
+from aiohttp import web
+
+from trading.candle_store import CandleStore, interval_to_ms
+from trading.kline_stream import KlineStreamManager
+
+
+MINUTE = 60_000
+
+
+def make_kline(open_time, close):
+    return [open_time, '100', '101', '99', str(close), '10', open_time + MINUTE - 1, '0', 1, '0', '0', '0']
+
+
+# ============================================
+# FAKES
+# ============================================
+
+class FakeRestClient:
+    """REST get_klines: `limit` candles 1m kết thúc tại last_open"""
+
+    def __init__(self, last_open):
+        self.last_open = last_open
+        self.calls = 0
+
+    def get_klines(self, symbol, interval='1m', limit=100):
+        self.calls += 1
+        start = self.last_open - (limit - 1) * MINUTE
+        return [make_kline(start + i * MINUTE, 'rest') for i in range(limit)]
+
+
+class FakeKlineServer:
+    """Combined stream endpoint /stream?streams=..."""
+
+    def __init__(self):
+        self.connections = 0
+        self.streams = []
+        self.ws = None
+
+    async def stream(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        self.streams = request.query['streams'].split('/')
+        self.ws = ws
+        async for _ in ws:
+            pass
+        return ws
+
+    async def send(self, symbol, interval, open_time, close):
+        await self.ws.send_json({
+            'stream': f"{symbol.lower()}@kline_{interval}",
+            'data': {
+                'e': 'kline', 's': symbol,
+                'k': {
+                    't': open_time, 'T': open_time + MINUTE - 1, 's': symbol, 'i': interval,
+                    'o': '100', 'c': str(close), 'h': '101', 'l': '99', 'v': '10',
+                    'n': 1, 'x': False, 'q': '0', 'V': '0', 'Q': '0', 'B': '0'
+                }
+            }
+        })
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get('/stream', self.stream)
+        return app
+
+
+async def _wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        await asyncio.sleep(0.02)
+    return False
+
+
+async def _with_stream(server, rest, fn, symbols=('BTCUSDT',), intervals=('1m',)):
+    """Start fake server + KlineStreamManager (thread riêng), chạy fn(manager)"""
+    runner = web.AppRunner(server.app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    manager = KlineStreamManager(f'ws://127.0.0.1:{port}', rest, symbols, intervals, CandleStore(100))
+    manager.RECONNECT_DELAY = 0.05
+    manager.start()
+    try:
+        assert await _wait_for(lambda: server.ws is not None and manager.store.is_ready(symbols[0], intervals[0]))
+        return await fn(manager)
+    finally:
+        await asyncio.to_thread(manager.stop)
+        await runner.cleanup()
+
+
+# ============================================
+# TESTS
+# ============================================
+
+class TestCandleStore:
+
+    def test_interval_to_ms(self):
+        assert interval_to_ms('15m') == 15 * MINUTE
+        assert interval_to_ms('4h') == 240 * MINUTE
+        assert interval_to_ms('1M') is None
+
+    def test_not_ready_before_backfill(self):
+        store = CandleStore(10)
+        store.update('BTCUSDT', '1m', make_kline(0, 1))
+        assert store.get_klines('BTCUSDT', '1m', 1) is None
+
+    def test_forming_candle_replaced_and_ring_bounded(self):
+        store = CandleStore(5)
+        store.backfill('BTCUSDT', '1m', [make_kline(i * MINUTE, i) for i in range(5)])
+
+        assert store.update('BTCUSDT', '1m', make_kline(4 * MINUTE, 'forming'))
+        assert store.update('BTCUSDT', '1m', make_kline(5 * MINUTE, 'new'))
+
+        klines = store.get_klines('BTCUSDT', '1m', 5)
+        assert [k[0] for k in klines] == [i * MINUTE for i in range(1, 6)]
+        assert klines[-2][4] == 'forming'
+        assert store.get_klines('BTCUSDT', '1m', 6) is None
+
+    def test_gap_marks_stale(self):
+        store = CandleStore(10)
+        store.backfill('BTCUSDT', '1m', [make_kline(i * MINUTE, i) for i in range(3)])
+
+        assert not store.update('BTCUSDT', '1m', make_kline(5 * MINUTE, 'gap'))
+        assert store.get_klines('BTCUSDT', '1m', 1) is None
+
+    def test_backfill_keeps_newer_stream_candles(self):
+        store = CandleStore(10)
+        store.update('BTCUSDT', '1m', make_kline(3 * MINUTE, 'stream'))
+        store.backfill('BTCUSDT', '1m', [make_kline(i * MINUTE, 'rest') for i in range(3)])
+
+        klines = store.get_klines('BTCUSDT', '1m', 4)
+        assert [k[4] for k in klines] == ['rest', 'rest', 'rest', 'stream']
+
+
+class TestKlineStreamManager:
+
+    def test_subscribes_all_streams(self):
+        server = FakeKlineServer()
+        rest = FakeRestClient(last_open=1000 * MINUTE)
+
+        async def run(manager):
+            assert await _wait_for(lambda: rest.calls == 4)
+            return sorted(server.streams)
+
+        streams = asyncio.run(_with_stream(server, rest, run, symbols=('BTCUSDT', 'ETHUSDT'), intervals=('1m', '1h')))
+
+        assert streams == sorted(['btcusdt@kline_1m', 'btcusdt@kline_1h', 'ethusdt@kline_1m', 'ethusdt@kline_1h'])
+
+    def test_stream_updates_served_locally(self):
+        server = FakeKlineServer()
+        rest = FakeRestClient(last_open=1000 * MINUTE)
+
+        async def run(manager):
+            store = manager.store
+            await server.send('BTCUSDT', '1m', 1000 * MINUTE, 'forming')
+            await server.send('BTCUSDT', '1m', 1001 * MINUTE, 'new')
+            assert await _wait_for(lambda: (store.get_klines('BTCUSDT', '1m', 1) or [[0]])[0][0] == 1001 * MINUTE)
+            return store.get_klines('BTCUSDT', '1m', 100)
+
+        klines = asyncio.run(_with_stream(server, rest, run))
+
+        assert len(klines) == 100
+        assert [k[4] for k in klines[-2:]] == ['forming', 'new']
+        assert rest.calls == 1  # Chỉ backfill lúc connect
+
+    def test_gap_triggers_backfill(self):
+        server = FakeKlineServer()
+        rest = FakeRestClient(last_open=1000 * MINUTE)
+
+        async def run(manager):
+            rest.last_open = 1005 * MINUTE
+            await server.send('BTCUSDT', '1m', 1005 * MINUTE, 'after-gap')
+            assert await _wait_for(lambda: rest.calls == 2 and manager.store.is_ready('BTCUSDT', '1m', 100))
+            return manager.store.get_klines('BTCUSDT', '1m', 100)
+
+        klines = asyncio.run(_with_stream(server, rest, run))
+
+        open_times = [k[0] for k in klines]
+        assert open_times == list(range(906 * MINUTE, 1006 * MINUTE, MINUTE))
+
+    def test_reconnect_backfills(self):
+        server = FakeKlineServer()
+        rest = FakeRestClient(last_open=1000 * MINUTE)
+
+        async def run(manager):
+            await server.ws.close()
+            assert await _wait_for(lambda: server.connections == 2 and rest.calls == 2)
+            assert await _wait_for(lambda: manager.store.is_ready('BTCUSDT', '1m', 100))
+
+        asyncio.run(_with_stream(server, rest, run))
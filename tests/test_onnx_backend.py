@@ -0,0 +1,123 @@
+# ============================================
+# 🧪 TESTS FOR ONNX BACKEND
+# ensemble.onnx (scalers + models trong 1 graph) phải cho cùng probabilities
+# như models gốc; thiếu / cũ -> EnsemblePredictor dùng models gốc
+# ============================================
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+
+pytest.importorskip('onnx')
+pytest.importorskip('onnxmltools')
+pytest.importorskip('onnxruntime')
+
+from config import Config
+from conftest import N_FEATURES, make_ensemble, make_windows
+from ml.ensemble import EnsemblePredictor, InferenceBackend
+from ml.onnx_export import export_ensemble
+from ml.xgboost_model import XGBoostTrainer
+
+SEQ_LEN = 20  # Như windows của fixture `trained` (conftest)
+
+
+@pytest.fixture(scope='module')
+def onnx_path(trained, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('onnx') / 'ensemble.onnx')
+    assert export_ensemble(trained, path, seq_length=SEQ_LEN)
+    return path
+
+
+class TestExport:
+
+    def test_each_model_matches_native(self, trained, onnx_path):
+        backend = InferenceBackend(onnx_path)
+        X, _ = make_windows(n=64, seed=1)
+
+        outputs = backend.run(X)
+
+        assert backend.model_names == list(trained)
+        for name, trainer in trained.items():
+            np.testing.assert_allclose(outputs[name], trainer.predict_batch(X), atol=1e-5)
+
+    def test_single_window_and_other_seq_len(self, trained, onnx_path):
+        backend = InferenceBackend(onnx_path)
+        X, _ = make_windows(n=3, seq_len=7, seed=2)
+
+        assert backend.run(X[0])['xgboost'].shape == (1,)
+        np.testing.assert_allclose(backend.run(X)['lstm'], trained['lstm'].predict_batch(X), atol=1e-5)
+
+    def test_export_without_models_fails(self, tmp_path):
+        path = str(tmp_path / 'ensemble.onnx')
+        assert not export_ensemble({'xgboost': XGBoostTrainer(input_size=N_FEATURES)}, path)
+        assert not os.path.exists(path)
+
+
+class TestEnsembleBackend:
+
+    def test_results_match_native(self, trained, onnx_path):
+        ensemble = make_ensemble(trained)
+        X, _ = make_windows(n=10, seed=3)
+
+        native = ensemble.predict_results(X)
+        native_single = ensemble.predict_result(X[0])
+
+        ensemble.backend = InferenceBackend(onnx_path)
+        ensemble.model_runs.clear()
+        fast = ensemble.predict_results(X)
+        fast_single = ensemble.predict_result(X[0])
+
+        assert dict(ensemble.model_runs) == {name: 11 for name in trained}
+        for a, b in zip(native + [native_single], fast + [fast_single]):
+            assert b.predictions == pytest.approx(a.predictions, abs=1e-5)
+            assert b.weights == pytest.approx(a.weights)
+            assert b.probability == pytest.approx(a.probability, abs=1e-5)
+
+    def test_only_ensemble_models_are_used(self, trained, onnx_path):
+        ensemble = make_ensemble({name: trained[name] for name in ('xgboost', 'catboost')})
+        ensemble.backend = InferenceBackend(onnx_path)
+        X, _ = make_windows(n=1, seed=4)
+
+        assert set(ensemble.predict_result(X[0]).predictions) == {'xgboost', 'catboost'}
+
+    def test_failure_falls_back_to_native(self, trained, onnx_path):
+        ensemble = make_ensemble(trained)
+        ensemble.backend = InferenceBackend(onnx_path)
+        X = np.zeros((2, SEQ_LEN, N_FEATURES + 1), dtype=np.float32)  # Sai n_features
+
+        ensemble.predict_results(X)
+        assert ensemble.backend is None
+
+
+class TestLoad:
+
+    def test_missing_or_stale_artifact(self, onnx_path, tmp_path, monkeypatch):
+        monkeypatch.setattr(Config, 'MODEL_PATH', str(tmp_path / 'lstm_model.pt'))
+        assert InferenceBackend.load(str(tmp_path / 'missing.onnx'), ['xgboost']) is None
+
+        assert InferenceBackend.load(onnx_path, ['xgboost', 'lstm']) is not None
+        assert InferenceBackend.load(onnx_path, ['xgboost', 'mlp']) is None
+
+        model_path = tmp_path / 'xgboost_model.json'
+        model_path.write_text('{}')
+        os.utime(model_path, (os.path.getmtime(onnx_path) + 10,) * 2)  # Retrain sau export
+        assert InferenceBackend.load(onnx_path, ['xgboost']) is None
+
+    def test_load_models_attaches_backend(self, trained, onnx_path, tmp_path, monkeypatch):
+        monkeypatch.setattr(Config, 'MODEL_PATH', str(tmp_path / 'lstm_model.pt'))
+        monkeypatch.setattr(Config, 'SCALER_PATH', str(tmp_path / 'scaler.pkl'))
+        monkeypatch.setattr(Config, 'ONNX_MODEL_PATH', onnx_path)
+        trained['xgboost'].save(str(tmp_path / 'xgboost_model.json'), str(tmp_path / 'xgboost_scaler.pkl'))
+        os.utime(onnx_path)  # Export sau khi save models
+
+        ensemble = EnsemblePredictor(models=['xgboost'], weights=[1.0], input_size=N_FEATURES)
+        assert ensemble.load_models()
+        assert ensemble.backend is not None
+
+        monkeypatch.setattr(Config, 'USE_ONNX_RUNTIME', False)
+        ensemble = EnsemblePredictor(models=['xgboost'], weights=[1.0], input_size=N_FEATURES)
+        assert ensemble.load_models()
+        assert ensemble.backend is None
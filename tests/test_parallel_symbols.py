@@ -0,0 +1,206 @@
+# ============================================
+# 🧪 TESTS FOR PARALLEL SYMBOL PROCESSING
+# Thứ tự symbols (positions trước entry scans), worker pool mỗi exchange
+# và state dùng chung (RLock) khi nhiều symbols chạy song song
+# ============================================
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from bot import AsterDEXBot
+from config import Config
+from trading.position_tracker import PositionTracker
+from trading.risk_manager import RiskManager
+from trading.signal_cooldown import SignalCooldownTracker
+from trading.trailing_stop import TrailingStopManager
+
+SYMBOLS = [f'SYM{i}USDT' for i in range(12)]
+TRACKED = ['SYM9USDT', 'SYM4USDT']
+
+
+class RecordingBot(AsterDEXBot):
+    """AsterDEXBot không load models / clients, _process_symbol chỉ ghi lại symbol + thread"""
+
+    def __init__(self, tracker, exchanges=('asterdex',), delay=0.0):
+        self.clients = {name: object() for name in exchanges}
+        self.exchange_symbols = {name: list(SYMBOLS) for name in exchanges}
+        self.position_tracker = tracker
+        self.symbol_executors = self._create_symbol_executors()
+        self.delay = delay
+        self.processed = []
+        self.threads = {name: set() for name in exchanges}
+        self.active = {name: 0 for name in exchanges}
+        self.max_active = {name: 0 for name in exchanges}
+        self._record_lock = threading.Lock()
+
+    def _process_symbol(self, exchange_name, client, symbol, current_balance, leverage):
+        with self._record_lock:
+            self.processed.append((exchange_name, symbol))
+            self.threads[exchange_name].add(threading.current_thread().name)
+            self.active[exchange_name] += 1
+            self.max_active[exchange_name] = max(self.max_active[exchange_name], self.active[exchange_name])
+        time.sleep(self.delay)
+        with self._record_lock:
+            self.active[exchange_name] -= 1
+
+    def shutdown(self):
+        for executor in self.symbol_executors.values():
+            executor.shutdown(wait=True)
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    tracker = PositionTracker(data_file=str(tmp_path / 'position_times.json'))
+    for symbol in TRACKED:
+        tracker.track_position_open(symbol)
+    return tracker
+
+
+@pytest.fixture(autouse=True)
+def _config(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # data/ của SignalCooldownTracker
+    monkeypatch.setattr(Config, 'USE_BATCH_INFERENCE', False)
+    monkeypatch.setattr(Config, 'SYMBOL_WORKERS', 3)
+    monkeypatch.setattr(Config, 'BINANCE_SYMBOL_WORKERS', 2)
+
+
+# ============================================
+# TESTS
+# ============================================
+
+class TestSymbolOrder:
+
+    def test_tracked_positions_first(self, tracker):
+        bot = RecordingBot(tracker)
+        ordered = bot._order_symbols(SYMBOLS)
+
+        assert ordered[:2] == ['SYM4USDT', 'SYM9USDT']  # Giữ thứ tự gốc trong mỗi nhóm
+        assert ordered[2:] == [s for s in SYMBOLS if s not in TRACKED]
+
+    def test_sequential_path(self, tracker, monkeypatch):
+        monkeypatch.setattr(Config, 'USE_PARALLEL_SYMBOLS', False)
+        bot = RecordingBot(tracker)
+
+        bot._process_symbols(1000)
+
+        assert bot.symbol_executors == {}
+        assert [s for _, s in bot.processed] == bot._order_symbols(SYMBOLS)
+        assert bot.threads['asterdex'] == {threading.current_thread().name}
+
+    def test_parallel_path_submits_tracked_first(self, tracker, monkeypatch):
+        monkeypatch.setattr(Config, 'USE_PARALLEL_SYMBOLS', True)
+        monkeypatch.setattr(Config, 'SYMBOL_WORKERS', 1)  # 1 worker: thứ tự xử lý = thứ tự submit
+        bot = RecordingBot(tracker)
+        try:
+            bot._process_symbols(1000)
+        finally:
+            bot.shutdown()
+
+        assert [s for _, s in bot.processed] == bot._order_symbols(SYMBOLS)
+        assert all(name.startswith('asterdex-symbol') for name in bot.threads['asterdex'])
+
+
+class TestParallelSymbols:
+
+    def test_every_symbol_once_with_capped_workers(self, tracker, monkeypatch):
+        monkeypatch.setattr(Config, 'USE_PARALLEL_SYMBOLS', True)
+        bot = RecordingBot(tracker, exchanges=('asterdex', 'binance'), delay=0.02)
+        try:
+            bot._process_symbols(1000)
+        finally:
+            bot.shutdown()
+
+        assert sorted(bot.processed) == sorted((name, s) for name in bot.clients for s in SYMBOLS)
+        assert 1 < bot.max_active['asterdex'] <= Config.SYMBOL_WORKERS
+        assert 1 < bot.max_active['binance'] <= Config.BINANCE_SYMBOL_WORKERS
+        assert len(bot.threads['asterdex']) <= Config.SYMBOL_WORKERS
+        assert len(bot.threads['binance']) <= Config.BINANCE_SYMBOL_WORKERS
+
+    def test_selected_symbols_only(self, tracker, monkeypatch):
+        monkeypatch.setattr(Config, 'USE_PARALLEL_SYMBOLS', True)
+        bot = RecordingBot(tracker, exchanges=('asterdex', 'binance'))
+        try:
+            bot._process_symbols(1000, {'asterdex': ['SYM1USDT', 'SYM9USDT'], 'binance': []})
+        finally:
+            bot.shutdown()
+
+        assert sorted(bot.processed) == [('asterdex', 'SYM1USDT'), ('asterdex', 'SYM9USDT')]
+
+
+class TestSharedState:
+    """Nhiều worker threads ghi cùng lúc vào state dùng chung"""
+
+    THREADS = 8
+    PER_THREAD = 25
+
+    def _run(self, fn):
+        with ThreadPoolExecutor(max_workers=self.THREADS) as pool:
+            list(pool.map(fn, range(self.THREADS)))
+
+    def test_record_trade(self):
+        risk = RiskManager()
+
+        def trade(worker):
+            for i in range(self.PER_THREAD):
+                risk.record_trade(f'SYM{worker}USDT', 'BUY', 1.0, 10.0, pnl_pct=1.0 if i % 2 else -1.0)
+
+        self._run(trade)
+
+        stats = risk.get_daily_stats()
+        total = self.THREADS * self.PER_THREAD
+        assert stats['trades'] == stats['total_trades'] == total
+        assert stats['winning_trades'] + stats['losing_trades'] == total
+        assert stats['volume'] == pytest.approx(total * 10.0 * Config.LEVERAGE)
+
+    def test_position_tracker_persisted(self, tmp_path):
+        data_file = str(tmp_path / 'positions.json')
+        tracker = PositionTracker(data_file=data_file)
+
+        def track(worker):
+            for i in range(self.PER_THREAD):
+                tracker.track_position_open(f'W{worker}S{i}USDT')
+                if i % 5 == 0:
+                    tracker.clear_position(f'W{worker}S{i}USDT')
+
+        self._run(track)
+
+        expected = {f'W{w}S{i}USDT' for w in range(self.THREADS) for i in range(self.PER_THREAD) if i % 5}
+        with open(data_file) as f:
+            assert set(json.load(f)) == expected
+        assert set(PositionTracker(data_file=data_file).position_times) == expected
+
+    def test_signal_cooldown_persisted(self):
+        cooldown = SignalCooldownTracker()
+
+        def record(worker):
+            for i in range(self.PER_THREAD):
+                cooldown.record_signal(f'W{worker}S{i}USDT', 'LONG')
+                cooldown.record_trade_close(f'W{worker}S{i}USDT', 1.0, 'TP')
+
+        self._run(record)
+
+        expected = {f'W{w}S{i}USDT' for w in range(self.THREADS) for i in range(self.PER_THREAD)}
+        reloaded = SignalCooldownTracker()
+        assert set(reloaded.last_signals) == set(reloaded.post_trade_cooldowns) == expected
+
+    def test_trailing_stops(self):
+        trailing = TrailingStopManager(activation_pct=0.5, trail_pct=0.3)
+
+        def update(worker):
+            for i in range(self.PER_THREAD):
+                trailing.update_trailing_stop(f'W{worker}USDT', 'LONG', 100.0, 100.0 + i * 0.1, leverage=10)
+
+        self._run(update)
+
+        for worker in range(self.THREADS):
+            info = trailing.get_trailing_stop_info(f'W{worker}USDT')
+            assert info['activated']
+            assert info['highest_pnl_pct'] == pytest.approx((self.PER_THREAD - 1) * 0.1 * 10)
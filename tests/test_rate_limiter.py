@@ -0,0 +1,102 @@
+# ============================================
+# 🧪 TESTS FOR RATE LIMITER
+# ============================================
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import threading
+import time
+
+from trading.rate_limiter import RateLimiter, endpoint_weight
+
+
+class TestEndpointWeight:
+
+    def test_klines_weight_by_limit(self):
+        assert endpoint_weight('/fapi/v1/klines', {'limit': 50}) == 1
+        assert endpoint_weight('/fapi/v1/klines', {'limit': 200}) == 2
+        assert endpoint_weight('/fapi/v1/klines', {'limit': 1000}) == 5
+        assert endpoint_weight('/fapi/v1/klines', {'limit': 1500}) == 10
+
+    def test_depth_weight_by_limit(self):
+        assert endpoint_weight('/fapi/v1/depth', {'limit': 10}) == 2
+        assert endpoint_weight('/fapi/v1/depth', {'limit': 100}) == 5
+        assert endpoint_weight('/fapi/v1/depth', {'limit': 1000}) == 20
+
+    def test_fixed_weights(self):
+        assert endpoint_weight('/fapi/v2/positionRisk') == 5
+        assert endpoint_weight('/fapi/v2/balance') == 5
+        assert endpoint_weight('/fapi/v1/ticker/price', {'symbol': 'BTCUSDT'}) == 1
+        assert endpoint_weight('/fapi/v1/ticker/price') == 2
+        assert endpoint_weight('/fapi/v1/unknown') == 1
+
+
+class TestRateLimiter:
+
+    def test_burst_within_capacity_does_not_wait(self):
+        limiter = RateLimiter('test', weight_per_minute=600, utilization=1.0)
+
+        start = time.monotonic()
+        for _ in range(100):
+            limiter.acquire(5)
+
+        assert time.monotonic() - start < 0.1
+        assert limiter.total_weight == 500
+
+    def test_waits_for_refill_when_empty(self):
+        limiter = RateLimiter('test', weight_per_minute=600, utilization=1.0)  # 10 weight / s
+        limiter.acquire(600)
+
+        start = time.monotonic()
+        limiter.acquire(2)
+
+        assert 0.15 <= time.monotonic() - start < 1.0
+
+    def test_used_weight_header_reduces_capacity(self):
+        limiter = RateLimiter('test', weight_per_minute=600, utilization=1.0)
+        limiter.update_from_headers({'X-MBX-USED-WEIGHT-1M': '590'})
+
+        assert limiter.used_weight == 590
+        assert limiter.get_stats()['tokens'] <= 10
+
+    def test_429_blocks_until_retry_after(self):
+        limiter = RateLimiter('test', weight_per_minute=6000, utilization=1.0)
+        limiter.update_from_headers({'Retry-After': '0.3'}, status_code=429)
+
+        start = time.monotonic()
+        limiter.acquire(1)
+
+        assert time.monotonic() - start >= 0.25
+
+    def test_concurrent_callers_never_exceed_budget(self):
+        limiter = RateLimiter('test', weight_per_minute=1200, utilization=1.0)  # 20 weight / s
+        start = time.monotonic()
+
+        def worker():
+            for _ in range(10):
+                limiter.acquire(5)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        elapsed = time.monotonic() - start
+        # 400 weight = 1200 burst capacity -> không phải chờ; budget = capacity + refill
+        assert limiter.total_weight == 400
+        assert limiter.total_weight <= limiter.capacity + elapsed * limiter.refill_rate
+
+    def test_async_acquire(self):
+        limiter = RateLimiter('test', weight_per_minute=600, utilization=1.0)
+        limiter.acquire(600)
+
+        async def run():
+            start = time.monotonic()
+            await asyncio.gather(limiter.acquire_async(1), limiter.acquire_async(1))
+            return time.monotonic() - start
+
+        assert 0.1 <= asyncio.run(run()) < 1.0
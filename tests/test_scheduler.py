@@ -0,0 +1,111 @@
+# ============================================
+# 🧪 TESTS FOR EVENT SCHEDULER
+# Clock giả lập (không sleep)
+# ============================================
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+from datetime import datetime, timezone
+
+import pytest
+
+from trading.scheduler import EventScheduler, next_candle_close, next_daily
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+HOUR = 3600
+T0 = 1_700_000_000 // HOUR * HOUR  # Đầu 1 giờ (UTC)
+
+
+class TestCandleClose:
+
+    def test_next_close_aligned_to_interval(self):
+        assert next_candle_close('1h', T0) == T0 + HOUR
+        assert next_candle_close('1h', T0 + 10) == T0 + HOUR
+        assert next_candle_close('15m', T0 + 901) == T0 + 1800
+        assert next_candle_close('4h', T0) % (4 * HOUR) == 0
+
+    def test_weekly_close_on_monday(self):
+        close = next_candle_close('1w', T0)
+        assert datetime.fromtimestamp(close, timezone.utc).weekday() == 0  # Monday 00:00 UTC
+        assert close % 86400 == 0
+
+    def test_invalid_interval(self):
+        with pytest.raises(ValueError):
+            next_candle_close('1M', T0)
+
+    def test_next_daily_is_future(self):
+        now = datetime(2024, 5, 1, 23, 59, 30).timestamp()
+        assert datetime.fromtimestamp(next_daily(0, 0, now)) == datetime(2024, 5, 2, 0, 0)
+        assert datetime.fromtimestamp(next_daily(23, 59, now)) == datetime(2024, 5, 2, 23, 59)
+
+
+class TestEventScheduler:
+
+    def test_candle_jobs_fire_once_per_close_with_jitter(self):
+        clock = FakeClock(T0 + 100)
+        scheduler = EventScheduler(clock=clock, rng=random.Random(1))
+        for symbol in ('BTCUSDT', 'ETHUSDT', 'SOLUSDT'):
+            scheduler.add_candle_close(('entry', symbol), '1h', jitter=10, delay=2)
+
+        clock.now = T0 + HOUR + 1
+        assert scheduler.pop_due() == []  # Chưa qua delay
+
+        due_times = []
+        while len(due_times) < 3:
+            clock.now = scheduler.next_due()
+            due_times.append(clock.now)
+            assert len(scheduler.pop_due()) == 1
+
+        assert all(T0 + HOUR + 2 <= t <= T0 + HOUR + 12 for t in due_times)
+        assert len(set(due_times)) == 3  # Jitter tách các symbols
+        assert scheduler.next_due() >= T0 + 2 * HOUR + 2  # Candle kế tiếp
+
+    def test_interval_job_immediate_then_periodic(self):
+        clock = FakeClock(T0)
+        scheduler = EventScheduler(clock=clock)
+        scheduler.add_interval('positions', 15)
+        scheduler.add_interval('cleanup', 150, immediate=False)
+
+        assert scheduler.pop_due() == ['positions']
+        clock.now = T0 + 14
+        assert scheduler.pop_due() == []
+        clock.now = T0 + 15
+        assert scheduler.pop_due() == ['positions']
+
+    def test_late_jobs_coalesce(self):
+        clock = FakeClock(T0)
+        scheduler = EventScheduler(clock=clock)
+        scheduler.add_interval('positions', 15, immediate=False)
+        scheduler.add_candle_close('entry', '15m', delay=0)
+
+        clock.now = T0 + 3 * HOUR  # Máy bị treo nhiều chu kỳ
+        assert sorted(scheduler.pop_due()) == ['entry', 'positions']
+        assert scheduler.pop_due() == []
+        assert scheduler.seconds_until_next() == 15
+
+    def test_remove_job(self):
+        clock = FakeClock(T0)
+        scheduler = EventScheduler(clock=clock)
+        scheduler.add_interval('a', 10)
+        scheduler.add_interval('b', 20)
+        scheduler.remove('a')
+
+        assert 'a' not in scheduler
+        assert scheduler.pop_due() == ['b']
+        assert scheduler.next_due() == T0 + 20
+
+    def test_wait_returns_empty_when_stopped(self):
+        scheduler = EventScheduler()
+        scheduler.add_interval('positions', 60, immediate=False)
+        assert scheduler.wait(should_stop=lambda: True) == []
@@ -0,0 +1,118 @@
+# ============================================
+# 🧪 TESTS FOR SEQUENCE DATASET
+# Lazy windows phải giống hệt FeatureEngine.create_sequences
+# ============================================
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+from sklearn.model_selection import train_test_split
+
+from ml.batch_features import build_sequences
+from ml.features import FeatureEngine
+from ml.lstm_model import LSTMTrainer
+from ml.sequence_dataset import SequenceDataset
+from ml.xgboost_model import XGBoostTrainer
+
+
+def make_data(n=300, n_features=6, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, n_features)).astype(np.float32)
+
+
+class TestSequenceDataset:
+
+    def test_matches_create_sequences(self):
+        data = make_data()
+        X, y = FeatureEngine.create_sequences(data, seq_length=60)
+        dataset = SequenceDataset(data, seq_length=60)
+
+        assert dataset.shape == X.shape and len(dataset) == len(X)
+        np.testing.assert_array_equal(np.asarray(dataset), X)
+        np.testing.assert_array_equal(dataset.labels, y)
+        np.testing.assert_array_equal(dataset[7], X[7])
+        np.testing.assert_array_equal(dataset[[3, 1, 239]], X[[3, 1, 239]])
+        np.testing.assert_array_equal(dataset[:, -1, :], X[:, -1, :])
+        np.testing.assert_array_equal(dataset[10:20, 5, 2], X[10:20, 5, 2])
+
+    def test_windows_are_views(self):
+        data = make_data()
+        dataset = SequenceDataset(data, seq_length=60)
+
+        assert np.shares_memory(dataset[0], data)
+        assert not np.shares_memory(dataset.last_timestep(), data)  # Gather 1 row / window
+        assert dataset.last_timestep().shape == (240, data.shape[1])
+
+    def test_symbol_boundaries(self):
+        data = make_data()
+        offsets = np.array([0, 100, 130, 300])
+        dataset = SequenceDataset(data, seq_length=60, offsets=offsets)
+
+        X, y, seq_symbols = build_sequences(data, offsets, seq_length=60)
+        assert len(dataset) == 40 + 0 + 110
+        np.testing.assert_array_equal(np.asarray(dataset), X)
+        np.testing.assert_array_equal(dataset.symbol_codes, seq_symbols)
+        np.testing.assert_array_equal(dataset.labels, y)
+
+    @pytest.mark.parametrize('shuffle', [False, True])
+    def test_split_matches_sklearn(self, shuffle):
+        data = make_data()
+        dataset = SequenceDataset(data, seq_length=60)
+        X, y = FeatureEngine.create_sequences(data, seq_length=60)
+
+        train, test = dataset.split(test_size=0.2, shuffle=shuffle, random_state=42)
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, shuffle=shuffle, random_state=42 if shuffle else None
+        )
+
+        np.testing.assert_array_equal(np.asarray(train), X_train)
+        np.testing.assert_array_equal(np.asarray(test), X_test)
+        np.testing.assert_array_equal(test.labels, y_test)
+        assert train.data is data
+
+    def test_rows_cover_flattened_windows(self):
+        data = make_data()
+        train, _ = SequenceDataset(data, seq_length=60, offsets=np.array([0, 100, 130, 300])).split(0.5)
+
+        flat = np.asarray(train).reshape(-1, data.shape[1])
+        np.testing.assert_array_equal(train.rows().min(axis=0), flat.min(axis=0))
+        np.testing.assert_array_equal(train.rows().max(axis=0), flat.max(axis=0))
+
+    def test_batches(self):
+        dataset = SequenceDataset(make_data(n=100), seq_length=10)
+        batches = list(dataset.batches(batch_size=32, shuffle=True, seed=1))
+
+        assert [len(X) for X, _ in batches] == [32, 32, 26]
+        assert sum(y.sum() for _, y in batches) == dataset.labels.sum()
+
+    def test_short_data(self):
+        dataset = SequenceDataset(make_data(n=5), seq_length=10)
+        assert dataset.shape == (0, 10, 6)
+        assert np.asarray(dataset).shape == (0, 10, 6)
+
+
+class TestTrainersAcceptDataset:
+
+    def test_lstm_trains_on_lazy_batches(self):
+        data = make_data(n=120)
+        dataset = SequenceDataset(data, seq_length=20)
+
+        trainer = LSTMTrainer(input_size=data.shape[1])
+        trainer.train(dataset, dataset.labels, epochs=1, batch_size=32)
+
+        predictions = trainer.predict(dataset)
+        assert predictions.shape == (len(dataset),)
+        np.testing.assert_allclose(predictions, trainer.predict(np.asarray(dataset)), rtol=1e-5)
+
+    def test_tree_model_uses_last_timestep(self):
+        data = make_data(n=200)
+        train, val = SequenceDataset(data, seq_length=20).split(0.25)
+
+        lazy = XGBoostTrainer(input_size=data.shape[1])
+        lazy.train(train, train.labels, val, val.labels, epochs=5)
+        dense = XGBoostTrainer(input_size=data.shape[1])
+        dense.train(np.asarray(train), train.labels, np.asarray(val), val.labels, epochs=5)
+
+        np.testing.assert_array_equal(lazy.predict(val), dense.predict(np.asarray(val)))
@@ -0,0 +1,218 @@
+# ============================================
+# 🧪 TESTS FOR EXCHANGE SIMULATOR
+# Clients thật (python-binance) chạy với local simulator
+# ============================================
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+import time
+
+import aiohttp
+import pytest
+
+from config import Config
+from trading.asterdex_client import AsterDEXClient
+from trading.async_asterdex_client import AsyncAsterDEXClient
+from trading.simulator import ExchangeSimulator, SimMarket, SyntheticPath, load_price_path
+
+
+SYMBOLS = [f'SIM{i}USDT' for i in range(120)]
+
+
+@pytest.fixture(autouse=True)
+def _isolated_data_dir(tmp_path, monkeypatch):
+    """Exchange info cache (data/) của symbols simulator ghi vào tmp dir"""
+    monkeypatch.chdir(tmp_path)
+
+
+async def _with_sim(fn, **kwargs):
+    """Start simulator (không tick tự động), tạo AsyncAsterDEXClient trỏ tới nó, chạy fn(sim, client, url)"""
+    kwargs.setdefault('seed', 1)
+    sim = ExchangeSimulator(kwargs.pop('symbols', SYMBOLS), **kwargs)
+    url = await sim.start(ticks=False)
+
+    original = Config.FUTURES_BASE_URL, Config.SIMULATOR_URL
+    Config.FUTURES_BASE_URL, Config.SIMULATOR_URL = f'{url}/fapi', url
+    try:
+        async with AsyncAsterDEXClient('key', 'secret', testnet=False) as client:
+            return await fn(sim, client, url)
+    finally:
+        Config.FUTURES_BASE_URL, Config.SIMULATOR_URL = original
+        await sim.stop()
+
+
+async def _receive(ws, event, timeout=2):
+    """Message đầu tiên có data['e'] == event"""
+    while True:
+        msg = await asyncio.wait_for(ws.receive(), timeout)
+        data = json.loads(msg.data)
+        data = data.get('data', data) if isinstance(data, dict) else data
+        if isinstance(data, dict) and data.get('e') == event:
+            return data
+
+
+class TestMarketData:
+
+    def test_many_symbols_concurrently(self):
+        async def run(sim, client, url):
+            klines = await asyncio.gather(*(client.get_klines(s, '1h', 200) for s in SYMBOLS))
+            books = await asyncio.gather(*(client.get_orderbook(s, 20) for s in SYMBOLS[:10]))
+            return klines, books
+
+        klines, books = asyncio.run(_with_sim(run))
+
+        assert len(klines) == 120 and all(len(k) == 200 for k in klines)
+        for candles in klines[:5]:
+            # Candles liên tục, close cuối = giá hiện tại
+            assert all(b[0] - a[0] == 3600000 for a, b in zip(candles, candles[1:]))
+            assert all(float(c[3]) <= min(float(c[1]), float(c[4])) for c in candles)
+        assert all(float(b['bids'][0][0]) < float(b['asks'][0][0]) for b in books)
+
+    def test_kline_start_time_returns_only_newer_candles(self):
+        now = time.time() * 1000
+        market = SimMarket('BTCUSDT', SyntheticPath(50000), int(now))
+
+        candles = market.klines('1m', int(now), limit=1000)
+        newer = market.klines('1m', int(now), limit=1000, start_time=candles[-3][0])
+
+        assert [c[0] for c in newer] == [c[0] for c in candles[-3:]]
+        assert float(candles[-1][4]) == pytest.approx(50000)
+
+    def test_load_price_path_csv(self, tmp_path):
+        path = tmp_path / 'btc.csv'
+        path.write_text('timestamp,close\n1,100.5\n2,101\n3,99.25\n')
+        assert load_price_path(str(path)) == [100.5, 101.0, 99.25]
+
+    def test_recorded_path_replayed_on_ticks(self):
+        async def run(sim, client, url):
+            prices = [await client.get_ticker_price('BTCUSDT')]
+            for _ in range(3):
+                await sim.tick()
+                prices.append(await client.get_ticker_price('BTCUSDT'))
+            return prices
+
+        prices = asyncio.run(_with_sim(run, symbols=['BTCUSDT'], paths={'BTCUSDT': [100.0, 101.0, 102.5]}))
+        assert prices == [100.0, 101.0, 102.5, 100.0]
+
+
+class TestTrading:
+
+    def test_market_orders_update_position_and_balance(self):
+        async def run(sim, client, url):
+            assert await client.ensure_symbol_config('SIM0USDT', 10, 'ISOLATED')
+            price = sim.markets['SIM0USDT'].price
+            qty = float(sim.markets['SIM0USDT'].fmt_qty(100 / price))
+
+            order = await client.create_market_order('SIM0USDT', 'BUY', qty, client_order_id='fm-1')
+            position = await client.get_position('SIM0USDT')
+            found = await client.get_order('SIM0USDT', 'fm-1')
+
+            closes = await client.create_market_orders([
+                {'symbol': 'SIM0USDT', 'side': 'SELL', 'quantity': qty, 'reduce_only': True},
+                {'symbol': 'SIM1USDT', 'side': 'SELL', 'quantity': 1, 'reduce_only': True},
+            ])
+            positions, balance = await client.get_all_positions(), await client.get_account_balance()
+            return order, position, found, closes, positions, balance, sim.account
+
+        order, position, found, closes, positions, balance, account = asyncio.run(_with_sim(run))
+
+        assert order['status'] == 'FILLED' and found['orderId'] == order['orderId']
+        assert position['side'] == 'LONG'
+        assert (account.leverage['SIM0USDT'], account.margin_type['SIM0USDT']) == (10, 'isolated')
+        assert closes[0]['reduceOnly'] and closes[1] is None  # Không có position để reduce
+        assert positions == {}
+        assert balance == pytest.approx(10000 - 2 * 100 * 0.0004, abs=0.05)  # Chỉ mất phí
+
+    def test_sync_batch_failed_after_accept_not_resubmitted(self):
+        class TimeoutBatchClient(AsterDEXClient):
+            """Batch tới exchange nhưng response bị mất"""
+            def _place_batch_orders(self, batch):
+                super()._place_batch_orders(batch)
+                raise TimeoutError('read timeout')
+
+        async def run(sim, client, url):
+            sync_client = await asyncio.to_thread(TimeoutBatchClient, 'key', 'secret', False)
+            price = sim.markets['SIM0USDT'].price
+            qty = float(sim.markets['SIM0USDT'].fmt_qty(100 / price))
+            orders = [{'symbol': 'SIM0USDT', 'side': 'BUY', 'quantity': qty}]
+            results = await asyncio.to_thread(sync_client.create_market_orders, orders)
+            return orders, qty, results, await client.get_position('SIM0USDT')
+
+        orders, qty, results, position = asyncio.run(_with_sim(run))
+
+        assert results[0]['status'] == 'FILLED'
+        assert position['amount'] == pytest.approx(qty)  # Không gửi lại order đã fill
+        assert 'client_order_id' not in orders[0]
+
+    def test_sync_client_routed_by_simulator_url(self):
+        async def run(sim, client, url):
+            # Client constructor ping spot API -> cũng phải tới simulator
+            sync_client = await asyncio.to_thread(AsterDEXClient, 'key', 'secret', False)
+            return sync_client.client.API_URL, await asyncio.to_thread(sync_client.get_account_balance)
+
+        api_url, balance = asyncio.run(_with_sim(run, balance=500))
+        assert api_url.startswith('http://127.0.0.1') and balance == 500
+
+
+class TestLimits:
+
+    def test_rate_limit_returns_429(self):
+        async def run(sim, client, url):
+            statuses = []
+            async with aiohttp.ClientSession() as session:
+                for _ in range(6):
+                    async with session.get(f'{url}/fapi/v1/klines',
+                                           params={'symbol': 'SIM0USDT', 'interval': '1m', 'limit': '100'}) as r:
+                        statuses.append((r.status, r.headers.get('X-MBX-USED-WEIGHT-1M'), r.headers.get('Retry-After')))
+            return statuses
+
+        statuses = asyncio.run(_with_sim(run, weight_limit=10))
+
+        assert [s[0] for s in statuses] == [200] * 5 + [429]  # klines limit 100 = weight 2
+        assert statuses[4][1] == '10' and statuses[5][2] is not None
+
+    def test_latency_added_to_requests(self):
+        async def run(sim, client, url):
+            start = time.monotonic()
+            await client.get_ticker_price('SIM0USDT')
+            return time.monotonic() - start
+
+        assert asyncio.run(_with_sim(run, latency_ms=80)) >= 0.08
+
+
+class TestWebsocket:
+
+    def test_market_streams_and_subscribe(self):
+        async def run(sim, client, url):
+            async with aiohttp.ClientSession() as session:
+                async with session.ws_connect(f'{url.replace("http", "ws")}/stream?streams=sim0usdt@kline_1m') as ws:
+                    await sim.tick()
+                    kline = await _receive(ws, 'kline')
+
+                    await ws.send_json({'method': 'SUBSCRIBE', 'params': ['sim1usdt@markPrice@1s'], 'id': 1})
+                    assert (await ws.receive_json())['id'] == 1
+                    await sim.tick()
+                    mark = await _receive(ws, 'markPriceUpdate')
+                    return kline, mark, sim.markets['SIM1USDT'].price
+
+        kline, mark, price = asyncio.run(_with_sim(run))
+
+        assert kline['k']['s'] == 'SIM0USDT' and kline['k']['i'] == '1m'
+        assert mark['s'] == 'SIM1USDT' and float(mark['p']) == pytest.approx(price, rel=1e-3)
+
+    def test_user_stream_receives_fills(self):
+        async def run(sim, client, url):
+            listen_key = await client.client.futures_stream_get_listen_key()
+            async with aiohttp.ClientSession() as session:
+                async with session.ws_connect(f'{url.replace("http", "ws")}/ws/{listen_key}') as ws:
+                    await client.create_market_order('SIM2USDT', 'SELL', 5, client_order_id='fm-2')
+                    return await _receive(ws, 'ORDER_TRADE_UPDATE'), await _receive(ws, 'ACCOUNT_UPDATE')
+
+        order_update, account_update = asyncio.run(_with_sim(run))
+
+        assert order_update['o']['c'] == 'fm-2' and order_update['o']['X'] == 'FILLED'
+        assert float(account_update['a']['P'][0]['pa']) == -5
@@ -0,0 +1,105 @@
+# ============================================
+# 🧪 TESTS FOR STREAMING FEATURE ENGINE
+# So sánh với FeatureEngine.calculate_indicators (batch)
+# ============================================
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ml.features
+from conftest import make_klines
+from ml.features import FeatureEngine
+from ml.streaming_features import IncrementalFeatures, StreamingFeatureEngine
+
+
+@pytest.fixture(autouse=True)
+def manual_indicators(monkeypatch):
+    """Streaming engine dùng công thức manual (không pandas-ta)"""
+    monkeypatch.setattr(ml.features, 'USE_PANDAS_TA', False)
+
+
+def batch_last_row(klines):
+    df = pd.DataFrame([k[1:6] for k in klines], columns=['open', 'high', 'low', 'close', 'volume']).astype(float)
+    return FeatureEngine.calculate_indicators(df)[FeatureEngine.FEATURE_COLUMNS].iloc[-1].to_numpy(dtype=float)
+
+
+def assert_rows_close(stream_row, batch_row):
+    np.testing.assert_allclose(stream_row, batch_row, rtol=1e-7, atol=1e-7)
+
+
+class TestIncrementalFeatures:
+
+    def test_every_row_matches_batch(self):
+        klines = make_klines(n=160)
+        features = IncrementalFeatures()
+
+        for t, kline in enumerate(klines):
+            row = features.update_kline(kline)
+            assert_rows_close(row, batch_last_row(klines[:t + 1]))
+
+    def test_divergence_scores_emitted(self):
+        klines = make_klines(n=400, seed=3)
+        features = IncrementalFeatures()
+        column = FeatureEngine.FEATURE_COLUMNS.index('rsi_divergence_score')
+
+        scores = [features.update_kline(k)[column] for k in klines]
+
+        df = pd.DataFrame([k[1:6] for k in klines], columns=['open', 'high', 'low', 'close', 'volume']).astype(float)
+        expected = FeatureEngine.calculate_indicators(df)['rsi_divergence_score'].to_numpy()
+        assert set(scores) - {0.0}  # Data có divergence
+        np.testing.assert_array_equal(scores, expected)
+
+    def test_forming_candle_replaced(self):
+        klines = make_klines(n=80)
+        features = IncrementalFeatures()
+        for kline in klines[:-1]:
+            features.update_kline(kline)
+
+        # Candle cuối tới nhiều lần (đang hình thành), chỉ lần cuối được giữ
+        last = klines[-1]
+        for close in ('1', '99999', last[4]):
+            partial = list(last)
+            partial[4] = close
+            features.update_kline(partial)
+        row = features.update_kline(last)
+
+        assert_rows_close(row, batch_last_row(klines))
+
+    def test_large_prices_keep_precision(self):
+        klines = make_klines(n=2500, start_price=2e6, seed=11)
+        features = IncrementalFeatures()
+        for kline in klines:
+            row = features.update_kline(kline)
+
+        assert_rows_close(row, batch_last_row(klines))
+
+
+class TestStreamingFeatureEngine:
+
+    def test_seed_then_stream(self):
+        klines = make_klines(n=150)
+        engine = StreamingFeatureEngine(history=100)
+
+        engine.seed('BTCUSDT', '1h', klines[:120])
+        for kline in klines[120:]:
+            engine.update('BTCUSDT', '1h', kline)
+
+        rows = engine.get_rows('BTCUSDT', '1h', 60)
+        assert rows.shape == (60, len(FeatureEngine.FEATURE_COLUMNS))
+        assert_rows_close(rows[-1], batch_last_row(klines))
+        assert_rows_close(rows[-2], batch_last_row(klines[:-1]))
+        assert engine.get_rows('BTCUSDT', '1h', 101) is None
+        assert engine.get_row('ETHUSDT', '1h') is None
+
+    def test_forming_candle_does_not_grow_history(self):
+        klines = make_klines(n=30)
+        engine = StreamingFeatureEngine()
+        engine.seed('BTCUSDT', '15m', klines)
+        engine.update('BTCUSDT', '15m', klines[-1])
+
+        assert len(engine.get_rows('BTCUSDT', '15m')) == 30
@@ -0,0 +1,230 @@
+# ============================================
+# 🧪 TESTS FOR USER DATA STREAM + ACCOUNT STATE
+# Chạy với local aiohttp websocket server (không cần network)
+# ============================================
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import time
+from aiohttp import web
+
+from trading.account_config import AccountConfigCache
+from trading.base_exchange import AccountSnapshot
+from trading.user_stream import AccountState, UserDataStream
+
+
+def account_update(symbol, amount, entry_price=100.0, unrealized=0.0, balance=None, event_time=None):
+    event_time = event_time or int(time.time() * 1000)
+    account = {'m': 'ORDER', 'B': [], 'P': [{
+        's': symbol, 'pa': str(amount), 'ep': str(entry_price), 'up': str(unrealized),
+        'mt': 'isolated', 'ps': 'BOTH'
+    }]}
+    if balance is not None:
+        account['B'].append({'a': 'USDT', 'wb': str(balance), 'cw': str(balance)})
+    return {'e': 'ACCOUNT_UPDATE', 'E': event_time, 'T': event_time, 'a': account}
+
+
+# ============================================
+# FAKES
+# ============================================
+
+class FakeRestClient:
+    """Listen key + REST snapshot, ghi lại mọi call"""
+
+    exchange_name = 'TEST'
+
+    def __init__(self, balance=1000.0, positions=None):
+        self.balance = balance
+        self.positions = positions or {}
+        self.account_config = AccountConfigCache()
+        self.listen_keys = 0
+        self.keepalives = []
+        self.closed = []
+
+    def start_user_stream(self):
+        self.listen_keys += 1
+        return f'key{self.listen_keys}'
+
+    def keepalive_user_stream(self, listen_key):
+        self.keepalives.append(listen_key)
+
+    def close_user_stream(self, listen_key):
+        self.closed.append(listen_key)
+
+    def get_account_snapshot(self):
+        return AccountSnapshot(balance=self.balance, positions=dict(self.positions))
+
+    def _parse_position(self, pos):
+        amt = float(pos['positionAmt'])
+        if amt == 0:
+            return None
+        return {
+            'side': 'LONG' if amt > 0 else 'SHORT',
+            'amount': abs(amt),
+            'entry_price': float(pos['entryPrice']),
+            'mark_price': float(pos['markPrice']),
+            'pnl_usdt': float(pos['unRealizedProfit']),
+            'leverage': pos.get('leverage'),
+        }
+
+
+class FakeUserStreamServer:
+    """Combined stream endpoint /stream?streams=<listenKey>/!markPrice@arr@1s"""
+
+    def __init__(self):
+        self.streams = []
+        self.ws = None
+
+    async def stream(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.streams.append(request.query['streams'])
+        self.ws = ws
+        async for _ in ws:
+            pass
+        return ws
+
+    async def send(self, data, stream='key'):
+        await self.ws.send_json({'stream': stream, 'data': data})
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get('/stream', self.stream)
+        return app
+
+
+async def _wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        await asyncio.sleep(0.02)
+    return False
+
+
+async def _with_stream(server, rest, fn, reconnect_delay=0.05):
+    """Start fake server + UserDataStream (thread riêng), chạy fn(stream)"""
+    runner = web.AppRunner(server.app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    stream = UserDataStream(f'ws://127.0.0.1:{port}', rest)
+    stream.RECONNECT_DELAY = reconnect_delay
+    stream.start()
+    try:
+        assert await _wait_for(stream.is_live)
+        return await fn(stream)
+    finally:
+        await asyncio.to_thread(stream.stop)
+        await runner.cleanup()
+
+
+# ============================================
+# TESTS
+# ============================================
+
+class TestAccountState:
+
+    def test_account_update_opens_and_closes_positions(self):
+        state = AccountState()
+        closed = []
+        state.add_position_closed_listener(lambda symbol, record: closed.append(symbol))
+
+        state.apply_event(account_update('BTCUSDT', 0.5, entry_price=100, unrealized=5, balance=950))
+        positions = {p['symbol']: p for p in state.get_raw_positions()}
+        assert positions['BTCUSDT']['positionAmt'] == 0.5
+        assert positions['BTCUSDT']['markPrice'] == 110  # ep + up / amt
+        assert state.balance == 950
+
+        state.apply_event(account_update('BTCUSDT', 0))
+        assert state.get_raw_positions() == []
+        assert closed == ['BTCUSDT']
+
+    def test_mark_price_updates_unrealized_pnl(self):
+        state = AccountState()
+        state.apply_event(account_update('ETHUSDT', -2, entry_price=100))
+        state.apply_event([{'e': 'markPriceUpdate', 's': 'ETHUSDT', 'p': '95'}])
+
+        position = state.get_raw_positions()[0]
+        assert position['markPrice'] == 95
+        assert position['unRealizedProfit'] == 10  # SHORT 2 @ 100 -> 95
+
+    def test_snapshot_does_not_override_newer_events(self):
+        state = AccountState()
+        state.apply_event(account_update('BTCUSDT', 1, event_time=2000))
+
+        snapshot = AccountSnapshot(balance=500, positions={
+            'ETHUSDT': {'side': 'SHORT', 'amount': 3, 'entry_price': 10, 'mark_price': 11, 'pnl_usdt': -3}
+        })
+        state.load_snapshot(snapshot, as_of=1000)
+
+        symbols = {p['symbol']: p['positionAmt'] for p in state.get_raw_positions()}
+        assert symbols == {'BTCUSDT': 1, 'ETHUSDT': -3}
+
+    def test_order_updates_bounded(self):
+        state = AccountState()
+        for i in range(AccountState.MAX_ORDERS + 10):
+            state.apply_event({'e': 'ORDER_TRADE_UPDATE', 'E': i, 'o': {'i': i, 's': 'BTCUSDT', 'X': 'FILLED'}})
+
+        assert state.get_order(0) is None
+        assert state.get_order(AccountState.MAX_ORDERS + 9)['X'] == 'FILLED'
+
+
+class TestUserDataStream:
+
+    def test_seeded_then_updated_in_realtime(self):
+        server = FakeUserStreamServer()
+        rest = FakeRestClient(balance=1000, positions={
+            'BTCUSDT': {'side': 'LONG', 'amount': 1, 'entry_price': 100, 'mark_price': 100, 'pnl_usdt': 0}
+        })
+
+        async def run(stream):
+            assert stream.get_snapshot().get_position('BTCUSDT')['amount'] == 1
+
+            await server.send(account_update('ETHUSDT', -2, entry_price=50, balance=990))
+            await server.send([{'e': 'markPriceUpdate', 's': 'BTCUSDT', 'p': '105'}], stream='!markPrice@arr@1s')
+            await server.send({'e': 'ACCOUNT_CONFIG_UPDATE', 'E': 1, 'ac': {'s': 'ETHUSDT', 'l': 15}})
+            assert await _wait_for(lambda: rest.account_config.get('ETHUSDT').leverage == 15)
+            return stream.get_snapshot()
+
+        snapshot = asyncio.run(_with_stream(server, rest, run))
+
+        assert server.streams == ['key1/!markPrice@arr@1s']
+        assert snapshot.balance == 990
+        assert snapshot.get_position('BTCUSDT')['mark_price'] == 105
+        assert snapshot.get_position('ETHUSDT')['side'] == 'SHORT'
+        assert snapshot.get_position('ETHUSDT')['leverage'] == 15
+        assert rest.closed == ['key1']  # stop() đóng listen key
+
+    def test_listen_key_expired_renews_key(self):
+        server = FakeUserStreamServer()
+        rest = FakeRestClient()
+
+        async def run(stream):
+            await server.send({'e': 'listenKeyExpired', 'E': 1})
+            assert await _wait_for(lambda: len(server.streams) == 2 and stream.is_live())
+
+        asyncio.run(_with_stream(server, rest, run))
+
+        assert server.streams[1] == 'key2/!markPrice@arr@1s'
+
+    def test_not_live_falls_back_to_rest(self):
+        server = FakeUserStreamServer()
+        rest = FakeRestClient()
+
+        async def run(stream):
+            await server.ws.close()
+            assert await _wait_for(lambda: not stream.is_live())
+            assert stream.get_snapshot() is None  # Bot dùng REST snapshot
+
+            # Reconnect (listen key mới) + seed lại
+            assert await _wait_for(lambda: len(server.streams) == 2 and stream.is_live())
+
+        asyncio.run(_with_stream(server, rest, run, reconnect_delay=0.5))
+
+        assert rest.listen_keys == 2
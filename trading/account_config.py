@@ -0,0 +1,99 @@
+# ============================================
+# ⚙️ ACCOUNT CONFIG CACHE
+# Leverage / margin type hiện tại của mỗi symbol, để chỉ gọi
+# change leverage / change margin type khi thật sự cần đổi
+# ============================================
+
+import threading
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, Optional
+
+
+@dataclass
+class SymbolConfig:
+    """Cấu hình account của 1 symbol (None = chưa biết)"""
+    leverage: Optional[int] = None
+    margin_type: Optional[str] = None  # 'ISOLATED' | 'CROSSED'
+
+
+def parse_margin_type(value: Optional[str]) -> Optional[str]:
+    """marginType của positionRisk ('isolated' / 'cross') -> 'ISOLATED' / 'CROSSED'"""
+    if not value:
+        return None
+    value = value.upper()
+    if value == 'ISOLATED':
+        return 'ISOLATED'
+    if value in ('CROSS', 'CROSSED'):
+        return 'CROSSED'
+    return None
+
+
+class AccountConfigCache:
+    """
+    State cache leverage + margin type theo symbol.
+
+    - Nạp hàng loạt từ futures_position_information() (mọi symbol, kể cả
+      không có position) mỗi khi client lấy tất cả positions
+    - set_leverage / set_margin_type thành công -> cập nhật cache
+    - needs_leverage / needs_margin_type: False nếu exchange đã đúng config,
+      khi đó không cần request nào trước khi đặt lệnh
+    """
+
+    def __init__(self):
+        self._configs: Dict[str, SymbolConfig] = {}
+        self._lock = threading.Lock()
+
+    def get(self, symbol: str) -> SymbolConfig:
+        with self._lock:
+            return replace(self._configs.get(symbol, SymbolConfig()))
+
+    def set_leverage(self, symbol: str, leverage: int):
+        with self._lock:
+            self._configs.setdefault(symbol, SymbolConfig()).leverage = int(leverage)
+
+    def set_margin_type(self, symbol: str, margin_type: str):
+        with self._lock:
+            self._configs.setdefault(symbol, SymbolConfig()).margin_type = parse_margin_type(margin_type)
+
+    def needs_leverage(self, symbol: str, leverage: int) -> bool:
+        return self.get(symbol).leverage != int(leverage)
+
+    def needs_margin_type(self, symbol: str, margin_type: str) -> bool:
+        return self.get(symbol).margin_type != parse_margin_type(margin_type)
+
+    def load_positions(self, positions: Iterable[dict]) -> int:
+        """
+        Nạp leverage / marginType từ payload positionRisk
+
+        Args:
+            positions: Response của futures_position_information() (raw)
+
+        Returns:
+            int: Số symbols đã cập nhật
+        """
+        loaded = {}
+        for pos in positions:
+            symbol = pos.get('symbol')
+            if not symbol or 'leverage' not in pos:
+                continue
+            try:
+                leverage = int(float(pos['leverage']))
+            except (TypeError, ValueError):
+                continue
+            loaded[symbol] = SymbolConfig(leverage, parse_margin_type(pos.get('marginType')))
+
+        with self._lock:
+            self._configs.update(loaded)
+        return len(loaded)
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """Xoá cache (tất cả hoặc 1 symbol), lần sau sẽ set lại"""
+        with self._lock:
+            if symbol is None:
+                self._configs.clear()
+            else:
+                self._configs.pop(symbol, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._configs)
@@ -7,6 +7,7 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple
 from config import Config
+from trading.indicator_cache import indicator
 from utils.logger import logger
 
 class AdvancedEntrySystem:
@@ -19,6 +20,9 @@ class AdvancedEntrySystem:
     - Volume analysis
     """
 
+    # Indicator columns (FeatureEngine.compute) đọc từ df
+    REQUIRED_COLUMNS = ['rsi', 'macd', 'macd_signal', 'bb_upper', 'bb_middle', 'bb_lower', 'atr']
+
     def __init__(self, min_confluence_score=7):
         self.min_confluence_score = min_confluence_score
         self.entry_reasons = []
@@ -181,13 +185,13 @@ class AdvancedEntrySystem:
 
         # Calculate EMAs if not present
         if 'ema_8' not in df.columns:
-            df['ema_8'] = df['close'].ewm(span=8, adjust=False).mean()
+            df['ema_8'] = indicator(df, 'ema_8')
         if 'ema_21' not in df.columns:
-            df['ema_21'] = df['close'].ewm(span=21, adjust=False).mean()
+            df['ema_21'] = indicator(df, 'ema_21')
         if 'ema_50' not in df.columns:
-            df['ema_50'] = df['close'].ewm(span=50, adjust=False).mean()
+            df['ema_50'] = indicator(df, 'ema_50')
         if 'ema_200' not in df.columns:
-            df['ema_200'] = df['close'].ewm(span=200, adjust=False).mean()
+            df['ema_200'] = indicator(df, 'ema_200')
 
         current_price = df['close'].iloc[-1]
 
@@ -213,8 +217,8 @@ class AdvancedEntrySystem:
                 pullback_complete = True
 
         # Find key levels
-        swing_high = df['high'].rolling(20).max().iloc[-1]
-        swing_low = df['low'].rolling(20).min().iloc[-1]
+        swing_high = indicator(df, 'high_max_20').iloc[-1]
+        swing_low = indicator(df, 'low_min_20').iloc[-1]
 
         # Position in range
         range_size = swing_high - swing_low
@@ -315,7 +319,7 @@ class AdvancedEntrySystem:
 
         # Order Block Detection
         # Tìm vùng có strong move sau consolidation
-        avg_volume = df['volume'].rolling(20).mean().iloc[-1]
+        avg_volume = indicator(df, 'volume_sma_20').iloc[-1]
 
         for i in range(-10, -2):
             try:
@@ -426,7 +430,7 @@ class AdvancedEntrySystem:
             return volume_analysis
 
         current_vol = df['volume'].iloc[-1]
-        avg_vol = df['volume'].rolling(20).mean().iloc[-1]
+        avg_vol = indicator(df, 'volume_sma_20').iloc[-1]
 
         if avg_vol > 0:
             if current_vol > avg_vol * 1.5:
@@ -435,8 +439,8 @@ class AdvancedEntrySystem:
                 volume_analysis['volume_dry_up'] = True
 
         # Volume trend
-        vol_sma_5 = df['volume'].rolling(5).mean().iloc[-1]
-        vol_sma_20 = df['volume'].rolling(20).mean().iloc[-1]
+        vol_sma_5 = indicator(df, 'volume_sma_5').iloc[-1]
+        vol_sma_20 = indicator(df, 'volume_sma_20').iloc[-1]
 
         if vol_sma_5 > vol_sma_20:
             volume_analysis['volume_trend'] = 'increasing'
@@ -513,8 +517,7 @@ class AdvancedEntrySystem:
             atr = df['atr'].iloc[-1]
         else:
             # Calculate simple ATR
-            high_low = df['high'] - df['low']
-            atr = high_low.rolling(14).mean().iloc[-1]
+            atr = indicator(df, 'range_sma_14').iloc[-1]
 
         if signal == 'LONG':
             # Enter slightly above current price
@@ -557,6 +560,10 @@ class SmartEntrySystemV2:
     5. Risk/Reward Filter - Only entry when R:R > min ratio
     """
 
+    # Indicator columns đọc từ df_primary / từ HTF frames (df_higher, df_4h: chỉ OHLCV)
+    REQUIRED_COLUMNS = ['rsi', 'atr']
+    HTF_REQUIRED_COLUMNS = []
+
     def __init__(self, min_score=6, min_rr_ratio=2.0):
         """
         Initialize Smart Entry System V2
@@ -697,11 +704,11 @@ class SmartEntrySystemV2:
 
         # Calculate EMAs if not present
         if 'ema_8' not in df.columns:
-            df['ema_8'] = df['close'].ewm(span=8, adjust=False).mean()
+            df['ema_8'] = indicator(df, 'ema_8')
         if 'ema_21' not in df.columns:
-            df['ema_21'] = df['close'].ewm(span=21, adjust=False).mean()
+            df['ema_21'] = indicator(df, 'ema_21')
         if 'ema_50' not in df.columns:
-            df['ema_50'] = df['close'].ewm(span=50, adjust=False).mean()
+            df['ema_50'] = indicator(df, 'ema_50')
 
         ema8 = df['ema_8'].iloc[-1]
         ema21 = df['ema_21'].iloc[-1]
@@ -764,8 +771,8 @@ class SmartEntrySystemV2:
         current_price = df_primary['close'].iloc[-1]
 
         # Check swing highs/lows on primary timeframe
-        swing_high = df_primary['high'].rolling(20).max().iloc[-1]
-        swing_low = df_primary['low'].rolling(20).min().iloc[-1]
+        swing_high = indicator(df_primary, 'high_max_20').iloc[-1]
+        swing_low = indicator(df_primary, 'low_min_20').iloc[-1]
 
         # Check if at key level (within 1%)
         if abs(current_price - swing_low) / current_price < 0.01:
@@ -775,8 +782,8 @@ class SmartEntrySystemV2:
 
         # Check higher timeframe levels if available
         if df_higher is not None and len(df_higher) >= 20:
-            htf_swing_high = df_higher['high'].rolling(20).max().iloc[-1]
-            htf_swing_low = df_higher['low'].rolling(20).min().iloc[-1]
+            htf_swing_high = indicator(df_higher, 'high_max_20').iloc[-1]
+            htf_swing_low = indicator(df_higher, 'low_min_20').iloc[-1]
 
             if abs(current_price - htf_swing_low) / current_price < 0.015:
                 return 1, "🔑 Near HTF support"
@@ -797,7 +804,7 @@ class SmartEntrySystemV2:
             return 0, ""
 
         current_vol = df['volume'].iloc[-1]
-        avg_vol = df['volume'].rolling(20).mean().iloc[-1]
+        avg_vol = indicator(df, 'volume_sma_20').iloc[-1]
 
         if current_vol > avg_vol * 2:
             return 2, "📈 Strong volume spike (2x)"
@@ -885,8 +892,7 @@ class SmartEntrySystemV2:
             atr = df['atr'].iloc[-1]
         else:
             # Calculate simple ATR
-            high_low = df['high'] - df['low']
-            atr = high_low.rolling(14).mean().iloc[-1]
+            atr = indicator(df, 'range_sma_14').iloc[-1]
 
         # Set SL at 1.5x ATR
         atr_multiplier = 1.5
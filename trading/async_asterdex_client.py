@@ -0,0 +1,54 @@
+# ============================================
+# 🔌 ASYNC ASTERDEX CLIENT
+# AsterDEX Futures client trên asyncio (aiohttp)
+# ============================================
+
+import asyncio
+from config import Config
+from utils.logger import logger
+from trading.async_binance_client import AsyncBinanceClient
+from trading.http_session import create_connector
+from trading.rate_limiter import AsyncRateLimitedClient, get_rate_limiter
+
+
+class AsyncAsterDEXClient(AsyncBinanceClient):
+    """
+    Async AsterDEX Futures Client
+    AsterDEX 100% tương thích với Binance API, nên chỉ khác URL,
+    credentials và cách tính leverage cho PnL%.
+    """
+
+    EXCHANGE_NAME = "AsterDEX"
+
+    def __init__(self, api_key=None, api_secret=None, testnet=None):
+        # Get credentials
+        api_key = api_key or Config.API_KEY
+        api_secret = api_secret or Config.API_SECRET
+        testnet = testnet if testnet is not None else Config.TESTNET_MODE
+
+        super().__init__(api_key, api_secret, testnet)
+
+    def _create_client(self):
+        """Tạo AsyncClient trỏ tới AsterDEX URL"""
+        connector = create_connector()
+        client = AsyncRateLimitedClient(
+            self.api_key,
+            self.api_secret,
+            get_rate_limiter(self.venue),
+            loop=asyncio.get_running_loop(),
+            session_params={'connector': connector}
+        )
+
+        # Override URL
+        client.FUTURES_URL = Config.TESTNET_URL if self.testnet else Config.FUTURES_BASE_URL
+        return client
+
+    def log_connection_info(self):
+        """Log thông tin kết nối"""
+        mode = "TESTNET" if self.testnet else "MAINNET"
+        logger.info(f"🔌 AsterDEX Async Client initialized ({mode})")
+        logger.info(f"   URL: {self.client.FUTURES_URL}")
+
+    def _position_leverage(self, pos):
+        """AsterDEX: PnL% tính theo Config.LEVERAGE (giống AsterDEXClient)"""
+        return Config.LEVERAGE
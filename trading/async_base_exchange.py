@@ -0,0 +1,361 @@
+# ============================================
+# 🔌 ASYNC BASE EXCHANGE CLIENT
+# Async interface (asyncio) cho tất cả exchanges
+# ============================================
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Any
+import asyncio
+from utils.logger import logger
+from trading.account_config import AccountConfigCache
+from trading.base_exchange import (
+    AccountSnapshot, BATCH_ORDER_LIMIT, batch_order_params, close_orders, parse_batch_response
+)
+from trading.execution import new_client_order_id
+
+
+class AsyncBaseExchangeClient(ABC):
+    """
+    Async counterpart của BaseExchangeClient.
+
+    Cùng interface (get_klines, get_orderbook, get_position, create_market_order, ...)
+    nhưng mọi method là coroutine. Tất cả requests của 1 client đi qua 1
+    aiohttp session (connection pool) duy nhất, nên có thể poll hàng trăm
+    symbols song song bằng asyncio.gather thay vì 1 thread / request.
+
+    Usage:
+        async with AsyncAsterDEXClient() as client:
+            klines = await client.get_klines('BTCUSDT', '1h', 200)
+    """
+
+    def __init__(self, api_key: str, api_secret: str, testnet: bool = False):
+        """
+        Initialize async exchange client
+
+        Args:
+            api_key: API key
+            api_secret: API secret
+            testnet: Sử dụng testnet hay mainnet
+        """
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.testnet = testnet
+        self._symbol_info_cache = {}
+
+        # Subclass sẽ implement client initialization
+        self.client = None
+        self.exchange_name = "BaseExchange"
+
+        # Leverage / margin type hiện tại mỗi symbol (nạp từ get_all_positions)
+        self.account_config = AccountConfigCache()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    @abstractmethod
+    async def close(self):
+        """Đóng HTTP session (connection pool)"""
+        pass
+
+    @abstractmethod
+    async def get_account_balance(self) -> float:
+        """
+        Lấy balance USDT trong futures account
+
+        Returns:
+            float: Số dư USDT
+        """
+        pass
+
+    @abstractmethod
+    async def get_position(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Lấy thông tin position hiện tại
+
+        Args:
+            symbol: Trading pair (e.g., 'BTCUSDT')
+
+        Returns:
+            dict hoặc None: cùng format với BaseExchangeClient.get_position
+        """
+        pass
+
+    @abstractmethod
+    async def get_all_positions(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Lấy tất cả positions đang mở trong 1 request
+
+        Returns:
+            dict hoặc None: {symbol: position dict}, None nếu request lỗi
+        """
+        pass
+
+    async def get_account_snapshot(self) -> Optional[AccountSnapshot]:
+        """
+        Lấy balance + tất cả positions (2 requests song song)
+
+        Returns:
+            AccountSnapshot hoặc None nếu không lấy được positions
+        """
+        positions, balance = await asyncio.gather(
+            self.get_all_positions(),
+            self.get_account_balance()
+        )
+        if positions is None:
+            return None
+        return AccountSnapshot(balance=balance, positions=positions)
+
+    @abstractmethod
+    async def get_klines(self, symbol: str, interval: str = '1m', limit: int = 100) -> List[List]:
+        """
+        Lấy candlestick data
+
+        Args:
+            symbol: Trading pair
+            interval: Timeframe ('1m', '5m', '1h', '4h', '1d', etc.)
+            limit: Số lượng candles
+
+        Returns:
+            List of klines (OHLCV format)
+        """
+        pass
+
+    @abstractmethod
+    async def get_orderbook(self, symbol: str, limit: int = 10) -> Dict[str, List]:
+        """
+        Lấy order book
+
+        Args:
+            symbol: Trading pair
+            limit: Độ sâu order book
+
+        Returns:
+            dict: {'bids': [[price, qty], ...], 'asks': [[price, qty], ...]}
+        """
+        pass
+
+    @abstractmethod
+    async def get_ticker_price(self, symbol: str) -> float:
+        """
+        Lấy giá hiện tại
+
+        Args:
+            symbol: Trading pair
+
+        Returns:
+            float: Current price
+        """
+        pass
+
+    @abstractmethod
+    async def set_leverage(self, symbol: str, leverage: int) -> bool:
+        """
+        Đặt đòn bẩy cho symbol
+
+        Args:
+            symbol: Trading pair
+            leverage: Đòn bẩy (1-125x)
+
+        Returns:
+            bool: True nếu thành công
+        """
+        pass
+
+    @abstractmethod
+    async def set_margin_type(self, symbol: str, margin_type: str = 'ISOLATED') -> bool:
+        """
+        Đặt loại margin (ISOLATED hoặc CROSSED)
+
+        Args:
+            symbol: Trading pair
+            margin_type: 'ISOLATED' hoặc 'CROSSED'
+
+        Returns:
+            bool: True nếu thành công
+        """
+        pass
+
+    async def ensure_symbol_config(self, symbol: str, leverage: int, margin_type: str = 'ISOLATED') -> bool:
+        """
+        Đảm bảo leverage + margin type của symbol, chỉ gửi request cho phần
+        khác với account_config (thường là 0 request trước khi đặt lệnh)
+
+        Args:
+            symbol: Trading pair
+            leverage: Đòn bẩy
+            margin_type: 'ISOLATED' hoặc 'CROSSED'
+
+        Returns:
+            bool: True nếu config đã đúng hoặc set thành công
+        """
+        ok = True
+        if self.account_config.needs_leverage(symbol, leverage):
+            ok = await self.set_leverage(symbol, leverage)
+        if self.account_config.needs_margin_type(symbol, margin_type):
+            ok = await self.set_margin_type(symbol, margin_type) and ok
+        return ok
+
+    @abstractmethod
+    async def format_quantity(self, symbol: str, quantity: float) -> float:
+        """
+        Format quantity theo quy định của exchange (precision, step size)
+
+        Args:
+            symbol: Trading pair
+            quantity: Số lượng chưa format
+
+        Returns:
+            float: Số lượng đã được format đúng
+        """
+        pass
+
+    @abstractmethod
+    async def create_market_order(self, symbol: str, side: str, quantity: float,
+                                  reduce_only: bool = False,
+                                  client_order_id: Optional[str] = None) -> Optional[Dict]:
+        """
+        Tạo market order
+
+        Args:
+            symbol: Trading pair
+            side: 'BUY' hoặc 'SELL'
+            quantity: Số lượng
+            reduce_only: True nếu đóng position
+            client_order_id: Client order id (idempotent khi retry)
+
+        Returns:
+            dict hoặc None: Order info nếu thành công
+        """
+        pass
+
+    async def create_market_orders(self, orders: List[Dict[str, Any]]) -> List[Optional[Dict]]:
+        """
+        Gửi nhiều market orders song song (xem BaseExchangeClient.create_market_orders)
+
+        Returns:
+            list: Order info hoặc None (lỗi), cùng thứ tự với orders
+        """
+        chunks = [orders[i:i + BATCH_ORDER_LIMIT] for i in range(0, len(orders), BATCH_ORDER_LIMIT)]
+        results = await asyncio.gather(*(self._submit_order_chunk(chunk) for chunk in chunks))
+        return [order for chunk in results for order in chunk]
+
+    async def _submit_order_chunk(self, chunk: List[Dict[str, Any]]) -> List[Optional[Dict]]:
+        # Copy + client order id trước khi build batch: batch và lookup khi gửi lại dùng cùng id
+        chunk = [{**o, 'client_order_id': o.get('client_order_id') or new_client_order_id()} for o in chunk]
+        quantities = await asyncio.gather(*(self.format_quantity(o['symbol'], o['quantity']) for o in chunk))
+        batch = [batch_order_params(o, q) for o, q in zip(chunk, quantities)]
+        lookup = False
+        try:
+            response = await self._place_batch_orders(batch)
+        except Exception as e:
+            # Không biết orders nào đã tới exchange -> tra theo client order id trước khi gửi lại
+            logger.warning(f"⚠️ [{self.exchange_name}] Batch orders failed ({e}), submitting individually")
+            response = None
+            lookup = True
+
+        if response is not None:
+            return parse_batch_response(chunk, response, self.exchange_name)
+
+        return list(await asyncio.gather(*(self._submit_single_order(o, lookup) for o in chunk)))
+
+    async def _submit_single_order(self, order: Dict[str, Any], lookup: bool = False) -> Optional[Dict]:
+        try:
+            if lookup:
+                existing = await self.get_order(order['symbol'], order['client_order_id'])
+                if existing is not None:
+                    return existing
+            return await self.create_market_order(
+                order['symbol'], order['side'], order['quantity'],
+                reduce_only=order.get('reduce_only', False),
+                client_order_id=order['client_order_id']
+            )
+        except Exception as e:
+            logger.error(f"[{self.exchange_name}] Order {order['side']} {order['symbol']} failed: {e}")
+            return None
+
+    async def _place_batch_orders(self, batch: List[Dict[str, str]]) -> Optional[List[Dict]]:
+        """POST batchOrders (None nếu exchange không hỗ trợ batch)"""
+        return None
+
+    async def close_positions(self, positions: Dict[str, Dict[str, Any]]) -> Dict[str, Optional[Dict]]:
+        """Đóng nhiều positions cùng lúc (reduce-only, song song)"""
+        orders = close_orders(positions)
+        return dict(zip(positions.keys(), await self.create_market_orders(orders)))
+
+    @abstractmethod
+    async def get_order(self, symbol: str, client_order_id: str) -> Optional[Dict]:
+        """
+        Lấy order theo client order id
+
+        Args:
+            symbol: Trading pair
+            client_order_id: Client order id đã gửi khi tạo order
+
+        Returns:
+            dict hoặc None: Order info, None nếu không tồn tại
+        """
+        pass
+
+    @abstractmethod
+    async def close_position(self, symbol: str, position: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Đóng toàn bộ position
+
+        Args:
+            symbol: Trading pair
+            position: Position đã biết (vd. từ AccountSnapshot) để khỏi fetch lại
+
+        Returns:
+            bool: True nếu thành công
+        """
+        pass
+
+    @abstractmethod
+    async def start_user_stream(self) -> str:
+        """
+        Tạo listen key cho user-data stream
+
+        Returns:
+            str: Listen key (raise nếu lỗi)
+        """
+        pass
+
+    @abstractmethod
+    async def keepalive_user_stream(self, listen_key: str):
+        """Gia hạn listen key (hết hạn sau 60 phút nếu không keep-alive)"""
+        pass
+
+    @abstractmethod
+    async def close_user_stream(self, listen_key: str):
+        """Đóng listen key"""
+        pass
+
+    @abstractmethod
+    async def _get_symbol_info(self, symbol: str) -> Optional[Dict]:
+        """
+        Lấy thông tin symbol từ exchange (precision, filters, etc.)
+        Nên implement caching để tránh API calls không cần thiết
+
+        Args:
+            symbol: Trading pair
+
+        Returns:
+            dict hoặc None: Symbol info
+        """
+        pass
+
+    def get_exchange_name(self) -> str:
+        """Trả về tên exchange"""
+        return self.exchange_name
+
+    def is_testnet(self) -> bool:
+        """Kiểm tra có đang dùng testnet không"""
+        return self.testnet
+
+    def log_connection_info(self):
+        """Log thông tin kết nối (để subclass override)"""
+        mode = "TESTNET" if self.testnet else "MAINNET"
+        logger.info(f"🔌 {self.exchange_name} Async Client initialized ({mode})")
@@ -0,0 +1,378 @@
+# ============================================
+# 🔌 ASYNC BINANCE CLIENT
+# Binance Futures client trên asyncio (aiohttp)
+# ============================================
+
+import asyncio
+from binance.exceptions import BinanceAPIException
+from config import Config
+from utils.logger import logger
+from trading.async_base_exchange import AsyncBaseExchangeClient
+from trading.exchange_info import ExchangeInfoIndex
+from trading.http_session import create_connector
+from trading.rate_limiter import AsyncRateLimitedClient, get_rate_limiter
+
+
+class AsyncBinanceClient(AsyncBaseExchangeClient):
+    """
+    Async Binance Futures Client
+    Cùng behavior với BinanceClient nhưng non-blocking.
+
+    Phải được khởi tạo bên trong event loop đang chạy, vì aiohttp session
+    được gắn với loop đó.
+    """
+
+    EXCHANGE_NAME = "Binance"
+
+    # Binance Futures URLs
+    MAINNET_URL = 'https://fapi.binance.com'
+    TESTNET_URL = 'https://testnet.binancefuture.com'
+
+    def __init__(self, api_key=None, api_secret=None, testnet=None):
+        # Get credentials (sử dụng BINANCE_ prefix)
+        api_key = api_key or Config.BINANCE_API_KEY
+        api_secret = api_secret or Config.BINANCE_API_SECRET
+        testnet = testnet if testnet is not None else Config.BINANCE_TESTNET_MODE
+
+        # Initialize base class
+        super().__init__(api_key, api_secret, testnet)
+
+        # Set exchange name
+        self.exchange_name = self.EXCHANGE_NAME
+
+        # Rate limiter + exchange info dùng chung với sync client cùng exchange
+        self.venue = f"{self.exchange_name.lower()}_{'testnet' if self.testnet else 'mainnet'}"
+
+        # Initialize async Binance client (1 aiohttp session = 1 keep-alive connection pool)
+        self.client = self._create_client()
+
+        # Trading rules của tất cả symbols (cùng file cache với sync client).
+        # Không truyền fetch: refresh bằng await _refresh_exchange_info()
+        self.exchange_info = ExchangeInfoIndex(self.venue)
+
+        # Log connection info
+        self.log_connection_info()
+
+    def _create_client(self):
+        """Tạo python-binance AsyncClient với connection pool giới hạn"""
+        connector = create_connector()
+        return AsyncRateLimitedClient(
+            self.api_key,
+            self.api_secret,
+            get_rate_limiter(self.venue),
+            testnet=self.testnet,
+            loop=asyncio.get_running_loop(),
+            session_params={'connector': connector}
+        )
+
+    def log_connection_info(self):
+        """Log thông tin kết nối"""
+        mode = "TESTNET" if self.testnet else "MAINNET"
+        base_url = self.TESTNET_URL if self.testnet else self.MAINNET_URL
+        if Config.SIMULATOR_URL:
+            base_url = self.client.FUTURES_URL
+        logger.info(f"🔌 {self.exchange_name} Async Client initialized ({mode})")
+        logger.info(f"   URL: {base_url}")
+
+    async def close(self):
+        """Đóng aiohttp session"""
+        if self.client is not None:
+            await self.client.close_connection()
+
+    def _position_leverage(self, pos):
+        """Leverage dùng để tính PnL% cho 1 position"""
+        return int(pos.get('leverage', Config.BINANCE_LEVERAGE))
+
+    async def get_account_balance(self):
+        """Lấy balance USDT"""
+        try:
+            balances = await self.client.futures_account_balance()
+            usdt_balance = next((b for b in balances if b['asset'] == 'USDT'), None)
+
+            if usdt_balance:
+                return float(usdt_balance['balance'])
+            return 0.0
+
+        except BinanceAPIException as e:
+            logger.error(f"[{self.exchange_name}] Get balance error: {e}")
+            return 0.0
+        except Exception as e:
+            logger.error(f"[{self.exchange_name}] Unexpected error getting balance: {e}")
+            return 0.0
+
+    def _parse_position(self, pos):
+        """
+        Parse 1 entry của futures_position_information
+
+        Returns:
+            dict hoặc None (nếu positionAmt = 0)
+        """
+        amt = float(pos['positionAmt'])
+        if amt == 0:
+            return None
+
+        entry_price = float(pos['entryPrice'])
+        mark_price = float(pos['markPrice'])
+        leverage = self._position_leverage(pos)
+
+        # Calculate PnL % (WITH LEVERAGE for actual PnL)
+        if amt > 0:  # LONG
+            price_change_pct = (mark_price - entry_price) / entry_price
+            side = 'LONG'
+        else:  # SHORT
+            price_change_pct = (entry_price - mark_price) / entry_price
+            side = 'SHORT'
+
+        return {
+            'side': side,
+            'amount': abs(amt),
+            'entry_price': entry_price,
+            'mark_price': mark_price,
+            'pnl_pct': price_change_pct * leverage,  # Includes leverage effect
+            'pnl_usdt': float(pos['unRealizedProfit'])
+        }
+
+    async def get_position(self, symbol):
+        """
+        Lấy thông tin position
+
+        Returns:
+            dict hoặc None: {
+                'side': 'LONG' | 'SHORT',
+                'amount': float,
+                'entry_price': float,
+                'mark_price': float,
+                'pnl_pct': float,
+                'pnl_usdt': float
+            }
+        """
+        try:
+            positions = await self.client.futures_position_information(symbol=symbol)
+
+            for pos in positions:
+                position = self._parse_position(pos)
+                if position is not None:
+                    return position
+
+            return None
+
+        except BinanceAPIException as e:
+            logger.error(f"[{self.exchange_name}] Get position error: {e}")
+            return None
+
+    async def get_all_positions(self):
+        """
+        Lấy tất cả positions đang mở trong 1 request
+
+        Returns:
+            dict hoặc None: {symbol: position}, None nếu request lỗi
+        """
+        try:
+            positions = await self.client.futures_position_information()
+
+            # positionRisk có leverage / marginType của mọi symbol
+            self.account_config.load_positions(positions)
+
+            result = {}
+            for pos in positions:
+                position = self._parse_position(pos)
+                if position is not None:
+                    result[pos['symbol']] = position
+
+            return result
+
+        except BinanceAPIException as e:
+            logger.error(f"[{self.exchange_name}] Get all positions error: {e}")
+            return None
+
+    async def get_klines(self, symbol, interval='1m', limit=100):
+        """Lấy candlestick data"""
+        try:
+            return await self.client.futures_klines(
+                symbol=symbol,
+                interval=interval,
+                limit=limit
+            )
+        except BinanceAPIException as e:
+            logger.error(f"[{self.exchange_name}] Get klines error: {e}")
+            return []
+
+    async def get_orderbook(self, symbol, limit=10):
+        """Lấy order book"""
+        try:
+            return await self.client.futures_order_book(symbol=symbol, limit=limit)
+        except BinanceAPIException as e:
+            # Symbol unavailable (skip silently)
+            if e.code == -1121 or e.code == -4108:
+                logger.warning(f"[{self.exchange_name}] Symbol {symbol} temporarily unavailable, skipping...")
+            else:
+                logger.error(f"[{self.exchange_name}] Get orderbook error: {e}")
+            return {'bids': [], 'asks': []}
+
+    async def get_ticker_price(self, symbol):
+        """Lấy giá hiện tại"""
+        try:
+            ticker = await self.client.futures_symbol_ticker(symbol=symbol)
+            return float(ticker['price'])
+        except BinanceAPIException as e:
+            logger.error(f"[{self.exchange_name}] Get ticker error: {e}")
+            return 0.0
+
+    async def set_leverage(self, symbol, leverage):
+        """Set leverage"""
+        try:
+            await self.client.futures_change_leverage(symbol=symbol, leverage=leverage)
+            self.account_config.set_leverage(symbol, leverage)
+            logger.info(f"✅ [{self.exchange_name}] Set leverage {leverage}x for {symbol}")
+            return True
+        except BinanceAPIException as e:
+            logger.error(f"[{self.exchange_name}] Set leverage error: {e}")
+            return False
+
+    async def set_margin_type(self, symbol, margin_type='ISOLATED'):
+        """Set margin type"""
+        try:
+            await self.client.futures_change_margin_type(symbol=symbol, marginType=margin_type)
+            self.account_config.set_margin_type(symbol, margin_type)
+            logger.info(f"✅ [{self.exchange_name}] Set margin type {margin_type} for {symbol}")
+            return True
+        except BinanceAPIException as e:
+            # Ignore nếu đã set rồi
+            if 'No need to change margin type' in str(e):
+                self.account_config.set_margin_type(symbol, margin_type)
+                return True
+            logger.warning(f"[{self.exchange_name}] Set margin type warning: {e}")
+            return False
+
+    async def _get_symbol_info(self, symbol):
+        """
+        Raw symbol info với caching (1 lần download cache tất cả symbols).
+        Trading rules (step size, min notional) -> dùng self.exchange_info.
+        """
+        if symbol not in self._symbol_info_cache:
+            try:
+                exchange_info = await self.client.futures_exchange_info()
+                self.exchange_info.update(exchange_info)
+                for s in exchange_info['symbols']:
+                    self._symbol_info_cache[s['symbol']] = s
+            except Exception as e:
+                logger.error(f"[{self.exchange_name}] Error getting symbol info: {e}")
+                return None
+        return self._symbol_info_cache.get(symbol)
+
+    async def _refresh_exchange_info(self):
+        """Download exchange info vào index (khi hết TTL hoặc thiếu symbol)"""
+        try:
+            self.exchange_info.update(await self.client.futures_exchange_info())
+        except Exception as e:
+            logger.error(f"[{self.exchange_name}] Error refreshing exchange info: {e}")
+
+    async def format_quantity(self, symbol, quantity):
+        """Format quantity according to symbol's LOT_SIZE filter"""
+        try:
+            filters = self.exchange_info.get(symbol)
+            if filters is None or self.exchange_info.is_expired():
+                await self._refresh_exchange_info()
+                filters = self.exchange_info.get(symbol)
+
+            if filters is None:
+                # Default to 3 decimals if can't get info
+                return round(quantity, 3)
+
+            return filters.format_quantity(quantity)
+
+        except Exception as e:
+            logger.error(f"[{self.exchange_name}] Error formatting quantity: {e}")
+            return round(quantity, 3)  # Safe default
+
+    async def create_market_order(self, symbol, side, quantity, reduce_only=False, client_order_id=None):
+        """
+        Tạo market order
+
+        Args:
+            symbol: Trading pair
+            side: 'BUY' hoặc 'SELL'
+            quantity: Số lượng (will be formatted to correct precision)
+            reduce_only: True nếu đóng position
+            client_order_id: newClientOrderId (retry cùng id không tạo order thứ 2)
+        """
+        try:
+            # Format quantity to correct precision
+            formatted_qty = await self.format_quantity(symbol, quantity)
+
+            logger.info(f"📝 [{self.exchange_name}] Order: {side} {symbol}")
+            logger.info(f"   Raw qty: {quantity:.8f} -> Formatted: {formatted_qty}")
+
+            params = {
+                'symbol': symbol,
+                'side': side,
+                'type': 'MARKET',
+                'quantity': formatted_qty
+            }
+
+            if reduce_only:
+                params['reduceOnly'] = True
+            if client_order_id:
+                params['newClientOrderId'] = client_order_id
+
+            order = await self.client.futures_create_order(**params)
+
+            logger.info(f"✅ [{self.exchange_name}] Order created: {side} {formatted_qty} {symbol}")
+            return order
+
+        except BinanceAPIException as e:
+            logger.error(f"[{self.exchange_name}] Create order error: {e}")
+            logger.error(f"   Symbol: {symbol}, Side: {side}, Qty: {quantity}")
+            return None
+
+    async def _place_batch_orders(self, batch):
+        """POST /fapi/v1/batchOrders (tối đa 5 orders)"""
+        return await self.client.futures_place_batch_order(batchOrders=batch)
+
+    async def get_order(self, symbol, client_order_id):
+        """Order theo client order id (None nếu exchange không có order này)"""
+        try:
+            return await self.client.futures_get_order(symbol=symbol, origClientOrderId=client_order_id)
+        except BinanceAPIException as e:
+            if e.code != -2013:  # Order does not exist
+                logger.error(f"[{self.exchange_name}] Get order error: {e}")
+            return None
+
+    async def close_position(self, symbol, position=None):
+        """
+        Đóng toàn bộ position
+
+        Args:
+            symbol: Trading pair
+            position: Position đã biết (từ AccountSnapshot / get_position) để khỏi fetch lại
+        """
+        pos = position if position is not None else await self.get_position(symbol)
+
+        if not pos:
+            logger.info(f"[{self.exchange_name}] No position to close for {symbol}")
+            return True
+
+        # Determine close side
+        close_side = 'SELL' if pos['side'] == 'LONG' else 'BUY'
+
+        # Close order
+        order = await self.create_market_order(
+            symbol=symbol,
+            side=close_side,
+            quantity=pos['amount'],
+            reduce_only=True
+        )
+
+        return order is not None
+
+    async def start_user_stream(self):
+        """Tạo listen key cho user-data stream"""
+        return await self.client.futures_stream_get_listen_key()
+
+    async def keepalive_user_stream(self, listen_key):
+        """Gia hạn listen key"""
+        await self.client.futures_stream_keepalive(listenKey=listen_key)
+
+    async def close_user_stream(self, listen_key):
+        """Đóng listen key"""
+        await self.client.futures_stream_close(listenKey=listen_key)
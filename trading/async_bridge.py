@@ -0,0 +1,185 @@
+# ============================================
+# 🌉 ASYNC -> SYNC CLIENT BRIDGE
+# Cho phép code blocking (SignalGenerator, bot._process_symbol)
+# dùng async client chạy trên event loop
+# ============================================
+
+import asyncio
+import threading
+from typing import Dict, Optional
+from utils.logger import logger
+from trading.base_exchange import BaseExchangeClient
+
+
+class AsyncClientBridge(BaseExchangeClient):
+    """
+    Sync facade (BaseExchangeClient) bọc 1 AsyncBaseExchangeClient.
+
+    - Market data (klines, orderbook) được prefetch song song trên event loop
+      bằng prefetch(), sau đó serve từ memory cho worker thread. Positions
+      đến từ AccountSnapshot của bot, không fetch theo từng symbol.
+    - Các call khác (orders, leverage, ...) được forward sang event loop bằng
+      asyncio.run_coroutine_threadsafe.
+
+    Chỉ gọi các method sync từ worker thread (asyncio.to_thread), KHÔNG gọi
+    từ chính event loop thread (sẽ deadlock).
+    """
+
+    def __init__(self, async_client, loop: asyncio.AbstractEventLoop):
+        """
+        Args:
+            async_client: AsyncBaseExchangeClient instance
+            loop: Event loop mà async_client đang chạy trên
+        """
+        super().__init__(async_client.api_key, async_client.api_secret, async_client.testnet)
+        self.async_client = async_client
+        self.loop = loop
+        self.exchange_name = async_client.exchange_name
+
+        # Dùng chung state cache: ensure_symbol_config() không cần qua event loop
+        # khi leverage / margin type đã đúng
+        self.account_config = async_client.account_config
+
+        # Prefetched data per symbol: {symbol: {'klines': {interval: (limit, klines)}, 'orderbook': (limit, dict)}}
+        self._prefetched = {}
+        self._lock = threading.Lock()
+
+    # ============================================
+    # PREFETCH (chạy trên event loop)
+    # ============================================
+
+    async def prefetch(self, symbol: str, kline_requests: Dict[str, int],
+                       position: Optional[dict] = None, orderbook_limit: int = 10):
+        """
+        Prefetch market data cho 1 symbol (song song)
+
+        Market data chỉ được tải khi không có position (giống luồng _process_symbol).
+
+        Args:
+            symbol: Trading pair
+            kline_requests: {interval: limit}
+            position: Position hiện tại của symbol (từ AccountSnapshot)
+            orderbook_limit: Độ sâu order book
+        """
+        data = {'klines': {}, 'orderbook': None}
+
+        if position is None:
+            # Intervals đã có trong candle store (kline stream) không cần REST
+            intervals = [
+                (interval, limit) for interval, limit in kline_requests.items()
+                if self.candle_store is None or not self.candle_store.is_ready(symbol, interval, limit)
+            ]
+            results = await asyncio.gather(
+                *(self.async_client.get_klines(symbol, interval=i, limit=l) for i, l in intervals),
+                self.async_client.get_orderbook(symbol, limit=orderbook_limit)
+            )
+            for (interval, limit), klines in zip(intervals, results[:-1]):
+                data['klines'][interval] = (limit, klines)
+            data['orderbook'] = (orderbook_limit, results[-1])
+
+        with self._lock:
+            self._prefetched[symbol] = data
+
+    def release(self, symbol: str):
+        """Xoá prefetched data sau khi xử lý xong symbol"""
+        with self._lock:
+            self._prefetched.pop(symbol, None)
+
+    def _get_prefetched(self, symbol: str) -> Optional[dict]:
+        with self._lock:
+            return self._prefetched.get(symbol)
+
+    def _call(self, coro):
+        """Chạy coroutine trên event loop và chờ kết quả (từ worker thread)"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    # ============================================
+    # BaseExchangeClient interface
+    # ============================================
+
+    def get_account_balance(self):
+        return self._call(self.async_client.get_account_balance())
+
+    def get_position(self, symbol):
+        return self._call(self.async_client.get_position(symbol))
+
+    def get_all_positions(self):
+        return self._call(self.async_client.get_all_positions())
+
+    def get_account_snapshot(self):
+        return self._call(self.async_client.get_account_snapshot())
+
+    def get_klines(self, symbol, interval='1m', limit=100):
+        if self.candle_store is not None:
+            klines = self.candle_store.get_klines(symbol, interval, limit)
+            if klines is not None:
+                return klines
+
+        data = self._get_prefetched(symbol)
+        if data is not None and interval in data['klines']:
+            fetched_limit, klines = data['klines'][interval]
+            if limit <= fetched_limit:
+                return klines[-limit:]
+        logger.debug(f"[{self.exchange_name}] Klines cache miss {symbol} {interval} x{limit}, fetching live")
+        return self._call(self.async_client.get_klines(symbol, interval=interval, limit=limit))
+
+    def get_orderbook(self, symbol, limit=10):
+        data = self._get_prefetched(symbol)
+        if data is not None and data['orderbook'] is not None:
+            fetched_limit, orderbook = data['orderbook']
+            if limit <= fetched_limit:
+                return {'bids': orderbook.get('bids', [])[:limit], 'asks': orderbook.get('asks', [])[:limit]}
+        return self._call(self.async_client.get_orderbook(symbol, limit=limit))
+
+    def get_cached_price(self, symbol, interval):
+        price = super().get_cached_price(symbol, interval)
+        if price is not None:
+            return price
+
+        data = self._get_prefetched(symbol)
+        if data is not None and data['klines'].get(interval):
+            _, klines = data['klines'][interval]
+            if klines:
+                return float(klines[-1][4])
+        return None
+
+    def get_ticker_price(self, symbol):
+        return self._call(self.async_client.get_ticker_price(symbol))
+
+    def set_leverage(self, symbol, leverage):
+        return self._call(self.async_client.set_leverage(symbol, leverage))
+
+    def set_margin_type(self, symbol, margin_type='ISOLATED'):
+        return self._call(self.async_client.set_margin_type(symbol, margin_type))
+
+    def format_quantity(self, symbol, quantity):
+        return self._call(self.async_client.format_quantity(symbol, quantity))
+
+    def create_market_order(self, symbol, side, quantity, reduce_only=False, client_order_id=None):
+        return self._call(self.async_client.create_market_order(
+            symbol, side, quantity, reduce_only=reduce_only, client_order_id=client_order_id
+        ))
+
+    def get_order(self, symbol, client_order_id):
+        return self._call(self.async_client.get_order(symbol, client_order_id))
+
+    def create_market_orders(self, orders):
+        return self._call(self.async_client.create_market_orders(orders))
+
+    def close_position(self, symbol, position=None):
+        return self._call(self.async_client.close_position(symbol, position=position))
+
+    def _get_symbol_info(self, symbol):
+        return self._call(self.async_client._get_symbol_info(symbol))
+
+    def _parse_position(self, pos):
+        return self.async_client._parse_position(pos)
+
+    def start_user_stream(self):
+        return self._call(self.async_client.start_user_stream())
+
+    def keepalive_user_stream(self, listen_key):
+        return self._call(self.async_client.keepalive_user_stream(listen_key))
+
+    def close_user_stream(self, listen_key):
+        return self._call(self.async_client.close_user_stream(listen_key))
@@ -3,9 +3,88 @@
 # Abstract interface cho tất cả exchanges
 # ============================================
 
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Any
+from config import Config
 from utils.logger import logger
+from trading.account_config import AccountConfigCache
+from trading.execution import new_client_order_id
+
+
+# Số orders tối đa mỗi request batchOrders (Binance / AsterDEX)
+BATCH_ORDER_LIMIT = 5
+
+
+def close_orders(positions: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Reduce-only market orders đóng các positions
+
+    Args:
+        positions: {symbol: position dict}
+
+    Returns:
+        list: [{'symbol', 'side', 'quantity', 'reduce_only', 'client_order_id'}]
+    """
+    return [{
+        'symbol': symbol,
+        'side': 'SELL' if pos['side'] == 'LONG' else 'BUY',
+        'quantity': pos['amount'],
+        'reduce_only': True,
+        'client_order_id': new_client_order_id()
+    } for symbol, pos in positions.items()]
+
+
+def batch_order_params(order: Dict[str, Any], quantity: float) -> Dict[str, str]:
+    """1 phần tử của batchOrders (mọi value là string)"""
+    params = {
+        'symbol': order['symbol'],
+        'side': order['side'],
+        'type': 'MARKET',
+        'quantity': str(quantity),
+    }
+    if order.get('reduce_only'):
+        params['reduceOnly'] = 'true'
+    if order.get('client_order_id'):
+        params['newClientOrderId'] = order['client_order_id']
+    return params
+
+
+def parse_batch_response(chunk: List[Dict[str, Any]], response: List[Dict[str, Any]],
+                         exchange_name: str = '') -> List[Optional[Dict]]:
+    """Response batchOrders -> order hoặc None (lỗi) theo thứ tự chunk"""
+    results = []
+    for order, item in zip(chunk, response):
+        if 'code' in item and 'orderId' not in item:
+            logger.error(f"[{exchange_name}] Batch order {order['side']} {order['symbol']} error: {item.get('msg')}")
+            results.append(None)
+        else:
+            results.append(item)
+    results.extend([None] * (len(chunk) - len(results)))
+    return results
+
+
+@dataclass
+class AccountSnapshot:
+    """
+    Balance + tất cả positions đang mở của 1 exchange, lấy 1 lần mỗi loop.
+    Thay cho việc gọi get_position() riêng cho từng symbol.
+    """
+    balance: float
+    positions: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # {symbol: position dict}
+    timestamp: float = field(default_factory=time.time)
+
+    def get_position(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Position của symbol (None nếu không có)"""
+        return self.positions.get(symbol)
+
+    def active_symbols(self, symbols: Optional[List[str]] = None) -> List[str]:
+        """Symbols đang có position (lọc theo symbols nếu truyền vào)"""
+        if symbols is None:
+            return list(self.positions.keys())
+        return [s for s in symbols if s in self.positions]
 
 
 class BaseExchangeClient(ABC):
@@ -32,6 +111,15 @@ class BaseExchangeClient(ABC):
         self.client = None
         self.exchange_name = "BaseExchange"
 
+        # CandleStore (kline websocket streams), get_klines đọc từ đây trước REST
+        self.candle_store = None
+
+        # KlineCache (REST delta fetching), set bởi subclass nếu USE_KLINE_CACHE
+        self.kline_cache = None
+
+        # Leverage / margin type hiện tại mỗi symbol (nạp từ get_all_positions)
+        self.account_config = AccountConfigCache()
+
     @abstractmethod
     def get_account_balance(self) -> float:
         """
@@ -62,6 +150,30 @@ class BaseExchangeClient(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_all_positions(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Lấy tất cả positions đang mở trong 1 request
+        (futures_position_information không truyền symbol)
+
+        Returns:
+            dict hoặc None: {symbol: position dict như get_position()},
+                            None nếu request lỗi
+        """
+        pass
+
+    def get_account_snapshot(self) -> Optional[AccountSnapshot]:
+        """
+        Lấy balance + tất cả positions (2 requests cho cả account)
+
+        Returns:
+            AccountSnapshot hoặc None nếu không lấy được positions
+        """
+        positions = self.get_all_positions()
+        if positions is None:
+            return None
+        return AccountSnapshot(balance=self.get_account_balance(), positions=positions)
+
     @abstractmethod
     def get_klines(self, symbol: str, interval: str = '1m', limit: int = 100) -> List[List]:
         """
@@ -132,6 +244,38 @@ class BaseExchangeClient(ABC):
         """
         pass
 
+    def ensure_symbol_config(self, symbol: str, leverage: int, margin_type: str = 'ISOLATED') -> bool:
+        """
+        Đảm bảo leverage + margin type của symbol, chỉ gửi request cho phần
+        khác với account_config (thường là 0 request trước khi đặt lệnh)
+
+        Args:
+            symbol: Trading pair
+            leverage: Đòn bẩy
+            margin_type: 'ISOLATED' hoặc 'CROSSED'
+
+        Returns:
+            bool: True nếu config đã đúng hoặc set thành công
+        """
+        ok = True
+        if self.account_config.needs_leverage(symbol, leverage):
+            ok = self.set_leverage(symbol, leverage)
+        if self.account_config.needs_margin_type(symbol, margin_type):
+            ok = self.set_margin_type(symbol, margin_type) and ok
+        return ok
+
+    def get_cached_price(self, symbol: str, interval: str) -> Optional[float]:
+        """
+        Giá gần nhất đã có trong memory (không request), vd. close của candle
+        đang hình thành trong candle store
+
+        Returns:
+            float hoặc None nếu không có data
+        """
+        if self.candle_store is None:
+            return None
+        return self.candle_store.last_close(symbol, interval)
+
     @abstractmethod
     def format_quantity(self, symbol: str, quantity: float) -> float:
         """
@@ -148,7 +292,8 @@ class BaseExchangeClient(ABC):
 
     @abstractmethod
     def create_market_order(self, symbol: str, side: str, quantity: float,
-                          reduce_only: bool = False) -> Optional[Dict]:
+                          reduce_only: bool = False,
+                          client_order_id: Optional[str] = None) -> Optional[Dict]:
         """
         Tạo market order
 
@@ -157,25 +302,137 @@ class BaseExchangeClient(ABC):
             side: 'BUY' hoặc 'SELL'
             quantity: Số lượng
             reduce_only: True nếu đóng position
+            client_order_id: Client order id (idempotent khi retry)
 
         Returns:
             dict hoặc None: Order info nếu thành công
         """
         pass
 
+    def create_market_orders(self, orders: List[Dict[str, Any]]) -> List[Optional[Dict]]:
+        """
+        Gửi nhiều market orders song song: batchOrders (tối đa
+        BATCH_ORDER_LIMIT / request) nếu exchange hỗ trợ, không thì từng
+        order đồng thời (pacing do rate limiter của client)
+
+        Args:
+            orders: [{'symbol', 'side', 'quantity', 'reduce_only'?, 'client_order_id'?}]
+
+        Returns:
+            list: Order info hoặc None (lỗi), cùng thứ tự với orders
+        """
+        if not orders:
+            return []
+
+        chunks = [orders[i:i + BATCH_ORDER_LIMIT] for i in range(0, len(orders), BATCH_ORDER_LIMIT)]
+        with ThreadPoolExecutor(max_workers=min(len(chunks), Config.BULK_ORDER_WORKERS)) as pool:
+            results = list(pool.map(self._submit_order_chunk, chunks))
+        return [order for chunk in results for order in chunk]
+
+    def _submit_order_chunk(self, chunk: List[Dict[str, Any]]) -> List[Optional[Dict]]:
+        # Copy + client order id trước khi build batch: batch và lookup khi gửi lại dùng cùng id
+        chunk = [{**o, 'client_order_id': o.get('client_order_id') or new_client_order_id()} for o in chunk]
+        batch = [batch_order_params(o, self.format_quantity(o['symbol'], o['quantity'])) for o in chunk]
+        lookup = False
+        try:
+            response = self._place_batch_orders(batch)
+        except Exception as e:
+            # Không biết orders nào đã tới exchange -> tra theo client order id trước khi gửi lại
+            logger.warning(f"⚠️ [{self.exchange_name}] Batch orders failed ({e}), submitting individually")
+            response = None
+            lookup = True
+
+        if response is not None:
+            return parse_batch_response(chunk, response, self.exchange_name)
+
+        with ThreadPoolExecutor(max_workers=len(chunk)) as pool:
+            return list(pool.map(lambda o: self._submit_single_order(o, lookup), chunk))
+
+    def _submit_single_order(self, order: Dict[str, Any], lookup: bool = False) -> Optional[Dict]:
+        try:
+            if lookup:
+                existing = self.get_order(order['symbol'], order['client_order_id'])
+                if existing is not None:
+                    return existing
+            return self.create_market_order(
+                order['symbol'], order['side'], order['quantity'],
+                reduce_only=order.get('reduce_only', False),
+                client_order_id=order['client_order_id']
+            )
+        except Exception as e:
+            logger.error(f"[{self.exchange_name}] Order {order['side']} {order['symbol']} failed: {e}")
+            return None
+
+    def _place_batch_orders(self, batch: List[Dict[str, str]]) -> Optional[List[Dict]]:
+        """
+        POST batchOrders. Subclass override nếu exchange hỗ trợ.
+
+        Returns:
+            list response hoặc None nếu không hỗ trợ batch
+        """
+        return None
+
+    def close_positions(self, positions: Dict[str, Dict[str, Any]]) -> Dict[str, Optional[Dict]]:
+        """
+        Đóng nhiều positions cùng lúc (reduce-only, song song)
+
+        Args:
+            positions: {symbol: position dict} (vd. từ get_all_positions)
+
+        Returns:
+            dict: {symbol: order info hoặc None nếu lỗi}
+        """
+        orders = close_orders(positions)
+        return dict(zip(positions.keys(), self.create_market_orders(orders)))
+
     @abstractmethod
-    def close_position(self, symbol: str) -> bool:
+    def get_order(self, symbol: str, client_order_id: str) -> Optional[Dict]:
+        """
+        Lấy order theo client order id
+
+        Args:
+            symbol: Trading pair
+            client_order_id: Client order id đã gửi khi tạo order
+
+        Returns:
+            dict hoặc None: Order info, None nếu không tồn tại
+        """
+        pass
+
+    @abstractmethod
+    def close_position(self, symbol: str, position: Optional[Dict[str, Any]] = None) -> bool:
         """
         Đóng toàn bộ position
 
         Args:
             symbol: Trading pair
+            position: Position đã biết (vd. từ AccountSnapshot) để khỏi fetch lại
 
         Returns:
             bool: True nếu thành công
         """
         pass
 
+    @abstractmethod
+    def start_user_stream(self) -> str:
+        """
+        Tạo listen key cho user-data stream
+
+        Returns:
+            str: Listen key (raise nếu lỗi)
+        """
+        pass
+
+    @abstractmethod
+    def keepalive_user_stream(self, listen_key: str):
+        """Gia hạn listen key (hết hạn sau 60 phút nếu không keep-alive)"""
+        pass
+
+    @abstractmethod
+    def close_user_stream(self, listen_key: str):
+        """Đóng listen key"""
+        pass
+
     @abstractmethod
     def _get_symbol_info(self, symbol: str) -> Optional[Dict]:
         """
@@ -3,11 +3,13 @@
 # Official Binance Futures client
 # ============================================
 
-from binance.client import Client
 from binance.exceptions import BinanceAPIException
 import time
 from config import Config
 from utils.logger import logger
+from trading.kline_cache import kline_cache
+from trading.exchange_info import ExchangeInfoIndex
+from trading.rate_limiter import RateLimitedClient, get_rate_limiter
 from trading.base_exchange import BaseExchangeClient
 
 
@@ -33,12 +35,21 @@ class BinanceClient(BaseExchangeClient):
         # Set exchange name
         self.exchange_name = "Binance"
 
-        # Initialize Binance client
-        self.client = Client(self.api_key, self.api_secret)
+        # Initialize Binance client (requests đi qua rate limiter chung của exchange)
+        venue = f"{self.exchange_name.lower()}_{'testnet' if self.testnet else 'mainnet'}"
+        self.client = RateLimitedClient(self.api_key, self.api_secret, get_rate_limiter(venue))
+
+        # Delta-fetching kline cache (chung cho mọi client)
+        self.kline_cache = kline_cache if Config.USE_KLINE_CACHE else None
+
+        # Trading rules của tất cả symbols (data/exchange_info_*.json)
+        self.exchange_info = ExchangeInfoIndex(venue, self.client.futures_exchange_info)
 
         # Set correct URL
         base_url = self.TESTNET_URL if self.testnet else self.MAINNET_URL
-        if self.testnet:
+        if Config.SIMULATOR_URL:
+            base_url = self.client.FUTURES_URL
+        elif self.testnet:
             self.client.FUTURES_URL = base_url
 
         # Log connection info
@@ -72,6 +83,44 @@ class BinanceClient(BaseExchangeClient):
             logger.error(f"[{self.exchange_name}] Unexpected error getting balance: {e}")
             return 0.0
 
+    def _parse_position(self, pos):
+        """
+        Parse 1 entry của futures_position_information
+
+        Returns:
+            dict hoặc None (nếu positionAmt = 0)
+        """
+        amt = float(pos['positionAmt'])
+        if amt == 0:
+            return None
+
+        entry_price = float(pos['entryPrice'])
+        mark_price = float(pos['markPrice'])
+        unrealized_pnl = float(pos['unRealizedProfit'])
+
+        # Get leverage for this symbol
+        leverage = int(pos.get('leverage', Config.BINANCE_LEVERAGE))
+
+        # Calculate PnL % (WITH LEVERAGE for actual PnL)
+        if amt > 0:  # LONG
+            price_change_pct = (mark_price - entry_price) / entry_price
+            side = 'LONG'
+        else:  # SHORT
+            price_change_pct = (entry_price - mark_price) / entry_price
+            side = 'SHORT'
+
+        # PnL% = Price Change% * Leverage
+        pnl_pct = price_change_pct * leverage
+
+        return {
+            'side': side,
+            'amount': abs(amt),
+            'entry_price': entry_price,
+            'mark_price': mark_price,
+            'pnl_pct': pnl_pct,  # Includes leverage effect
+            'pnl_usdt': unrealized_pnl
+        }
+
     def get_position(self, symbol):
         """
         Lấy thông tin position
@@ -90,35 +139,9 @@ class BinanceClient(BaseExchangeClient):
             positions = self.client.futures_position_information(symbol=symbol)
 
             for pos in positions:
-                amt = float(pos['positionAmt'])
-
-                if amt != 0:
-                    entry_price = float(pos['entryPrice'])
-                    mark_price = float(pos['markPrice'])
-                    unrealized_pnl = float(pos['unRealizedProfit'])
-
-                    # Get leverage for this symbol
-                    leverage = int(pos.get('leverage', Config.BINANCE_LEVERAGE))
-
-                    # Calculate PnL % (WITH LEVERAGE for actual PnL)
-                    if amt > 0:  # LONG
-                        price_change_pct = (mark_price - entry_price) / entry_price
-                        side = 'LONG'
-                    else:  # SHORT
-                        price_change_pct = (entry_price - mark_price) / entry_price
-                        side = 'SHORT'
-
-                    # PnL% = Price Change% * Leverage
-                    pnl_pct = price_change_pct * leverage
-
-                    return {
-                        'side': side,
-                        'amount': abs(amt),
-                        'entry_price': entry_price,
-                        'mark_price': mark_price,
-                        'pnl_pct': pnl_pct,  # Includes leverage effect
-                        'pnl_usdt': unrealized_pnl
-                    }
+                position = self._parse_position(pos)
+                if position is not None:
+                    return position
 
             return None
 
@@ -126,19 +149,57 @@ class BinanceClient(BaseExchangeClient):
             logger.error(f"[{self.exchange_name}] Get position error: {e}")
             return None
 
+    def get_all_positions(self):
+        """
+        Lấy tất cả positions đang mở trong 1 request
+
+        Returns:
+            dict hoặc None: {symbol: position}, None nếu request lỗi
+        """
+        try:
+            positions = self.client.futures_position_information()
+
+            # positionRisk có leverage / marginType của mọi symbol
+            self.account_config.load_positions(positions)
+
+            result = {}
+            for pos in positions:
+                position = self._parse_position(pos)
+                if position is not None:
+                    result[pos['symbol']] = position
+
+            return result
+
+        except BinanceAPIException as e:
+            logger.error(f"[{self.exchange_name}] Get all positions error: {e}")
+            return None
+
     def get_klines(self, symbol, interval='1m', limit=100):
-        """Lấy candlestick data"""
+        """Lấy candlestick data (từ candle store nếu có stream, ngược lại REST)"""
+        if self.candle_store is not None:
+            klines = self.candle_store.get_klines(symbol, interval, limit)
+            if klines is not None:
+                return klines
+
         try:
-            klines = self.client.futures_klines(
-                symbol=symbol,
-                interval=interval,
-                limit=limit
-            )
-            return klines
+            if self.kline_cache is not None:
+                mode = 'testnet' if self.testnet else 'mainnet'
+                return self.kline_cache.get_klines(
+                    f"{self.exchange_name}:{mode}", symbol, interval, limit,
+                    lambda limit, start_time=None: self._fetch_klines(symbol, interval, limit, start_time)
+                )
+            return self._fetch_klines(symbol, interval, limit)
         except BinanceAPIException as e:
             logger.error(f"[{self.exchange_name}] Get klines error: {e}")
             return []
 
+    def _fetch_klines(self, symbol, interval, limit, start_time=None):
+        """REST klines (startTime: chỉ lấy candles từ open time này trở đi)"""
+        params = {'symbol': symbol, 'interval': interval, 'limit': limit}
+        if start_time is not None:
+            params['startTime'] = start_time
+        return self.client.futures_klines(**params)
+
     def get_orderbook(self, symbol, limit=10):
         """Lấy order book"""
         try:
@@ -165,6 +226,7 @@ class BinanceClient(BaseExchangeClient):
         """Set leverage"""
         try:
             self.client.futures_change_leverage(symbol=symbol, leverage=leverage)
+            self.account_config.set_leverage(symbol, leverage)
             logger.info(f"✅ [{self.exchange_name}] Set leverage {leverage}x for {symbol}")
             return True
         except BinanceAPIException as e:
@@ -175,24 +237,28 @@ class BinanceClient(BaseExchangeClient):
         """Set margin type"""
         try:
             self.client.futures_change_margin_type(symbol=symbol, marginType=margin_type)
+            self.account_config.set_margin_type(symbol, margin_type)
             logger.info(f"✅ [{self.exchange_name}] Set margin type {margin_type} for {symbol}")
             return True
         except BinanceAPIException as e:
             # Ignore nếu đã set rồi
             if 'No need to change margin type' in str(e):
+                self.account_config.set_margin_type(symbol, margin_type)
                 return True
             logger.warning(f"[{self.exchange_name}] Set margin type warning: {e}")
             return False
 
     def _get_symbol_info(self, symbol):
-        """Get symbol info with caching"""
+        """
+        Raw symbol info với caching (1 lần download cache tất cả symbols).
+        Trading rules (step size, min notional) -> dùng self.exchange_info.
+        """
         if symbol not in self._symbol_info_cache:
             try:
                 exchange_info = self.client.futures_exchange_info()
+                self.exchange_info.update(exchange_info)
                 for s in exchange_info['symbols']:
-                    if s['symbol'] == symbol:
-                        self._symbol_info_cache[symbol] = s
-                        break
+                    self._symbol_info_cache[s['symbol']] = s
             except Exception as e:
                 logger.error(f"[{self.exchange_name}] Error getting symbol info: {e}")
                 return None
@@ -201,42 +267,18 @@ class BinanceClient(BaseExchangeClient):
     def format_quantity(self, symbol, quantity):
         """Format quantity according to symbol's LOT_SIZE filter"""
         try:
-            symbol_info = self._get_symbol_info(symbol)
-            if not symbol_info:
+            filters = self.exchange_info.get(symbol)
+            if filters is None:
                 # Default to 3 decimals if can't get info
                 return round(quantity, 3)
 
-            # Get LOT_SIZE filter
-            lot_size_filter = next(
-                (f for f in symbol_info['filters'] if f['filterType'] == 'LOT_SIZE'),
-                None
-            )
-
-            if lot_size_filter:
-                step_size = float(lot_size_filter['stepSize'])
-
-                # Calculate precision from step_size
-                # e.g., 0.001 -> 3 decimals, 0.01 -> 2 decimals, 1.0 -> 0 decimals
-                precision = 0
-                if step_size < 1:
-                    precision = len(str(step_size).rstrip('0').split('.')[-1])
-
-                # Round to step_size
-                formatted = round(quantity / step_size) * step_size
-                # Round to precision
-                formatted = round(formatted, precision)
-
-                return formatted
-            else:
-                # Fallback to quantityPrecision
-                qty_precision = symbol_info.get('quantityPrecision', 3)
-                return round(quantity, qty_precision)
+            return filters.format_quantity(quantity)
 
         except Exception as e:
             logger.error(f"[{self.exchange_name}] Error formatting quantity: {e}")
             return round(quantity, 3)  # Safe default
 
-    def create_market_order(self, symbol, side, quantity, reduce_only=False):
+    def create_market_order(self, symbol, side, quantity, reduce_only=False, client_order_id=None):
         """
         Tạo market order
 
@@ -245,6 +287,7 @@ class BinanceClient(BaseExchangeClient):
             side: 'BUY' hoặc 'SELL'
             quantity: Số lượng (will be formatted to correct precision)
             reduce_only: True nếu đóng position
+            client_order_id: newClientOrderId (retry cùng id không tạo order thứ 2)
         """
         try:
             # Format quantity to correct precision
@@ -262,6 +305,8 @@ class BinanceClient(BaseExchangeClient):
 
             if reduce_only:
                 params['reduceOnly'] = True
+            if client_order_id:
+                params['newClientOrderId'] = client_order_id
 
             order = self.client.futures_create_order(**params)
 
@@ -273,9 +318,28 @@ class BinanceClient(BaseExchangeClient):
             logger.error(f"   Symbol: {symbol}, Side: {side}, Qty: {quantity}")
             return None
 
-    def close_position(self, symbol):
-        """Đóng toàn bộ position"""
-        pos = self.get_position(symbol)
+    def _place_batch_orders(self, batch):
+        """POST /fapi/v1/batchOrders (tối đa 5 orders)"""
+        return self.client.futures_place_batch_order(batchOrders=batch)
+
+    def get_order(self, symbol, client_order_id):
+        """Order theo client order id (None nếu exchange không có order này)"""
+        try:
+            return self.client.futures_get_order(symbol=symbol, origClientOrderId=client_order_id)
+        except BinanceAPIException as e:
+            if e.code != -2013:  # Order does not exist
+                logger.error(f"[{self.exchange_name}] Get order error: {e}")
+            return None
+
+    def close_position(self, symbol, position=None):
+        """
+        Đóng toàn bộ position
+
+        Args:
+            symbol: Trading pair
+            position: Position đã biết (từ AccountSnapshot / get_position) để khỏi fetch lại
+        """
+        pos = position if position is not None else self.get_position(symbol)
 
         if not pos:
             logger.info(f"[{self.exchange_name}] No position to close for {symbol}")
@@ -293,3 +357,15 @@ class BinanceClient(BaseExchangeClient):
         )
 
         return order is not None
+
+    def start_user_stream(self):
+        """Tạo listen key cho user-data stream"""
+        return self.client.futures_stream_get_listen_key()
+
+    def keepalive_user_stream(self, listen_key):
+        """Gia hạn listen key"""
+        self.client.futures_stream_keepalive(listenKey=listen_key)
+
+    def close_user_stream(self, listen_key):
+        """Đóng listen key"""
+        self.client.futures_stream_close(listenKey=listen_key)
@@ -0,0 +1,167 @@
+# ============================================
+# 🕯️ CANDLE STORE
+# Ring buffer candles in-memory cho mỗi (symbol, interval)
+# ============================================
+
+import threading
+from collections import deque
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+
+_INTERVAL_UNITS_MS = {'m': 60_000, 'h': 3_600_000, 'd': 86_400_000, 'w': 604_800_000}
+
+
+def interval_to_ms(interval: str) -> Optional[int]:
+    """
+    Độ dài 1 candle theo milliseconds ('15m' -> 900000)
+
+    Returns:
+        int hoặc None nếu interval không cố định (vd. '1M')
+    """
+    unit = _INTERVAL_UNITS_MS.get(interval[-1:])
+    if unit is None or not interval[:-1].isdigit():
+        return None
+    return int(interval[:-1]) * unit
+
+
+class CandleStore:
+    """
+    Lưu klines (cùng format với REST futures_klines) trong deque giới hạn
+    `maxlen` cho mỗi (symbol, interval).
+
+    - update(): apply 1 candle từ websocket. Candle đang hình thành (cùng
+      open time) được thay thế, candle mới được append.
+    - backfill(): nạp klines từ REST (lúc khởi động, reconnect hoặc có gap).
+    - get_klines(): chỉ trả data khi key đã backfill và đủ `limit` candles,
+      ngược lại trả None để caller fallback REST.
+
+    Thread-safe: websocket thread ghi, worker threads của bot đọc.
+    """
+
+    def __init__(self, maxlen: int = 500):
+        """
+        Args:
+            maxlen: Số candles tối đa giữ cho mỗi (symbol, interval)
+        """
+        self.maxlen = maxlen
+        self._buffers: Dict[Tuple[str, str], deque] = {}
+        self._ready = set()
+        self._lock = threading.RLock()
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+
+    def update(self, symbol: str, interval: str, kline: list) -> bool:
+        """
+        Apply 1 candle từ stream
+
+        Args:
+            symbol: Trading pair
+            interval: Timeframe
+            kline: [open_time, open, high, low, close, volume, close_time, ...]
+
+        Returns:
+            bool: False nếu phát hiện gap (thiếu candle) -> cần backfill
+        """
+        key = (symbol, interval)
+
+        with self._lock:
+            buf = self._buffers.get(key)
+            if buf is None:
+                buf = self._buffers[key] = deque(maxlen=self.maxlen)
+
+            if buf:
+                last_open = buf[-1][0]
+                open_time = kline[0]
+
+                if open_time == last_open:
+                    buf[-1] = kline  # Candle đang hình thành
+                    return True
+                if open_time < last_open:
+                    return True  # Update cũ, bỏ qua
+
+                step = interval_to_ms(interval)
+                if key in self._ready and step and open_time - last_open > step:
+                    self._ready.discard(key)
+                    buf.append(kline)
+                    return False
+
+            buf.append(kline)
+            return True
+
+    def backfill(self, symbol: str, interval: str, klines: List[list]):
+        """
+        Nạp klines từ REST. Candles từ stream mới hơn REST được giữ lại.
+
+        Args:
+            symbol: Trading pair
+            interval: Timeframe
+            klines: Klines từ REST (cũ -> mới)
+        """
+        if not klines:
+            return
+
+        key = (symbol, interval)
+
+        with self._lock:
+            buf = deque(klines, maxlen=self.maxlen)
+            last_open = buf[-1][0]
+
+            for kline in self._buffers.get(key, ()):
+                if kline[0] > last_open:
+                    buf.append(kline)
+
+            self._buffers[key] = buf
+            self._ready.add(key)
+
+    def mark_stale(self, keys=None):
+        """
+        Đánh dấu keys cần backfill lại (vd. websocket disconnect)
+
+        Args:
+            keys: List (symbol, interval), None = tất cả
+        """
+        with self._lock:
+            if keys is None:
+                self._ready.clear()
+            else:
+                self._ready.difference_update(keys)
+
+    def is_ready(self, symbol: str, interval: str, limit: int = 1) -> bool:
+        """Key đã backfill và có ít nhất `limit` candles"""
+        key = (symbol, interval)
+        with self._lock:
+            return key in self._ready and len(self._buffers.get(key, ())) >= limit
+
+    def get_klines(self, symbol: str, interval: str, limit: int = 100) -> Optional[List[list]]:
+        """
+        Lấy `limit` candles mới nhất
+
+        Returns:
+            List klines hoặc None (chưa sẵn sàng / không đủ candles)
+        """
+        key = (symbol, interval)
+
+        with self._lock:
+            buf = self._buffers.get(key)
+            if key not in self._ready or buf is None or len(buf) < limit:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return list(islice(buf, len(buf) - limit, None))
+
+    def last_close(self, symbol: str, interval: str) -> Optional[float]:
+        """Close của candle mới nhất (candle đang hình thành = giá gần nhất)"""
+        with self._lock:
+            buf = self._buffers.get((symbol, interval))
+            if (symbol, interval) not in self._ready or not buf:
+                return None
+            return float(buf[-1][4])
+
+    def get_stats(self) -> Dict[str, int]:
+        """Hit/miss counters"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'keys': len(self._ready)}
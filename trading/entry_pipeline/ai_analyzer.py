@@ -189,6 +189,9 @@ class AIEntryAnalyzer:
         AIProvider.GEMINI: "gemini-1.5-flash"
     }
 
+    # Indicator columns đọc từ df
+    REQUIRED_COLUMNS = ['rsi', 'macd', 'atr']
+
     SYSTEM_PROMPT = """You are an expert crypto trading analyst. Analyze the trading setup and provide a quick decision.
 
 You will receive market data including:
@@ -402,6 +405,11 @@ Guidelines:
 Direction: {ml_prediction.direction.value}
 ML Confidence: {ml_prediction.confidence:.2%}
 Model Agreement: {ml_prediction.model_agreement:.2%}"""
+            if ml_prediction.individual_predictions:
+                # Probabilities từng model (cùng lần predict với ML stage, không chạy lại)
+                models = ', '.join(f"{name} {prob:.2f}" for name, prob in ml_prediction.individual_predictions.items())
+                ml_section += f"""
+Model Probabilities (UP): {models} | Weighted: {ml_prediction.ensemble_prob:.2f}"""
         else:
             # Detect direction from price action
             direction = "BULLISH" if df['close'].iloc[-1] > df['close'].iloc[-5] else "BEARISH"
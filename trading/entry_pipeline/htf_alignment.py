@@ -9,6 +9,7 @@ from typing import Dict, Tuple, Optional
 from enum import Enum
 
 from trading.entry_pipeline.models import SignalDirection, StageResult
+from trading.indicator_cache import indicator
 from utils.logger import logger
 
 
@@ -32,6 +33,9 @@ class HTFTrendAligner:
     - LONG only if 4H uptrend
     - SHORT only if 4H downtrend
     """
+
+    # HTF frame chỉ cần OHLCV (EMAs qua indicator cache)
+    HTF_REQUIRED_COLUMNS = []
     
     def __init__(self, config: Dict):
         """
@@ -61,8 +65,8 @@ class HTFTrendAligner:
             return TrendType.RANGING
         
         # Calculate EMAs
-        ema_20 = df_htf['close'].ewm(span=20, adjust=False).mean()
-        ema_50 = df_htf['close'].ewm(span=50, adjust=False).mean()
+        ema_20 = indicator(df_htf, 'ema_20')
+        ema_50 = indicator(df_htf, 'ema_50')
         
         current_price = df_htf['close'].iloc[-1]
         ema_20_curr = ema_20.iloc[-1]
@@ -6,9 +6,12 @@
 
 import numpy as np
 import pandas as pd
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
+from collections import Counter
+
+from ml.ensemble_result import EnsembleResult
 from trading.entry_pipeline.models import MLPrediction, SignalDirection
 from utils.logger import logger
 
@@ -53,6 +56,9 @@ class MLEnsembleSignal:
         
         # Normalize weights
         self._normalize_weights()
+
+        # Số inputs mỗi model đã predict trong stage này (0 khi dùng lại EnsembleResult)
+        self.model_runs = Counter()
         
         logger.info(f"🎭 MLEnsembleSignal initialized")
         logger.info(f"   Models: {list(self.weights.keys())}")
@@ -75,16 +81,24 @@ class MLEnsembleSignal:
             self.weights = {k: v for k, v in self.weights.items() if k in available}
             self._normalize_weights()
     
-    def predict(self, X: np.ndarray) -> MLPrediction:
+    def predict(self, X: np.ndarray, result: Optional[EnsembleResult] = None) -> MLPrediction:
         """
         Generate ML prediction from ensemble
 
         Args:
             X: Input features (seq_len, n_features) or (n_samples, seq_len, n_features)
+            result: EnsembleResult đã tính cho X (EnsemblePredictor.predict_result),
+                dùng lại probabilities thay vì chạy lại models
 
         Returns:
             MLPrediction with direction, confidence, and details
         """
+        if result is not None:
+            prediction = self.from_result(result)
+            if prediction is not None:
+                logger.info(f"   📊 [TIER 1] Ensemble result (reused): {prediction.direction.value} (confidence: {prediction.confidence:.2%}, agreement: {prediction.model_agreement:.2%})")
+                return prediction
+
         logger.info("   🎭 [TIER 1] ML Ensemble predicting...")
         logger.info(f"      Available models: {list(self.models.keys())}")
         logger.info(f"      Model weights: {self.weights}")
@@ -102,6 +116,7 @@ class MLEnsembleSignal:
             
             try:
                 pred = model.predict(X)
+                self.model_runs[model_name] += 1
                 
                 # Handle different return types
                 if isinstance(pred, np.ndarray):
@@ -122,34 +137,91 @@ class MLEnsembleSignal:
         
         if not predictions:
             logger.error("All model predictions failed!")
+            return self._build_prediction(EnsembleResult())
+
+        prediction = self._build_prediction(EnsembleResult.from_predictions(predictions, valid_weights))
+        logger.info(f"   📊 [TIER 1] Ensemble result: {prediction.direction.value} (confidence: {prediction.confidence:.2%}, agreement: {prediction.model_agreement:.2%})")
+
+        return prediction
+
+    def predict_batch(self, X: np.ndarray) -> List[MLPrediction]:
+        """
+        ML predictions cho nhiều symbols: mỗi model chạy 1 lần trên cả batch
+
+        Args:
+            X: (n_symbols, seq_len, n_features)
+
+        Returns:
+            List MLPrediction, cùng thứ tự với X
+        """
+        columns = {}
+        valid_weights = {}
+
+        for model_name, weight in self.weights.items():
+            model = self.models.get(model_name)
+            if model is None or not hasattr(model, 'predict'):
+                continue
+
+            try:
+                if hasattr(model, 'predict_batch'):
+                    preds = np.asarray(model.predict_batch(X), dtype=float).reshape(-1)
+                else:
+                    preds = np.array([float(np.asarray(model.predict(x)).flatten()[0]) for x in X])
+                self.model_runs[model_name] += len(X)
+
+                columns[model_name] = np.clip(preds, 0.0, 1.0)
+                valid_weights[model_name] = weight
+
+            except Exception as e:
+                logger.warning(f"Batch prediction failed for {model_name}: {e}")
+                continue
+
+        logger.info(f"   🎭 [TIER 1] ML Ensemble batch: {len(X)} symbols, models: {list(columns.keys())}")
+
+        return [
+            self._build_prediction(EnsembleResult.from_predictions(
+                {name: float(preds[i]) for name, preds in columns.items()}, valid_weights
+            ))
+            for i in range(len(X))
+        ]
+
+    def from_result(self, result: EnsembleResult) -> Optional[MLPrediction]:
+        """
+        MLPrediction từ EnsembleResult có sẵn, theo weights của stage (không chạy models)
+
+        Returns:
+            None nếu result không có model nào của stage
+        """
+        predictions = {
+            name: float(np.clip(p, 0.0, 1.0))
+            for name, p in result.predictions.items()
+            if name in self.weights and name in self.models
+        }
+        if not predictions:
+            return None
+
+        reweighted = EnsembleResult.from_predictions(predictions, self.weights)
+        return self._build_prediction(reweighted)
+
+    def _build_prediction(self, result: EnsembleResult) -> MLPrediction:
+        """Direction + confidence từ weighted mean / agreement của result"""
+        if not result.predictions:
             return MLPrediction(
                 direction=SignalDirection.NEUTRAL,
                 confidence=0.0,
                 individual_predictions={},
                 model_agreement=0.0
             )
-        
-        # Calculate weighted ensemble prediction
-        weights_array = np.array(list(valid_weights.values()))
-        weights_array = weights_array / weights_array.sum()
-
-        preds_array = np.array(list(predictions.values()))
-        ensemble_pred = np.average(preds_array, weights=weights_array)
-
-        # Calculate model agreement (1 - normalized std)
-        std = np.std(preds_array)
-        agreement = 1.0 - min(std * 2, 1.0)
 
         # Determine direction and confidence
-        direction, confidence = self._determine_direction(ensemble_pred)
+        direction, confidence = self._determine_direction(result.probability)
 
-        logger.info(f"   📊 [TIER 1] Ensemble result: {direction.value} (confidence: {confidence:.2%}, agreement: {agreement:.2%})")
-        
         return MLPrediction(
             direction=direction,
             confidence=confidence,
-            individual_predictions=predictions,
-            model_agreement=agreement
+            individual_predictions=dict(result.predictions),
+            model_agreement=result.agreement,
+            ensemble_prob=result.probability
         )
 
     def _determine_direction(self, prob: float) -> Tuple[SignalDirection, float]:
@@ -181,28 +253,24 @@ class MLEnsembleSignal:
         else:
             return SignalDirection.SHORT, confidence
 
-    def get_prediction_details(self, X: np.ndarray) -> Dict:
+    def get_prediction_details(self, X: np.ndarray, prediction: Optional[MLPrediction] = None) -> Dict:
         """
         Get detailed prediction info for logging/debugging
 
         Args:
             X: Input features
+            prediction: MLPrediction đã có cho X (không predict lại)
 
         Returns:
             Dictionary with detailed prediction info
         """
-        prediction = self.predict(X)
+        if prediction is None:
+            prediction = self.predict(X)
 
         return {
             'direction': prediction.direction.value,
             'confidence': round(prediction.confidence, 4),
-            'ensemble_prob': round(
-                sum(p * self.weights.get(m, 0)
-                    for m, p in prediction.individual_predictions.items()) /
-                sum(self.weights.get(m, 0)
-                    for m in prediction.individual_predictions.keys()),
-                4
-            ) if prediction.individual_predictions else 0.5,
+            'ensemble_prob': round(prediction.ensemble_prob, 4) if prediction.individual_predictions else 0.5,
             'model_agreement': round(prediction.model_agreement, 4),
             'individual': {
                 m: round(p, 4)
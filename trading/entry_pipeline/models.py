@@ -23,6 +23,7 @@ class MLPrediction:
     confidence: float  # 0-1
     individual_predictions: Dict[str, float] = field(default_factory=dict)
     model_agreement: float = 0.0  # 0-1, higher = more agreement
+    ensemble_prob: float = 0.5  # Weighted mean probability UP
     
     @property
     def is_valid(self) -> bool:
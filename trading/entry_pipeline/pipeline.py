@@ -9,6 +9,7 @@ import pandas as pd
 from typing import Dict, Optional, List, Tuple, Any
 from dataclasses import asdict
 
+from ml.ensemble_result import EnsembleResult
 from trading.entry_pipeline.models import (
     SignalDirection,
     EntryDecision,
@@ -41,6 +42,9 @@ class EntryPipeline:
     - Enable/disable stages via config
     - Detailed logging and metrics
     """
+
+    # Indicator columns pipeline tự đọc (direction detection, SL/TP)
+    REQUIRED_COLUMNS = ['rsi', 'atr']
     
     def __init__(
         self,
@@ -87,6 +91,26 @@ class EntryPipeline:
         logger.info(f"   Stages enabled: ML={self.use_ml}, SmartEntry={self.use_smart_entry}, "
                    f"PA={self.use_price_action}, HTF={self.use_htf}, AI={self.use_ai}")
     
+    def required_columns(self) -> Tuple[List[str], List[str]]:
+        """
+        Indicator columns mà các stages đang bật đọc
+
+        Returns:
+            (primary columns, HTF columns) cho FeatureEngine.compute
+        """
+        primary, htf = list(self.REQUIRED_COLUMNS), []
+        if self.smart_entry_stage:
+            stage_primary, stage_htf = self.smart_entry_stage.required_columns()
+            primary += stage_primary
+            htf += stage_htf
+        if self.price_action_stage:
+            primary += self.price_action_stage.REQUIRED_COLUMNS
+        if self.htf_stage:
+            htf += self.htf_stage.HTF_REQUIRED_COLUMNS
+        if self.ai_stage:
+            primary += self.ai_stage.REQUIRED_COLUMNS
+        return list(dict.fromkeys(primary)), list(dict.fromkeys(htf))
+
     def set_models(self, models: Dict):
         """Set ML models after initialization"""
         if self.ml_stage:
@@ -98,7 +122,9 @@ class EntryPipeline:
         df: pd.DataFrame,
         X_features: Optional[np.ndarray] = None,
         df_higher: Optional[pd.DataFrame] = None,
-        df_4h: Optional[pd.DataFrame] = None
+        df_4h: Optional[pd.DataFrame] = None,
+        ml_prediction: Optional[MLPrediction] = None,
+        ensemble_result: Optional[EnsembleResult] = None
     ) -> EntryDecision:
         """
         Evaluate entry through all pipeline stages
@@ -109,6 +135,10 @@ class EntryPipeline:
             X_features: Pre-computed features for ML (optional)
             df_higher: Higher timeframe data (1H)
             df_4h: 4H timeframe data for HTF alignment
+            ml_prediction: Prediction đã tính sẵn cho X_features
+                (MLEnsembleSignal.predict_batch cả loop), None = predict tại đây
+            ensemble_result: Probabilities từng model đã tính cho X_features
+                (SignalGenerator), ML stage dùng lại thay vì chạy lại models
         
         Returns:
             EntryDecision with all stage results
@@ -118,7 +148,6 @@ class EntryPipeline:
 
         stages_results: List[StageResult] = []
         direction = SignalDirection.NEUTRAL
-        ml_prediction = None
         entry_score = 0
         pa_score = 0
 
@@ -134,7 +163,8 @@ class EntryPipeline:
 
         # ========== STAGE 1: ML ENSEMBLE ==========
         if self.use_ml and self.ml_stage and X_features is not None:
-            ml_prediction = self.ml_stage.predict(X_features)
+            if ml_prediction is None:
+                ml_prediction = self.ml_stage.predict(X_features, result=ensemble_result)
             passed, reason = self.ml_stage.validate(ml_prediction)
             
             stages_results.append(StageResult(
@@ -10,6 +10,7 @@ from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass, field
 
 from trading.entry_pipeline.models import SignalDirection, PriceActionResult, StageResult
+from trading.indicator_cache import indicator
 from utils.logger import logger
 
 
@@ -51,6 +52,9 @@ class PriceActionValidator:
     BULLISH_PATTERNS = ['hammer', 'bullish_engulfing', 'morning_star', 'piercing_line', 'bullish_harami']
     BEARISH_PATTERNS = ['shooting_star', 'bearish_engulfing', 'evening_star', 'dark_cloud', 'bearish_harami']
     STRONG_PATTERNS = ['morning_star', 'evening_star', 'bullish_engulfing', 'bearish_engulfing']
+
+    # Indicator columns đọc từ df
+    REQUIRED_COLUMNS = ['rsi', 'atr']
     
     def __init__(self, config: Dict):
         """
@@ -386,7 +390,7 @@ class PriceActionValidator:
             return 0
 
         current_vol = df['volume'].iloc[-1]
-        avg_vol = df['volume'].rolling(20).mean().iloc[-1]
+        avg_vol = indicator(df, 'volume_sma_20').iloc[-1]
 
         if avg_vol > 0 and current_vol > avg_vol * self.volume_ratio:
             return 1
@@ -398,7 +402,7 @@ class PriceActionValidator:
             return 0.0
 
         current_vol = df['volume'].iloc[-1]
-        avg_vol = df['volume'].rolling(20).mean().iloc[-1]
+        avg_vol = indicator(df, 'volume_sma_20').iloc[-1]
 
         return current_vol / avg_vol if avg_vol > 0 else 0.0
 
@@ -8,6 +8,7 @@ import numpy as np
 from typing import Dict, Optional, Tuple, List
 
 from trading.entry_pipeline.models import SignalDirection, StageResult
+from trading.indicator_cache import indicator
 from utils.logger import logger
 
 
@@ -22,6 +23,10 @@ class SmartEntryScoring:
     
     Can integrate with existing SmartEntrySystemV2 or work standalone.
     """
+
+    # Indicator columns đọc từ df (standalone scoring); HTF frames chỉ cần OHLCV
+    REQUIRED_COLUMNS = ['rsi', 'macd', 'macd_signal', 'bb_upper', 'bb_lower']
+    HTF_REQUIRED_COLUMNS = []
     
     def __init__(self, config: Dict, smart_entry_v2=None):
         """
@@ -39,6 +44,12 @@ class SmartEntryScoring:
         self.min_rr_ratio = config.get('MIN_RR_RATIO', 2.0)
         
         logger.info(f"🎯 SmartEntryScoring initialized (min score: {self.min_score})")
+
+    def required_columns(self) -> Tuple[List[str], List[str]]:
+        """(primary columns, HTF columns) mà stage này đọc"""
+        if self.smart_entry_v2 is not None:
+            return self.smart_entry_v2.REQUIRED_COLUMNS, self.smart_entry_v2.HTF_REQUIRED_COLUMNS
+        return self.REQUIRED_COLUMNS, self.HTF_REQUIRED_COLUMNS
     
     def calculate_score(
         self,
@@ -174,9 +185,9 @@ class SmartEntryScoring:
             return score, reasons
 
         # Calculate EMAs
-        ema_8 = df['close'].ewm(span=8, adjust=False).mean()
-        ema_21 = df['close'].ewm(span=21, adjust=False).mean()
-        ema_50 = df['close'].ewm(span=50, adjust=False).mean()
+        ema_8 = indicator(df, 'ema_8')
+        ema_21 = indicator(df, 'ema_21')
+        ema_50 = indicator(df, 'ema_50')
 
         current_price = df['close'].iloc[-1]
 
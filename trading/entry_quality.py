@@ -10,6 +10,7 @@ from datetime import datetime
 from typing import Optional, Tuple
 from utils.logger import logger
 from config import Config
+from trading.indicator_cache import indicator
 
 
 class EntryQualityChecker:
@@ -17,6 +18,9 @@ class EntryQualityChecker:
     Kiểm tra chất lượng entry point sau khi vừa đóng lệnh
     Đặc biệt sau TP để tránh FOMO entry
     """
+
+    # Indicator columns đọc từ df
+    REQUIRED_COLUMNS = ['rsi']
     
     def __init__(self):
         """Initialize entry quality checker"""
@@ -98,7 +102,7 @@ class EntryQualityChecker:
         
         # 3. CHECK VOLUME - Volume đang cao không?
         if 'volume' in df.columns:
-            avg_volume = df['volume'].rolling(20).mean().iloc[-1]
+            avg_volume = indicator(df, 'volume_sma_20').iloc[-1]
             current_volume = df['volume'].iloc[-1]
             if current_volume > avg_volume * 1.2:
                 quality_score += 1
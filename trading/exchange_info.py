@@ -0,0 +1,242 @@
+# ============================================
+# 📚 EXCHANGE INFO INDEX
+# LOT_SIZE / PRICE_FILTER / MIN_NOTIONAL của tất cả symbols,
+# load 1 lần, lưu trên disk (data/) với TTL, refresh nền
+# ============================================
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, Optional
+
+from config import Config
+from utils.logger import logger
+
+
+@dataclass
+class SymbolFilters:
+    """Trading rules của 1 symbol (từ futures_exchange_info)"""
+    symbol: str
+    step_size: float = 0.0
+    min_qty: float = 0.0
+    max_qty: float = 0.0
+    tick_size: float = 0.0
+    min_notional: float = 0.0
+    quantity_precision: int = 3
+    price_precision: int = 2
+
+    def format_quantity(self, quantity: float) -> float:
+        """Round quantity theo LOT_SIZE stepSize (fallback quantityPrecision)"""
+        if self.step_size > 0:
+            # Calculate precision from step_size
+            # e.g., 0.001 -> 3 decimals, 0.01 -> 2 decimals, 1.0 -> 0 decimals
+            precision = 0
+            if self.step_size < 1:
+                precision = len(str(self.step_size).rstrip('0').split('.')[-1])
+
+            # Round to step_size, then to precision
+            formatted = round(quantity / self.step_size) * self.step_size
+            return round(formatted, precision)
+
+        return round(quantity, self.quantity_precision)
+
+
+def parse_exchange_info(exchange_info: dict) -> Dict[str, SymbolFilters]:
+    """
+    Parse payload futures_exchange_info thành {symbol: SymbolFilters}
+
+    Args:
+        exchange_info: Response của GET /fapi/v1/exchangeInfo
+
+    Returns:
+        dict: {symbol: SymbolFilters}
+    """
+    index = {}
+
+    for s in exchange_info.get('symbols', []):
+        filters = {f['filterType']: f for f in s.get('filters', [])}
+        lot_size = filters.get('LOT_SIZE', {})
+        price_filter = filters.get('PRICE_FILTER', {})
+        min_notional = filters.get('MIN_NOTIONAL', {})
+
+        index[s['symbol']] = SymbolFilters(
+            symbol=s['symbol'],
+            step_size=float(lot_size.get('stepSize', 0)),
+            min_qty=float(lot_size.get('minQty', 0)),
+            max_qty=float(lot_size.get('maxQty', 0)),
+            tick_size=float(price_filter.get('tickSize', 0)),
+            min_notional=float(min_notional.get('notional', min_notional.get('minNotional', 0))),
+            quantity_precision=int(s.get('quantityPrecision', 3)),
+            price_precision=int(s.get('pricePrecision', 2))
+        )
+
+    return index
+
+
+class ExchangeInfoIndex:
+    """
+    Lookup table SymbolFilters cho tất cả symbols của 1 exchange.
+
+    - Load: memory -> file data/exchange_info_<name>.json (nếu còn TTL) -> REST
+    - Hết TTL: vẫn trả data hiện có, refresh trong background thread
+    - Symbol không có trong index (vd. mới list): refresh (tối đa 1 lần / MIN_REFRESH_INTERVAL)
+
+    Usage:
+        index = ExchangeInfoIndex('asterdex_mainnet', client.futures_exchange_info)
+        filters = index.get('BTCUSDT')
+        qty = filters.format_quantity(0.12345)
+    """
+
+    MIN_REFRESH_INTERVAL = 60  # Giây giữa 2 lần refresh vì symbol lạ
+
+    def __init__(self, name: str, fetch: Optional[Callable[[], dict]] = None,
+                 ttl: Optional[float] = None, data_dir: str = 'data'):
+        """
+        Args:
+            name: Tên index (tên file cache)
+            fetch: Hàm trả về payload futures_exchange_info (None: chỉ update() thủ công)
+            ttl: Thời gian sống của cache (giây), mặc định Config.EXCHANGE_INFO_TTL
+            data_dir: Thư mục lưu cache
+        """
+        if Config.SIMULATOR_URL:
+            name = f"{name}_sim"  # Không ghi đè trading rules thật bằng symbols của simulator
+        self.name = name
+        self.fetch = fetch
+        self.ttl = ttl if ttl is not None else Config.EXCHANGE_INFO_TTL
+        self.path = os.path.join(data_dir, f"exchange_info_{name}.json")
+
+        self._symbols: Dict[str, SymbolFilters] = {}
+        self._updated_at = 0.0
+        self._last_refresh_attempt = 0.0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._init_lock = threading.Lock()
+        self._loaded = False
+
+    # ============================================
+    # LOOKUP
+    # ============================================
+
+    def get(self, symbol: str) -> Optional[SymbolFilters]:
+        """
+        Trading rules của symbol
+
+        Returns:
+            SymbolFilters hoặc None nếu không lấy được
+        """
+        self._ensure_loaded()
+
+        with self._lock:
+            filters = self._symbols.get(symbol)
+
+        if filters is None and self.fetch is not None \
+                and time.time() - self._last_refresh_attempt > self.MIN_REFRESH_INTERVAL:
+            self.refresh()
+            with self._lock:
+                filters = self._symbols.get(symbol)
+        elif self.is_expired():
+            self.refresh_async()
+
+        return filters
+
+    def __contains__(self, symbol: str) -> bool:
+        with self._lock:
+            return symbol in self._symbols
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._symbols)
+
+    def is_expired(self) -> bool:
+        return time.time() - self._updated_at > self.ttl
+
+    # ============================================
+    # LOAD / REFRESH
+    # ============================================
+
+    def _ensure_loaded(self):
+        """Lần đầu: đọc từ disk, fetch nếu không có hoặc hết TTL"""
+        if self._loaded:
+            return
+
+        with self._init_lock:
+            if self._loaded:
+                return
+            self._load_from_disk()
+            # Chưa có data -> phải chờ fetch; có data cũ hết TTL -> dùng tạm, refresh nền
+            if self.fetch is not None and len(self) == 0:
+                self.refresh()
+            self._loaded = True
+
+        if self.fetch is not None and self.is_expired():
+            self.refresh_async()
+
+    def update(self, exchange_info: dict):
+        """Nạp payload futures_exchange_info mới và lưu xuống disk"""
+        symbols = parse_exchange_info(exchange_info)
+        if not symbols:
+            return
+
+        with self._lock:
+            self._symbols = symbols
+            self._updated_at = time.time()
+            self._loaded = True
+
+        self._save_to_disk()
+        logger.debug(f"📚 Exchange info [{self.name}] updated: {len(symbols)} symbols")
+
+    def refresh(self) -> bool:
+        """Fetch exchange info (blocking). Returns True nếu thành công"""
+        if self.fetch is None:
+            return False
+
+        with self._refresh_lock:
+            self._last_refresh_attempt = time.time()
+            try:
+                self.update(self.fetch())
+                return True
+            except Exception as e:
+                logger.error(f"Error refreshing exchange info [{self.name}]: {e}")
+                return False
+
+    def refresh_async(self):
+        """Refresh trong background thread (bỏ qua nếu đang refresh)"""
+        if self.fetch is None or self._refresh_lock.locked():
+            return
+        if time.time() - self._last_refresh_attempt < self.MIN_REFRESH_INTERVAL:
+            return
+        self._last_refresh_attempt = time.time()
+        threading.Thread(target=self.refresh, name=f"exchange-info-{self.name}", daemon=True).start()
+
+    def _load_from_disk(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            symbols = {s: SymbolFilters(**v) for s, v in data['symbols'].items()}
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"⚠️ Invalid exchange info cache {self.path}: {e}")
+            return
+
+        with self._lock:
+            self._symbols = symbols
+            self._updated_at = float(data.get('updated_at', 0))
+
+    def _save_to_disk(self):
+        with self._lock:
+            data = {
+                'updated_at': self._updated_at,
+                'symbols': {s: asdict(f) for s, f in self._symbols.items()}
+            }
+
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not save exchange info cache {self.path}: {e}")
@@ -0,0 +1,201 @@
+# ============================================
+# 🏎️ ORDER EXECUTION FAST PATH
+# Sizing từ data đã có trong memory, market order với client order id
+# (retry idempotent), đo latency signal -> ack
+# ============================================
+
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import Config
+from utils.logger import logger
+from trading.http_session import backoff_delay
+
+
+# Prefix client order id của bot (Binance: ^[\.A-Z\:/a-z0-9_-]{1,36}$)
+ORDER_ID_PREFIX = 'fm'
+
+
+def new_client_order_id(prefix: str = ORDER_ID_PREFIX) -> str:
+    """Client order id duy nhất (<= 36 ký tự)"""
+    return f"{prefix}-{uuid.uuid4().hex[:30]}"
+
+
+class LatencyTracker:
+    """Giữ `maxlen` samples (ms) gần nhất cho mỗi stage, tính p50 / p95 / max"""
+
+    def __init__(self, maxlen: int = 500):
+        self.maxlen = maxlen
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, ms: float):
+        with self._lock:
+            self._samples.setdefault(name, deque(maxlen=self.maxlen)).append(ms)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """{stage: {'count', 'p50', 'p95', 'max'}}"""
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+
+        result = {}
+        for name, values in samples.items():
+            if not values:
+                continue
+            result[name] = {
+                'count': len(values),
+                'p50': values[len(values) // 2],
+                'p95': values[min(len(values) - 1, int(len(values) * 0.95))],
+                'max': values[-1],
+            }
+        return result
+
+
+@dataclass
+class OrderPlan:
+    """Input đã tính sẵn cho 1 market order"""
+    symbol: str
+    side: str              # 'BUY' | 'SELL'
+    quantity: float        # Đã format theo LOT_SIZE
+    raw_quantity: float
+    price: float           # Giá tham chiếu để sizing
+    price_source: str      # 'mark' | 'candle' | 'ticker'
+    signal_time: float     # time.monotonic() lúc có signal
+
+
+@dataclass
+class ExecutionResult:
+    order: Optional[dict]
+    client_order_id: str
+    attempts: int
+    signal_to_ack_ms: float
+    submit_to_ack_ms: float
+
+    @property
+    def ok(self) -> bool:
+        return self.order is not None
+
+
+class OrderExecutor:
+    """
+    Đường đặt lệnh entry của 1 exchange client.
+
+    - plan_entry(): giá tham chiếu từ các price sources trong memory (mark
+      price của user-data stream, candle store / prefetched klines), chỉ gọi
+      get_ticker_price khi không có; quantity format 1 lần từ exchange info
+      index (local)
+    - submit(): market order với newClientOrderId. Lỗi network / timeout
+      (không biết order đã tới exchange chưa) -> tra order theo client order
+      id, chỉ gửi lại (cùng id) nếu exchange chưa có order đó
+    - Latency signal -> ack và submit -> ack được ghi vào `latency`
+
+    Usage:
+        executor = OrderExecutor(client, risk_manager, price_sources=[('mark', get_mark)])
+        plan = executor.plan_entry('BTCUSDT', 'LONG', balance, leverage, signal_time)
+        result = executor.submit(plan)
+    """
+
+    def __init__(self, client, risk_manager,
+                 price_sources: Optional[List[Tuple[str, Callable[[str], Optional[float]]]]] = None,
+                 max_retries: Optional[int] = None, exchange_name: str = ''):
+        """
+        Args:
+            client: BaseExchangeClient (hoặc AsyncClientBridge)
+            risk_manager: RiskManager (calculate_position_size)
+            price_sources: [(name, fn(symbol) -> price | None)] theo thứ tự ưu tiên
+            max_retries: Số lần gửi lại khi lỗi network (mặc định Config.ORDER_MAX_RETRIES)
+            exchange_name: Dùng cho log
+        """
+        self.client = client
+        self.risk_manager = risk_manager
+        self.price_sources = price_sources or []
+        self.max_retries = max_retries if max_retries is not None else Config.ORDER_MAX_RETRIES
+        self.exchange_name = exchange_name
+        self.latency = LatencyTracker()
+
+    def reference_price(self, symbol: str) -> Tuple[float, str]:
+        """(price, source): price source đầu tiên có giá, fallback ticker REST"""
+        for name, source in self.price_sources:
+            try:
+                price = source(symbol)
+            except Exception as e:
+                logger.debug(f"[{self.exchange_name}] Price source {name} failed for {symbol}: {e}")
+                continue
+            if price:
+                return price, name
+
+        return self.client.get_ticker_price(symbol), 'ticker'
+
+    def plan_entry(self, symbol: str, direction: str, balance: float, leverage: int,
+                   signal_time: Optional[float] = None) -> OrderPlan:
+        """
+        Tính order cho entry
+
+        Args:
+            direction: 'LONG' | 'SHORT'
+            signal_time: time.monotonic() lúc có signal (mặc định: bây giờ)
+        """
+        signal_time = signal_time if signal_time is not None else time.monotonic()
+        price, source = self.reference_price(symbol)
+
+        raw_quantity = self.risk_manager.calculate_position_size(balance, price, leverage) if price > 0 else 0
+        quantity = self.client.format_quantity(symbol, raw_quantity) if raw_quantity > 0 else 0
+
+        return OrderPlan(
+            symbol=symbol,
+            side='BUY' if direction == 'LONG' else 'SELL',
+            quantity=quantity,
+            raw_quantity=raw_quantity,
+            price=price,
+            price_source=source,
+            signal_time=signal_time
+        )
+
+    def submit(self, plan: OrderPlan, reduce_only: bool = False) -> ExecutionResult:
+        """Gửi market order (idempotent theo client order id)"""
+        client_order_id = new_client_order_id()
+        submit_time = time.monotonic()
+        order = None
+        attempts = 0
+
+        while True:
+            attempts += 1
+            try:
+                order = self.client.create_market_order(
+                    symbol=plan.symbol, side=plan.side, quantity=plan.quantity,
+                    reduce_only=reduce_only, client_order_id=client_order_id
+                )
+                break  # Ack hoặc exchange từ chối (None) -> không retry
+            except Exception as e:
+                logger.warning(f"⚠️ [{self.exchange_name}] Order {client_order_id} {plan.symbol} error: {e}")
+
+            # Không biết order đã tới exchange chưa -> kiểm tra trước khi gửi lại
+            order = self._lookup(plan.symbol, client_order_id)
+            if order is not None or attempts > self.max_retries:
+                break
+            time.sleep(backoff_delay(attempts))
+
+        ack_time = time.monotonic()
+        result = ExecutionResult(
+            order=order,
+            client_order_id=client_order_id,
+            attempts=attempts,
+            signal_to_ack_ms=(ack_time - plan.signal_time) * 1000,
+            submit_to_ack_ms=(ack_time - submit_time) * 1000
+        )
+
+        if result.ok:
+            self.latency.record('signal_to_ack', result.signal_to_ack_ms)
+            self.latency.record('submit_to_ack', result.submit_to_ack_ms)
+        return result
+
+    def _lookup(self, symbol: str, client_order_id: str) -> Optional[dict]:
+        try:
+            return self.client.get_order(symbol, client_order_id)
+        except Exception as e:
+            logger.warning(f"⚠️ [{self.exchange_name}] Order lookup {client_order_id} failed: {e}")
+            return None
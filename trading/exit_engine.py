@@ -0,0 +1,293 @@
+# ============================================
+# ⚡ EXIT ENGINE
+# Trailing stop / breakeven / TP / SL / timeout cho positions đang mở,
+# đánh giá mỗi mark price tick thay vì mỗi LOOP_SLEEP
+# ============================================
+
+import asyncio
+import json
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import aiohttp
+
+from config import Config
+from utils.logger import logger
+
+
+def reprice_position(position: dict, mark_price: float, leverage: int) -> dict:
+    """
+    Position dict (format get_position) tính lại theo mark price mới
+
+    Args:
+        position: {'side', 'amount', 'entry_price', 'mark_price', 'pnl_pct', 'pnl_usdt'}
+        mark_price: Mark price mới
+        leverage: Leverage để tính pnl_pct (giống client)
+    """
+    entry_price = position['entry_price']
+    sign = 1 if position['side'] == 'LONG' else -1
+    price_change_pct = sign * (mark_price - entry_price) / entry_price
+
+    repriced = dict(position)
+    repriced['mark_price'] = mark_price
+    repriced['pnl_pct'] = price_change_pct * leverage
+    repriced['pnl_usdt'] = sign * (mark_price - entry_price) * position['amount']
+    return repriced
+
+
+class ExitEngine:
+    """
+    Theo dõi positions đang mở của 1 exchange ở tốc độ mark price stream.
+
+    - Subscribe <symbol>@markPrice@1s chỉ cho symbols đang có position
+      (SUBSCRIBE / UNSUBSCRIBE trên 1 websocket connection)
+    - Mỗi tick: reprice position rồi gọi evaluate(symbol, position); nếu cần
+      đóng -> close(symbol, position, reason) trong worker thread ngay lập tức
+    - positions lấy từ position_source() mỗi poll_interval; khi websocket
+      mất kết nối, mỗi lần poll cũng là 1 lần đánh giá (REST fallback)
+    - Chạy trên event loop riêng trong daemon thread (start/stop)
+
+    Usage:
+        engine = ExitEngine(ws_url, client.get_all_positions, bot_evaluate, bot_close, leverage=10)
+        engine.start()
+    """
+
+    RECONNECT_DELAY = 1
+    MAX_RECONNECT_DELAY = 60
+    HEARTBEAT = 30
+    CLOSE_GRACE = 10  # Giây bỏ qua symbol vừa đóng (REST có thể vẫn trả position cũ)
+
+    def __init__(self, ws_url: str,
+                 position_source: Callable[[], Optional[Dict[str, dict]]],
+                 evaluate: Callable[[str, dict], Tuple[bool, str]],
+                 close: Callable[[str, dict, str], bool],
+                 leverage: int, poll_interval: Optional[float] = None, exchange_name: str = ''):
+        """
+        Args:
+            ws_url: Websocket base URL (vd. 'wss://fstream.binance.com')
+            position_source: Trả về {symbol: position} đang mở (None nếu lỗi)
+            evaluate: evaluate(symbol, position) -> (should_close, reason)
+            close: close(symbol, position, reason) -> bool (blocking, chạy trong thread)
+            leverage: Leverage để tính pnl_pct khi reprice
+            poll_interval: Giây giữa 2 lần refresh positions (mặc định Config.EXIT_POLL_INTERVAL)
+            exchange_name: Dùng cho log
+        """
+        self.ws_url = ws_url.rstrip('/')
+        self.position_source = position_source
+        self.evaluate = evaluate
+        self.close = close
+        self.leverage = leverage
+        self.poll_interval = poll_interval if poll_interval is not None else Config.EXIT_POLL_INTERVAL
+        self.exchange_name = exchange_name
+
+        self._positions: Dict[str, dict] = {}
+        self._closing = set()
+        self._closed_at: Dict[str, float] = {}
+        self._subscribed = set()
+        self._ws = None
+        self._request_id = 0
+
+        self._loop = None
+        self._stop_event = None
+        self._thread = None
+
+        # Stats
+        self.ticks = 0
+        self.closes = 0
+
+    # ============================================
+    # LIFECYCLE
+    # ============================================
+
+    def start(self):
+        """Chạy engine trong daemon thread (event loop riêng)"""
+        self._thread = threading.Thread(
+            target=asyncio.run, args=(self.run(),),
+            name=f"{self.exchange_name or 'exit'}-exit-engine", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        """Dừng engine (an toàn khi gọi từ thread bất kỳ)"""
+        if self._loop is not None and not self._loop.is_closed() and self._stop_event is not None:
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    async def run(self):
+        """Poll positions + mark price stream cho tới khi stop()"""
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+
+        async with aiohttp.ClientSession() as session:
+            tasks = [
+                asyncio.create_task(self._run_connection(session)),
+                asyncio.create_task(self._poll_positions()),
+            ]
+            try:
+                await self._stop_event.wait()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        logger.info(f"⚡ [{self.exchange_name}] Exit engine stopped")
+
+    # ============================================
+    # POSITIONS
+    # ============================================
+
+    async def _poll_positions(self):
+        while True:
+            try:
+                positions = await asyncio.to_thread(self.position_source)
+                if positions is not None:
+                    await self._sync_positions(positions)
+                    if self._ws is None:
+                        # Websocket không chạy -> đánh giá theo giá REST
+                        for symbol, position in list(self._positions.items()):
+                            self._check(symbol, position)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ [{self.exchange_name}] Exit engine position refresh failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _sync_positions(self, positions: Dict[str, dict]):
+        """Cập nhật positions đang theo dõi và subscriptions"""
+        now = time.monotonic()
+        for symbol, position in positions.items():
+            closed_at = self._closed_at.get(symbol)
+            if closed_at is not None and now - closed_at < self.CLOSE_GRACE:
+                continue
+            current = self._positions.get(symbol)
+            if current is not None and current['side'] == position['side'] \
+                    and current['amount'] == position['amount'] \
+                    and current['entry_price'] == position['entry_price']:
+                continue  # Giữ mark price mới nhất từ stream
+            self._positions[symbol] = position
+
+        for symbol in list(self._positions):
+            if symbol not in positions:
+                del self._positions[symbol]
+
+        await self._update_subscriptions()
+
+    # ============================================
+    # MARK PRICE STREAM
+    # ============================================
+
+    @staticmethod
+    def _stream_name(symbol: str) -> str:
+        return f"{symbol.lower()}@markPrice@1s"
+
+    async def _send(self, method: str, symbols):
+        if self._ws is None or not symbols:
+            return
+        self._request_id += 1
+        await self._ws.send_json({
+            'method': method,
+            'params': [self._stream_name(s) for s in symbols],
+            'id': self._request_id
+        })
+
+    async def _update_subscriptions(self):
+        wanted = set(self._positions)
+        added, removed = wanted - self._subscribed, self._subscribed - wanted
+        try:
+            await self._send('SUBSCRIBE', sorted(added))
+            await self._send('UNSUBSCRIBE', sorted(removed))
+        except Exception as e:
+            logger.warning(f"⚠️ [{self.exchange_name}] Mark price subscription failed: {e}")
+            return
+        if self._ws is not None:
+            self._subscribed = wanted
+
+    async def _run_connection(self, session: aiohttp.ClientSession):
+        """1 websocket connection, tự reconnect với exponential backoff"""
+        url = f"{self.ws_url}/ws"
+        delay = self.RECONNECT_DELAY
+
+        while True:
+            try:
+                async with session.ws_connect(url, heartbeat=self.HEARTBEAT) as ws:
+                    self._ws = ws
+                    self._subscribed = set()
+                    delay = self.RECONNECT_DELAY
+                    await self._update_subscriptions()
+                    logger.info(f"⚡ [{self.exchange_name}] Exit engine mark price stream connected")
+
+                    async for msg in ws:
+                        if msg.type == aiohttp.WSMsgType.TEXT:
+                            self._handle_message(msg.data)
+                        elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                            break
+
+                logger.warning(f"⚠️ [{self.exchange_name}] Exit engine stream disconnected, polling REST")
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ [{self.exchange_name}] Exit engine stream error: {e}, reconnecting in {delay}s...")
+            finally:
+                self._ws = None
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.MAX_RECONNECT_DELAY)
+
+    def _handle_message(self, raw: str):
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            return
+
+        data = data.get('data', data) if isinstance(data, dict) else data
+        if not isinstance(data, dict) or data.get('e') != 'markPriceUpdate':
+            return
+
+        self.on_mark_price(data['s'], float(data['p']))
+
+    # ============================================
+    # EXIT CHECKS
+    # ============================================
+
+    def on_mark_price(self, symbol: str, mark_price: float):
+        """1 mark price tick (gọi trên event loop của engine)"""
+        position = self._positions.get(symbol)
+        if position is None:
+            return
+
+        self.ticks += 1
+        position = reprice_position(position, mark_price, self.leverage)
+        self._positions[symbol] = position
+        self._check(symbol, position)
+
+    def _check(self, symbol: str, position: dict):
+        if symbol in self._closing:
+            return
+
+        try:
+            should_close, reason = self.evaluate(symbol, position)
+        except Exception as e:
+            logger.error(f"❌ [{self.exchange_name}] Exit evaluation error {symbol}: {e}")
+            return
+
+        if should_close:
+            self._closing.add(symbol)
+            asyncio.get_running_loop().create_task(self._close(symbol, position, reason))
+
+    async def _close(self, symbol: str, position: dict, reason: str):
+        try:
+            if await asyncio.to_thread(self.close, symbol, position, reason):
+                self.closes += 1
+                self._closed_at[symbol] = time.monotonic()
+                self._positions.pop(symbol, None)
+                await self._update_subscriptions()
+        except Exception as e:
+            logger.error(f"❌ [{self.exchange_name}] Exit engine close {symbol} failed: {e}")
+        finally:
+            self._closing.discard(symbol)
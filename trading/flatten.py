@@ -0,0 +1,112 @@
+# ============================================
+# 🔴 FLATTEN ALL
+# Đóng tất cả positions trên mọi exchange song song
+# (daily loss limit, shutdown, scripts/close_all.py)
+# ============================================
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from utils.logger import logger
+
+
+@dataclass
+class CloseResult:
+    """Kết quả đóng 1 position"""
+    exchange: str
+    symbol: str
+    side: str = ''
+    amount: float = 0.0
+    mark_price: float = 0.0
+    pnl_pct: float = 0.0
+    ok: bool = False
+    order_id: Optional[int] = None
+    error: str = ''
+    elapsed_ms: float = 0.0
+
+
+def flatten_exchange(exchange_name: str, client) -> List[CloseResult]:
+    """
+    Đóng tất cả positions của 1 exchange: 1 request positions + batch orders
+
+    Returns:
+        list: CloseResult mỗi position (1 result lỗi nếu không lấy được positions)
+    """
+    start = time.monotonic()
+    positions = client.get_all_positions()
+
+    if positions is None:
+        return [CloseResult(exchange_name, '*', error='positions unavailable')]
+    if not positions:
+        return []
+
+    try:
+        orders = client.close_positions(positions)
+    except Exception as e:
+        logger.error(f"❌ [{exchange_name.upper()}] Flatten failed: {e}")
+        orders = {}
+
+    elapsed_ms = (time.monotonic() - start) * 1000
+    results = []
+    for symbol, pos in positions.items():
+        order = orders.get(symbol)
+        results.append(CloseResult(
+            exchange=exchange_name,
+            symbol=symbol,
+            side=pos['side'],
+            amount=pos['amount'],
+            mark_price=pos.get('mark_price', 0.0),
+            pnl_pct=pos.get('pnl_pct', 0.0),
+            ok=order is not None,
+            order_id=order.get('orderId') if order else None,
+            error='' if order is not None else 'order failed',
+            elapsed_ms=elapsed_ms
+        ))
+    return results
+
+
+def flatten_all(clients: Dict[str, object]) -> List[CloseResult]:
+    """
+    Đóng tất cả positions trên tất cả exchanges song song
+
+    Args:
+        clients: {exchange_name: BaseExchangeClient}
+
+    Returns:
+        list: CloseResult mỗi position
+    """
+    if not clients:
+        return []
+
+    with ThreadPoolExecutor(max_workers=len(clients), thread_name_prefix='flatten') as pool:
+        futures = {name: pool.submit(flatten_exchange, name, client) for name, client in clients.items()}
+
+    results = []
+    for name, future in futures.items():
+        try:
+            results.extend(future.result())
+        except Exception as e:
+            logger.error(f"❌ [{name.upper()}] Flatten failed: {e}")
+            results.append(CloseResult(name, '*', error=str(e)))
+    return results
+
+
+def format_report(results: List[CloseResult]) -> str:
+    """Report từng position (để log / Telegram)"""
+    if not results:
+        return "🔴 FLATTEN: no open positions"
+
+    closed = sum(1 for r in results if r.ok)
+    lines = [f"🔴 FLATTEN: {closed}/{len(results)} positions closed"]
+    for r in results:
+        if r.symbol == '*':
+            lines.append(f"   ❌ [{r.exchange.upper()}] {r.error}")
+            continue
+        status = f"✅ order {r.order_id}" if r.ok else f"❌ {r.error}"
+        lines.append(
+            f"   [{r.exchange.upper()}] {r.side} {r.amount} {r.symbol} @ ${r.mark_price:.4f} "
+            f"| PnL {r.pnl_pct*100:.2f}% | {status} ({r.elapsed_ms:.0f}ms)"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,150 @@
+# ============================================
+# 🌐 HTTP SESSION
+# Keep-alive connection pool dùng chung cho mọi REST caller,
+# retry lỗi mạng / 5xx với jittered exponential backoff
+# ============================================
+
+import random
+import threading
+from typing import Dict, Optional
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import Config
+
+
+# Lỗi phía server đáng retry (429/418 do RateLimiter xử lý, không retry ở đây)
+RETRY_STATUSES = (500, 502, 503, 504)
+
+# Methods retry được khi request có thể đã tới server (POST order thì không)
+IDEMPOTENT_METHODS = frozenset(['GET', 'PUT', 'DELETE', 'HEAD', 'OPTIONS'])
+
+MAX_BACKOFF = 10.0  # Giây
+
+
+def backoff_delay(attempt: int, factor: Optional[float] = None) -> float:
+    """
+    Full-jitter exponential backoff: random(0, factor * 2^attempt)
+
+    Jitter tránh các callers cùng retry đúng 1 thời điểm sau khi exchange lỗi.
+
+    Args:
+        attempt: Lần retry (0 = retry đầu tiên)
+        factor: Backoff factor (giây), mặc định Config.HTTP_BACKOFF_FACTOR
+    """
+    factor = Config.HTTP_BACKOFF_FACTOR if factor is None else factor
+    return random.uniform(0, min(MAX_BACKOFF, factor * (2 ** attempt)))
+
+
+def create_retry() -> Retry:
+    """urllib3 Retry policy cho sync sessions"""
+    return Retry(
+        total=Config.HTTP_MAX_RETRIES,
+        backoff_factor=Config.HTTP_BACKOFF_FACTOR,
+        backoff_jitter=Config.HTTP_BACKOFF_FACTOR,
+        backoff_max=MAX_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=IDEMPOTENT_METHODS,
+        respect_retry_after_header=False,
+        raise_on_status=False  # Response 5xx cuối cùng trả về cho caller xử lý
+    )
+
+
+# ============================================
+# SYNC (requests)
+# ============================================
+
+class SharedHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter mount vào nhiều Sessions.
+
+    close() của từng Session (vd. Client.close_connection) không đóng pool
+    chung; dùng close_pool() khi tắt process.
+    """
+
+    def close(self):
+        pass
+
+    def close_pool(self):
+        super().close()
+
+
+_adapter: Optional[SharedHTTPAdapter] = None
+_session: Optional[requests.Session] = None
+_lock = threading.Lock()
+
+
+def get_http_adapter() -> SharedHTTPAdapter:
+    """
+    Connection pool chung của process (tạo lần đầu gọi)
+
+    - pool_connections: số hosts giữ pool
+    - pool_maxsize: max connections keep-alive mỗi host (pool_block: callers
+      chờ connection rảnh thay vì mở thêm)
+    """
+    global _adapter
+    with _lock:
+        if _adapter is None:
+            _adapter = SharedHTTPAdapter(
+                pool_connections=Config.HTTP_POOL_CONNECTIONS,
+                pool_maxsize=Config.HTTP_POOL_MAXSIZE,
+                max_retries=create_retry(),
+                pool_block=True
+            )
+        return _adapter
+
+
+def create_session(headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    """
+    requests.Session riêng (headers riêng, vd. X-MBX-APIKEY) nhưng dùng
+    connection pool chung
+
+    Args:
+        headers: Default headers của session
+    """
+    session = requests.Session()
+    adapter = get_http_adapter()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """Shared Session không auth (public endpoints, vd. DataFetcher)"""
+    global _session
+    if _session is None:
+        session = create_session()
+        with _lock:
+            if _session is None:
+                _session = session
+    return _session
+
+
+def close_http_pool():
+    """Đóng tất cả connections của pool chung"""
+    with _lock:
+        if _adapter is not None:
+            _adapter.close_pool()
+
+
+# ============================================
+# ASYNC (aiohttp)
+# ============================================
+
+def create_connector() -> aiohttp.TCPConnector:
+    """
+    aiohttp connector với keep-alive và giới hạn connections mỗi host
+
+    Phải gọi bên trong event loop đang chạy.
+    """
+    return aiohttp.TCPConnector(
+        limit=Config.ASYNC_MAX_CONNECTIONS,
+        limit_per_host=Config.HTTP_POOL_MAXSIZE,
+        keepalive_timeout=Config.HTTP_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=300
+    )
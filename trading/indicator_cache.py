@@ -0,0 +1,232 @@
+# ============================================
+# 🧮 INDICATOR CACHE
+# Memoize indicator frames theo (exchange, symbol, interval, candle time):
+# indicators + EMAs / rolling windows chỉ tính 1 lần,
+# dùng chung cho SignalGenerator, EntryPipeline, entry systems và filters
+# ============================================
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from ml.features import FeatureEngine
+
+
+# Tên entry cho DataFrame indicators (FeatureEngine.compute) trong memo
+INDICATORS_FRAME = 'indicators'
+
+# Named indicators '<kind>_<window>' (vd. 'ema_21', 'volume_sma_20') -> fn(df, window)
+# Công thức trên cả frame (ewm adjust=False, rolling mean/max/min). EMA trên window riêng
+# hoặc adjust=True (vd. MarketRegimeDetector) không dùng named indicators.
+INDICATORS: Dict[str, Callable[[pd.DataFrame, int], pd.Series]] = {
+    'ema': lambda df, n: df['close'].ewm(span=n, adjust=False).mean(),
+    'volume_sma': lambda df, n: df['volume'].rolling(n).mean(),
+    'high_max': lambda df, n: df['high'].rolling(n).max(),
+    'low_min': lambda df, n: df['low'].rolling(n).min(),
+    'range_sma': lambda df, n: (df['high'] - df['low']).rolling(n).mean(),  # Simple ATR (high - low)
+}
+
+# Attribute (instance __dict__, không phải column) gắn IndicatorFrame vào DataFrame của nó.
+# df.copy() / slices không mang theo -> data khác thì không dùng nhầm cache.
+_FRAME_ATTR = '_indicator_frame'
+
+
+def compute_indicator(df: pd.DataFrame, name: str) -> pd.Series:
+    """Tính 1 named indicator trực tiếp (không cache)"""
+    kind, _, window = name.rpartition('_')
+    if kind not in INDICATORS or not window.isdigit():
+        raise KeyError(f"Unknown indicator '{name}'")
+    return INDICATORS[kind](df, int(window))
+
+
+def frame_of(df: Optional[pd.DataFrame]) -> Optional['IndicatorFrame']:
+    """IndicatorFrame đã tạo ra df này (None nếu df không đến từ cache)"""
+    if df is None:
+        return None
+    return df.__dict__.get(_FRAME_ATTR)
+
+
+def indicator(df: pd.DataFrame, name: str) -> pd.Series:
+    """
+    Named indicator của df
+
+    df đến từ IndicatorFrame -> memoized (mỗi tên tính 1 lần mỗi frame),
+    ngược lại (backtest, tests, df tự tạo) -> tính trực tiếp.
+    """
+    frame = frame_of(df)
+    if frame is None:
+        return compute_indicator(df, name)
+    return frame.get(name)
+
+
+class IndicatorFrame:
+    """
+    1 OHLCV frame + indicators tính lazily
+
+    `indicators(columns)` = FeatureEngine.compute(raw, columns), chỉ tính các
+    columns chưa có (frame trong memo được mở rộng khi consumer cần thêm).
+    Consumers nhận shallow copy: thêm / gán columns (vd. ob_imbalance, ema_*)
+    không sửa frame dùng chung giữa stages / threads.
+    `get(name)` = named indicator (INDICATORS) trên frame đó, mỗi tên tính 1 lần.
+    """
+
+    def __init__(self, raw: pd.DataFrame, cache: Optional['IndicatorCache'] = None):
+        """
+        Args:
+            raw: DataFrame OHLCV (SignalGenerator._parse_klines)
+            cache: IndicatorCache nhận hit/miss counters (None = không đếm)
+        """
+        self.raw = raw
+        self.cache = cache
+        self._memo: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """DataFrame với tất cả indicators (như calculate_indicators)"""
+        return self.indicators()
+
+    def indicators(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        DataFrame indicators, đảm bảo có `columns`
+
+        Args:
+            columns: Indicator columns cần (None = tất cả FEATURE_COLUMNS)
+
+        Returns:
+            Shallow copy của frame cached (không copy data, vẫn dùng memo của named indicators)
+        """
+        computed = []
+        with self._lock:
+            df = self._frame(columns, computed)
+            missing = [column for spec in FeatureEngine.resolve(columns)
+                       for column in spec.outputs if column not in df.columns]
+            if missing:
+                extra = FeatureEngine.compute(self.raw, missing)
+                for column in missing:
+                    df[column] = extra[column]
+                computed.append(INDICATORS_FRAME)
+            view = df.copy(deep=False)
+        object.__setattr__(view, _FRAME_ATTR, self)
+        self._count(computed)
+        return view
+
+    def get(self, name: str) -> pd.Series:
+        """Named indicator (INDICATORS), vd. 'ema_21'"""
+        computed = []
+        with self._lock:
+            value = self._memo.get(name)
+            if value is None:
+                value = self._memo[name] = compute_indicator(self._frame([], computed), name)
+                computed.append(name)
+        self._count(computed)
+        return value
+
+    def _frame(self, columns: Optional[List[str]], computed: list) -> pd.DataFrame:
+        """Indicators DataFrame trong memo, tạo với `columns` nếu chưa có (gọi khi đang giữ lock)"""
+        df = self._memo.get(INDICATORS_FRAME)
+        if df is None:
+            df = self._memo[INDICATORS_FRAME] = FeatureEngine.compute(self.raw, columns)
+            object.__setattr__(df, _FRAME_ATTR, self)
+            computed.append(INDICATORS_FRAME)
+        return df
+
+    def _count(self, computed: list):
+        if self.cache is not None:
+            self.cache._count(computed)
+
+
+class IndicatorCache:
+    """
+    Cache IndicatorFrames theo (exchange, symbol, interval, open time của candle cuối).
+
+    Candle cuối có thể đang hình thành: entry chỉ được dùng lại khi OHLCV của
+    candle đó không đổi, nếu khác thì frame mới thay thế frame cũ.
+    LRU, giữ tối đa `max_frames` frames.
+
+    Thread-safe, dùng chung (xem `indicator_cache` bên dưới).
+    """
+
+    def __init__(self, max_frames: int = 512):
+        """
+        Args:
+            max_frames: Số frames tối đa (LRU)
+        """
+        self.max_frames = max_frames
+        self._frames: 'OrderedDict[Tuple, Tuple[Tuple, IndicatorFrame]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Stats
+        self.frame_hits = 0
+        self.frame_misses = 0
+        self.hits = 0
+        self.misses = 0
+        self.computed: Dict[str, int] = {}  # Số lần mỗi indicator được tính
+
+    @staticmethod
+    def _fingerprint(raw: pd.DataFrame) -> Tuple:
+        """(open time candle cuối, OHLCV candle cuối)"""
+        candle_time = raw['timestamp'].iloc[-1] if 'timestamp' in raw.columns else raw.index[-1]
+        return candle_time, tuple(raw[['open', 'high', 'low', 'close', 'volume']].iloc[-1].tolist())
+
+    def get_frame(self, symbol: str, interval: str, raw: pd.DataFrame, exchange: str = '') -> IndicatorFrame:
+        """
+        IndicatorFrame cho klines của (exchange, symbol, interval)
+
+        Args:
+            symbol: Trading pair
+            interval: Timeframe
+            raw: DataFrame OHLCV (có 'timestamp')
+            exchange: Tên exchange (cùng symbol trên 2 exchanges là 2 frames riêng)
+
+        Returns:
+            IndicatorFrame (cached nếu cùng candle)
+        """
+        candle_time, fingerprint = self._fingerprint(raw)
+        key = (exchange, symbol, interval, candle_time, len(raw))  # Cùng interval, limit khác = frame khác
+
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is not None and entry[0] == fingerprint:
+                self._frames.move_to_end(key)
+                self.frame_hits += 1
+                return entry[1]
+
+            frame = IndicatorFrame(raw, cache=self)
+            self._frames[key] = (fingerprint, frame)
+            self._frames.move_to_end(key)
+            self.frame_misses += 1
+            while len(self._frames) > self.max_frames:
+                self._frames.popitem(last=False)
+            return frame
+
+    def _count(self, computed: list):
+        """computed rỗng = hit, ngược lại 1 miss cho mỗi indicator vừa tính"""
+        with self._lock:
+            if not computed:
+                self.hits += 1
+            for name in computed:
+                self.misses += 1
+                self.computed[name] = self.computed.get(name, 0) + 1
+
+    def stats(self) -> Dict:
+        """Hit/miss counters"""
+        with self._lock:
+            return {
+                'frames': len(self._frames),
+                'frame_hits': self.frame_hits,
+                'frame_misses': self.frame_misses,
+                'hits': self.hits,
+                'misses': self.misses,
+                'computed': dict(self.computed),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+
+
+# Shared instance (SignalGenerator và các consumers)
+indicator_cache = IndicatorCache()
@@ -0,0 +1,161 @@
+# ============================================
+# 🗃️ KLINE CACHE
+# Incremental REST candle cache: chỉ fetch candles mới (startTime)
+# ============================================
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import Config
+from trading.candle_store import interval_to_ms
+
+
+# 1 row = 1 kline (REST futures_klines format, bỏ cột 'ignore')
+KLINE_DTYPE = np.dtype([
+    ('open_time', 'i8'), ('open', 'f8'), ('high', 'f8'), ('low', 'f8'), ('close', 'f8'),
+    ('volume', 'f8'), ('close_time', 'i8'), ('quote_volume', 'f8'), ('trades', 'i8'),
+    ('taker_buy_base', 'f8'), ('taker_buy_quote', 'f8')
+])
+
+# REST limit tối đa mỗi request
+MAX_FETCH_LIMIT = 1500
+# Limit tối thiểu cho delta fetch (weight thấp nhất)
+DELTA_FETCH_LIMIT = 99
+
+
+def klines_to_array(klines: List[list]) -> np.ndarray:
+    """REST klines (list of lists, giá dạng string) -> structured array"""
+    return np.array(
+        [(int(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5]),
+          int(k[6]), float(k[7]), int(k[8]), float(k[9]), float(k[10])) for k in klines],
+        dtype=KLINE_DTYPE
+    )
+
+
+def array_to_klines(arr: np.ndarray) -> List[list]:
+    """Structured array -> REST klines format (giá dạng float)"""
+    return [list(row) + ['0'] for row in arr.tolist()]
+
+
+class KlineCache:
+    """
+    Cache klines theo (exchange, symbol, interval) trong NumPy structured arrays.
+
+    Lần đầu (hoặc khi cần nhiều candles hơn cache đang có) fetch full window.
+    Các lần sau chỉ fetch từ open time của candle cuối trong cache
+    (startTime): candle đó (có thể đang hình thành) được thay bằng bản mới
+    nhất và các candles mới được append. Mỗi loop thường chỉ 1-2 candles
+    thay vì 100-200.
+
+    Thread-safe, dùng chung cho tất cả clients (xem `kline_cache` bên dưới).
+    """
+
+    def __init__(self, max_candles: int = 1000):
+        """
+        Args:
+            max_candles: Số candles tối đa giữ cho mỗi key
+        """
+        self.max_candles = max_candles
+        self._data: Dict[Tuple[str, str, str], np.ndarray] = {}
+        self._locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+        # Stats
+        self.full_fetches = 0
+        self.delta_fetches = 0
+        self.candles_fetched = 0
+
+    def _key_lock(self, key) -> threading.Lock:
+        with self._lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def get_klines(self, exchange: str, symbol: str, interval: str, limit: int,
+                   fetch: Callable[..., List[list]]) -> List[list]:
+        """
+        Lấy `limit` klines mới nhất, chỉ fetch phần còn thiếu
+
+        Args:
+            exchange: Tên exchange (phần của cache key)
+            symbol: Trading pair
+            interval: Timeframe
+            limit: Số candles
+            fetch: fetch(limit=..., start_time=None|ms) -> REST klines, raise nếu lỗi
+
+        Returns:
+            List klines (REST format)
+        """
+        key = (exchange, symbol, interval)
+        if limit > self.max_candles:
+            return fetch(limit=limit)
+
+        with self._key_lock(key):
+            cached = self._data.get(key)
+            start_time = self._delta_start(cached, interval, limit)
+
+            if start_time is None:
+                klines = fetch(limit=limit)
+                merged = klines_to_array(klines)
+                self.full_fetches += 1
+            else:
+                # startTime giới hạn response chỉ còn candles mới, limit chỉ cần đủ lớn
+                # (limit < 100 vẫn tính weight 1, chịu được lệch giờ local/exchange)
+                missing = (int(time.time() * 1000) - start_time) // interval_to_ms(interval) + 1
+                klines = fetch(limit=min(max(missing + 1, DELTA_FETCH_LIMIT), MAX_FETCH_LIMIT), start_time=start_time)
+                merged = self._merge(cached, klines_to_array(klines))
+                self.delta_fetches += 1
+
+            self.candles_fetched += len(klines)
+            merged = merged[-self.max_candles:]
+            self._data[key] = merged
+
+        return array_to_klines(merged[-limit:])
+
+    def _delta_start(self, cached: Optional[np.ndarray], interval: str, limit: int) -> Optional[int]:
+        """
+        startTime cho delta fetch, None nếu phải fetch full window
+        (chưa có cache, cache không đủ limit, interval không cố định, hoặc
+        thiếu quá nhiều candles cho 1 request)
+        """
+        step = interval_to_ms(interval)
+        if cached is None or len(cached) < limit or step is None:
+            return None
+
+        last_open = int(cached['open_time'][-1])
+        missing = (int(time.time() * 1000) - last_open) // step + 1
+        if missing >= MAX_FETCH_LIMIT or missing > limit:
+            return None
+        return last_open
+
+    @staticmethod
+    def _merge(cached: np.ndarray, fresh: np.ndarray) -> np.ndarray:
+        """Thay candles từ open time đầu tiên của fresh trở đi"""
+        if len(fresh) == 0:
+            return cached
+        keep = cached['open_time'] < fresh['open_time'][0]
+        return np.concatenate([cached[keep], fresh])
+
+    def invalidate(self, exchange: Optional[str] = None, symbol: Optional[str] = None):
+        """Xoá cache (tất cả, theo exchange, hoặc theo exchange + symbol)"""
+        with self._lock:
+            for key in list(self._data.keys()):
+                if (exchange is None or key[0] == exchange) and (symbol is None or key[1] == symbol):
+                    del self._data[key]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Fetch counters"""
+        return {
+            'keys': len(self._data),
+            'full_fetches': self.full_fetches,
+            'delta_fetches': self.delta_fetches,
+            'candles_fetched': self.candles_fetched,
+        }
+
+
+# Shared instance cho AsterDEXClient, BinanceClient và DataFetcher
+kline_cache = KlineCache(Config.KLINE_CACHE_SIZE)
@@ -0,0 +1,219 @@
+# ============================================
+# 📡 KLINE STREAM
+# Websocket kline streams -> CandleStore, REST backfill khi cần
+# ============================================
+
+import asyncio
+import json
+import threading
+import time
+from typing import Iterable, List, Optional
+
+import aiohttp
+
+from utils.logger import logger
+from trading.candle_store import CandleStore
+
+
+class KlineStreamManager:
+    """
+    Subscribe kline streams (<symbol>@kline_<interval>) cho tất cả symbols x
+    intervals và ghi vào CandleStore.
+
+    - Mỗi websocket connection tối đa MAX_STREAMS_PER_CONNECTION streams
+      (combined stream: /stream?streams=a/b/c)
+    - Sau mỗi lần connect (kể cả reconnect) các keys của connection được
+      backfill bằng REST; gap giữa 2 candles cũng trigger backfill cho key đó
+    - Chạy trên event loop riêng trong daemon thread (start/stop), hoặc
+      await run() trực tiếp trên loop có sẵn
+
+    Usage:
+        store = CandleStore(500)
+        client.candle_store = store
+        stream = KlineStreamManager('wss://fstream.binance.com', client, symbols, ['15m', '1h'], store)
+        stream.start()
+    """
+
+    MAX_STREAMS_PER_CONNECTION = 200
+    BACKFILL_CONCURRENCY = 5
+    RECONNECT_DELAY = 1
+    MAX_RECONNECT_DELAY = 60
+    HEARTBEAT = 30
+    BACKFILL_RETRY = 30  # Giây giữa 2 lần retry backfill thất bại
+
+    def __init__(self, ws_url: str, rest_client, symbols: Iterable[str], intervals: Iterable[str],
+                 store: Optional[CandleStore] = None, exchange_name: str = ''):
+        """
+        Args:
+            ws_url: Websocket base URL (vd. 'wss://fstream.binance.com')
+            rest_client: Client có get_klines(symbol, interval, limit) để backfill
+            symbols: Symbols cần stream
+            intervals: Timeframes cần stream
+            store: CandleStore (tạo mới nếu None)
+            exchange_name: Dùng cho log
+        """
+        self.ws_url = ws_url.rstrip('/')
+        self.rest_client = rest_client
+        self.store = store if store is not None else CandleStore()
+        self.exchange_name = exchange_name or getattr(rest_client, 'exchange_name', '')
+
+        self.keys = [(symbol, interval) for symbol in symbols for interval in intervals]
+        self._key_set = set(self.keys)
+
+        self._loop = None
+        self._stop_event = None
+        self._thread = None
+        self._backfill_semaphore = None
+        self._backfilling = set()
+        self._last_backfill = {}
+
+    @staticmethod
+    def _stream_name(symbol: str, interval: str) -> str:
+        return f"{symbol.lower()}@kline_{interval}"
+
+    def _connection_url(self, keys: List[tuple]) -> str:
+        streams = '/'.join(self._stream_name(s, i) for s, i in keys)
+        return f"{self.ws_url}/stream?streams={streams}"
+
+    # ============================================
+    # LIFECYCLE
+    # ============================================
+
+    def start(self):
+        """Chạy streams trong daemon thread (event loop riêng)"""
+        self._thread = threading.Thread(
+            target=asyncio.run, args=(self.run(),),
+            name=f"{self.exchange_name or 'kline'}-stream", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        """Dừng streams (an toàn khi gọi từ thread bất kỳ)"""
+        if self._loop is not None and not self._loop.is_closed() and self._stop_event is not None:
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    async def run(self):
+        """Chạy tất cả connections cho tới khi stop()"""
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        self._backfill_semaphore = asyncio.Semaphore(self.BACKFILL_CONCURRENCY)
+
+        chunks = [
+            self.keys[i:i + self.MAX_STREAMS_PER_CONNECTION]
+            for i in range(0, len(self.keys), self.MAX_STREAMS_PER_CONNECTION)
+        ]
+        logger.info(f"📡 [{self.exchange_name}] Kline streams: {len(self.keys)} streams, {len(chunks)} connections")
+
+        async with aiohttp.ClientSession() as session:
+            tasks = [asyncio.create_task(self._run_connection(session, keys)) for keys in chunks]
+            try:
+                await self._stop_event.wait()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.store.mark_stale()
+        logger.info(f"📡 [{self.exchange_name}] Kline streams stopped")
+
+    # ============================================
+    # CONNECTION
+    # ============================================
+
+    async def _run_connection(self, session: aiohttp.ClientSession, keys: List[tuple]):
+        """1 websocket connection, tự reconnect với exponential backoff"""
+        url = self._connection_url(keys)
+        delay = self.RECONNECT_DELAY
+
+        while not self._stop_event.is_set():
+            try:
+                async with session.ws_connect(url, heartbeat=self.HEARTBEAT) as ws:
+                    logger.info(f"📡 [{self.exchange_name}] Stream connected ({len(keys)} streams)")
+                    delay = self.RECONNECT_DELAY
+
+                    # Data trong lúc disconnect bị thiếu -> backfill lại toàn bộ keys
+                    self.store.mark_stale(keys)
+                    for symbol, interval in keys:
+                        self._schedule_backfill(symbol, interval)
+
+                    async for msg in ws:
+                        if msg.type == aiohttp.WSMsgType.TEXT:
+                            self._handle_message(msg.data)
+                        elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                            break
+
+                logger.warning(f"⚠️ [{self.exchange_name}] Stream disconnected, reconnecting...")
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ [{self.exchange_name}] Stream error: {e}, reconnecting in {delay}s...")
+
+            self.store.mark_stale(keys)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.MAX_RECONNECT_DELAY)
+
+    def _handle_message(self, raw: str):
+        """Parse kline event và apply vào store"""
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            return
+
+        # Combined stream: {'stream': ..., 'data': {...}}
+        data = message.get('data', message)
+        if data.get('e') != 'kline':
+            return
+
+        k = data['k']
+        symbol, interval = k['s'], k['i']
+        key = (symbol, interval)
+        if key not in self._key_set:
+            return
+
+        # Cùng format với REST futures_klines
+        kline = [k['t'], k['o'], k['h'], k['l'], k['c'], k['v'], k['T'], k['q'], k['n'], k['V'], k['Q'], k['B']]
+
+        if not self.store.update(symbol, interval, kline):
+            logger.debug(f"[{self.exchange_name}] Gap in {symbol} {interval} stream, backfilling")
+            self._schedule_backfill(symbol, interval)
+        elif (not self.store.is_ready(symbol, interval)
+              and time.monotonic() - self._last_backfill.get(key, 0) > self.BACKFILL_RETRY):
+            # Backfill trước đó thất bại
+            self._schedule_backfill(symbol, interval)
+
+    # ============================================
+    # REST BACKFILL
+    # ============================================
+
+    def _schedule_backfill(self, symbol: str, interval: str):
+        key = (symbol, interval)
+        if key in self._backfilling:
+            return
+        self._backfilling.add(key)
+        self._last_backfill[key] = time.monotonic()
+        asyncio.get_running_loop().create_task(self._backfill(symbol, interval))
+
+    async def _backfill(self, symbol: str, interval: str):
+        """Lấy klines từ REST (trong thread, client là blocking) và nạp vào store"""
+        try:
+            async with self._backfill_semaphore:
+                klines = await asyncio.to_thread(
+                    self.rest_client.get_klines, symbol, interval, self.store.maxlen
+                )
+            self.store.backfill(symbol, interval, klines)
+        except Exception as e:
+            logger.warning(f"⚠️ [{self.exchange_name}] Backfill {symbol} {interval} failed: {e}")
+        finally:
+            self._backfilling.discard((symbol, interval))
+
+    def wait_until_ready(self, timeout: float = 30) -> bool:
+        """Block tới khi tất cả keys đã backfill (dùng lúc startup / tests)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if all(self.store.is_ready(s, i) for s, i in self.keys):
+                return True
+            time.sleep(0.05)
+        return False
@@ -101,6 +101,7 @@ class MarketRegimeDetector:
         
         # 5. Moving average alignment
         if len(df) >= 50:
+            # EMA trên lookback window (adjust=True), khác EMA cả frame của indicator cache
             ema_20 = df['close'].ewm(span=20).mean().iloc[-1]
             ema_50 = df['close'].ewm(span=50).mean().iloc[-1]
             
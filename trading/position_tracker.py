@@ -5,6 +5,7 @@
 
 import json
 import os
+import threading
 from datetime import datetime, timedelta
 from utils.logger import logger
 
@@ -23,6 +24,7 @@ class PositionTracker:
         """
         self.data_file = data_file
         self.position_times = {}  # {symbol: timestamp_str}
+        self._lock = threading.RLock()  # Thread-safe khi xử lý symbols song song
         
         # Create data directory if needed
         os.makedirs(os.path.dirname(data_file), exist_ok=True)
@@ -46,7 +48,7 @@ class PositionTracker:
     def _save(self):
         """Save position times to disk"""
         try:
-            with open(self.data_file, 'w') as f:
+            with self._lock, open(self.data_file, 'w') as f:
                 json.dump(self.position_times, f, indent=2)
         except Exception as e:
             logger.error(f"Error saving position times: {e}")
@@ -59,8 +61,9 @@ class PositionTracker:
             symbol: Trading pair (e.g., 'BTCUSDT')
         """
         timestamp = datetime.now().isoformat()
-        self.position_times[symbol] = timestamp
-        self._save()
+        with self._lock:
+            self.position_times[symbol] = timestamp
+            self._save()
         logger.info(f"⏱️ Tracking position open time for {symbol}: {timestamp}")
     
     def clear_position(self, symbol):
@@ -70,10 +73,12 @@ class PositionTracker:
         Args:
             symbol: Trading pair
         """
-        if symbol in self.position_times:
+        with self._lock:
+            if symbol not in self.position_times:
+                return
             del self.position_times[symbol]
             self._save()
-            logger.info(f"⏱️ Cleared position tracking for {symbol}")
+        logger.info(f"⏱️ Cleared position tracking for {symbol}")
     
     def get_position_age_hours(self, symbol):
         """
@@ -85,11 +90,12 @@ class PositionTracker:
         Returns:
             float: Hours since position opened, or None if not tracked
         """
-        if symbol not in self.position_times:
+        timestamp = self.position_times.get(symbol)
+        if timestamp is None:
             return None
         
         try:
-            open_time = datetime.fromisoformat(self.position_times[symbol])
+            open_time = datetime.fromisoformat(timestamp)
             age = datetime.now() - open_time
             hours = age.total_seconds() / 3600
             return hours
@@ -123,7 +129,8 @@ class PositionTracker:
         Args:
             active_symbols: List of symbols with active positions
         """
-        stale_symbols = [s for s in self.position_times.keys() if s not in active_symbols]
+        with self._lock:
+            stale_symbols = [s for s in self.position_times.keys() if s not in active_symbols]
         
         for symbol in stale_symbols:
             self.clear_position(symbol)
@@ -139,7 +146,9 @@ class PositionTracker:
             dict: {symbol: age_hours}
         """
         result = {}
-        for symbol in self.position_times.keys():
+        with self._lock:
+            symbols = list(self.position_times.keys())
+        for symbol in symbols:
             age = self.get_position_age_hours(symbol)
             if age is not None:
                 result[symbol] = age
@@ -0,0 +1,302 @@
+# ============================================
+# 🚦 RATE LIMITER
+# Weight-aware token bucket mỗi exchange, dùng chung cho mọi REST caller
+# ============================================
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+from binance.client import Client, AsyncClient
+
+from config import Config
+from trading.http_session import IDEMPOTENT_METHODS, RETRY_STATUSES, backoff_delay, create_session
+from utils.logger import logger
+
+
+# ============================================
+# ENDPOINT WEIGHTS (Binance USDⓈ-M Futures, AsterDEX dùng cùng bảng)
+# ============================================
+
+# Weight cố định theo endpoint (không phụ thuộc params)
+ENDPOINT_WEIGHTS = {
+    'positionRisk': 5,
+    'account': 5,
+    'balance': 5,
+    'exchangeInfo': 1,
+    'leverage': 1,
+    'marginType': 1,
+    'order': 1,
+    'batchOrders': 5,
+    'listenKey': 1,
+    'ping': 1,
+    'time': 1,
+}
+
+
+def _klines_weight(limit: int) -> int:
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+def _depth_weight(limit: int) -> int:
+    if limit <= 50:
+        return 2
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 10
+    return 20
+
+
+def endpoint_weight(path: str, params: Optional[dict] = None) -> int:
+    """
+    Request weight của 1 REST call
+
+    Args:
+        path: URL path (vd. '/fapi/v1/klines')
+        params: Query/body params
+
+    Returns:
+        int: Weight
+    """
+    params = params or {}
+    endpoint = path.rstrip('/').rsplit('/', 1)[-1]
+
+    if endpoint in ('klines', 'continuousKlines', 'markPriceKlines'):
+        return _klines_weight(int(params.get('limit', 500)))
+    if endpoint == 'depth':
+        return _depth_weight(int(params.get('limit', 500)))
+    if endpoint in ('price', 'premiumIndex', 'bookTicker'):
+        # Không truyền symbol = tất cả symbols
+        return 1 if 'symbol' in params else 2
+    if endpoint == 'openOrders':
+        return 1 if 'symbol' in params else 40
+    return ENDPOINT_WEIGHTS.get(endpoint, 1)
+
+
+# ============================================
+# TOKEN BUCKET
+# ============================================
+
+class RateLimiter:
+    """
+    Token bucket theo request weight cho 1 exchange (giới hạn theo IP).
+
+    - capacity = weight_per_minute * utilization, refill đều trong 60s
+    - acquire(weight) / await acquire_async(weight) chờ tới khi đủ tokens,
+      an toàn khi nhiều threads / coroutines gọi cùng lúc
+    - update_from_headers(): đồng bộ với X-MBX-USED-WEIGHT-1M của exchange,
+      429/418 + Retry-After chặn toàn bộ requests tới khi hết hạn
+    """
+
+    DEFAULT_BACKOFF = 10  # Giây chặn khi bị 429 mà không có Retry-After
+
+    def __init__(self, name: str, weight_per_minute: int = 2400, utilization: float = 0.8):
+        """
+        Args:
+            name: Tên exchange (dùng cho log)
+            weight_per_minute: REQUEST_WEIGHT limit của exchange
+            utilization: Tỷ lệ limit được phép dùng (chừa margin cho callers khác)
+        """
+        self.name = name
+        self.capacity = max(1.0, weight_per_minute * utilization)
+        self.refill_rate = self.capacity / 60.0  # weight / giây
+
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+        # Stats
+        self.total_weight = 0
+        self.total_wait = 0.0
+        self.used_weight = 0  # Từ header gần nhất
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.refill_rate)
+        self._last_refill = now
+
+    def _try_acquire(self, weight: int) -> float:
+        """
+        Lấy tokens nếu đủ
+
+        Returns:
+            float: 0 nếu đã lấy, ngược lại số giây nên chờ trước khi thử lại
+        """
+        weight = min(weight, self.capacity)
+
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+
+            self._refill(now)
+            if self._tokens >= weight:
+                self._tokens -= weight
+                self.total_weight += weight
+                return 0.0
+
+            return (weight - self._tokens) / self.refill_rate
+
+    def acquire(self, weight: int = 1):
+        """Chờ (blocking) tới khi có đủ capacity cho request"""
+        while True:
+            wait = self._try_acquire(weight)
+            if wait <= 0:
+                return
+            self.total_wait += wait
+            time.sleep(wait)
+
+    async def acquire_async(self, weight: int = 1):
+        """Async version của acquire()"""
+        while True:
+            wait = self._try_acquire(weight)
+            if wait <= 0:
+                return
+            self.total_wait += wait
+            await asyncio.sleep(wait)
+
+    def update_from_headers(self, headers, status_code: int = 200):
+        """
+        Đồng bộ bucket với response của exchange
+
+        Args:
+            headers: Response headers (case-insensitive mapping)
+            status_code: HTTP status
+        """
+        used = headers.get('X-MBX-USED-WEIGHT-1M') or headers.get('X-MBX-USED-WEIGHT')
+
+        with self._lock:
+            if used is not None:
+                try:
+                    self.used_weight = int(used)
+                    # Exchange đã tính nhiều hơn bucket nghĩ (callers khác cùng IP)
+                    self._refill(time.monotonic())
+                    self._tokens = min(self._tokens, self.capacity - self.used_weight)
+                except ValueError:
+                    pass
+
+            if status_code in (418, 429):
+                try:
+                    retry_after = float(headers.get('Retry-After', 0)) or self.DEFAULT_BACKOFF
+                except ValueError:
+                    retry_after = self.DEFAULT_BACKOFF
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+                self._tokens = 0
+                logger.warning(f"⚠️ [{self.name}] HTTP {status_code} rate limited, pausing requests {retry_after:.0f}s")
+
+    def get_stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'tokens': self._tokens,
+                'capacity': self.capacity,
+                'used_weight': self.used_weight,
+                'total_weight': self.total_weight,
+                'total_wait': self.total_wait,
+            }
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str) -> RateLimiter:
+    """
+    Shared RateLimiter cho 1 exchange (vd. 'asterdex_mainnet'), tạo lần đầu gọi
+
+    Tất cả clients (sync, async, DataFetcher) cùng exchange dùng chung 1 bucket.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            if name.startswith('binance'):
+                weight_per_minute = Config.BINANCE_RATE_LIMIT_WEIGHT
+            else:
+                weight_per_minute = Config.RATE_LIMIT_WEIGHT
+            limiter = _limiters[name] = RateLimiter(name, weight_per_minute, Config.RATE_LIMIT_UTILIZATION)
+        return limiter
+
+
+# ============================================
+# PYTHON-BINANCE CLIENTS
+# ============================================
+
+def _use_simulator_urls(client):
+    """Config.SIMULATOR_URL: spot (ping) + futures URLs trỏ tới local simulator"""
+    if Config.SIMULATOR_URL:
+        client.API_URL = f"{Config.SIMULATOR_URL}/api"
+        client.FUTURES_URL = client.FUTURES_TESTNET_URL = f"{Config.SIMULATOR_URL}/fapi"
+
+
+class RateLimitedClient(Client):
+    """
+    python-binance Client: mọi request đi qua RateLimiter, dùng connection
+    pool chung (trading.http_session) thay vì 1 Session riêng mỗi client
+    """
+
+    def __init__(self, api_key, api_secret, rate_limiter: RateLimiter, **kwargs):
+        self.rate_limiter = rate_limiter
+        # Set trước super().__init__: Client ping ngay trong constructor
+        _use_simulator_urls(self)
+        super().__init__(api_key, api_secret, **kwargs)
+
+    def _init_session(self):
+        return create_session(self._get_headers())
+
+    def _request(self, method, uri: str, signed: bool, force_params: bool = False, **kwargs):
+        self.rate_limiter.acquire(endpoint_weight(urlparse(uri).path, kwargs.get('data')))
+
+        # Retry lỗi mạng / 5xx do HTTPAdapter của pool chung xử lý
+        kwargs = self._get_request_kwargs(method, signed, force_params, **kwargs)
+        response = getattr(self.session, method)(uri, **kwargs)
+        self.response = response
+
+        self.rate_limiter.update_from_headers(response.headers, response.status_code)
+        return self._handle_response(response)
+
+
+class AsyncRateLimitedClient(AsyncClient):
+    """
+    python-binance AsyncClient: mọi request đi qua RateLimiter, retry lỗi
+    mạng / 5xx với jittered backoff (chỉ methods idempotent, POST chỉ khi
+    chưa kết nối được)
+    """
+
+    def __init__(self, api_key, api_secret, rate_limiter: RateLimiter, **kwargs):
+        self.rate_limiter = rate_limiter
+        _use_simulator_urls(self)
+        super().__init__(api_key, api_secret, **kwargs)
+
+    async def _request(self, method, uri: str, signed: bool, force_params: bool = False, **kwargs):
+        weight = endpoint_weight(urlparse(uri).path, kwargs.get('data'))
+        kwargs = self._get_request_kwargs(method, signed, force_params, **kwargs)
+        retryable = method.upper() in IDEMPOTENT_METHODS
+
+        for attempt in range(Config.HTTP_MAX_RETRIES + 1):
+            last_attempt = attempt == Config.HTTP_MAX_RETRIES
+            await self.rate_limiter.acquire_async(weight)
+
+            try:
+                async with getattr(self.session, method)(uri, **kwargs) as response:
+                    self.response = response
+                    self.rate_limiter.update_from_headers(response.headers, response.status)
+                    if not (retryable and response.status in RETRY_STATUSES) or last_attempt:
+                        return await self._handle_response(response)
+            except aiohttp.ClientConnectorError:
+                # Chưa gửi được request -> retry an toàn cho mọi method
+                if last_attempt:
+                    raise
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if not retryable or last_attempt:
+                    raise
+
+            await asyncio.sleep(backoff_delay(attempt))
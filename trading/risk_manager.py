@@ -3,6 +3,7 @@
 # Quản lý rủi ro và position sizing
 # ============================================
 
+import threading
 from config import Config
 from utils.logger import logger
 
@@ -10,6 +11,8 @@ class RiskManager:
     """Quản lý rủi ro trading"""
     
     def __init__(self):
+        # Lock cho trường hợp nhiều symbol được xử lý song song
+        self._lock = threading.RLock()
         self.daily_start_balance = 0
         self.daily_trades = 0
         self.daily_volume = 0
@@ -20,10 +23,11 @@ class RiskManager:
     
     def set_daily_start(self, balance):
         """Set balance đầu ngày"""
-        self.daily_start_balance = balance
-        self.daily_trades = 0
-        self.daily_volume = 0
-        self.daily_pnl = 0
+        with self._lock:
+            self.daily_start_balance = balance
+            self.daily_trades = 0
+            self.daily_volume = 0
+            self.daily_pnl = 0
         logger.info(f"📊 Daily start balance: ${balance:.2f}")
     
     def check_daily_loss_limit(self, current_balance):
@@ -92,38 +96,40 @@ class RiskManager:
     
     def record_trade(self, symbol, side, quantity, price, pnl_pct=None):
         """Ghi nhận trade"""
-        self.daily_trades += 1
-        self.total_trades += 1
-        
-        # Volume
-        volume = quantity * price * Config.LEVERAGE
-        self.daily_volume += volume
-        
-        # PnL tracking
-        if pnl_pct is not None:
-            if pnl_pct > 0:
-                self.winning_trades += 1
-            else:
-                self.losing_trades += 1
-        
+        with self._lock:
+            self.daily_trades += 1
+            self.total_trades += 1
+
+            # Volume
+            volume = quantity * price * Config.LEVERAGE
+            self.daily_volume += volume
+
+            # PnL tracking
+            if pnl_pct is not None:
+                if pnl_pct > 0:
+                    self.winning_trades += 1
+                else:
+                    self.losing_trades += 1
+
         logger.info(f"📝 Trade recorded: {side} {quantity} {symbol} @ ${price:.2f}")
         logger.info(f"   Daily trades: {self.daily_trades} | Volume: ${self.daily_volume/1000:.1f}k")
     
     def get_daily_stats(self):
         """Lấy stats trong ngày"""
-        win_rate = 0
-        if self.total_trades > 0:
-            win_rate = self.winning_trades / self.total_trades * 100
-        
-        return {
-            'trades': self.daily_trades,
-            'volume': self.daily_volume,
-            'pnl': self.daily_pnl,
-            'total_trades': self.total_trades,
-            'win_rate': win_rate,
-            'winning_trades': self.winning_trades,
-            'losing_trades': self.losing_trades
-        }
+        with self._lock:
+            win_rate = 0
+            if self.total_trades > 0:
+                win_rate = self.winning_trades / self.total_trades * 100
+
+            return {
+                'trades': self.daily_trades,
+                'volume': self.daily_volume,
+                'pnl': self.daily_pnl,
+                'total_trades': self.total_trades,
+                'win_rate': win_rate,
+                'winning_trades': self.winning_trades,
+                'losing_trades': self.losing_trades
+            }
     
     def get_stats_message(self):
         """Tạo message stats"""
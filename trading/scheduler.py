@@ -0,0 +1,193 @@
+# ============================================
+# ⏰ EVENT SCHEDULER
+# Chạy jobs đúng lúc candle đóng / theo chu kỳ / theo giờ cố định
+# thay vì poll mọi thứ mỗi LOOP_SLEEP
+# ============================================
+
+import heapq
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import count
+from typing import Callable, Dict, Hashable, List, Optional
+
+from trading.candle_store import interval_to_ms
+
+
+# Candle 1w của Binance mở lúc thứ Hai 00:00 UTC (epoch là thứ Năm)
+_WEEK_OFFSET = 4 * 86400
+
+
+def next_candle_close(interval: str, now: float) -> float:
+    """
+    Thời điểm (epoch seconds) candle `interval` hiện tại đóng
+
+    Args:
+        interval: '1m', '15m', '1h', '4h', '1d', '1w'
+        now: Epoch seconds
+
+    Returns:
+        float: Close time của candle đang hình thành (> now)
+    """
+    step_ms = interval_to_ms(interval)
+    if step_ms is None:
+        raise ValueError(f"Unsupported interval: {interval}")
+
+    step = step_ms / 1000
+    offset = _WEEK_OFFSET if interval.endswith('w') else 0
+    return ((now - offset) // step + 1) * step + offset
+
+
+def next_daily(hour: int, minute: int, now: float) -> float:
+    """Lần tới đồng hồ local chỉ hour:minute (epoch seconds, > now)"""
+    current = datetime.fromtimestamp(now)
+    target = current.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target.timestamp() <= now:
+        target += timedelta(days=1)
+    return target.timestamp()
+
+
+class EventScheduler:
+    """
+    Priority queue của các jobs lặp lại, mỗi job có 1 key (hashable).
+
+    - add_candle_close(): đúng lúc candle đóng (+ delay cho exchange chốt
+      candle + jitter ngẫu nhiên để nhiều symbols không gọi API cùng 1 lúc)
+    - add_interval(): mỗi `seconds` giây
+    - add_daily(): mỗi ngày lúc hour:minute (giờ local)
+
+    pop_due() trả về keys đã tới hạn và lên lịch lần kế tiếp; caller quyết
+    định làm gì với từng key. Không có thread riêng: bot gọi wait() /
+    seconds_until_next() trong main loop.
+
+    Usage:
+        scheduler = EventScheduler()
+        scheduler.add_candle_close(('entry', 'binance', 'BTCUSDT'), '1h', jitter=10)
+        scheduler.add_interval('positions', 15)
+        while running:
+            for key in scheduler.wait(): ...
+    """
+
+    CLOSE_DELAY = 2.0  # Giây sau close time, chờ exchange chốt candle
+
+    def __init__(self, clock: Callable[[], float] = time.time, rng: Optional[random.Random] = None):
+        """
+        Args:
+            clock: Nguồn thời gian (epoch seconds), inject được để test
+            rng: Random cho jitter (mặc định module random)
+        """
+        self.clock = clock
+        self.rng = rng or random
+        self._queue = []
+        self._jobs: Dict[Hashable, dict] = {}
+        self._seq = count()
+
+    # ============================================
+    # JOBS
+    # ============================================
+
+    def add_candle_close(self, key: Hashable, interval: str, jitter: float = 0.0,
+                         delay: Optional[float] = None):
+        """Job chạy sau mỗi lần candle `interval` đóng"""
+        next_candle_close(interval, 0)  # Validate interval
+        self._add(key, {
+            'kind': 'candle', 'interval': interval, 'jitter': jitter,
+            'delay': self.CLOSE_DELAY if delay is None else delay
+        })
+
+    def add_interval(self, key: Hashable, seconds: float, immediate: bool = True):
+        """Job chạy mỗi `seconds` giây (immediate: lần đầu chạy ngay)"""
+        if seconds <= 0:
+            raise ValueError("seconds must be > 0")
+        self._add(key, {'kind': 'interval', 'seconds': seconds}, now_due=immediate)
+
+    def add_daily(self, key: Hashable, hour: int = 0, minute: int = 0):
+        """Job chạy mỗi ngày lúc hour:minute (giờ local)"""
+        self._add(key, {'kind': 'daily', 'hour': hour, 'minute': minute})
+
+    def remove(self, key: Hashable):
+        """Bỏ job (entry trong queue bị bỏ qua khi tới hạn)"""
+        self._jobs.pop(key, None)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._jobs
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def _add(self, key: Hashable, job: dict, now_due: bool = False):
+        now = self.clock()
+        job['due'] = now if now_due else self._next_due(job, now)
+        self._jobs[key] = job
+        heapq.heappush(self._queue, (job['due'], next(self._seq), key))
+
+    def _next_due(self, job: dict, now: float) -> float:
+        kind = job['kind']
+        if kind == 'candle':
+            jitter = self.rng.uniform(0, job['jitter']) if job['jitter'] > 0 else 0.0
+            return next_candle_close(job['interval'], now) + job['delay'] + jitter
+        if kind == 'interval':
+            return now + job['seconds']
+        return next_daily(job['hour'], job['minute'], now)
+
+    # ============================================
+    # DISPATCH
+    # ============================================
+
+    def next_due(self) -> Optional[float]:
+        """Thời điểm job sớm nhất tới hạn (None nếu không có job)"""
+        self._drop_removed()
+        return self._queue[0][0] if self._queue else None
+
+    def seconds_until_next(self) -> Optional[float]:
+        due = self.next_due()
+        if due is None:
+            return None
+        return max(0.0, due - self.clock())
+
+    def pop_due(self) -> List[Hashable]:
+        """
+        Keys đã tới hạn (theo thứ tự due), mỗi job được lên lịch lại.
+        Job bị trễ nhiều chu kỳ (vd. máy sleep) chỉ trả về 1 lần.
+        """
+        now = self.clock()
+        due = []
+
+        while self._queue and self._queue[0][0] <= now:
+            when, _, key = heapq.heappop(self._queue)
+            job = self._jobs.get(key)
+            if job is None or job['due'] != when:
+                continue  # Đã remove / thay thế
+
+            due.append(key)
+            # Tính từ max(now, when) để candle job không bắn lại cho cùng candle
+            job['due'] = self._next_due(job, max(now, when))
+            heapq.heappush(self._queue, (job['due'], next(self._seq), key))
+
+        return due
+
+    def wait(self, should_stop: Callable[[], bool] = lambda: False, max_sleep: float = 1.0) -> List[Hashable]:
+        """
+        Block tới khi có job tới hạn (hoặc should_stop()), rồi pop_due()
+
+        Args:
+            should_stop: Kiểm tra mỗi tối đa max_sleep giây (vd. bot.running == False)
+            max_sleep: Giây sleep tối đa mỗi lần
+        """
+        while not should_stop():
+            remaining = self.seconds_until_next()
+            if remaining is None:
+                time.sleep(max_sleep)
+                continue
+            if remaining <= 0:
+                return self.pop_due()
+            time.sleep(min(remaining, max_sleep))
+        return []
+
+    def _drop_removed(self):
+        while self._queue:
+            when, _, key = self._queue[0]
+            job = self._jobs.get(key)
+            if job is not None and job['due'] == when:
+                return
+            heapq.heappop(self._queue)
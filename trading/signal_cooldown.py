@@ -5,6 +5,7 @@
 
 import json
 import os
+import threading
 from datetime import datetime, timedelta
 from typing import Optional
 from utils.logger import logger
@@ -28,6 +29,7 @@ class SignalCooldownTracker:
         self.data_file = 'data/signal_cooldown.json'
         self.last_signals = {}  # {symbol: {'time': datetime, 'signal': 'LONG/SHORT'}}
         self.post_trade_cooldowns = {}  # {symbol: {'time': datetime, 'close_price': float, 'close_reason': str}}
+        self._lock = threading.RLock()  # Thread-safe khi xử lý symbols song song
         self._load_data()
     
     def _load_data(self):
@@ -69,21 +71,22 @@ class SignalCooldownTracker:
         try:
             os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
             data = {'signals': {}, 'post_trade': {}}
-            # Save signal cooldowns
-            for symbol, info in self.last_signals.items():
-                data['signals'][symbol] = {
-                    'time': info['time'].isoformat(),
-                    'signal': info['signal']
-                }
-            # Save post-trade cooldowns
-            for symbol, info in self.post_trade_cooldowns.items():
-                data['post_trade'][symbol] = {
-                    'time': info['time'].isoformat(),
-                    'close_price': info.get('close_price', 0),
-                    'close_reason': info.get('close_reason', '')
-                }
-            with open(self.data_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            with self._lock:
+                # Save signal cooldowns
+                for symbol, info in self.last_signals.items():
+                    data['signals'][symbol] = {
+                        'time': info['time'].isoformat(),
+                        'signal': info['signal']
+                    }
+                # Save post-trade cooldowns
+                for symbol, info in self.post_trade_cooldowns.items():
+                    data['post_trade'][symbol] = {
+                        'time': info['time'].isoformat(),
+                        'close_price': info.get('close_price', 0),
+                        'close_reason': info.get('close_reason', '')
+                    }
+                with open(self.data_file, 'w') as f:
+                    json.dump(data, f, indent=2)
         except Exception as e:
             logger.error(f"Could not save signal cooldown data: {e}")
     
@@ -98,10 +101,10 @@ class SignalCooldownTracker:
         Returns:
             tuple: (can_signal: bool, reason: str or None)
         """
-        if symbol not in self.last_signals:
+        last_info = self.last_signals.get(symbol)
+        if last_info is None:
             return True, None
         
-        last_info = self.last_signals[symbol]
         last_time = last_info['time']
         last_signal = last_info['signal']
         
@@ -125,11 +128,12 @@ class SignalCooldownTracker:
             symbol: Trading pair
             signal: 'LONG' or 'SHORT'
         """
-        self.last_signals[symbol] = {
-            'time': datetime.now(),
-            'signal': signal
-        }
-        self._save_data()
+        with self._lock:
+            self.last_signals[symbol] = {
+                'time': datetime.now(),
+                'signal': signal
+            }
+            self._save_data()
         logger.debug(f"Recorded {signal} signal for {symbol}")
     
     def clear_signal(self, symbol: str):
@@ -139,10 +143,12 @@ class SignalCooldownTracker:
         Args:
             symbol: Trading pair
         """
-        if symbol in self.last_signals:
+        with self._lock:
+            if symbol not in self.last_signals:
+                return
             del self.last_signals[symbol]
             self._save_data()
-            logger.debug(f"Cleared signal cooldown for {symbol}")
+        logger.debug(f"Cleared signal cooldown for {symbol}")
     
     def get_cooldown_info(self, symbol: str) -> Optional[dict]:
         """
@@ -177,24 +183,27 @@ class SignalCooldownTracker:
             max_age_hours: Remove records older than this
         """
         cutoff = datetime.now() - timedelta(hours=max_age_hours)
-        old_symbols = [
-            symbol for symbol, info in self.last_signals.items()
-            if info['time'] < cutoff
-        ]
+        with self._lock:
+            old_symbols = [
+                symbol for symbol, info in self.last_signals.items()
+                if info['time'] < cutoff
+            ]
 
-        for symbol in old_symbols:
-            del self.last_signals[symbol]
+            for symbol in old_symbols:
+                del self.last_signals[symbol]
 
-        # Also cleanup post-trade cooldowns
-        old_post_trade = [
-            symbol for symbol, info in self.post_trade_cooldowns.items()
-            if info['time'] < cutoff
-        ]
-        for symbol in old_post_trade:
-            del self.post_trade_cooldowns[symbol]
+            # Also cleanup post-trade cooldowns
+            old_post_trade = [
+                symbol for symbol, info in self.post_trade_cooldowns.items()
+                if info['time'] < cutoff
+            ]
+            for symbol in old_post_trade:
+                del self.post_trade_cooldowns[symbol]
+
+            if old_symbols or old_post_trade:
+                self._save_data()
 
         if old_symbols or old_post_trade:
-            self._save_data()
             logger.info(f"Cleaned up {len(old_symbols)} signal + {len(old_post_trade)} post-trade cooldown records")
 
     # ============================================
@@ -210,12 +219,13 @@ class SignalCooldownTracker:
             close_price: Price at which position was closed
             close_reason: Reason for closing (TP, SL, TIMEOUT, etc.)
         """
-        self.post_trade_cooldowns[symbol] = {
-            'time': datetime.now(),
-            'close_price': close_price,
-            'close_reason': close_reason
-        }
-        self._save_data()
+        with self._lock:
+            self.post_trade_cooldowns[symbol] = {
+                'time': datetime.now(),
+                'close_price': close_price,
+                'close_reason': close_reason
+            }
+            self._save_data()
         logger.info(f"📝 Post-trade cooldown recorded for {symbol} (reason: {close_reason})")
 
     def can_enter_after_close(self, symbol: str, current_price: float = None, require_pullback: bool = False, pullback_pct: float = 0.3) -> tuple[bool, Optional[str]]:
@@ -231,10 +241,10 @@ class SignalCooldownTracker:
         Returns:
             tuple: (can_enter: bool, reason: str or None)
         """
-        if symbol not in self.post_trade_cooldowns:
+        info = self.post_trade_cooldowns.get(symbol)
+        if info is None:
             return True, None
 
-        info = self.post_trade_cooldowns[symbol]
         time_since = datetime.now() - info['time']
         minutes_since = time_since.total_seconds() / 60
 
@@ -262,10 +272,12 @@ class SignalCooldownTracker:
         Args:
             symbol: Trading pair
         """
-        if symbol in self.post_trade_cooldowns:
+        with self._lock:
+            if symbol not in self.post_trade_cooldowns:
+                return
             del self.post_trade_cooldowns[symbol]
             self._save_data()
-            logger.debug(f"Cleared post-trade cooldown for {symbol}")
+        logger.debug(f"Cleared post-trade cooldown for {symbol}")
 
     def get_post_trade_info(self, symbol: str) -> Optional[dict]:
         """
@@ -4,16 +4,24 @@
 # + NEW: Entry Pipeline 5-Stage Validation
 # ============================================
 
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
 import pandas as pd
 import numpy as np
 from ml.features import FeatureEngine
+from ml.feature_store import FeatureStore
 from ml.lstm_model import LSTMTrainer
 from ml.ensemble import EnsemblePredictor
+from ml.ensemble_result import EnsembleResult
 from config import Config
 from utils.logger import logger
 from trading.advanced_entry import AdvancedEntrySystem, SmartEntrySystemV2
 from trading.signal_cooldown import SignalCooldownTracker
 from trading.entry_quality import EntryQualityChecker
+from trading.indicator_cache import indicator, indicator_cache
 
 # NEW: Entry Pipeline imports
 try:
@@ -23,6 +31,18 @@ except ImportError:
     ENTRY_PIPELINE_AVAILABLE = False
     logger.warning("⚠️ Entry Pipeline not available")
 
+@dataclass
+class PreparedSignal:
+    """Features + ML predictions của 1 symbol (bước 1-5 của generate_signal)"""
+    symbol: str
+    df: pd.DataFrame
+    ob_imbalance: float
+    ml_input: np.ndarray                  # (SEQUENCE_LENGTH, n_features) đã normalize
+    ml_prob: float = 0.5
+    ensemble_result: Optional[EnsembleResult] = None  # Probabilities từng model, Entry Pipeline dùng lại
+    prepared_at: float = field(default_factory=time.monotonic)
+
+
 class SignalGenerator:
     """
     Tạo trading signals từ nhiều nguồn:
@@ -42,6 +62,16 @@ class SignalGenerator:
         self.predictor = predictor  # Can be LSTMTrainer or EnsemblePredictor
         self.feature_engine = FeatureEngine()
 
+        # Indicators mỗi (symbol, interval, candle) tính 1 lần, dùng chung cho mọi stages
+        self.indicator_cache = indicator_cache if Config.USE_INDICATOR_CACHE else None
+
+        # Model input: float32 buffer mỗi (exchange, symbol, interval), không tạo DataFrame features
+        self.feature_store = FeatureStore(capacity=Config.SEQUENCE_LENGTH)
+
+        # Kết quả prepare_batch chờ generate_signal: {(client, symbol): PreparedSignal}
+        self._prepared: Dict = {}
+        self._prepared_lock = threading.Lock()
+
         # Check if using ensemble
         self.use_ensemble = isinstance(predictor, EnsemblePredictor)
 
@@ -100,6 +130,32 @@ class SignalGenerator:
                 logger.error(f"Failed to initialize Entry Pipeline: {e}")
                 self.entry_pipeline = None
 
+        # Chỉ tính indicators mà models + stages đang bật đọc
+        self.primary_columns, self.htf_columns = self._indicator_columns()
+
+    def _indicator_columns(self):
+        """
+        Indicator columns cần tính
+
+        Returns:
+            (primary columns, HTF columns): primary gồm FEATURE_COLUMNS (input của
+            ML models) + columns stages đọc; HTF frames chỉ dùng cho trend / swing levels
+        """
+        primary = list(FeatureEngine.FEATURE_COLUMNS) + ['rsi']
+        htf = []
+
+        for consumer in (self.smart_entry_v2, self.advanced_entry, self.entry_quality_checker):
+            if consumer is not None:
+                primary += consumer.REQUIRED_COLUMNS
+                htf += getattr(consumer, 'HTF_REQUIRED_COLUMNS', [])
+
+        if self.entry_pipeline is not None:
+            pipeline_primary, pipeline_htf = self.entry_pipeline.required_columns()
+            primary += pipeline_primary
+            htf += pipeline_htf
+
+        return list(dict.fromkeys(primary)), list(dict.fromkeys(htf))
+
     def _build_pipeline_config(self) -> dict:
         """Build config dict for Entry Pipeline"""
         return {
@@ -173,6 +229,137 @@ class SignalGenerator:
 
         return models
     
+    # ============================================
+    # BATCH INFERENCE (1 lần predict cho mọi symbols mỗi loop)
+    # ============================================
+
+    # PreparedSignal cũ hơn (giây) bị bỏ, generate_signal tự tính lại
+    PREPARED_MAX_AGE = 60
+
+    def _prepare_ml_input(self, client, symbol: str) -> Optional[PreparedSignal]:
+        """
+        Bước 1-4 của generate_signal: klines, indicators, order book, normalized ML input
+
+        Returns:
+            PreparedSignal (chưa predict), None nếu thiếu data
+        """
+        # Determine interval
+        interval = Config.PRIMARY_TIMEFRAME if Config.USE_ADVANCED_ENTRY else '15m'
+
+        # 1. Get klines data (more data for advanced analysis)
+        limit = 200 if Config.USE_ADVANCED_ENTRY else 100
+        klines = client.get_klines(symbol, interval=interval, limit=limit)
+
+        if not klines or len(klines) < 60:
+            logger.warning(f"Insufficient klines data for {symbol}")
+            return None
+
+        # 2. Parse klines + calculate indicators
+        df = self._calculate_indicators(client, symbol, interval, klines, self.primary_columns)
+
+        # 3. Get Order Book (with error handling)
+        orderbook = client.get_orderbook(symbol, limit=10)
+
+        # If orderbook is empty (symbol unavailable), use neutral imbalance
+        if not orderbook.get('bids') or not orderbook.get('asks'):
+            logger.warning(f"Empty orderbook for {symbol}, using neutral imbalance")
+            ob_imbalance = 1.0  # Neutral
+        else:
+            ob_imbalance = self.feature_engine.calculate_ob_imbalance(
+                orderbook['bids'],
+                orderbook['asks']
+            )
+
+        # Update OB imbalance
+        df['ob_imbalance'] = ob_imbalance
+
+        # 4. Prepare features for ML model (last 60 candles)
+        if len(df) < Config.SEQUENCE_LENGTH:
+            logger.warning(f"Not enough data for ML model: {len(df)}")
+            return None
+
+        # Buffer dùng chung giữa threads (parallel symbols / prepare_batch executor):
+        # giữ lock tới khi transform xong (transform trả về array mới, không giữ view của buffer)
+        buffer = self.feature_store.buffer(symbol, interval, exchange=self._exchange_key(client))
+        with buffer.lock:
+            features = buffer.load(df, n=Config.SEQUENCE_LENGTH)
+            ml_input = self.predictor.scaler.transform(features)
+
+        return PreparedSignal(symbol=symbol, df=df, ob_imbalance=ob_imbalance, ml_input=ml_input)
+
+    def _predict_prepared(self, prepared: List[PreparedSignal]):
+        """
+        Bước 5: ML prediction cho nhiều symbols, 1 forward pass mỗi model
+
+        Ensemble: mỗi symbol 1 EnsembleResult (probabilities từng model, weighted mean,
+        agreement), Entry Pipeline / AI stage dùng lại thay vì chạy lại models.
+
+        Args:
+            prepared: PreparedSignals (ghi ml_prob / ensemble_result in-place)
+        """
+        if not prepared:
+            return
+
+        X = np.stack([item.ml_input for item in prepared])  # (n_symbols, seq_len, n_features)
+
+        # 5. ML Prediction (LSTM or Ensemble)
+        if self.use_ensemble:
+            for item, result in zip(prepared, self.predictor.predict_results(X)):
+                item.ensemble_result = result
+                item.ml_prob = result.probability
+        else:
+            probs = self.predictor.predict_batch(X)
+            for i, item in enumerate(prepared):
+                item.ml_prob = float(probs[i])
+
+    def prepare_batch(self, client, symbols: List[str], executor=None) -> int:
+        """
+        Tính trước features + ML predictions cho cả loop (cross-symbol batch)
+
+        Fetch / indicators từng symbol (song song nếu có executor), sau đó mỗi model
+        predict 1 lần trên (n_symbols, seq_len, n_features). Kết quả được
+        generate_signal(client, symbol) lấy ra thay vì predict từng symbol.
+
+        Args:
+            client: Exchange client (giống client truyền vào generate_signal)
+            symbols: Symbols sẽ gọi generate_signal trong loop này
+            executor: ThreadPoolExecutor cho bước fetch (None = tuần tự)
+
+        Returns:
+            Số symbols đã prepare
+        """
+        def prepare(symbol):
+            try:
+                return self._prepare_ml_input(client, symbol)
+            except Exception as e:
+                logger.debug(f"Batch prepare failed for {symbol}: {e}")
+                return None
+
+        mapped = executor.map(prepare, symbols) if executor is not None else map(prepare, symbols)
+        prepared = [item for item in mapped if item is not None]
+
+        if prepared:
+            start = time.perf_counter()
+            self._predict_prepared(prepared)
+            logger.debug(f"🧮 Batch inference: {len(prepared)} symbols in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+        with self._prepared_lock:
+            # Kết quả loop trước của client này không còn dùng
+            for key in [key for key in self._prepared if key[0] is client]:
+                del self._prepared[key]
+            for item in prepared:
+                self._prepared[(client, item.symbol)] = item
+
+        return len(prepared)
+
+    def _take_prepared(self, client, symbol: str) -> Optional[PreparedSignal]:
+        """Lấy (và xóa) PreparedSignal của symbol nếu còn mới"""
+        with self._prepared_lock:
+            prepared = self._prepared.pop((client, symbol), None)
+        if prepared is None or time.monotonic() - prepared.prepared_at > self.PREPARED_MAX_AGE:
+            return None
+        return prepared
+
     def generate_signal(self, client, symbol):
         """
         Tạo signal cho 1 symbol
@@ -186,74 +373,32 @@ class SignalGenerator:
                    OR str: 'LONG', 'SHORT', 'HOLD' (legacy mode)
         """
         try:
-            # Determine interval
-            interval = Config.PRIMARY_TIMEFRAME if Config.USE_ADVANCED_ENTRY else '15m'
-
-            # 1. Get klines data (more data for advanced analysis)
-            limit = 200 if Config.USE_ADVANCED_ENTRY else 100
-            klines = client.get_klines(symbol, interval=interval, limit=limit)
-            
-            if not klines or len(klines) < 60:
-                logger.warning(f"Insufficient klines data for {symbol}")
-                if Config.USE_ADVANCED_ENTRY:
-                    return 'HOLD', 0, []
-                else:
-                    return 'HOLD'
-            
-            # Parse klines
-            df = self._parse_klines(klines)
-            
-            # 2. Calculate indicators
-            df = self.feature_engine.calculate_indicators(df)
-            
-            # 3. Get Order Book (with error handling)
-            orderbook = client.get_orderbook(symbol, limit=10)
-
-            # If orderbook is empty (symbol unavailable), use neutral imbalance
-            if not orderbook.get('bids') or not orderbook.get('asks'):
-                logger.warning(f"Empty orderbook for {symbol}, using neutral imbalance")
-                ob_imbalance = 1.0  # Neutral
-            else:
-                ob_imbalance = self.feature_engine.calculate_ob_imbalance(
-                    orderbook['bids'],
-                    orderbook['asks']
-                )
-            
-            # Update OB imbalance
-            df['ob_imbalance'] = ob_imbalance
-            
-            # 4. Prepare features for ML model
-            feature_df = self.feature_engine.prepare_features(df)
+            # 1-5. Klines, indicators, order book, ML prediction
+            # (tính sẵn bởi prepare_batch của loop nếu có)
+            prepared = self._take_prepared(client, symbol)
+            if prepared is None:
+                prepared = self._prepare_ml_input(client, symbol)
+                if prepared is None:
+                    if Config.USE_ADVANCED_ENTRY:
+                        return 'HOLD', 0, []
+                    else:
+                        return 'HOLD'
+                self._predict_prepared([prepared])
 
-            # Normalize
-            normalized = self.predictor.scaler.transform(feature_df.values)
+            df = prepared.df
+            ob_imbalance = prepared.ob_imbalance
+            ml_input = prepared.ml_input
 
-            # Get last 60 candles
-            if len(normalized) < Config.SEQUENCE_LENGTH:
-                logger.warning(f"Not enough data for ML model: {len(normalized)}")
-                if Config.USE_ADVANCED_ENTRY:
-                    return 'HOLD', 0, []
-                else:
-                    return 'HOLD'
-
-            ml_input = normalized[-Config.SEQUENCE_LENGTH:]
-
-            # 5. ML Prediction (LSTM or Ensemble)
-            if self.use_ensemble:
-                ml_prob, pred_details = self.predictor.predict_with_details(ml_input)
-                # Log individual model predictions (only in debug mode)
-                # Note: logger is custom Logger class, use logging module for level check
-                import logging
-                if logging.getLogger().getEffectiveLevel() <= logging.INFO:
-                    logger.debug(f"   ML predictions:")
-                    for model_name, pred in pred_details.items():
-                        if model_name not in ['ensemble', 'weights']:
-                            logger.debug(f"      {model_name}: {pred:.3f}")
-            else:
-                ml_prob = self.predictor.predict(ml_input)[0]
+            # Log individual model predictions (only in debug mode)
+            # Note: logger is custom Logger class, use logging module for level check
+            import logging
+            if self.use_ensemble and logging.getLogger().getEffectiveLevel() <= logging.INFO:
+                logger.debug(f"   ML predictions:")
+                for model_name, pred in prepared.ensemble_result.predictions.items():
+                    logger.debug(f"      {model_name}: {pred:.3f}")
 
             # For backward compatibility, keep variable name as lstm_prob
-            lstm_prob = ml_prob
+            lstm_prob = prepared.ml_prob
             
             # 6. Get current indicators
             current_rsi = df['rsi'].iloc[-1]
@@ -295,7 +440,8 @@ class SignalGenerator:
                     df=df,
                     ml_input=ml_input,
                     lstm_prob=lstm_prob,
-                    current_rsi=current_rsi
+                    current_rsi=current_rsi,
+                    ensemble_result=prepared.ensemble_result
                 )
 
             # Use SmartEntrySystemV2 if enabled (priority over AdvancedEntry)
@@ -308,13 +454,11 @@ class SignalGenerator:
                     try:
                         # Get 1H data
                         klines_1h = client.get_klines(symbol, interval='1h', limit=100)
-                        df_1h = self._parse_klines(klines_1h)
-                        df_1h = self.feature_engine.calculate_indicators(df_1h)
+                        df_1h = self._calculate_indicators(client, symbol, '1h', klines_1h, self.htf_columns)
 
                         # Get 4H data
                         klines_4h = client.get_klines(symbol, interval='4h', limit=100)
-                        df_4h = self._parse_klines(klines_4h)
-                        df_4h = self.feature_engine.calculate_indicators(df_4h)
+                        df_4h = self._calculate_indicators(client, symbol, '4h', klines_4h, self.htf_columns)
                     except Exception as e:
                         logger.warning(f"Could not get HTF data: {e}")
 
@@ -390,8 +534,7 @@ class SignalGenerator:
                 if Config.USE_MULTI_TIMEFRAME:
                     try:
                         klines_htf = client.get_klines(symbol, interval=Config.HIGHER_TIMEFRAME, limit=100)
-                        df_htf = self._parse_klines(klines_htf)
-                        df_htf = self.feature_engine.calculate_indicators(df_htf)
+                        df_htf = self._calculate_indicators(client, symbol, Config.HIGHER_TIMEFRAME, klines_htf, self.htf_columns)
 
                         # Check HTF trend
                         htf_trend = self._get_trend(df_htf)
@@ -510,8 +653,8 @@ class SignalGenerator:
         if len(df) < 50:
             return 'NEUTRAL'
 
-        ema_20 = df['close'].ewm(span=20, adjust=False).mean().iloc[-1]
-        ema_50 = df['close'].ewm(span=50, adjust=False).mean().iloc[-1]
+        ema_20 = indicator(df, 'ema_20').iloc[-1]
+        ema_50 = indicator(df, 'ema_50').iloc[-1]
         current_price = df['close'].iloc[-1]
 
         if current_price > ema_20 > ema_50:
@@ -521,6 +664,23 @@ class SignalGenerator:
         else:
             return 'NEUTRAL'
     
+    def _calculate_indicators(self, client, symbol, interval, klines, columns=None):
+        """
+        Parse klines + indicators `columns` (qua IndicatorCache nếu USE_INDICATOR_CACHE)
+
+        Frame trả về là shallow copy của frame cached: thêm / gán columns không ảnh hưởng cache.
+        """
+        df = self._parse_klines(klines)
+        if self.indicator_cache is None:
+            return self.feature_engine.compute(df, columns)
+        frame = self.indicator_cache.get_frame(symbol, interval, df, exchange=self._exchange_key(client))
+        return frame.indicators(columns)
+
+    @staticmethod
+    def _exchange_key(client) -> str:
+        """Tên exchange của client (key cho caches: cùng symbol trên 2 exchanges là 2 series)"""
+        return getattr(client, 'exchange_name', None) or type(client).__name__
+
     def _parse_klines(self, klines):
         """Parse klines thành DataFrame"""
         df = pd.DataFrame(klines, columns=[
@@ -579,7 +739,8 @@ class SignalGenerator:
         df: pd.DataFrame,
         ml_input: np.ndarray,
         lstm_prob: float,
-        current_rsi: float
+        current_rsi: float,
+        ensemble_result=None
     ):
         """
         Generate signal using Entry Pipeline (5-stage validation)
@@ -591,6 +752,7 @@ class SignalGenerator:
             ml_input: Normalized ML input features
             lstm_prob: ML probability (for logging)
             current_rsi: Current RSI value
+            ensemble_result: EnsembleResult của ml_input (None = pipeline tự predict)
 
         Returns:
             tuple: (signal, confluence_score, reasons)
@@ -604,13 +766,11 @@ class SignalGenerator:
                 try:
                     # Get 1H data
                     klines_1h = client.get_klines(symbol, interval='1h', limit=100)
-                    df_1h = self._parse_klines(klines_1h)
-                    df_1h = self.feature_engine.calculate_indicators(df_1h)
+                    df_1h = self._calculate_indicators(client, symbol, '1h', klines_1h, self.htf_columns)
 
                     # Get 4H data
                     klines_4h = client.get_klines(symbol, interval='4h', limit=100)
-                    df_4h = self._parse_klines(klines_4h)
-                    df_4h = self.feature_engine.calculate_indicators(df_4h)
+                    df_4h = self._calculate_indicators(client, symbol, '4h', klines_4h, self.htf_columns)
                 except Exception as e:
                     logger.warning(f"Could not get HTF data: {e}")
 
@@ -620,7 +780,8 @@ class SignalGenerator:
                 df=df,
                 X_features=ml_input,
                 df_higher=df_1h,
-                df_4h=df_4h
+                df_4h=df_4h,
+                ensemble_result=ensemble_result
             )
 
             # Convert decision to signal format
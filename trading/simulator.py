@@ -0,0 +1,847 @@
+# ============================================
+# 🧪 EXCHANGE SIMULATOR
+# Local Binance-compatible futures API (REST + websocket) để load test /
+# đo latency bot với 100+ symbols, không cần network
+# ============================================
+
+import asyncio
+import csv
+import json
+import math
+import random
+import time
+import uuid
+from collections import deque
+from itertools import count
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import unquote
+
+from aiohttp import web, WSMsgType
+
+from utils.logger import logger
+from trading.candle_store import interval_to_ms
+from trading.rate_limiter import endpoint_weight
+
+
+# ============================================
+# PRICE PATHS
+# ============================================
+
+class SyntheticPath:
+    """Random walk (log-normal) cho 1 symbol, volatility tính theo 1 phút"""
+
+    def __init__(self, start_price: float, volatility: float = 0.001, rng: Optional[random.Random] = None):
+        self.price = start_price
+        self.volatility = volatility
+        self.rng = rng or random.Random()
+
+    def step(self, seconds: float) -> float:
+        """Giá sau `seconds` giây"""
+        sigma = self.volatility * math.sqrt(max(seconds, 0.0) / 60)
+        self.price *= math.exp(self.rng.gauss(0, sigma))
+        return self.price
+
+
+class RecordedPath:
+    """
+    Replay chuỗi giá đã ghi, mỗi tick 1 giá (hết thì quay lại đầu).
+    History trước giá đầu tiên vẫn là random walk với `volatility`.
+    """
+
+    def __init__(self, prices: List[float], volatility: float = 0.001, rng: Optional[random.Random] = None):
+        if not prices:
+            raise ValueError("Recorded path is empty")
+        self.prices = prices
+        self.volatility = volatility
+        self.rng = rng or random.Random()
+        self._index = 0
+        self.price = prices[0]
+
+    def step(self, seconds: float) -> float:
+        self._index = (self._index + 1) % len(self.prices)
+        self.price = self.prices[self._index]
+        return self.price
+
+
+def load_price_path(path: str) -> List[float]:
+    """
+    Đọc giá từ CSV (cột 'close' hoặc 'price') hoặc JSON list klines
+    (format futures_klines, giá close ở index 4)
+    """
+    if path.endswith('.json'):
+        with open(path) as f:
+            return [float(k[4]) for k in json.load(f)]
+
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        column = next((c for c in ('close', 'price') if c in (reader.fieldnames or [])), None)
+        if column is None:
+            raise ValueError(f"{path}: no 'close' or 'price' column")
+        return [float(row[column]) for row in reader if row[column]]
+
+
+# ============================================
+# MARKET (1 symbol)
+# ============================================
+
+class SimMarket:
+    """
+    Giá + candles của 1 symbol.
+
+    Candles mỗi interval được sinh lúc request đầu tiên (random walk ngược
+    từ giá hiện tại), sau đó mỗi tick cập nhật candle đang hình thành và
+    mở candle mới khi qua close time.
+    """
+
+    HISTORY = 1500  # Candles giữ lại mỗi interval (= limit tối đa của klines)
+
+    def __init__(self, symbol: str, path, now_ms: int, rng: Optional[random.Random] = None):
+        self.symbol = symbol
+        self.path = path
+        self.price = path.price
+        self.updated = now_ms
+        self.rng = rng or random.Random()
+        self.candles: Dict[str, deque] = {}
+
+        # Precision theo độ lớn giá (giống các symbols thật)
+        self.price_precision = max(0, min(8, 4 - int(math.floor(math.log10(self.price)))))
+        self.quantity_precision = max(0, min(3, int(math.floor(math.log10(self.price)))))
+        self.tick_size = 10 ** -self.price_precision
+        self.step_size = 10 ** -self.quantity_precision
+
+    def fmt_price(self, price: float) -> str:
+        return f"{price:.{self.price_precision}f}"
+
+    def fmt_qty(self, quantity: float) -> str:
+        return f"{quantity:.{self.quantity_precision}f}"
+
+    def tick(self, now_ms: int):
+        """Bước giá tới now_ms, cập nhật candles"""
+        self.price = self.path.step((now_ms - self.updated) / 1000)
+        self.updated = now_ms
+        volume = self.rng.uniform(0.1, 2.0)
+
+        for interval, candles in self.candles.items():
+            self._roll(interval, candles, now_ms)
+            candle = candles[-1]
+            candle[2] = max(candle[2], self.price)
+            candle[3] = min(candle[3], self.price)
+            candle[4] = self.price
+            candle[5] += volume
+            candle[7] += volume * self.price
+            candle[8] += 1
+
+    def klines(self, interval: str, now_ms: int, limit: int = 500,
+               start_time: Optional[int] = None, end_time: Optional[int] = None) -> List[List]:
+        """Candles theo format futures_klines (candle cuối đang hình thành)"""
+        candles = self._get_candles(interval, now_ms)
+        selected = [c for c in candles
+                    if (start_time is None or c[0] >= start_time) and (end_time is None or c[0] <= end_time)]
+        selected = selected[:limit] if start_time is not None else selected[-limit:]
+        return [self._format_candle(c) for c in selected]
+
+    def kline_event(self, interval: str, now_ms: int) -> dict:
+        """Websocket kline event của candle đang hình thành"""
+        c = self._get_candles(interval, now_ms)[-1]
+        return {
+            'e': 'kline', 'E': now_ms, 's': self.symbol,
+            'k': {
+                't': c[0], 'T': c[6], 's': self.symbol, 'i': interval,
+                'o': self.fmt_price(c[1]), 'h': self.fmt_price(c[2]),
+                'l': self.fmt_price(c[3]), 'c': self.fmt_price(c[4]),
+                'v': self.fmt_qty(c[5]), 'q': f"{c[7]:.4f}", 'n': c[8],
+                'V': self.fmt_qty(c[5] / 2), 'Q': f"{c[7] / 2:.4f}", 'B': '0',
+                'x': now_ms >= c[6]
+            }
+        }
+
+    def mark_price_event(self, now_ms: int) -> dict:
+        return {
+            'e': 'markPriceUpdate', 'E': now_ms, 's': self.symbol,
+            'p': self.fmt_price(self.price), 'i': self.fmt_price(self.price),
+            'P': self.fmt_price(self.price), 'r': '0.00010000', 'T': now_ms
+        }
+
+    def depth(self, limit: int) -> dict:
+        """Order book giả quanh giá hiện tại (spread 1 tick)"""
+        levels = range(1, limit + 1)
+        return {
+            'lastUpdateId': self.updated, 'E': self.updated, 'T': self.updated,
+            'bids': [[self.fmt_price(self.price - i * self.tick_size), self.fmt_qty(self.rng.uniform(1, 50) * self.step_size * 100)]
+                     for i in levels],
+            'asks': [[self.fmt_price(self.price + i * self.tick_size), self.fmt_qty(self.rng.uniform(1, 50) * self.step_size * 100)]
+                     for i in levels],
+        }
+
+    def symbol_info(self) -> dict:
+        """Entry của exchangeInfo"""
+        return {
+            'symbol': self.symbol, 'status': 'TRADING', 'contractType': 'PERPETUAL',
+            'baseAsset': self.symbol[:-4], 'quoteAsset': 'USDT', 'marginAsset': 'USDT',
+            'pricePrecision': self.price_precision, 'quantityPrecision': self.quantity_precision,
+            'filters': [
+                {'filterType': 'PRICE_FILTER', 'tickSize': self.fmt_price(self.tick_size),
+                 'minPrice': self.fmt_price(self.tick_size), 'maxPrice': '1000000'},
+                {'filterType': 'LOT_SIZE', 'stepSize': self.fmt_qty(self.step_size),
+                 'minQty': self.fmt_qty(self.step_size), 'maxQty': '1000000'},
+                {'filterType': 'MARKET_LOT_SIZE', 'stepSize': self.fmt_qty(self.step_size),
+                 'minQty': self.fmt_qty(self.step_size), 'maxQty': '1000000'},
+                {'filterType': 'MIN_NOTIONAL', 'notional': '5'},
+            ]
+        }
+
+    def _get_candles(self, interval: str, now_ms: int) -> deque:
+        candles = self.candles.get(interval)
+        if candles is None:
+            candles = self.candles[interval] = self._generate_history(interval, now_ms)
+        self._roll(interval, candles, now_ms)
+        return candles
+
+    def _generate_history(self, interval: str, now_ms: int) -> deque:
+        step = interval_to_ms(interval)
+        if step is None:
+            raise ValueError(f"Invalid interval: {interval}")
+
+        # Random walk ngược từ giá hiện tại: close của candle trước = open của candle sau
+        minutes = step / 60000
+        open_time = now_ms // step * step
+        close = self.price
+        candles = []
+        for i in range(self.HISTORY):
+            t = open_time - i * step
+            elapsed = minutes if i > 0 else (now_ms - t) / 60000  # Candle đang hình thành
+            sigma = self.path.volatility * math.sqrt(elapsed)
+            open_ = close * math.exp(self.rng.gauss(0, sigma))
+            wick = abs(self.rng.gauss(0, sigma / 2))
+            volume = self.rng.uniform(10, 200) * minutes
+            candles.append([t, open_, max(open_, close) * (1 + wick), min(open_, close) * (1 - wick), close,
+                            volume, t + step - 1, volume * close, int(volume), 0])
+            close = open_
+        candles.reverse()
+        return deque(candles, maxlen=self.HISTORY)
+
+    def _roll(self, interval: str, candles: deque, now_ms: int):
+        """Mở candle mới (cả khi bỏ lỡ nhiều candles) khi qua close time"""
+        step = interval_to_ms(interval)
+        while now_ms > candles[-1][6]:
+            t = candles[-1][0] + step
+            p = candles[-1][4]
+            candles.append([t, p, p, p, p, 0.0, t + step - 1, 0.0, 0, 0])
+
+    def _format_candle(self, c: List) -> List:
+        return [c[0], self.fmt_price(c[1]), self.fmt_price(c[2]), self.fmt_price(c[3]), self.fmt_price(c[4]),
+                self.fmt_qty(c[5]), c[6], f"{c[7]:.4f}", c[8], self.fmt_qty(c[5] / 2), f"{c[7] / 2:.4f}", '0']
+
+
+# ============================================
+# ACCOUNT
+# ============================================
+
+class OrderRejected(Exception):
+    """Order bị từ chối (code / msg theo Binance)"""
+
+    def __init__(self, code: int, msg: str):
+        super().__init__(msg)
+        self.code = code
+        self.msg = msg
+
+
+class SimAccount:
+    """1 account USDT-M, one-way position mode, market orders fill ngay ở giá hiện tại"""
+
+    def __init__(self, balance: float = 10000.0, default_leverage: int = 20, taker_fee: float = 0.0004):
+        self.balance = balance
+        self.default_leverage = default_leverage
+        self.taker_fee = taker_fee
+        self.positions: Dict[str, dict] = {}     # symbol -> {'amt', 'entry'}
+        self.leverage: Dict[str, int] = {}
+        self.margin_type: Dict[str, str] = {}
+        self.orders: Dict[str, dict] = {}        # clientOrderId -> order
+        self._order_ids = count(1)
+
+    def fill(self, market: SimMarket, side: str, quantity: float, reduce_only: bool,
+             client_order_id: Optional[str], now_ms: int) -> dict:
+        """
+        Fill market order
+
+        Raises:
+            OrderRejected: Order không hợp lệ
+        """
+        if client_order_id and client_order_id in self.orders:
+            raise OrderRejected(-4015, 'Client order id is not valid.')
+        if quantity <= 0:
+            raise OrderRejected(-4003, 'Quantity less than or equal to zero.')
+
+        symbol = market.symbol
+        position = self.positions.get(symbol, {'amt': 0.0, 'entry': 0.0})
+        signed = quantity if side == 'BUY' else -quantity
+
+        if reduce_only:
+            if position['amt'] == 0 or position['amt'] * signed > 0:
+                raise OrderRejected(-2022, 'ReduceOnly Order is rejected.')
+            signed = math.copysign(min(abs(signed), abs(position['amt'])), signed)
+
+        price = market.price
+        realized = 0.0
+        amt, entry = position['amt'], position['entry']
+        new_amt = round(amt + signed, 8)
+
+        if amt == 0 or amt * signed > 0:
+            # Mở / tăng position: entry price trung bình
+            entry = (abs(amt) * entry + abs(signed) * price) / abs(new_amt)
+        else:
+            closed = min(abs(signed), abs(amt))
+            realized = closed * (price - entry) * (1 if amt > 0 else -1)
+            if new_amt * amt < 0:
+                entry = price  # Đảo chiều
+
+        self.balance += realized - abs(signed) * price * self.taker_fee
+        if new_amt == 0:
+            self.positions.pop(symbol, None)
+        else:
+            self.positions[symbol] = {'amt': new_amt, 'entry': entry}
+
+        order_id = next(self._order_ids)
+        order = {
+            'orderId': order_id, 'symbol': symbol, 'status': 'FILLED',
+            'clientOrderId': client_order_id or f"sim-{uuid.uuid4().hex[:16]}",
+            'price': '0', 'avgPrice': market.fmt_price(price),
+            'origQty': market.fmt_qty(abs(signed)), 'executedQty': market.fmt_qty(abs(signed)),
+            'cumQuote': f"{abs(signed) * price:.4f}", 'timeInForce': 'GTC', 'type': 'MARKET',
+            'reduceOnly': reduce_only, 'closePosition': False, 'side': side, 'positionSide': 'BOTH',
+            'origType': 'MARKET', 'updateTime': now_ms, 'realizedPnl': f"{realized:.8f}",
+        }
+        self.orders[order['clientOrderId']] = order
+        return order
+
+    def position_risk(self, market: SimMarket) -> dict:
+        position = self.positions.get(market.symbol, {'amt': 0.0, 'entry': 0.0})
+        amt, entry = position['amt'], position['entry']
+        return {
+            'symbol': market.symbol, 'positionAmt': market.fmt_qty(amt),
+            'entryPrice': market.fmt_price(entry), 'markPrice': market.fmt_price(market.price),
+            'unRealizedProfit': f"{(market.price - entry) * amt:.8f}",
+            'liquidationPrice': '0', 'leverage': str(self.leverage.get(market.symbol, self.default_leverage)),
+            'marginType': self.margin_type.get(market.symbol, 'cross'), 'isolatedMargin': '0',
+            'positionSide': 'BOTH', 'updateTime': market.updated,
+        }
+
+    def unrealized(self, markets: Dict[str, SimMarket]) -> float:
+        return sum((markets[s].price - p['entry']) * p['amt'] for s, p in self.positions.items())
+
+
+# ============================================
+# SIMULATOR SERVER
+# ============================================
+
+class ExchangeSimulator:
+    """
+    aiohttp server giả lập Binance USDT-M futures API cho các endpoints bot dùng:
+
+    - REST: ping, time, exchangeInfo, klines, depth, ticker/price, premiumIndex,
+      positionRisk, balance, leverage, marginType, order (POST/GET),
+      batchOrders, listenKey
+    - Websocket: /ws/<stream>, /stream?streams=a/b và SUBSCRIBE / UNSUBSCRIBE;
+      streams <symbol>@kline_<interval>, <symbol>@markPrice@1s,
+      !markPrice@arr@1s và user-data stream (listen key: ORDER_TRADE_UPDATE,
+      ACCOUNT_UPDATE)
+    - Latency mỗi REST request (latency_ms + jitter ngẫu nhiên)
+    - Rate limit weight / phút như Binance: X-MBX-USED-WEIGHT-1M header,
+      vượt limit -> 429 (code -1003) + Retry-After
+
+    Không kiểm tra signature. Giá là random walk (hoặc replay chuỗi giá đã
+    ghi), mỗi tick_interval giây 1 tick cho tất cả symbols.
+
+    Usage:
+        sim = ExchangeSimulator([f'SIM{i}USDT' for i in range(100)], latency_ms=20)
+        url = await sim.start(port=8765)   # SIMULATOR_URL=http://127.0.0.1:8765
+        ...
+        await sim.stop()
+    """
+
+    DEFAULT_PRICE = 100.0
+    DEPTH_LIMITS = (5, 10, 20, 50, 100, 500, 1000)
+
+    def __init__(self, symbols: Iterable[str], prices: Optional[Dict[str, float]] = None,
+                 paths: Optional[Dict[str, List[float]]] = None, volatility: float = 0.001,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, weight_limit: Optional[int] = 2400,
+                 tick_interval: float = 1.0, balance: float = 10000.0, seed: Optional[int] = None,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            symbols: Symbols được list
+            prices: Giá khởi đầu {symbol: price} (mặc định ngẫu nhiên)
+            paths: Chuỗi giá đã ghi {symbol: [price, ...]} (xem load_price_path)
+            volatility: Độ biến động random walk mỗi phút (0.001 = 0.1%)
+            latency_ms: Latency cố định thêm vào mỗi REST request
+            jitter_ms: Latency ngẫu nhiên thêm (uniform 0..jitter_ms)
+            weight_limit: Request weight tối đa mỗi phút (None: không giới hạn)
+            tick_interval: Giây giữa 2 tick giá
+            balance: Balance USDT ban đầu
+            seed: Seed cho giá / jitter (tái lập được)
+            clock: Nguồn thời gian (epoch seconds), inject được để test
+        """
+        self.rng = random.Random(seed)
+        self.clock = clock
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.weight_limit = weight_limit
+        self.tick_interval = tick_interval
+        self.account = SimAccount(balance)
+
+        prices = prices or {}
+        paths = paths or {}
+        now = self._now_ms()
+        self.markets: Dict[str, SimMarket] = {}
+        for symbol in symbols:
+            rng = random.Random(self.rng.random())
+            if symbol in paths:
+                path = RecordedPath(paths[symbol], volatility, rng)
+            else:
+                start = prices.get(symbol) or 10 ** self.rng.uniform(-1, 4)
+                path = SyntheticPath(start, volatility, rng)
+            self.markets[symbol] = SimMarket(symbol, path, now, rng)
+
+        # Stats
+        self.requests: Dict[str, int] = {}
+        self.rejected = 0   # 429
+        self.ticks = 0
+
+        self._window = 0
+        self._used_weight = 0
+        self._listen_keys = set()
+        self._sockets: Dict[web.WebSocketResponse, dict] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self._tick_task: Optional[asyncio.Task] = None
+
+    # ============================================
+    # LIFECYCLE
+    # ============================================
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        routes = [
+            ('GET', '/api/v3/ping', self._ping),
+            ('GET', '/fapi/v1/ping', self._ping),
+            ('GET', '/fapi/v1/time', self._time),
+            ('GET', '/fapi/v1/exchangeInfo', self._exchange_info),
+            ('GET', '/fapi/v1/klines', self._klines),
+            ('GET', '/fapi/v1/depth', self._depth),
+            ('GET', '/fapi/v1/ticker/price', self._ticker_price),
+            ('GET', '/fapi/v1/premiumIndex', self._premium_index),
+            ('GET', '/fapi/v2/positionRisk', self._position_risk),
+            ('GET', '/fapi/v2/balance', self._balance),
+            ('POST', '/fapi/v1/leverage', self._leverage),
+            ('POST', '/fapi/v1/marginType', self._margin_type),
+            ('POST', '/fapi/v1/order', self._create_order),
+            ('GET', '/fapi/v1/order', self._get_order),
+            ('POST', '/fapi/v1/batchOrders', self._batch_orders),
+            ('POST', '/fapi/v1/listenKey', self._listen_key),
+            ('PUT', '/fapi/v1/listenKey', self._listen_key),
+            ('DELETE', '/fapi/v1/listenKey', self._listen_key),
+            ('GET', '/ws', self._websocket),
+            ('GET', '/ws/{stream}', self._websocket),
+            ('GET', '/stream', self._websocket),
+            ('GET', '/sim/stats', self._stats),
+        ]
+        for method, path, handler in routes:
+            app.router.add_route(method, path, handler)
+        return app
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0, ticks: bool = True) -> str:
+        """
+        Start server (+ tick loop nếu ticks)
+
+        Returns:
+            str: Base URL (vd. 'http://127.0.0.1:8765'), dùng làm SIMULATOR_URL
+        """
+        self._runner = web.AppRunner(self.app(), access_log=None)  # 100+ symbols: log quá nhiều
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        if ticks:
+            self._tick_task = asyncio.get_running_loop().create_task(self._tick_loop())
+
+        url = f"http://{host}:{port}"
+        logger.info(f"🧪 Exchange simulator listening on {url} ({len(self.markets)} symbols)")
+        return url
+
+    async def stop(self):
+        if self._tick_task is not None:
+            self._tick_task.cancel()
+            try:
+                await self._tick_task
+            except asyncio.CancelledError:
+                pass
+            self._tick_task = None
+        for ws in list(self._sockets):
+            await ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _tick_loop(self):
+        while True:
+            await asyncio.sleep(self.tick_interval)
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.error(f"Simulator tick error: {e}")
+
+    async def tick(self):
+        """1 tick giá cho tất cả symbols + push websocket streams"""
+        now = self._now_ms()
+        for market in self.markets.values():
+            market.tick(now)
+        self.ticks += 1
+        await self._broadcast(now)
+
+    def stats(self) -> dict:
+        return {
+            'requests': dict(self.requests),
+            'total_requests': sum(self.requests.values()),
+            'rejected': self.rejected,
+            'ticks': self.ticks,
+            'orders': len(self.account.orders),
+            'open_positions': len(self.account.positions),
+            'balance': self.account.balance,
+            'websockets': len(self._sockets),
+        }
+
+    def _now_ms(self) -> int:
+        return int(self.clock() * 1000)
+
+    # ============================================
+    # LATENCY + RATE LIMIT
+    # ============================================
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        path = request.path
+        if not (path.startswith('/fapi') or path.startswith('/api')):
+            return await handler(request)
+
+        endpoint = path.rsplit('/', 1)[-1]
+        self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+        delay = self.latency_ms + (self.rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        window = int(self.clock() // 60)
+        if window != self._window:
+            self._window, self._used_weight = window, 0
+
+        weight = endpoint_weight(path, dict(request.query))
+        if self.weight_limit is not None and self._used_weight + weight > self.weight_limit:
+            self.rejected += 1
+            retry_after = str(60 - int(self.clock()) % 60)
+            return web.json_response(
+                {'code': -1003, 'msg': 'Too many requests; current limit is %d requests per minute.' % self.weight_limit},
+                status=429, headers={'Retry-After': retry_after, 'X-MBX-USED-WEIGHT-1M': str(self._used_weight)}
+            )
+
+        self._used_weight += weight
+        response = await handler(request)
+        response.headers['X-MBX-USED-WEIGHT-1M'] = str(self._used_weight)
+        return response
+
+    # ============================================
+    # REST
+    # ============================================
+
+    @staticmethod
+    def _error(code: int, msg: str, status: int = 400) -> web.Response:
+        return web.json_response({'code': code, 'msg': msg}, status=status)
+
+    @staticmethod
+    async def _params(request: web.Request) -> dict:
+        """Query + body (AsyncClient gửi signed params trên query, Client trong body)"""
+        params = dict(request.query)
+        if request.can_read_body:
+            params.update(await request.post())
+        return params
+
+    def _market(self, params: dict) -> Optional[SimMarket]:
+        return self.markets.get(params.get('symbol', ''))
+
+    async def _ping(self, request):
+        return web.json_response({})
+
+    async def _time(self, request):
+        return web.json_response({'serverTime': self._now_ms()})
+
+    async def _exchange_info(self, request):
+        return web.json_response({
+            'timezone': 'UTC', 'serverTime': self._now_ms(),
+            'rateLimits': [{'rateLimitType': 'REQUEST_WEIGHT', 'interval': 'MINUTE', 'intervalNum': 1,
+                            'limit': self.weight_limit or 0}],
+            'symbols': [m.symbol_info() for m in self.markets.values()],
+        })
+
+    async def _klines(self, request):
+        params = request.query
+        market = self._market(params)
+        if market is None:
+            return self._error(-1121, 'Invalid symbol.')
+        if interval_to_ms(params.get('interval', '')) is None:
+            return self._error(-1120, 'Invalid interval.')
+
+        start = int(params['startTime']) if 'startTime' in params else None
+        end = int(params['endTime']) if 'endTime' in params else None
+        limit = min(int(params.get('limit', 500)), SimMarket.HISTORY)
+        return web.json_response(market.klines(params['interval'], self._now_ms(), limit, start, end))
+
+    async def _depth(self, request):
+        market = self._market(request.query)
+        if market is None:
+            return self._error(-1121, 'Invalid symbol.')
+        limit = int(request.query.get('limit', 500))
+        if limit not in self.DEPTH_LIMITS:
+            return self._error(-1100, 'Illegal characters found in parameter \'limit\'.')
+        return web.json_response(market.depth(limit))
+
+    async def _ticker_price(self, request):
+        now = self._now_ms()
+        if 'symbol' not in request.query:
+            return web.json_response([{'symbol': m.symbol, 'price': m.fmt_price(m.price), 'time': now}
+                                      for m in self.markets.values()])
+        market = self._market(request.query)
+        if market is None:
+            return self._error(-1121, 'Invalid symbol.')
+        return web.json_response({'symbol': market.symbol, 'price': market.fmt_price(market.price), 'time': now})
+
+    async def _premium_index(self, request):
+        now = self._now_ms()
+        if 'symbol' not in request.query:
+            return web.json_response([self._premium(m, now) for m in self.markets.values()])
+        market = self._market(request.query)
+        if market is None:
+            return self._error(-1121, 'Invalid symbol.')
+        return web.json_response(self._premium(market, now))
+
+    @staticmethod
+    def _premium(market: SimMarket, now: int) -> dict:
+        price = market.fmt_price(market.price)
+        return {'symbol': market.symbol, 'markPrice': price, 'indexPrice': price,
+                'lastFundingRate': '0.00010000', 'nextFundingTime': (now // 28800000 + 1) * 28800000, 'time': now}
+
+    async def _position_risk(self, request):
+        params = await self._params(request)
+        if 'symbol' in params:
+            market = self._market(params)
+            if market is None:
+                return self._error(-1121, 'Invalid symbol.')
+            return web.json_response([self.account.position_risk(market)])
+        return web.json_response([self.account.position_risk(m) for m in self.markets.values()])
+
+    async def _balance(self, request):
+        unrealized = self.account.unrealized(self.markets)
+        return web.json_response([{
+            'accountAlias': 'sim', 'asset': 'USDT',
+            'balance': f"{self.account.balance:.8f}",
+            'crossWalletBalance': f"{self.account.balance:.8f}",
+            'crossUnPnl': f"{unrealized:.8f}",
+            'availableBalance': f"{self.account.balance + min(unrealized, 0):.8f}",
+            'maxWithdrawAmount': f"{self.account.balance:.8f}",
+            'marginAvailable': True, 'updateTime': self._now_ms(),
+        }])
+
+    async def _leverage(self, request):
+        params = await self._params(request)
+        market = self._market(params)
+        if market is None:
+            return self._error(-1121, 'Invalid symbol.')
+        leverage = int(params.get('leverage', 0))
+        if not 1 <= leverage <= 125:
+            return self._error(-4028, 'Leverage is not valid')
+        self.account.leverage[market.symbol] = leverage
+        return web.json_response({'symbol': market.symbol, 'leverage': leverage, 'maxNotionalValue': '1000000'})
+
+    async def _margin_type(self, request):
+        params = await self._params(request)
+        market = self._market(params)
+        if market is None:
+            return self._error(-1121, 'Invalid symbol.')
+        margin_type = params.get('marginType', '').lower()
+        if margin_type not in ('isolated', 'crossed'):
+            return self._error(-1116, 'Invalid marginType.')
+        margin_type = 'cross' if margin_type == 'crossed' else 'isolated'
+        if self.account.margin_type.get(market.symbol, 'cross') == margin_type:
+            return self._error(-4046, 'No need to change margin type.')
+        self.account.margin_type[market.symbol] = margin_type
+        return web.json_response({'code': 200, 'msg': 'success'})
+
+    async def _create_order(self, request):
+        params = await self._params(request)
+        result = self._place_order(params)
+        if 'code' in result:
+            return web.json_response(result, status=400)
+        await self._push_fill(result)
+        return web.json_response(result)
+
+    async def _batch_orders(self, request):
+        params = await self._params(request)
+        try:
+            # python-binance: JSON url-encode 1 lần, rồi encode tiếp trong query / body
+            batch = json.loads(unquote(params['batchOrders']))
+        except (KeyError, ValueError):
+            return self._error(-1130, 'Data sent for parameter \'batchOrders\' is not valid.')
+        if len(batch) > 5:
+            return self._error(-4039, 'Batch order list size exceeds max limit.')
+
+        results = [self._place_order(order) for order in batch]
+        for result in results:
+            if 'code' not in result:
+                await self._push_fill(result)
+        return web.json_response(results)
+
+    def _place_order(self, params: dict) -> dict:
+        """Fill 1 market order -> order dict hoặc {'code', 'msg'}"""
+        market = self._market(params)
+        if market is None:
+            return {'code': -1121, 'msg': 'Invalid symbol.'}
+        if params.get('type', 'MARKET') != 'MARKET':
+            return {'code': -1116, 'msg': 'Invalid orderType (simulator supports MARKET only).'}
+        if params.get('side') not in ('BUY', 'SELL'):
+            return {'code': -1117, 'msg': 'Invalid side.'}
+        try:
+            quantity = float(params.get('quantity', 0))
+        except ValueError:
+            return {'code': -1100, 'msg': 'Illegal characters found in parameter \'quantity\'.'}
+        try:
+            return self.account.fill(
+                market, params['side'], quantity,
+                reduce_only=str(params.get('reduceOnly', 'false')).lower() == 'true',
+                client_order_id=params.get('newClientOrderId'), now_ms=self._now_ms()
+            )
+        except OrderRejected as e:
+            return {'code': e.code, 'msg': e.msg}
+
+    async def _get_order(self, request):
+        params = await self._params(request)
+        order = self.account.orders.get(params.get('origClientOrderId', ''))
+        if order is None and 'orderId' in params:
+            order = next((o for o in self.account.orders.values() if str(o['orderId']) == params['orderId']), None)
+        if order is None:
+            return self._error(-2013, 'Order does not exist.')
+        return web.json_response(order)
+
+    async def _listen_key(self, request):
+        if request.method == 'POST':
+            key = uuid.uuid4().hex + uuid.uuid4().hex
+            self._listen_keys.add(key)
+            return web.json_response({'listenKey': key})
+        if request.method == 'DELETE':
+            params = await self._params(request)
+            self._listen_keys.discard(params.get('listenKey'))
+        return web.json_response({})
+
+    async def _stats(self, request):
+        return web.json_response(self.stats())
+
+    # ============================================
+    # WEBSOCKET
+    # ============================================
+
+    async def _websocket(self, request):
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+
+        streams = set()
+        if 'stream' in request.match_info:
+            streams.add(request.match_info['stream'])
+        if 'streams' in request.query:
+            streams.update(s for s in request.query['streams'].split('/') if s)
+        self._sockets[ws] = {'streams': streams, 'combined': request.path == '/stream'}
+
+        try:
+            async for msg in ws:
+                if msg.type == WSMsgType.TEXT:
+                    await self._handle_ws_message(ws, msg.data)
+                elif msg.type in (WSMsgType.CLOSED, WSMsgType.ERROR):
+                    break
+        finally:
+            self._sockets.pop(ws, None)
+        return ws
+
+    async def _handle_ws_message(self, ws, raw: str):
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            return
+        method, params = message.get('method'), message.get('params') or []
+        streams = self._sockets[ws]['streams']
+        if method == 'SUBSCRIBE':
+            streams.update(params)
+        elif method == 'UNSUBSCRIBE':
+            streams.difference_update(params)
+        elif method == 'LIST_SUBSCRIPTIONS':
+            await ws.send_json({'result': sorted(streams), 'id': message.get('id')})
+            return
+        await ws.send_json({'result': None, 'id': message.get('id')})
+
+    def _stream_payload(self, stream: str, now: int, cache: dict):
+        """Payload của 1 market stream cho tick hiện tại (None: không phải market stream)"""
+        if stream in cache:
+            return cache[stream]
+
+        payload = None
+        if stream.startswith('!markPrice@arr'):
+            payload = [m.mark_price_event(now) for m in self.markets.values()]
+        elif '@' in stream:
+            symbol, _, channel = stream.partition('@')
+            market = self.markets.get(symbol.upper())
+            if market is not None:
+                if channel.startswith('markPrice'):
+                    payload = market.mark_price_event(now)
+                elif channel.startswith('kline_') and interval_to_ms(channel[6:]) is not None:
+                    payload = market.kline_event(channel[6:], now)
+
+        cache[stream] = payload
+        return payload
+
+    async def _broadcast(self, now: int):
+        cache = {}
+        for ws, sub in list(self._sockets.items()):
+            for stream in list(sub['streams']):
+                payload = self._stream_payload(stream, now, cache)
+                if payload is not None:
+                    await self._send(ws, sub, stream, payload)
+
+    async def _push_fill(self, order: dict):
+        """ORDER_TRADE_UPDATE + ACCOUNT_UPDATE tới các user-data streams"""
+        targets = [(ws, sub, s) for ws, sub in self._sockets.items() for s in sub['streams'] if s in self._listen_keys]
+        if not targets:
+            return
+
+        now = self._now_ms()
+        market = self.markets[order['symbol']]
+        position = self.account.position_risk(market)
+        events = [
+            {'e': 'ORDER_TRADE_UPDATE', 'E': now, 'T': now, 'o': {
+                's': order['symbol'], 'c': order['clientOrderId'], 'S': order['side'], 'o': 'MARKET',
+                'q': order['origQty'], 'p': '0', 'ap': order['avgPrice'], 'x': 'TRADE', 'X': 'FILLED',
+                'i': order['orderId'], 'l': order['executedQty'], 'z': order['executedQty'],
+                'L': order['avgPrice'], 'T': now, 'R': order['reduceOnly'], 'ps': 'BOTH',
+                'rp': order['realizedPnl'],
+            }},
+            {'e': 'ACCOUNT_UPDATE', 'E': now, 'T': now, 'a': {
+                'm': 'ORDER',
+                'B': [{'a': 'USDT', 'wb': f"{self.account.balance:.8f}", 'cw': f"{self.account.balance:.8f}"}],
+                'P': [{'s': market.symbol, 'pa': position['positionAmt'], 'ep': position['entryPrice'],
+                       'up': position['unRealizedProfit'], 'mt': position['marginType'], 'ps': 'BOTH'}],
+            }},
+        ]
+        for ws, sub, stream in targets:
+            for event in events:
+                await self._send(ws, sub, stream, event)
+
+    async def _send(self, ws, sub: dict, stream: str, payload):
+        message = {'stream': stream, 'data': payload} if sub['combined'] else payload
+        try:
+            await ws.send_str(json.dumps(message))
+        except Exception:
+            self._sockets.pop(ws, None)
@@ -4,6 +4,7 @@
 # Tính theo PnL% (có tính leverage) thay vì Price Movement%
 # ============================================
 
+import threading
 import pandas as pd
 import numpy as np
 from config import Config
@@ -28,7 +29,8 @@ class TrailingStopManager:
         self.trail_pct = trail_pct
         self.use_pnl_based = use_pnl_based
         self.trailing_stops = {}  # {symbol: {'stop_price': float, 'highest_pnl': float}}
-        
+        self._lock = threading.RLock()  # Thread-safe khi xử lý symbols song song
+
     def update_trailing_stop(self, symbol, side, entry_price, current_price, leverage=None):
         """
         Update trailing stop cho position (PnL-based)
@@ -43,6 +45,11 @@ class TrailingStopManager:
         Returns:
             dict: {'should_close': bool, 'stop_price': float, 'reason': str}
         """
+        with self._lock:
+            return self._update_trailing_stop(symbol, side, entry_price, current_price, leverage)
+
+    def _update_trailing_stop(self, symbol, side, entry_price, current_price, leverage=None):
+        """Update trailing stop state (caller phải giữ self._lock)"""
         leverage = leverage or Config.LEVERAGE
 
         # Calculate current PnL % (with leverage effect)
@@ -129,12 +136,13 @@ class TrailingStopManager:
     
     def remove_trailing_stop(self, symbol):
         """Remove trailing stop cho symbol"""
-        if symbol in self.trailing_stops:
-            del self.trailing_stops[symbol]
+        with self._lock:
+            self.trailing_stops.pop(symbol, None)
     
     def get_trailing_stop_info(self, symbol):
         """Get trailing stop info"""
-        return self.trailing_stops.get(symbol, {})
+        with self._lock:
+            return dict(self.trailing_stops.get(symbol, {}))
 
 
 class ATRTrailingStop:
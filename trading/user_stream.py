@@ -0,0 +1,399 @@
+# ============================================
+# 👤 USER DATA STREAM
+# Listen-key websocket -> AccountState (positions, balance, orders)
+# realtime, REST polling chỉ dùng khi stream không live
+# ============================================
+
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import aiohttp
+
+from utils.logger import logger
+from trading.base_exchange import AccountSnapshot
+
+
+class AccountState:
+    """
+    Trạng thái account trong memory, cập nhật từ user-data stream events.
+
+    - Positions lưu theo format positionRisk (positionAmt, entryPrice, ...),
+      markPrice / unRealizedProfit tính lại từ mark price stream
+    - Seed bằng REST snapshot (load_snapshot); events mới hơn snapshot không
+      bị ghi đè
+    - live = False khi stream mất kết nối -> callers dùng REST
+
+    Giả định one-way position mode (1 position mỗi symbol) như bot.
+    """
+
+    MAX_ORDERS = 500  # Order updates gần nhất giữ lại
+
+    def __init__(self):
+        self.balance: Optional[float] = None
+        self.live = False
+        self.last_event = 0.0  # time.time() của event gần nhất
+
+        self._positions: Dict[str, dict] = {}
+        self._mark_prices: Dict[str, float] = {}
+        self._orders: 'OrderedDict[int, dict]' = OrderedDict()
+        self._updated: Dict[str, int] = {}  # symbol / 'balance' -> event time (ms)
+        self._listeners: List[Callable[[str, dict], None]] = []
+        self._lock = threading.RLock()
+
+    def add_position_closed_listener(self, callback: Callable[[str, dict], None]):
+        """callback(symbol, last_position_record) khi position về 0 (TP/SL, liquidation, ...)"""
+        self._listeners.append(callback)
+
+    # ============================================
+    # UPDATES
+    # ============================================
+
+    def load_snapshot(self, snapshot: AccountSnapshot, as_of: int):
+        """
+        Seed từ REST AccountSnapshot
+
+        Args:
+            snapshot: AccountSnapshot (positions đã parse)
+            as_of: Thời điểm (ms) bắt đầu request REST, events mới hơn được giữ
+        """
+        with self._lock:
+            if self._updated.get('balance', 0) <= as_of:
+                self.balance = snapshot.balance
+
+            for symbol in list(self._positions):
+                if symbol not in snapshot.positions and self._updated.get(symbol, 0) <= as_of:
+                    del self._positions[symbol]
+
+            for symbol, position in snapshot.positions.items():
+                if self._updated.get(symbol, 0) > as_of:
+                    continue
+                sign = 1 if position['side'] == 'LONG' else -1
+                self._positions[symbol] = {
+                    'symbol': symbol,
+                    'positionAmt': sign * position['amount'],
+                    'entryPrice': position['entry_price'],
+                    'unRealizedProfit': position['pnl_usdt'],
+                }
+                self._mark_prices.setdefault(symbol, position['mark_price'])
+
+    def apply_event(self, data: dict) -> Optional[str]:
+        """
+        Apply 1 event của user-data / mark price stream
+
+        Returns:
+            str: Loại event (None nếu không nhận ra)
+        """
+        if isinstance(data, list):
+            self._apply_mark_prices(data)
+            return 'markPriceUpdate'
+
+        event = data.get('e')
+        if event == 'ACCOUNT_UPDATE':
+            self._apply_account_update(data)
+        elif event == 'ORDER_TRADE_UPDATE':
+            self._apply_order_update(data)
+        elif event == 'markPriceUpdate':
+            self._apply_mark_prices([data])
+        elif event is None:
+            return None
+
+        self.last_event = time.time()
+        return event
+
+    def _apply_account_update(self, data: dict):
+        event_time = int(data.get('T') or data.get('E') or 0)
+        account = data.get('a', {})
+        closed = []
+
+        with self._lock:
+            for b in account.get('B', []):
+                if b.get('a') == 'USDT':
+                    self.balance = float(b['wb'])
+                    self._updated['balance'] = event_time
+
+            for p in account.get('P', []):
+                symbol = p['s']
+                amt = float(p['pa'])
+                self._updated[symbol] = event_time
+
+                if amt == 0:
+                    previous = self._positions.pop(symbol, None)
+                    if previous is not None:
+                        closed.append((symbol, previous))
+                    continue
+
+                self._positions[symbol] = {
+                    'symbol': symbol,
+                    'positionAmt': amt,
+                    'entryPrice': float(p['ep']),
+                    'unRealizedProfit': float(p.get('up', 0)),
+                    'marginType': p.get('mt'),
+                }
+
+        for symbol, previous in closed:
+            for callback in self._listeners:
+                try:
+                    callback(symbol, previous)
+                except Exception as e:
+                    logger.error(f"Position closed listener error ({symbol}): {e}")
+
+    def _apply_order_update(self, data: dict):
+        order = data.get('o', {})
+        with self._lock:
+            self._orders[order.get('i')] = order
+            self._orders.move_to_end(order.get('i'))
+            while len(self._orders) > self.MAX_ORDERS:
+                self._orders.popitem(last=False)
+
+    def _apply_mark_prices(self, items: List[dict]):
+        with self._lock:
+            for item in items:
+                self._mark_prices[item['s']] = float(item['p'])
+
+    def mark_stale(self):
+        self.live = False
+
+    # ============================================
+    # READ
+    # ============================================
+
+    def get_mark_price(self, symbol: str) -> Optional[float]:
+        with self._lock:
+            return self._mark_prices.get(symbol)
+
+    def get_order(self, order_id: int) -> Optional[dict]:
+        """Order update gần nhất (raw 'o' của ORDER_TRADE_UPDATE)"""
+        with self._lock:
+            return self._orders.get(order_id)
+
+    def get_raw_positions(self) -> List[dict]:
+        """
+        Positions theo format positionRisk, markPrice / unRealizedProfit
+        theo mark price mới nhất
+        """
+        with self._lock:
+            result = []
+            for symbol, p in self._positions.items():
+                entry = dict(p)
+                amt, entry_price = entry['positionAmt'], entry['entryPrice']
+                mark_price = self._mark_prices.get(symbol)
+                if mark_price is not None:
+                    entry['unRealizedProfit'] = (mark_price - entry_price) * amt
+                else:
+                    mark_price = entry_price + entry['unRealizedProfit'] / amt
+                entry['markPrice'] = mark_price
+                result.append(entry)
+            return result
+
+
+class UserDataStream:
+    """
+    User-data stream (listen key) + mark price stream của 1 exchange -> AccountState.
+
+    - Listen key: rest_client.start_user_stream(), keep-alive mỗi
+      KEEPALIVE_INTERVAL, tạo key mới khi nhận listenKeyExpired / reconnect
+    - Mỗi lần connect: seed state bằng REST get_account_snapshot()
+    - get_snapshot() trả None khi stream không live -> caller poll REST
+    - Chạy trên event loop riêng trong daemon thread (start/stop), giống
+      KlineStreamManager
+
+    Usage:
+        stream = UserDataStream('wss://fstream.binance.com', client)
+        stream.start()
+        snapshot = stream.get_snapshot() or client.get_account_snapshot()
+    """
+
+    MARK_PRICE_STREAM = '!markPrice@arr@1s'
+    KEEPALIVE_INTERVAL = 30 * 60  # Listen key hết hạn sau 60 phút
+    RECONNECT_DELAY = 1
+    MAX_RECONNECT_DELAY = 60
+    HEARTBEAT = 30
+
+    def __init__(self, ws_url: str, rest_client, state: Optional[AccountState] = None,
+                 exchange_name: str = ''):
+        """
+        Args:
+            ws_url: Websocket base URL (vd. 'wss://fstream.binance.com')
+            rest_client: Exchange client (listen key, get_account_snapshot, _parse_position)
+            state: AccountState (tạo mới nếu None)
+            exchange_name: Dùng cho log
+        """
+        self.ws_url = ws_url.rstrip('/')
+        self.rest_client = rest_client
+        self.state = state if state is not None else AccountState()
+        self.exchange_name = exchange_name or getattr(rest_client, 'exchange_name', '')
+
+        self._loop = None
+        self._stop_event = None
+        self._thread = None
+
+    # ============================================
+    # LIFECYCLE
+    # ============================================
+
+    def start(self):
+        """Chạy stream trong daemon thread (event loop riêng)"""
+        self._thread = threading.Thread(
+            target=asyncio.run, args=(self.run(),),
+            name=f"{self.exchange_name or 'user'}-user-stream", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        """Dừng stream (an toàn khi gọi từ thread bất kỳ)"""
+        if self._loop is not None and not self._loop.is_closed() and self._stop_event is not None:
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    async def run(self):
+        """Chạy stream cho tới khi stop()"""
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+
+        async with aiohttp.ClientSession() as session:
+            task = asyncio.create_task(self._run_connection(session))
+            try:
+                await self._stop_event.wait()
+            finally:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+        self.state.mark_stale()
+        logger.info(f"👤 [{self.exchange_name}] User data stream stopped")
+
+    def is_live(self) -> bool:
+        return self.state.live
+
+    # ============================================
+    # CONNECTION
+    # ============================================
+
+    async def _run_connection(self, session: aiohttp.ClientSession):
+        """Listen key + websocket, tự reconnect với exponential backoff"""
+        delay = self.RECONNECT_DELAY
+
+        while not self._stop_event.is_set():
+            listen_key = None
+            try:
+                listen_key = await asyncio.to_thread(self.rest_client.start_user_stream)
+                url = f"{self.ws_url}/stream?streams={listen_key}/{self.MARK_PRICE_STREAM}"
+
+                async with session.ws_connect(url, heartbeat=self.HEARTBEAT) as ws:
+                    await self._seed()
+                    self.state.live = True
+                    delay = self.RECONNECT_DELAY
+                    logger.info(f"👤 [{self.exchange_name}] User data stream connected")
+
+                    keepalive = asyncio.create_task(self._keepalive(listen_key))
+                    try:
+                        async for msg in ws:
+                            if msg.type == aiohttp.WSMsgType.TEXT:
+                                if not self._handle_message(msg.data):
+                                    logger.info(f"👤 [{self.exchange_name}] Listen key expired, renewing")
+                                    break
+                            elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                                break
+                    finally:
+                        keepalive.cancel()
+
+                logger.warning(f"⚠️ [{self.exchange_name}] User data stream disconnected, using REST until reconnected")
+
+            except asyncio.CancelledError:
+                self.state.mark_stale()
+                if listen_key is not None:
+                    await self._close_listen_key(listen_key)
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ [{self.exchange_name}] User data stream error: {e}, reconnecting in {delay}s...")
+
+            self.state.mark_stale()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.MAX_RECONNECT_DELAY)
+
+    async def _seed(self):
+        """Nạp REST snapshot (events tới trong lúc request không bị ghi đè)"""
+        as_of = int(time.time() * 1000)
+        snapshot = await asyncio.to_thread(self.rest_client.get_account_snapshot)
+        if snapshot is None:
+            raise RuntimeError("account snapshot unavailable")
+        self.state.load_snapshot(snapshot, as_of)
+
+    async def _keepalive(self, listen_key: str):
+        while True:
+            await asyncio.sleep(self.KEEPALIVE_INTERVAL)
+            try:
+                await asyncio.to_thread(self.rest_client.keepalive_user_stream, listen_key)
+            except Exception as e:
+                logger.warning(f"⚠️ [{self.exchange_name}] Listen key keep-alive failed: {e}")
+
+    async def _close_listen_key(self, listen_key: str):
+        try:
+            await asyncio.wait_for(asyncio.to_thread(self.rest_client.close_user_stream, listen_key), 5)
+        except Exception:
+            pass
+
+    def _handle_message(self, raw: str) -> bool:
+        """
+        Apply 1 message vào state
+
+        Returns:
+            bool: False nếu listen key đã hết hạn (cần reconnect)
+        """
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            return True
+
+        # Combined stream: {'stream': ..., 'data': {...}}
+        data = message.get('data', message) if isinstance(message, dict) else message
+        if isinstance(data, dict) and data.get('e') == 'listenKeyExpired':
+            return False
+
+        if isinstance(data, dict) and data.get('e') == 'ACCOUNT_CONFIG_UPDATE':
+            config = data.get('ac')
+            account_config = getattr(self.rest_client, 'account_config', None)
+            if config and account_config is not None:
+                account_config.set_leverage(config['s'], config['l'])
+
+        self.state.apply_event(data)
+
+        if isinstance(data, dict) and data.get('e') == 'ACCOUNT_UPDATE':
+            account_config = getattr(self.rest_client, 'account_config', None)
+            if account_config is not None:
+                for p in data.get('a', {}).get('P', []):
+                    if p.get('mt'):
+                        account_config.set_margin_type(p['s'], p['mt'])
+
+        return True
+
+    # ============================================
+    # READ
+    # ============================================
+
+    def get_snapshot(self) -> Optional[AccountSnapshot]:
+        """
+        AccountSnapshot từ state (positions parse bằng client, mark price realtime)
+
+        Returns:
+            AccountSnapshot hoặc None nếu stream không live
+        """
+        if not self.state.live or self.state.balance is None:
+            return None
+
+        account_config = getattr(self.rest_client, 'account_config', None)
+        positions = {}
+        for pos in self.state.get_raw_positions():
+            if account_config is not None:
+                leverage = account_config.get(pos['symbol']).leverage
+                if leverage is not None:
+                    pos['leverage'] = leverage
+            position = self.rest_client._parse_position(pos)
+            if position is not None:
+                positions[pos['symbol']] = position
+
+        return AccountSnapshot(balance=self.state.balance, positions=positions)
@@ -6,12 +6,19 @@ import requests
 import pandas as pd
 import time
 from datetime import datetime, timedelta
+from config import Config
 from utils.logger import logger
+from trading.kline_cache import kline_cache
+from trading.http_session import get_http_session
+from trading.rate_limiter import endpoint_weight, get_rate_limiter
 
 class DataFetcher:
     """Lấy dữ liệu lịch sử từ Coingecko và realtime từ AsterDEX"""
     
     COINGECKO_API = "https://api.coingecko.com/api/v3"
+
+    # Use AsterDEX/Binance API instead of Coingecko (no limits!)
+    KLINES_URL = "https://fapi.asterdex.com/fapi/v1/klines"
     
     # Mapping symbol -> coingecko id
     COIN_MAP = {
@@ -56,70 +63,93 @@ class DataFetcher:
         Returns:
             DataFrame với columns: timestamp, open, high, low, close, volume
         """
-        # Use AsterDEX/Binance API instead of Coingecko (no limits!)
-        url = "https://fapi.asterdex.com/fapi/v1/klines"
-
         # Calculate start time
         end_time = int(time.time() * 1000)  # Current time in ms
         start_time = end_time - (days * 24 * 60 * 60 * 1000)  # days ago
-
-        params = {
-            'symbol': symbol,
-            'interval': '1h',  # 1-hour candles (changed from 15m for quality signals)
-            'startTime': start_time,
-            'endTime': end_time,
-            'limit': 1500  # Max per request
-        }
+        limit = days * 24  # 1-hour candles (changed from 15m for quality signals)
 
         logger.info(f"Fetching {days} days data for {symbol}...")
 
+        if Config.USE_KLINE_CACHE and limit <= kline_cache.max_candles:
+            # Window ngắn (paper trading): chỉ fetch candles mới hơn cache
+            data = kline_cache.get_klines(
+                'AsterDEX:mainnet', symbol, '1h', limit,
+                lambda limit, start_time=None: cls._get_klines(
+                    symbol, limit, start_time=start_time, max_retries=max_retries
+                )
+            )
+        else:
+            data = cls._get_klines(
+                symbol, 1500,  # Max per request
+                start_time=start_time, end_time=end_time, max_retries=max_retries
+            )
+
+        if not data:
+            logger.warning(f"No data returned for {symbol}")
+            return pd.DataFrame()
+
+        # Parse Binance klines format
+        # [timestamp, open, high, low, close, volume, close_time, ...]
+        df = pd.DataFrame(data, columns=[
+            'timestamp', 'open', 'high', 'low', 'close', 'volume',
+            'close_time', 'quote_volume', 'trades', 'taker_buy_base',
+            'taker_buy_quote', 'ignore'
+        ])
+
+        # Convert types
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        df['open'] = df['open'].astype(float)
+        df['high'] = df['high'].astype(float)
+        df['low'] = df['low'].astype(float)
+        df['close'] = df['close'].astype(float)
+        df['volume'] = df['volume'].astype(float)
+
+        # Keep only needed columns
+        df = df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
+
+        logger.info(f"✅ Fetched {len(df)} candles for {symbol}")
+        return df
+
+    @classmethod
+    def _get_klines(cls, symbol, limit, start_time=None, end_time=None, max_retries=3):
+        """
+        GET 1h klines từ AsterDEX API qua rate limiter và connection pool
+        chung, retry khi bị rate limit (limiter chờ hết Retry-After).
+        Lỗi mạng / 5xx được session retry với jittered backoff.
+
+        Returns:
+            List klines (rỗng nếu lỗi)
+        """
+        params = {'symbol': symbol, 'interval': '1h', 'limit': limit}
+        if start_time is not None:
+            params['startTime'] = start_time
+        if end_time is not None:
+            params['endTime'] = end_time
+
+        rate_limiter = get_rate_limiter('asterdex_mainnet')
+        session = get_http_session()
+
         for attempt in range(max_retries):
             try:
-                response = requests.get(url, params=params, timeout=30)
+                rate_limiter.acquire(endpoint_weight('klines', params))
+                response = session.get(cls.KLINES_URL, params=params, timeout=30)
+                rate_limiter.update_from_headers(response.headers, response.status_code)
                 response.raise_for_status()
-                data = response.json()
-
-                if not data:
-                    logger.warning(f"No data returned for {symbol}")
-                    return pd.DataFrame()
-
-                # Parse Binance klines format
-                # [timestamp, open, high, low, close, volume, close_time, ...]
-                df = pd.DataFrame(data, columns=[
-                    'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                    'close_time', 'quote_volume', 'trades', 'taker_buy_base',
-                    'taker_buy_quote', 'ignore'
-                ])
-
-                # Convert types
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-                df['open'] = df['open'].astype(float)
-                df['high'] = df['high'].astype(float)
-                df['low'] = df['low'].astype(float)
-                df['close'] = df['close'].astype(float)
-                df['volume'] = df['volume'].astype(float)
-
-                # Keep only needed columns
-                df = df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
-
-                logger.info(f"✅ Fetched {len(df)} candles for {symbol}")
-                return df
+                return response.json()
 
             except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 429:  # Rate limit
-                    wait_time = 10 * (attempt + 1)
-                    logger.warning(f"⚠️ Rate limit hit, waiting {wait_time}s... (attempt {attempt+1}/{max_retries})")
-                    time.sleep(wait_time)
+                if e.response.status_code in (418, 429):  # Rate limit
+                    logger.warning(f"⚠️ Rate limit hit (attempt {attempt+1}/{max_retries})")
                     continue
                 else:
                     logger.error(f"AsterDEX API error: {e}")
-                    return pd.DataFrame()
+                    return []
             except Exception as e:
                 logger.error(f"Data fetch error: {e}")
-                return pd.DataFrame()
+                return []
 
         logger.error(f"❌ Failed to fetch {symbol} after {max_retries} retries")
-        return pd.DataFrame()
+        return []
     
     @classmethod
     def fetch_multiple_symbols(cls, symbols, days=365):
@@ -130,18 +160,12 @@ class DataFetcher:
             Dict {symbol: DataFrame}
         """
         result = {}
-        for i, symbol in enumerate(symbols):
+        for symbol in symbols:
+            # Pacing do rate limiter trong _get_klines
             df = cls.fetch_historical_ohlcv(symbol, days)
             if not df.empty:
                 result[symbol] = df
 
-            # Rate limit: Wait longer between requests
-            # Coingecko free tier: ~10-30 calls/minute
-            if i < len(symbols) - 1:  # Don't wait after last symbol
-                wait_time = 3.0  # 3 seconds = max 20 calls/minute (safe)
-                logger.info(f"⏳ Waiting {wait_time}s before next request...")
-                time.sleep(wait_time)
-
         return result
     
     @classmethod